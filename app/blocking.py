@@ -0,0 +1,274 @@
+"""
+Event-loop blocking detector for the orchestrator (opt-in diagnostics).
+
+With blocking_diagnostics_enabled set, the loop runs in asyncio debug mode
+(slow callbacks are logged with the stack that created them) and a watchdog
+thread watches a heartbeat task on the loop. When the heartbeat is late by
+more than blocking_threshold_ms, the watchdog snapshots the loop thread's
+stack while it is still blocked, so the report names the exact sync call -
+requests.get, a file write, a psycopg2 query - rather than just "the loop was
+slow". Each stall is attributed to the route whose handler (or a coroutine
+defined inside it) is on the stack, and offenders are aggregated by
+(route, code location) for GET /debug/blocking (admin token required).
+
+Debug mode adds per-callback overhead, so this stays off in production
+unless someone is actively hunting stalls.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from config_loader import get_setting
+
+from app import metrics
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_DIR = os.path.join(REPO_ROOT, "app") + os.sep
+# Wrappers that are on every HTTP stack - the blocking call is attributed to their caller
+_INSTRUMENTATION_FILES = {os.path.join(APP_DIR, name) for name in ("tracing.py", "metrics.py", "blocking.py")}
+
+
+def is_blocking_diagnostics_enabled() -> bool:
+    return str(get_setting("blocking_diagnostics_enabled", False)).lower() in ("1", "true", "yes")
+
+
+@dataclass
+class Offender:
+    """Stalls aggregated for one (route, code location)."""
+    route: str
+    location: str
+    blocked_in: str
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    last_seen: float = 0.0
+    stack: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "route": self.route,
+            "location": self.location,
+            "blocked_in": self.blocked_in,
+            "count": self.count,
+            "total_ms": round(self.total_ms, 1),
+            "max_ms": round(self.max_ms, 1),
+            "avg_ms": round(self.total_ms / self.count, 1) if self.count else 0.0,
+            "last_seen": self.last_seen,
+            "stack": self.stack,
+        }
+
+
+@dataclass
+class _Stall:
+    beat: float  # heartbeat the loop has not moved past
+    route: str
+    location: str
+    blocked_in: str
+    stack: List[str]
+
+
+def _short_path(filename: str) -> str:
+    return os.path.relpath(filename, REPO_ROOT) if filename.startswith(REPO_ROOT) else filename
+
+
+class BlockingDetector:
+    """
+    Heartbeat + watchdog stall detector for one event loop.
+
+    Args:
+        threshold_ms: Stalls at least this long are recorded (also asyncio's slow-callback threshold)
+        max_offenders: Distinct (route, location) pairs kept; later new pairs are counted as dropped
+        stack_depth: Frames kept per sample stack (innermost last)
+    """
+
+    def __init__(self, threshold_ms: float = 100, max_offenders: int = 500, stack_depth: int = 25):
+        self.threshold = threshold_ms / 1000
+        self.interval = min(0.1, max(0.01, self.threshold / 2))  # heartbeat period
+        self.max_offenders = max_offenders
+        self.stack_depth = stack_depth
+        self._offenders: Dict[Tuple[str, str], Offender] = {}
+        self._lock = threading.Lock()
+        self._routes: List[Tuple[str, str]] = []  # (endpoint qualname, "METHOD /path")
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._last_beat = 0.0
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self.stalls_total = 0
+        self.stalled_ms_total = 0.0
+        self.dropped = 0
+        self.started_at: Optional[float] = None
+
+    def register_routes(self, routes):
+        """Map endpoint functions to their route so stacks can be attributed."""
+        resolved = []
+        for route in routes:
+            endpoint = getattr(route, "endpoint", None)
+            path = getattr(route, "path", None)
+            if endpoint is None or path is None:
+                continue
+            methods = ",".join(sorted(getattr(route, "methods", None) or [])) or "WS"
+            resolved.append((endpoint.__qualname__, f"{methods} {path}"))
+        self._routes = resolved
+
+    def start(self):
+        """Start on the running loop (call from the loop thread, e.g. the app lifespan)."""
+        if self._watchdog:
+            return
+        loop = asyncio.get_running_loop()
+        loop.set_debug(True)
+        loop.slow_callback_duration = self.threshold
+        self._loop = loop
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self.started_at = time.time()
+        self._heartbeat_task = loop.create_task(self._heartbeat())
+        self._stopped.clear()
+        self._watchdog = threading.Thread(target=self._watch, name="loop-blocking-watchdog", daemon=True)
+        self._watchdog.start()
+        logger.info(f"🐢 Blocking diagnostics on: asyncio debug mode, stalls over {self.threshold * 1000:.0f}ms recorded")
+
+    def stop(self):
+        self._stopped.set()
+        if self._heartbeat_task:
+            self._heartbeat_task.cancel()
+        if self._watchdog:
+            self._watchdog.join(timeout=1)
+        self._watchdog = None
+
+    async def _heartbeat(self):
+        while True:
+            self._last_beat = time.monotonic()
+            await asyncio.sleep(self.interval)
+
+    def _watch(self):
+        stall: Optional[_Stall] = None
+        while not self._stopped.wait(self.interval / 2):
+            beat = self._last_beat
+            if stall and beat != stall.beat:
+                # Loop is back: lag = how much later than scheduled the next beat came
+                self._record(stall, (beat - stall.beat - self.interval) * 1000)
+                stall = None
+            if stall is None and time.monotonic() - beat - self.interval >= self.threshold:
+                stall = self._capture(beat)
+
+    def _capture(self, beat: float) -> Optional[_Stall]:
+        """Snapshot the loop thread's stack while it is blocked."""
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return None
+        frames = []
+        while frame is not None:
+            frames.append(frame)
+            frame = frame.f_back
+        frames.reverse()  # outermost first
+
+        route = None
+        for f in frames:
+            qualname = f.f_code.co_qualname
+            for endpoint, label in self._routes:
+                if qualname == endpoint or qualname.startswith(endpoint + ".<locals>."):
+                    route = label
+                    break
+            if route:
+                break
+        if route is None:
+            task = asyncio.current_task(self._loop)
+            coro = task.get_coro() if task else None
+            route = f"task:{getattr(coro, '__qualname__', task.get_name())}" if task else "loop"
+
+        innermost = frames[-1]
+        app_frames = [f for f in frames if f.f_code.co_filename.startswith(APP_DIR)
+                      and f.f_code.co_filename not in _INSTRUMENTATION_FILES]
+        location_frame = app_frames[-1] if app_frames else innermost
+        return _Stall(
+            beat=beat,
+            route=route,
+            location=f"{_short_path(location_frame.f_code.co_filename)}:{location_frame.f_lineno} in {location_frame.f_code.co_qualname}",
+            blocked_in=f"{_short_path(innermost.f_code.co_filename)}:{innermost.f_lineno} in {innermost.f_code.co_qualname}",
+            stack=[f"{_short_path(f.f_code.co_filename)}:{f.f_lineno} in {f.f_code.co_qualname}"
+                   for f in frames[-self.stack_depth:]],
+        )
+
+    def _record(self, stall: _Stall, blocked_ms: float):
+        if blocked_ms < self.threshold * 1000:
+            return
+        metrics.EVENT_LOOP_BLOCKS.labels(route=stall.route).inc()
+        key = (stall.route, stall.location)
+        with self._lock:
+            self.stalls_total += 1
+            self.stalled_ms_total += blocked_ms
+            offender = self._offenders.get(key)
+            if offender is None:
+                if len(self._offenders) >= self.max_offenders:
+                    self.dropped += 1
+                    return
+                offender = self._offenders[key] = Offender(stall.route, stall.location, stall.blocked_in)
+            offender.count += 1
+            offender.total_ms += blocked_ms
+            offender.last_seen = time.time()
+            if blocked_ms >= offender.max_ms:
+                offender.max_ms = blocked_ms
+                offender.blocked_in = stall.blocked_in
+                offender.stack = stall.stack
+        logger.warning(f"🐢 Event loop blocked {blocked_ms:.0f}ms by {stall.route} at {stall.location} "
+                       f"(in {stall.blocked_in})")
+
+    def report(self, limit: int = 20, sort: str = "total_ms") -> Dict[str, Any]:
+        """Top offenders, worst first by `sort` (total_ms, max_ms or count)."""
+        if sort not in ("total_ms", "max_ms", "count"):
+            sort = "total_ms"
+        with self._lock:
+            offenders = sorted(self._offenders.values(), key=lambda o: getattr(o, sort), reverse=True)
+            by_route: Dict[str, Dict[str, float]] = {}
+            for o in self._offenders.values():
+                entry = by_route.setdefault(o.route, {"count": 0, "total_ms": 0.0})
+                entry["count"] += o.count
+                entry["total_ms"] = round(entry["total_ms"] + o.total_ms, 1)
+            return {
+                "enabled": True,
+                "threshold_ms": self.threshold * 1000,
+                "since": self.started_at,
+                "stalls": self.stalls_total,
+                "stalled_ms": round(self.stalled_ms_total, 1),
+                "dropped": self.dropped,
+                "by_route": dict(sorted(by_route.items(), key=lambda kv: kv[1]["total_ms"], reverse=True)),
+                "offenders": [o.to_dict() for o in offenders[:limit]],
+            }
+
+    def reset(self) -> int:
+        with self._lock:
+            removed = len(self._offenders)
+            self._offenders.clear()
+            self.stalls_total = 0
+            self.stalled_ms_total = 0.0
+            self.dropped = 0
+            self.started_at = time.time()
+        return removed
+
+
+_blocking_detector: Optional[BlockingDetector] = None
+_blocking_detector_lock = threading.Lock()
+
+
+def get_blocking_detector() -> BlockingDetector:
+    """Process-wide (per-worker) blocking detector."""
+    global _blocking_detector
+    if _blocking_detector is None:
+        with _blocking_detector_lock:
+            if _blocking_detector is None:
+                _blocking_detector = BlockingDetector(
+                    threshold_ms=float(get_setting("blocking_threshold_ms", 100)),
+                )
+    return _blocking_detector
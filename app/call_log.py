@@ -0,0 +1,218 @@
+"""
+Indexed call log (replaces the rewrite-on-every-hangup static/calls/calls.json).
+
+Every finished call used to take an exclusive flock on calls.json, parse the
+whole file, append one entry and rewrite it - O(total calls) per hangup. The
+log now lives in a SQLite table keyed by call_sid with indexes on date,
+caller and customer, so recording a call is a single-row insert and the
+dashboard pages through it with indexed queries:
+
+    get_call_log().record({"call_sid": ..., "caller": ..., "summary": ...})
+    get_call_log().query(page=1, page_size=50, caller="+15551234567")
+
+Existing history is imported once with migrate_calls_json.py.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+from config_loader import get_setting
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MAX_PAGE_SIZE = 200
+
+_COLUMNS = ("call_sid", "date", "caller", "customer_id", "summary", "transcript_file", "audio_file")
+
+
+class CallLogStore:
+    """
+    SQLite call index shared by the orchestrator (writes) and web app (reads).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS calls (
+                call_sid TEXT PRIMARY KEY,
+                date TEXT NOT NULL,
+                caller TEXT,
+                customer_id INTEGER,
+                summary TEXT,
+                transcript_file TEXT,
+                audio_file TEXT,
+                recorded_at REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_calls_date ON calls (date DESC)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_calls_caller_date ON calls (caller, date DESC)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_calls_customer_date ON calls (customer_id, date DESC)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def record(self, entry: Dict[str, Any], replace: bool = True) -> bool:
+        """
+        Add (or update) one call.
+
+        Args:
+            entry: call_sid plus any of date ("%Y-%m-%d %H:%M:%S" UTC, default now),
+                caller, customer_id, summary, transcript_file, audio_file
+            replace: Overwrite an existing row for the same call_sid
+
+        Returns:
+            True if a row was written
+        """
+        row = {column: entry.get(column) for column in _COLUMNS}
+        row["date"] = row["date"] or datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+        verb = "INSERT OR REPLACE" if replace else "INSERT OR IGNORE"
+        cursor = self._connect().execute(
+            f"{verb} INTO calls ({', '.join(_COLUMNS)}, recorded_at) "
+            f"VALUES ({', '.join('?' for _ in _COLUMNS)}, ?)",
+            tuple(row[column] for column in _COLUMNS) + (time.time(),)
+        )
+        return cursor.rowcount > 0
+
+    def merge(self, entry: Dict[str, Any]) -> bool:
+        """
+        Add one call, or fill in an existing row without losing what it has.
+
+        For a second writer (e.g. the send_text service) after the orchestrator:
+        the existing date, caller and customer_id are kept; summary and the file
+        names are updated when the entry has them.
+
+        Args:
+            entry: Same fields as record()
+
+        Returns:
+            True if a row was written
+        """
+        row = {column: entry.get(column) for column in _COLUMNS}
+        row["date"] = row["date"] or datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+        cursor = self._connect().execute(
+            f"INSERT INTO calls ({', '.join(_COLUMNS)}, recorded_at) "
+            f"VALUES ({', '.join('?' for _ in _COLUMNS)}, ?) "
+            "ON CONFLICT(call_sid) DO UPDATE SET "
+            "caller = COALESCE(calls.caller, excluded.caller), "
+            "customer_id = COALESCE(calls.customer_id, excluded.customer_id), "
+            "summary = COALESCE(excluded.summary, calls.summary), "
+            "transcript_file = COALESCE(excluded.transcript_file, calls.transcript_file), "
+            "audio_file = COALESCE(excluded.audio_file, calls.audio_file)",
+            tuple(row[column] for column in _COLUMNS) + (time.time(),)
+        )
+        return cursor.rowcount > 0
+
+    def get(self, call_sid: str) -> Optional[Dict[str, Any]]:
+        row = self._connect().execute(
+            f"SELECT {', '.join(_COLUMNS)} FROM calls WHERE call_sid = ?", (call_sid,)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def query(self, page: int = 1, page_size: int = 50, caller: Optional[str] = None,
+              customer_id: Optional[int] = None, date_from: Optional[str] = None,
+              date_to: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Newest-first page of calls.
+
+        Args:
+            page: 1-based page number
+            page_size: Calls per page (capped at MAX_PAGE_SIZE)
+            caller: Exact caller number
+            customer_id: Only this tenant's calls
+            date_from: Inclusive lower bound ("YYYY-MM-DD" or full timestamp)
+            date_to: Inclusive upper bound ("YYYY-MM-DD" covers the whole day)
+
+        Returns:
+            Dict with calls, total, page, page_size
+        """
+        page = max(1, int(page))
+        page_size = max(1, min(int(page_size), MAX_PAGE_SIZE))
+        clauses, params = [], []
+        if caller:
+            clauses.append("caller = ?")
+            params.append(caller)
+        if customer_id is not None:
+            clauses.append("customer_id = ?")
+            params.append(customer_id)
+        if date_from:
+            clauses.append("date >= ?")
+            params.append(date_from)
+        if date_to:
+            clauses.append("date <= ?")
+            params.append(date_to + " 23:59:59" if len(date_to) == 10 else date_to)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        conn = self._connect()
+        total = conn.execute(f"SELECT COUNT(*) FROM calls {where}", params).fetchone()[0]
+        rows = conn.execute(
+            f"SELECT {', '.join(_COLUMNS)} FROM calls {where} ORDER BY date DESC, call_sid DESC LIMIT ? OFFSET ?",
+            params + [page_size, (page - 1) * page_size]
+        ).fetchall()
+        return {
+            "calls": [dict(row) for row in rows],
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+        }
+
+    def import_calls_json(self, path: str) -> Dict[str, int]:
+        """
+        One-time import of a legacy calls.json (safe to re-run: existing call_sids are kept).
+
+        Returns:
+            Dict with imported / skipped counts
+        """
+        with open(path, 'r') as f:
+            content = f.read()
+        entries = json.loads(content) if content.strip() else []
+        result = {"imported": 0, "skipped": 0}
+        conn = self._connect()
+        conn.execute("BEGIN")
+        try:
+            for entry in entries:
+                if not isinstance(entry, dict) or not entry.get("call_sid"):
+                    result["skipped"] += 1
+                    continue
+                if self.record(entry, replace=False):
+                    result["imported"] += 1
+                else:
+                    result["skipped"] += 1
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        logger.info(f"📒 Imported {path} into call log: {result}")
+        return result
+
+
+_call_log: Optional[CallLogStore] = None
+_call_log_lock = threading.Lock()
+
+
+def get_call_log() -> CallLogStore:
+    """Process-wide call log."""
+    global _call_log
+    if _call_log is None:
+        with _call_log_lock:
+            if _call_log is None:
+                _call_log = CallLogStore(get_setting("call_log_db_path", "data/calls/call_index.db"))
+    return _call_log
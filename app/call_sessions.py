@@ -0,0 +1,369 @@
+"""
+Call-session store shared by the phone front end and the media-stream websocket.
+
+Call state (caller, greeting, conversation, customer context) used to live
+in a dict inside the Flask process, which only works with a single
+gunicorn worker on a single node. CallSessionStore puts it behind one
+interface with per-session TTL expiry and atomic read-modify-write:
+
+    store = get_call_session_store()
+    store.set(call_sid, {"user_id": ..., "conversation": []})
+    store.update(call_sid, lambda s: s["conversation"].append(turn))
+    session = store.get(call_sid)
+
+Backends (call_session_backend setting):
+    memory - in-process dict (default, single worker)
+    sqlite - file shared by every worker/container that mounts it
+    redis  - any Redis-compatible server (call_session_redis_url); tests
+             can pass a local stand-in client such as fakeredis
+
+A realtime call also carries a small signed token in the Twilio <Stream>
+custom parameters (sign_call_context) binding the call_sid to its
+customer_id. The websocket trusts the customer from the token and loads the
+rest of the context (agent name, voice, sliders, ...) from this store.
+"""
+
+import json
+import time
+import heapq
+import sqlite3
+import logging
+import threading
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+from config_loader import get_secret, get_setting
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_SESSION_TTL = 3600
+
+CALL_CONTEXT_SALT = "call-context"
+
+# The token travels in the TwiML on every call; it only ever holds two ids
+MAX_CALL_CONTEXT_TOKEN_LENGTH = 160
+
+
+class CallSessionStore:
+    """
+    Interface for call-session backends.
+    """
+
+    backend = "base"
+
+    def __init__(self, ttl_seconds: float = DEFAULT_SESSION_TTL):
+        self.ttl_seconds = ttl_seconds
+
+    def get(self, call_sid: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the session, or None if missing/expired."""
+        raise NotImplementedError
+
+    def set(self, call_sid: str, data: Dict[str, Any], ttl_seconds: Optional[float] = None):
+        """Create or replace a session."""
+        raise NotImplementedError
+
+    def update(self, call_sid: str, mutate: Callable[[Dict[str, Any]], None]) -> Optional[Dict[str, Any]]:
+        """
+        Atomically apply mutate(session) to an existing session.
+
+        Args:
+            call_sid: Twilio CallSid
+            mutate: Function that modifies the session dict in place
+
+        Returns:
+            The updated session, or None if there is no live session
+        """
+        raise NotImplementedError
+
+    def delete(self, call_sid: str) -> bool:
+        raise NotImplementedError
+
+    def cleanup(self) -> int:
+        """Drop expired sessions. Returns how many were removed."""
+        return 0
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+    def __contains__(self, call_sid: str) -> bool:
+        return self.get(call_sid) is not None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.backend, "sessions": self.count(), "ttl_seconds": self.ttl_seconds}
+
+
+class InMemoryCallSessionStore(CallSessionStore):
+    """
+    Process-local store. Expiry is tracked in a heap, so cleanup only
+    touches sessions that actually expired.
+    """
+
+    backend = "memory"
+
+    def __init__(self, ttl_seconds: float = DEFAULT_SESSION_TTL):
+        super().__init__(ttl_seconds)
+        self._sessions: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
+
+    def _live(self, call_sid: str, now: float) -> Optional[Dict[str, Any]]:
+        entry = self._sessions.get(call_sid)
+        if entry is None:
+            return None
+        expires_at, data = entry
+        if expires_at <= now:
+            del self._sessions[call_sid]
+            return None
+        return data
+
+    def get(self, call_sid: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            data = self._live(call_sid, time.time())
+            return json.loads(json.dumps(data)) if data is not None else None
+
+    def set(self, call_sid: str, data: Dict[str, Any], ttl_seconds: Optional[float] = None):
+        expires_at = time.time() + (ttl_seconds or self.ttl_seconds)
+        with self._lock:
+            self._sessions[call_sid] = (expires_at, json.loads(json.dumps(data)))
+            heapq.heappush(self._expiry_heap, (expires_at, call_sid))
+
+    def update(self, call_sid: str, mutate: Callable[[Dict[str, Any]], None]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            data = self._live(call_sid, time.time())
+            if data is None:
+                return None
+            mutate(data)
+            return json.loads(json.dumps(data))
+
+    def delete(self, call_sid: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(call_sid, None) is not None
+
+    def cleanup(self) -> int:
+        now = time.time()
+        removed = 0
+        with self._lock:
+            while self._expiry_heap and self._expiry_heap[0][0] <= now:
+                expires_at, call_sid = heapq.heappop(self._expiry_heap)
+                entry = self._sessions.get(call_sid)
+                # Skip heap entries superseded by a later set()
+                if entry is not None and entry[0] == expires_at:
+                    del self._sessions[call_sid]
+                    removed += 1
+        return removed
+
+    def count(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+
+class SQLiteCallSessionStore(CallSessionStore):
+    """
+    SQLite-backed store for several workers (or containers) sharing one file.
+    Updates run inside BEGIN IMMEDIATE, which serializes writers.
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, path: str, ttl_seconds: float = DEFAULT_SESSION_TTL):
+        super().__init__(ttl_seconds)
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS call_sessions (
+                    call_sid TEXT PRIMARY KEY,
+                    data TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_call_sessions_expires ON call_sessions (expires_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def get(self, call_sid: str) -> Optional[Dict[str, Any]]:
+        row = self._connect().execute(
+            "SELECT data FROM call_sessions WHERE call_sid = ? AND expires_at > ?",
+            (call_sid, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, call_sid: str, data: Dict[str, Any], ttl_seconds: Optional[float] = None):
+        self._connect().execute(
+            "INSERT OR REPLACE INTO call_sessions (call_sid, data, expires_at) VALUES (?, ?, ?)",
+            (call_sid, json.dumps(data), time.time() + (ttl_seconds or self.ttl_seconds))
+        )
+
+    def update(self, call_sid: str, mutate: Callable[[Dict[str, Any]], None]) -> Optional[Dict[str, Any]]:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT data FROM call_sessions WHERE call_sid = ? AND expires_at > ?",
+                (call_sid, time.time())
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            data = json.loads(row[0])
+            mutate(data)
+            conn.execute("UPDATE call_sessions SET data = ? WHERE call_sid = ?", (json.dumps(data), call_sid))
+            conn.execute("COMMIT")
+            return data
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def delete(self, call_sid: str) -> bool:
+        cursor = self._connect().execute("DELETE FROM call_sessions WHERE call_sid = ?", (call_sid,))
+        return cursor.rowcount > 0
+
+    def cleanup(self) -> int:
+        cursor = self._connect().execute("DELETE FROM call_sessions WHERE expires_at <= ?", (time.time(),))
+        return cursor.rowcount
+
+    def count(self) -> int:
+        row = self._connect().execute(
+            "SELECT COUNT(*) FROM call_sessions WHERE expires_at > ?", (time.time(),)
+        ).fetchone()
+        return row[0]
+
+
+class RedisCallSessionStore(CallSessionStore):
+    """
+    Redis-backed store. Expiry is native (SET EX), updates use
+    WATCH/MULTI optimistic transactions.
+    """
+
+    backend = "redis"
+
+    def __init__(self, client=None, url: Optional[str] = None, ttl_seconds: float = DEFAULT_SESSION_TTL,
+                 prefix: str = "call_session:"):
+        super().__init__(ttl_seconds)
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError("call_session_backend=redis requires the 'redis' package (pip install redis)")
+            client = redis.Redis.from_url(url or "redis://localhost:6379/0")
+        self.client = client
+        self.prefix = prefix
+
+    def _key(self, call_sid: str) -> str:
+        return f"{self.prefix}{call_sid}"
+
+    def get(self, call_sid: str) -> Optional[Dict[str, Any]]:
+        raw = self.client.get(self._key(call_sid))
+        return json.loads(raw) if raw else None
+
+    def set(self, call_sid: str, data: Dict[str, Any], ttl_seconds: Optional[float] = None):
+        self.client.set(self._key(call_sid), json.dumps(data), ex=int(ttl_seconds or self.ttl_seconds))
+
+    def update(self, call_sid: str, mutate: Callable[[Dict[str, Any]], None]) -> Optional[Dict[str, Any]]:
+        from redis.exceptions import WatchError
+        key = self._key(call_sid)
+        with self.client.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(key)
+                    raw = pipe.get(key)
+                    if not raw:
+                        pipe.unwatch()
+                        return None
+                    data = json.loads(raw)
+                    mutate(data)
+                    pipe.multi()
+                    # KEEPTTL: an update doesn't extend the session's lifetime
+                    pipe.set(key, json.dumps(data), keepttl=True)
+                    pipe.execute()
+                    return data
+                except WatchError:
+                    continue
+
+    def delete(self, call_sid: str) -> bool:
+        return bool(self.client.delete(self._key(call_sid)))
+
+    def count(self) -> int:
+        return sum(1 for _ in self.client.scan_iter(match=f"{self.prefix}*"))
+
+
+def _call_context_serializer():
+    from itsdangerous import URLSafeTimedSerializer
+    secret = get_secret("SESSION_SECRET")
+    return URLSafeTimedSerializer(secret, salt=CALL_CONTEXT_SALT) if secret else None
+
+
+def sign_call_context(call_sid: str, customer_id: Any) -> Optional[str]:
+    """
+    Signed token binding a call to its customer, for the Twilio <Stream> parameters.
+
+    Only the ids are signed; the full customer context stays in the session store.
+
+    Returns:
+        The token, or None without SESSION_SECRET (or if it would exceed MAX_CALL_CONTEXT_TOKEN_LENGTH)
+    """
+    serializer = _call_context_serializer()
+    if serializer is None:
+        return None
+    token = serializer.dumps({"call_sid": call_sid, "customer_id": customer_id})
+    if len(token) > MAX_CALL_CONTEXT_TOKEN_LENGTH:
+        logger.error(f"❌ Call context token for {call_sid} is {len(token)} chars (max {MAX_CALL_CONTEXT_TOKEN_LENGTH}), not sending it")
+        return None
+    return token
+
+
+def verify_call_context(token: str, call_sid: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Verify a token from sign_call_context.
+
+    Args:
+        token: Token from the "ctx" stream parameter
+        call_sid: If given, the token must have been issued for this call
+
+    Returns:
+        {"call_sid", "customer_id"}, or None if the token is invalid, expired or for another call
+    """
+    from itsdangerous import BadSignature
+    serializer = _call_context_serializer()
+    if serializer is None:
+        return None
+    try:
+        context = serializer.loads(token, max_age=int(get_setting("call_context_token_ttl", 300)))
+    except BadSignature:
+        logger.warning("❌ Invalid or expired call context token")
+        return None
+    if call_sid and context.get("call_sid") != call_sid:
+        logger.warning(f"❌ Call context token issued for another call (expected {call_sid})")
+        return None
+    return context
+
+
+_call_session_store: Optional[CallSessionStore] = None
+_call_session_store_lock = threading.Lock()
+
+
+def get_call_session_store() -> CallSessionStore:
+    """Process-wide call-session store for the configured backend."""
+    global _call_session_store
+    if _call_session_store is None:
+        with _call_session_store_lock:
+            if _call_session_store is None:
+                backend = get_setting("call_session_backend", "memory")
+                ttl = float(get_setting("call_session_ttl_seconds", DEFAULT_SESSION_TTL))
+                if backend == "sqlite":
+                    store = SQLiteCallSessionStore(get_setting("call_session_sqlite_path", "call_sessions.db"), ttl_seconds=ttl)
+                elif backend == "redis":
+                    store = RedisCallSessionStore(url=get_secret("CALL_SESSION_REDIS_URL") or get_setting("call_session_redis_url"),
+                                                  ttl_seconds=ttl)
+                else:
+                    store = InMemoryCallSessionStore(ttl_seconds=ttl)
+                logger.info(f"📞 Call session store: {store.backend} (ttl {ttl:.0f}s)")
+                _call_session_store = store
+    return _call_session_store
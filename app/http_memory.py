@@ -5,7 +5,9 @@ import logging
 import requests
 import re
 import copy
-from typing import List, Dict, Any, Optional
+import zlib
+import threading
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 
 # Import centralized configuration
@@ -13,6 +15,8 @@ from config_loader import get_setting
 
 # Import JWT token generation for multi-tenant authentication
 from app.jwt_utils import generate_memory_token
+from app.tracing import TracedSession
+from app.metrics import observe_memory_store
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -121,6 +125,104 @@ PATTERNS = {
     "single_name": re.compile(r"\b([A-Z][a-z]{2,})\b")  # ✅ NEW: Single names like "Kelly"
 }
 
+# ============================================================================
+# STORED CALLER SCHEMA - Maintained incrementally on every user memory write
+# ============================================================================
+
+# The per-user schema document lives in AI-Memory as a regular memory so it
+# survives restarts and is shared by the Flask and FastAPI processes. It is
+# read by (user_id, type, key) and replaced in place (PUT /v1/memories/user),
+# so it never ages out behind newer memories. Incremental merges run on the
+# background memory writer, off the request path, and save with the version
+# they read (compare-and-swap), so merges from the web app, the orchestrator
+# and the writer thread can't overwrite each other.
+SCHEMA_MEMORY_TYPE = "normalized_schema"
+SCHEMA_MEMORY_KEY = "caller_schema"
+
+SCHEMA_TTL_DAYS = 30  # Expired documents are simply rebuilt on the next call
+
+# Priority timestamp for admin panel "person" records (always wins)
+PERSON_PRIORITY_TIMESTAMP = 9999999999
+
+# Conversation transcripts (thread_history:* and thread:*:recap are both
+# thread_recap; "moment" is a raw exchange) - frequent, large and not caller
+# facts, so they neither trigger a merge nor feed a rebuild
+SCHEMA_TRANSCRIPT_TYPES = {"thread_recap", "moment"}
+
+# Writes of these types never feed the caller schema
+SCHEMA_SKIP_TYPES = {SCHEMA_MEMORY_TYPE, "admin_setting"} | SCHEMA_TRANSCRIPT_TYPES
+
+# Newest-N fallback when AI-Memory has no ranked search (needs a wider window than ranked k)
+UNRANKED_SEARCH_K = 15
+
+# Reload-and-retry budget when another process saved the schema first
+SCHEMA_MERGE_ATTEMPTS = 3
+
+# Striped locks: avoid pointless version conflicts between this process's own
+# merges without keeping one lock per caller forever
+SCHEMA_LOCK_STRIPES = 64
+_schema_locks = [threading.Lock() for _ in range(SCHEMA_LOCK_STRIPES)]
+
+
+def _schema_lock(user_id: str) -> threading.Lock:
+    return _schema_locks[zlib.crc32(user_id.encode()) % SCHEMA_LOCK_STRIPES]
+
+
+class SchemaVersionConflict(Exception):
+    """The stored caller schema changed between load and save."""
+
+
+def parse_memory_lines(memory_str: str, user_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Parse AI-Memory's concatenated "memory" string (one JSON object per line)
+    into standard type/key/value memories. Lines that are not JSON are kept
+    as plain-text fact/preference memories.
+    
+    Args:
+        memory_str: Newline-separated JSON objects
+        user_id: Owner recorded on plain-text memories
+        
+    Returns:
+        List of normalized memory dicts
+    """
+    memories = []
+    for idx, line in enumerate(memory_str.split('\n')):
+        line = line.strip()
+        if line:
+            try:
+                mem_obj = json.loads(line)
+                
+                # ✅ Normalize to standard memory format with type/key/value
+                normalized = {
+                    "type": mem_obj.get("type", "fact"),
+                    "key": mem_obj.get("key") or mem_obj.get("k") or mem_obj.get("setting_key") or mem_obj.get("summary", "")[:50] or mem_obj.get("phone_number", "") or f"memory_{idx}",
+                    "value": mem_obj,  # Store entire object as value
+                    "scope": mem_obj.get("scope", "user"),
+                    "user_id": mem_obj.get("user_id"),
+                    "id": mem_obj.get("id") or mem_obj.get("memory_id") or f"concat_{idx}",
+                    "setting_key": mem_obj.get("setting_key"),  # Preserve for admin settings
+                    "k": mem_obj.get("k") or mem_obj.get("key") or mem_obj.get("setting_key"),  # Alias
+                    "score": mem_obj.get("score")  # Hybrid search relevance (if provided)
+                }
+                memories.append(normalized)
+            except json.JSONDecodeError:
+                # ✅ FIX: Handle plain text preferences (e.g., "John likes Ahi Tuna sushi")
+                logger.info(f"📝 Plain text memory (search), converting to structured format: {line[:100]}")
+                
+                # Create a fact-type memory from plain text
+                normalized = {
+                    "type": "preference" if any(kw in line.lower() for kw in ["likes", "favorite", "prefers", "enjoys"]) else "fact",
+                    "key": f"text_memory_{idx}",
+                    "value": {"description": line},  # Wrap in dict so normalization can extract it
+                    "scope": "user",
+                    "user_id": user_id,
+                    "id": f"text_search_{idx}"
+                }
+                memories.append(normalized)
+                logger.info(f"✅ Converted plain text to {normalized['type']} memory")
+    return memories
+
+
 class HTTPMemoryStore:
     """
     HTTP-based memory store that connects to AI-Memory service instead of direct PostgreSQL.
@@ -133,7 +235,7 @@ class HTTPMemoryStore:
         
         self.ai_memory_url = ai_memory_url
         
-        self.session = requests.Session()
+        self.session = TracedSession("ai-memory", observe=observe_memory_store)
         # Note: requests.Session doesn't have timeout as an attribute, 
         # it's passed to individual request methods
         
@@ -241,13 +343,18 @@ class HTTPMemoryStore:
                 if memory_id:
                     scope_info = f" [{scope}]" + (f" user:{user_id}" if user_id else "")
                     logger.info(f"Stored memory: {memory_type}:{key} with ID {memory_id}{scope_info}")
-                    return str(memory_id)
                 else:
                     # ✅ Fix: Don't fail on successful 200 response, generate fallback ID
                     logger.warning(f"AI-Memory service returned 200 but no ID field found. Response: {result}")
                     scope_info = f" [{scope}]" + (f" user:{user_id}" if user_id else "")
                     logger.info(f"Stored memory: {memory_type}:{key} with fallback KEY {key}{scope_info}")
-                    return key
+                    memory_id = key
+                
+                # 🧩 Keep the stored caller schema current (queued, never fails or slows the write)
+                if scope == "user" and user_id and memory_type not in SCHEMA_SKIP_TYPES:
+                    self._queue_schema_merge(user_id, [{"type": memory_type, "key": key, "value": value}])
+                
+                return str(memory_id)
             else:
                 raise Exception(f"AI-Memory service returned {response.status_code}: {response.text}")
                 
@@ -255,6 +362,78 @@ class HTTPMemoryStore:
             logger.error(f"Failed to write memory: {e}")
             raise
 
+    def write_many(self, memories: List[Dict[str, Any]], user_id: Optional[str] = None, source: str = "orchestrator") -> List[str]:
+        """
+        Store several user memories with one request to AI-Memory's bulk endpoint.
+        
+        Falls back to one write() per memory for shared memories (no user_id) and
+        for AI-Memory deployments without POST /v1/memories/user/bulk.
+        
+        Args:
+            memories: Dicts with type, key, value and optional ttl_days / source
+            user_id: User ID the memories belong to
+            source: Default source for memories that don't set one
+            
+        Returns:
+            IDs of the stored memories, in input order
+        """
+        self._check_connection()
+        if not memories:
+            return []
+        
+        def write_each() -> List[str]:
+            return [
+                self.write(m["type"], m["key"], m["value"], user_id=user_id, scope="user",
+                           ttl_days=m.get("ttl_days", 365), source=m.get("source") or source)
+                for m in memories
+            ]
+        
+        if not user_id:
+            return write_each()
+        
+        payload = {"memories": [
+            {
+                "type": m["type"],
+                "key": m["key"],
+                "value": m["value"],
+                "ttl_days": m.get("ttl_days", 365),
+                "source": m.get("source") or source
+            }
+            for m in memories
+        ]}
+        try:
+            jwt_token = generate_memory_token(customer_id=1)  # Peterson Insurance, as in write()
+            response = self.session.post(
+                f"{self.ai_memory_url}/v1/memories/user/bulk",
+                json=payload,
+                params={"user_id": user_id},
+                headers={
+                    "Content-Type": "application/json",
+                    "Authorization": f"Bearer {jwt_token}"
+                },
+                timeout=15
+            )
+        except Exception as e:
+            logger.error(f"Failed to write memories: {e}")
+            raise
+        
+        if response.status_code in (404, 405):
+            logger.info("AI-Memory has no bulk endpoint, writing memories one at a time")
+            return write_each()
+        if response.status_code != 200:
+            raise Exception(f"AI-Memory service returned {response.status_code}: {response.text}")
+        
+        memory_ids = [str(memory_id) for memory_id in response.json().get("memory_ids", [])]
+        logger.info(f"Stored {len(memories)} memories in one request [user] user:{user_id}")
+        
+        # 🧩 Keep the stored caller schema current (queued, never fails or slows the write)
+        schema_memories = [{"type": m["type"], "key": m["key"], "value": m["value"]}
+                           for m in memories if m["type"] not in SCHEMA_SKIP_TYPES]
+        if schema_memories:
+            self._queue_schema_merge(user_id, schema_memories)
+        
+        return memory_ids
+
     def search(self, query_text: str, user_id: Optional[str] = None, k: int = 6, memory_types: Optional[List[str]] = None, include_shared: bool = True) -> List[Dict[str, Any]]:
         """
         Search for relevant memories using AI-Memory service.
@@ -272,42 +451,53 @@ class HTTPMemoryStore:
         self._check_connection()
         
         try:
-            # Build payload for AI-Memory service
-            payload = {
-                "user_id": user_id or "unknown",
-                "message": query_text,
-                "limit": k,
-                "types": memory_types or []
+            # 🔐 Week 2: Generate JWT token for multi-tenant authentication
+            customer_id = 1  # Peterson Insurance - Phase A
+            jwt_token = generate_memory_token(customer_id=customer_id)
+            headers = {
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {jwt_token}"
             }
+            memory_type = None
+            if memory_types:
+                memory_type = ",".join(memory_types) if isinstance(memory_types, list) else memory_types
             
-            if not include_shared:
-                payload["scope"] = "user"
-            
-            # 🔍 DEBUG: Log what we're sending
-            logger.info(f"🔍 Querying AI-Memory: GET {self.ai_memory_url}/v1/memories")
+            # Ranked (hybrid lexical + vector) search - the query text must reach AI-Memory
+            logger.info(f"🔍 Querying AI-Memory: GET {self.ai_memory_url}/v1/memories/user/{user_id or 'unknown'}")
             logger.info(f"🔍 Query params: user_id={user_id}, limit={k}, memory_type={memory_types}")
-            
-            # Build query parameters for GET request
             params = {
-                "user_id": user_id or "unknown",
-                "limit": k
+                "query": query_text,
+                "limit": k,
+                "include_shared": str(include_shared).lower()
             }
-            if memory_types:
-                params["memory_type"] = ",".join(memory_types) if isinstance(memory_types, list) else memory_types
-            
-            # 🔐 Week 2: Generate JWT token for multi-tenant authentication
-            customer_id = 1  # Peterson Insurance - Phase A
-            jwt_token = generate_memory_token(customer_id=customer_id)
+            if memory_type:
+                params["memory_type"] = memory_type
+            response = None
+            if query_text:
+                response = self.session.get(
+                    f"{self.ai_memory_url}/v1/memories/user/{user_id or 'unknown'}",
+                    params=params,
+                    headers=headers,
+                    timeout=10
+                )
             
-            response = self.session.get(
-                f"{self.ai_memory_url}/v1/memories",
-                params=params,
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {jwt_token}"
-                },
-                timeout=10
-            )
+            if response is None or response.status_code in (404, 405):
+                # Older AI-Memory without ranked user search: newest memories only,
+                # so fetch the wider window the unranked path always needed
+                unranked_k = max(k, UNRANKED_SEARCH_K)
+                logger.warning(f"⚠️ Ranked memory search unavailable, falling back to newest {unranked_k} memories")
+                params = {
+                    "user_id": user_id or "unknown",
+                    "limit": unranked_k
+                }
+                if memory_type:
+                    params["memory_type"] = memory_type
+                response = self.session.get(
+                    f"{self.ai_memory_url}/v1/memories",
+                    params=params,
+                    headers=headers,
+                    timeout=10
+                )
             
             if response.status_code == 200:
                 result = response.json()
@@ -326,41 +516,7 @@ class HTTPMemoryStore:
                     if not memory_str:
                         return []
                     
-                    memories = []
-                    for idx, line in enumerate(memory_str.split('\n')):
-                        line = line.strip()
-                        if line:
-                            try:
-                                mem_obj = json.loads(line)
-                                
-                                # ✅ Normalize to standard memory format with type/key/value
-                                normalized = {
-                                    "type": mem_obj.get("type", "fact"),
-                                    "key": mem_obj.get("key") or mem_obj.get("k") or mem_obj.get("setting_key") or mem_obj.get("summary", "")[:50] or mem_obj.get("phone_number", "") or f"memory_{idx}",
-                                    "value": mem_obj,  # Store entire object as value
-                                    "scope": mem_obj.get("scope", "user"),
-                                    "user_id": mem_obj.get("user_id"),
-                                    "id": mem_obj.get("id") or mem_obj.get("memory_id") or f"concat_{idx}",
-                                    "setting_key": mem_obj.get("setting_key"),  # Preserve for admin settings
-                                    "k": mem_obj.get("k") or mem_obj.get("key") or mem_obj.get("setting_key")  # Alias
-                                }
-                                memories.append(normalized)
-                            except json.JSONDecodeError:
-                                # ✅ FIX: Handle plain text preferences (e.g., "John likes Ahi Tuna sushi")
-                                logger.info(f"📝 Plain text memory (search), converting to structured format: {line[:100]}")
-                                
-                                # Create a fact-type memory from plain text
-                                normalized = {
-                                    "type": "preference" if any(kw in line.lower() for kw in ["likes", "favorite", "prefers", "enjoys"]) else "fact",
-                                    "key": f"text_memory_{idx}",
-                                    "value": {"description": line},  # Wrap in dict so normalization can extract it
-                                    "scope": "user",
-                                    "user_id": user_id if 'user_id' in locals() else None,
-                                    "id": f"text_search_{idx}"
-                                }
-                                memories.append(normalized)
-                                logger.info(f"✅ Converted plain text to {normalized['type']} memory")
-                    
+                    memories = parse_memory_lines(memory_str, user_id)
                     logger.info(f"✅ Parsed {len(memories)} memories from concatenated format")
                     return memories
                 else:
@@ -513,7 +669,7 @@ class HTTPMemoryStore:
             logger.error(f"Failed to get user memories: {e}")
             return all_memories  # Return what we got so far
     
-    def normalize_memories(self, raw_memories: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def normalize_memories(self, raw_memories: List[Dict[str, Any]], seen: Optional[Dict[str, Dict]] = None) -> Dict[str, Any]:
         """
         ✅ COMPREHENSIVE Memory Normalization Pipeline
         
@@ -525,6 +681,8 @@ class HTTPMemoryStore:
         
         Args:
             raw_memories: List of raw memory dicts from ai-memory service
+            seen: Optional dict that receives the latest-wins tracking maps
+                  (contacts/vehicles/policies) so the result can be merged into later
             
         Returns:
             Complete MEMORY_TEMPLATE dict with populated fields
@@ -581,141 +739,19 @@ class HTTPMemoryStore:
         result = copy.deepcopy(MEMORY_TEMPLATE)
         
         # Tracking for deduplication (timestamp-based: latest wins)
-        seen_contacts = {}  # relationship -> (timestamp, data)
-        seen_vehicles = {}  # vin or composite_key -> (timestamp, data)
-        seen_policies = {}  # policy_number -> (timestamp, data)
+        # contacts: relationship -> (timestamp, data)
+        # vehicles: vin or composite_key -> (timestamp, data)
+        # policies: policy_number -> (timestamp, data)
+        if seen is None:
+            seen = {}
+        for category in ("contacts", "vehicles", "policies"):
+            seen.setdefault(category, {})
         
         logger.info(f"🔄 Normalizing {len(raw_memories)} raw memories...")
         
         # Stage 2: Process each memory
         for idx, mem in enumerate(raw_memories):
-            mem_type = mem.get("type", "").lower()
-            mem_key = (mem.get("key") or mem.get("k") or "").lower()
-            value = mem.get("value", {})
-            
-            # ✅ PRIORITY FIX: Give admin panel "person" type memories HIGHEST priority
-            # This ensures structured contact data from admin panel overrides conversation text
-            if mem_type == "person":
-                timestamp = 9999999999  # Very high timestamp = highest priority
-            else:
-                timestamp = mem.get("timestamp", idx)  # Use index if no timestamp
-            
-            # Convert value to string for text mining if needed
-            value_str = json.dumps(value) if isinstance(value, dict) else str(value)
-            value_lower = value_str.lower()
-            
-            # ================================================================
-            # STAGE 3: CLASSIFY & EXTRACT by Category
-            # ================================================================
-            
-            # -------------------
-            # IDENTITY (Caller info)
-            # -------------------
-            if "phone_number" in value_lower or mem_type == "registration" or "registration" in mem_key:
-                if isinstance(value, dict):
-                    if not result["identity"]["caller_phone"] and value.get("phone_number"):
-                        result["identity"]["caller_phone"] = value["phone_number"]
-                    # Try multiple fields for name
-                    name_value = value.get("name") or value.get("caller_name") or value.get("user_name")
-                    if not result["identity"]["caller_name"] and name_value:
-                        result["identity"]["caller_name"] = name_value
-            
-            # Also check for caller name in "identity" type memories
-            if mem_type == "identity" or "identity" in mem_key or "caller" in mem_key:
-                if isinstance(value, dict):
-                    name_value = value.get("name") or value.get("caller_name") or value.get("user_name")
-                    if not result["identity"]["caller_name"] and name_value:
-                        result["identity"]["caller_name"] = name_value
-            
-            # -------------------
-            # CONTACTS (Family, friends, relationships)
-            # -------------------
-            self._extract_contacts(value, value_str, value_lower, mem_key, timestamp, seen_contacts, result)
-            
-            # -------------------
-            # VEHICLES
-            # -------------------
-            self._extract_vehicles(value, value_str, value_lower, timestamp, seen_vehicles, result)
-            
-            # -------------------
-            # POLICIES
-            # -------------------
-            self._extract_policies(value, mem_type, mem_key, timestamp, seen_policies, result)
-            
-            # -------------------
-            # PREFERENCES
-            # -------------------
-            # Extract preferences from multiple sources: preference type, preference key, or food/likes keywords
-            is_preference = (
-                mem_type == "preference" or 
-                "preference" in mem_key or
-                any(keyword in value_lower for keyword in ["likes", "favorite", "enjoys", "loves", "prefers", "sushi", "food", "hobby", "interest"])
-            )
-            
-            if is_preference:
-                if isinstance(value, dict):
-                    # Check multiple field names: item, description, summary, value
-                    pref_text = value.get("item") or value.get("description") or value.get("summary") or value.get("value")
-                    if pref_text and isinstance(pref_text, str) and len(pref_text) > 5:
-                        result["preferences"]["interests"].append(pref_text[:150])
-                elif isinstance(value, str) and len(value) > 5:
-                    result["preferences"]["notes"].append(value[:100])
-            
-            # -------------------
-            # COMMITMENTS (Promises, follow-ups)
-            # -------------------
-            if "follow" in value_lower or "remind" in value_lower or "promise" in value_lower:
-                if len(result["commitments"]) < 10:
-                    result["commitments"].append(value_str[:150])
-            
-            # -------------------
-            # CONVERSATION SUMMARIES
-            # -------------------
-            if isinstance(value, dict) and "summary" in value:
-                if len(result["recent_conversations"]) < 5:
-                    result["recent_conversations"].append(value["summary"])
-            elif "assistant_response" in value_lower or "user_message" in value_lower:
-                # Skip - these are thread history, not facts
-                pass
-            
-            # -------------------
-            # GENERAL FACTS (fallback)
-            # -------------------
-            elif mem_type in ("fact", "moment", "rule") and len(result["facts"]) < 20:
-                if isinstance(value, dict) and "description" in value:
-                    result["facts"].append(value["description"][:150])
-                elif isinstance(value, str) and len(value) > 10 and len(value) < 300:
-                    # Filter ONLY greeting templates, not legitimate facts
-                    
-                    # SPECIFIC template variable detection (not just any braces)
-                    has_template_vars = (
-                        "{agent_name}" in value or 
-                        "{user_name}" in value or 
-                        "{time_greeting}" in value
-                    )
-                    
-                    # SPECIFIC greeting template patterns (not generic phrases)
-                    # Only match if multiple greeting indicators appear together
-                    greeting_count = 0
-                    if "this is " in value_lower and ("from" in value_lower or "peterson" in value_lower):
-                        greeting_count += 1
-                    if "how can i help" in value_lower or "how's your day" in value_lower:
-                        greeting_count += 1
-                    if value_lower.startswith(("hi,", "hello,", "hey,", "good morning", "good afternoon", "good evening")):
-                        if len(value) < 100:  # Short greetings only
-                            greeting_count += 1
-                    
-                    # Conversational markers (clear indicators of dialogue, not facts)
-                    conversational_markers = ["assistant:", "user:", "system:"]
-                    is_conversational = any(m in value_lower for m in conversational_markers)
-                    
-                    # Filter ONLY if it has template vars OR looks like a greeting
-                    is_likely_greeting = has_template_vars or greeting_count >= 1
-                    
-                    if not (is_likely_greeting or is_conversational):
-                        result["facts"].append(value[:150])
-                    else:
-                        logger.debug(f"⚠️ Filtered greeting template: {value[:50]}...")
+            self._merge_memory_into_schema(mem, self._memory_timestamp(mem, idx), seen, result)
         
         # Stage 4: Finalize - Clean up empty nested structures
         result = self._cleanup_template(result)
@@ -732,6 +768,158 @@ class HTTPMemoryStore:
         
         return result
     
+    @staticmethod
+    def _memory_timestamp(mem: Dict[str, Any], idx: int) -> float:
+        """Ordering timestamp used for latest-wins deduplication."""
+        # ✅ PRIORITY FIX: Give admin panel "person" type memories HIGHEST priority
+        # This ensures structured contact data from admin panel overrides conversation text
+        if (mem.get("type") or "").lower() == "person":
+            return PERSON_PRIORITY_TIMESTAMP  # Very high timestamp = highest priority
+        return mem.get("timestamp", idx)  # Use index if no timestamp
+    
+    def _merge_memory_into_schema(self, mem: Dict[str, Any], timestamp: float,
+                                  seen: Dict[str, Dict], result: Dict) -> None:
+        """
+        Classify a single raw memory and merge it into a normalized schema in place.
+        
+        Shared by the full normalization pipeline and the incremental write path,
+        so both produce the same schema for the same memories.
+        
+        Args:
+            mem: Raw memory dict with type, key and value
+            timestamp: Ordering timestamp (higher wins for contacts/vehicles/policies)
+            seen: Latest-wins tracking maps keyed by "contacts", "vehicles", "policies"
+            result: MEMORY_TEMPLATE-shaped schema to update
+        """
+        seen_contacts = seen["contacts"]
+        seen_vehicles = seen["vehicles"]
+        seen_policies = seen["policies"]
+        
+        mem_type = mem.get("type", "").lower()
+        mem_key = (mem.get("key") or mem.get("k") or "").lower()
+        value = mem.get("value", {})
+        
+        # Derived schema documents and conversation transcripts are never mined into the schema
+        if mem_type == SCHEMA_MEMORY_TYPE or mem_type in SCHEMA_TRANSCRIPT_TYPES:
+            return
+        
+        # Convert value to string for text mining if needed
+        value_str = json.dumps(value) if isinstance(value, dict) else str(value)
+        value_lower = value_str.lower()
+        
+        # ================================================================
+        # STAGE 3: CLASSIFY & EXTRACT by Category
+        # ================================================================
+        
+        # -------------------
+        # IDENTITY (Caller info)
+        # -------------------
+        if "phone_number" in value_lower or mem_type == "registration" or "registration" in mem_key:
+            if isinstance(value, dict):
+                if not result["identity"]["caller_phone"] and value.get("phone_number"):
+                    result["identity"]["caller_phone"] = value["phone_number"]
+                # Try multiple fields for name
+                name_value = value.get("name") or value.get("caller_name") or value.get("user_name")
+                if not result["identity"]["caller_name"] and name_value:
+                    result["identity"]["caller_name"] = name_value
+        
+        # Also check for caller name in "identity" type memories
+        if mem_type == "identity" or "identity" in mem_key or "caller" in mem_key:
+            if isinstance(value, dict):
+                name_value = value.get("name") or value.get("caller_name") or value.get("user_name")
+                if not result["identity"]["caller_name"] and name_value:
+                    result["identity"]["caller_name"] = name_value
+        
+        # -------------------
+        # CONTACTS (Family, friends, relationships)
+        # -------------------
+        self._extract_contacts(value, value_str, value_lower, mem_key, timestamp, seen_contacts, result)
+        
+        # -------------------
+        # VEHICLES
+        # -------------------
+        self._extract_vehicles(value, value_str, value_lower, timestamp, seen_vehicles, result)
+        
+        # -------------------
+        # POLICIES
+        # -------------------
+        self._extract_policies(value, mem_type, mem_key, timestamp, seen_policies, result)
+        
+        # -------------------
+        # PREFERENCES
+        # -------------------
+        # Extract preferences from multiple sources: preference type, preference key, or food/likes keywords
+        is_preference = (
+            mem_type == "preference" or 
+            "preference" in mem_key or
+            any(keyword in value_lower for keyword in ["likes", "favorite", "enjoys", "loves", "prefers", "sushi", "food", "hobby", "interest"])
+        )
+        
+        if is_preference:
+            if isinstance(value, dict):
+                # Check multiple field names: item, description, summary, value
+                pref_text = value.get("item") or value.get("description") or value.get("summary") or value.get("value")
+                if pref_text and isinstance(pref_text, str) and len(pref_text) > 5:
+                    result["preferences"]["interests"].append(pref_text[:150])
+            elif isinstance(value, str) and len(value) > 5:
+                result["preferences"]["notes"].append(value[:100])
+        
+        # -------------------
+        # COMMITMENTS (Promises, follow-ups)
+        # -------------------
+        if "follow" in value_lower or "remind" in value_lower or "promise" in value_lower:
+            if len(result["commitments"]) < 10:
+                result["commitments"].append(value_str[:150])
+        
+        # -------------------
+        # CONVERSATION SUMMARIES
+        # -------------------
+        if isinstance(value, dict) and "summary" in value:
+            if len(result["recent_conversations"]) < 5:
+                result["recent_conversations"].append(value["summary"])
+        elif "assistant_response" in value_lower or "user_message" in value_lower:
+            # Skip - these are thread history, not facts
+            pass
+        
+        # -------------------
+        # GENERAL FACTS (fallback)
+        # -------------------
+        elif mem_type in ("fact", "moment", "rule") and len(result["facts"]) < 20:
+            if isinstance(value, dict) and "description" in value:
+                result["facts"].append(value["description"][:150])
+            elif isinstance(value, str) and len(value) > 10 and len(value) < 300:
+                # Filter ONLY greeting templates, not legitimate facts
+                
+                # SPECIFIC template variable detection (not just any braces)
+                has_template_vars = (
+                    "{agent_name}" in value or 
+                    "{user_name}" in value or 
+                    "{time_greeting}" in value
+                )
+                
+                # SPECIFIC greeting template patterns (not generic phrases)
+                # Only match if multiple greeting indicators appear together
+                greeting_count = 0
+                if "this is " in value_lower and ("from" in value_lower or "peterson" in value_lower):
+                    greeting_count += 1
+                if "how can i help" in value_lower or "how's your day" in value_lower:
+                    greeting_count += 1
+                if value_lower.startswith(("hi,", "hello,", "hey,", "good morning", "good afternoon", "good evening")):
+                    if len(value) < 100:  # Short greetings only
+                        greeting_count += 1
+                
+                # Conversational markers (clear indicators of dialogue, not facts)
+                conversational_markers = ["assistant:", "user:", "system:"]
+                is_conversational = any(m in value_lower for m in conversational_markers)
+                
+                # Filter ONLY if it has template vars OR looks like a greeting
+                is_likely_greeting = has_template_vars or greeting_count >= 1
+                
+                if not (is_likely_greeting or is_conversational):
+                    result["facts"].append(value[:150])
+                else:
+                    logger.debug(f"⚠️ Filtered greeting template: {value[:50]}...")
+    
     def _extract_contacts(self, value: Any, value_str: str, value_lower: str, mem_key: str, 
                          timestamp: float, seen_contacts: Dict, result: Dict) -> None:
         """Extract contact information from memory value."""
@@ -748,8 +936,13 @@ class HTTPMemoryStore:
                 "wife": "spouse", "husband": "spouse"
             }
             relationship = relationship_map.get(relationship, relationship)
-            
-            if name and relationship in ["spouse", "father", "mother", "son", "daughter"]:
+
+            # Children are a list in the template (no "son"/"daughter" slot), same as the text path
+            if name and relationship in ["son", "daughter"]:
+                if not any(c.get("name") == name for c in result["contacts"]["children"]):
+                    result["contacts"]["children"].append({"name": name, "relationship": relationship})
+
+            elif name and relationship in ["spouse", "father", "mother"]:
                 # Update template if newer
                 if relationship not in seen_contacts or timestamp > seen_contacts[relationship][0]:
                     result["contacts"][relationship]["name"] = name
@@ -949,6 +1142,268 @@ class HTTPMemoryStore:
         
         return result
 
+    # ============================================================================
+    # STORED CALLER SCHEMA: Incremental merge on write, single keyed read on call
+    # ============================================================================
+    
+    def _new_schema_document(self) -> Dict[str, Any]:
+        """Empty stored schema document (schema + latest-wins tracking state)."""
+        return {
+            "schema": copy.deepcopy(MEMORY_TEMPLATE),
+            "seen": {"contacts": {}, "vehicles": {}, "policies": {}},
+            "clock": 0,  # Highest non-priority timestamp merged so far
+            "memory_count": 0,
+            "updated_at": None,
+            "rebuilt_at": None
+        }
+    
+    @staticmethod
+    def _unwrap_schema_document(mem: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Extract a stored schema document from either AI-Memory response format."""
+        if (mem.get("key") or mem.get("k")) != SCHEMA_MEMORY_KEY:
+            return None
+        
+        value = mem.get("value")
+        # Concatenated format wraps the stored object: {"type", "key", "value": {...}}
+        if isinstance(value, dict) and "schema" not in value and "value" in value:
+            value = value["value"]
+        if isinstance(value, str):
+            try:
+                value = json.loads(value)
+            except json.JSONDecodeError:
+                return None
+        
+        if isinstance(value, dict) and isinstance(value.get("schema"), dict):
+            return value
+        return None
+    
+    def load_caller_schema(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Load the stored caller schema document with a single keyed read.
+        
+        Args:
+            user_id: Caller identifier
+            
+        Returns:
+            Schema document ({"schema", "seen", "clock", "memory_count", ...}) or
+            None if no schema has been built for this caller yet (or it could not be read)
+        """
+        return self._load_caller_schema_versioned(user_id)[0]
+    
+    def _load_caller_schema_versioned(self, user_id: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """(document, version) - the version is None when AI-Memory has no keyed reads."""
+        self._check_connection()
+        
+        try:
+            jwt_token = generate_memory_token(customer_id=1)  # Peterson Insurance, as in write()
+            response = self.session.get(
+                f"{self.ai_memory_url}/v1/memories/user/{user_id}/key",
+                params={"memory_type": SCHEMA_MEMORY_TYPE, "key": SCHEMA_MEMORY_KEY},
+                headers={"Authorization": f"Bearer {jwt_token}"},
+                timeout=10
+            )
+        except Exception as e:
+            logger.error(f"Failed to load caller schema for {user_id}: {e}")
+            return None, None
+        if response.status_code in (404, 405):
+            # Older AI-Memory without keyed reads
+            return self._search_caller_schema(user_id), None
+        if response.status_code != 200:
+            logger.error(f"Caller schema read failed: {response.status_code} {response.text}")
+            return None, None
+        
+        mem = response.json().get("memory")
+        document = self._unwrap_schema_document(mem) if mem else None
+        if document is None:
+            return None, None
+        for category in ("contacts", "vehicles", "policies"):
+            document.setdefault("seen", {}).setdefault(category, {})
+        return document, mem.get("created_at")
+    
+    def _search_caller_schema(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Find the newest schema document through search (AI-Memory without keyed reads)."""
+        results = self.search(
+            SCHEMA_MEMORY_KEY,
+            user_id=user_id,
+            k=10,
+            memory_types=[SCHEMA_MEMORY_TYPE],
+            include_shared=False
+        )
+        documents = [doc for doc in (self._unwrap_schema_document(mem) for mem in results) if doc]
+        if not documents:
+            return None
+        
+        # Without upserts the store is append-only - newest document wins
+        document = max(documents, key=lambda doc: doc.get("updated_at") or "")
+        for category in ("contacts", "vehicles", "policies"):
+            document.setdefault("seen", {}).setdefault(category, {})
+        return document
+    
+    def save_caller_schema(self, user_id: str, document: Dict[str, Any], expected_version: Optional[str] = None) -> str:
+        """
+        Persist a caller schema document to AI-Memory (replaces the stored one in place).
+        
+        Args:
+            user_id: Caller identifier
+            document: Schema document
+            expected_version: Version from the load; raises SchemaVersionConflict if the stored one moved on
+        """
+        self._check_connection()
+        
+        document["updated_at"] = datetime.now().isoformat()
+        payload = {
+            "type": SCHEMA_MEMORY_TYPE,
+            "key": SCHEMA_MEMORY_KEY,
+            "value": document,
+            "ttl_days": SCHEMA_TTL_DAYS,
+            "source": "schema_maintainer"
+        }
+        jwt_token = generate_memory_token(customer_id=1)  # Peterson Insurance, as in write()
+        params = {"user_id": user_id}
+        if expected_version:
+            params["expected_version"] = expected_version
+        response = self.session.put(
+            f"{self.ai_memory_url}/v1/memories/user",
+            json=payload,
+            params=params,
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {jwt_token}"
+            },
+            timeout=10
+        )
+        if response.status_code in (404, 405):
+            # Older AI-Memory without upserts: append a new document
+            return self.write(
+                memory_type=SCHEMA_MEMORY_TYPE,
+                key=SCHEMA_MEMORY_KEY,
+                value=document,
+                user_id=user_id,
+                scope="user",
+                ttl_days=SCHEMA_TTL_DAYS,
+                source="schema_maintainer"
+            )
+        if response.status_code == 409:
+            raise SchemaVersionConflict(f"Caller schema for {user_id} changed since version {expected_version}")
+        if response.status_code != 200:
+            raise Exception(f"AI-Memory service returned {response.status_code}: {response.text}")
+        result = response.json()
+        return str(result.get("memory_id") or result.get("id"))
+    
+    def merge_into_caller_schema(self, user_id: str, memory_type: str, key: str, value: Any) -> bool:
+        """
+        Classify one newly written memory and merge it into the caller's stored schema.
+        
+        Uses the same latest-wins rules as normalize_memories(); each new write is
+        treated as newer than everything merged before it (admin panel "person"
+        records keep their priority timestamp). Callers without a stored schema are
+        skipped - the first call setup (or rebuild_caller_schema) builds it from all
+        stored memories, including this one.
+        
+        Args:
+            user_id: Caller identifier
+            memory_type: Type of the memory that was written
+            key: Key of the memory that was written
+            value: Memory content
+            
+        Returns:
+            True if the stored schema was updated
+        """
+        return self.merge_many_into_caller_schema(user_id, [{"type": memory_type, "key": key, "value": value}])
+    
+    def _queue_schema_merge(self, user_id: str, memories: List[Dict[str, Any]]):
+        """Hand a schema merge to the background memory writer (off the request path)."""
+        from app.memory_writer import get_memory_writer
+        get_memory_writer().submit_schema_merge(user_id, memories)
+    
+    def merge_many_into_caller_schema(self, user_id: str, memories: List[Dict[str, Any]]) -> bool:
+        """
+        Merge several newly written memories (in write order) with one schema load and save.
+        
+        The save is conditional on the version that was loaded; if another process
+        saved the schema in between, the merge is redone on the fresh document.
+        
+        Args:
+            user_id: Caller identifier
+            memories: Dicts with type, key and value
+            
+        Returns:
+            True if the stored schema was updated
+        """
+        try:
+            with _schema_lock(user_id):
+                for attempt in range(SCHEMA_MERGE_ATTEMPTS):
+                    try:
+                        return self._merge_once(user_id, memories)
+                    except SchemaVersionConflict:
+                        logger.info(f"🔁 Caller schema for {user_id} changed concurrently, re-merging (attempt {attempt + 1})")
+                logger.warning(f"⚠️ Gave up merging into caller schema for {user_id} after {SCHEMA_MERGE_ATTEMPTS} conflicts")
+                return False
+                
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to merge memory into caller schema for {user_id}: {e}")
+            return False
+    
+    def _merge_once(self, user_id: str, memories: List[Dict[str, Any]]) -> bool:
+        """One load-merge-save round (raises SchemaVersionConflict if the save lost a race)."""
+        document, version = self._load_caller_schema_versioned(user_id)
+        if document is None:
+            logger.debug(f"No stored caller schema for {user_id} yet, skipping incremental merge")
+            return False
+        
+        before = json.dumps([document["schema"], document["seen"]], sort_keys=True, default=str)
+        for memory in memories:
+            mem = {"type": memory["type"], "key": memory["key"], "value": memory["value"]}
+            timestamp = self._memory_timestamp(mem, document.get("clock", 0) + 1)
+            self._merge_memory_into_schema(mem, timestamp, document["seen"], document["schema"])
+            if timestamp != PERSON_PRIORITY_TIMESTAMP:
+                document["clock"] = timestamp
+        document["schema"] = self._cleanup_template(document["schema"])
+        changed = json.dumps([document["schema"], document["seen"]], sort_keys=True, default=str) != before
+        
+        previous_count = document.get("memory_count", 0)
+        document["memory_count"] = previous_count + len(memories)
+        
+        # Skip the write when nothing changed (first memory always persists
+        # so call setup knows this caller is no longer new)
+        if not changed and previous_count > 0:
+            return False
+        
+        self.save_caller_schema(user_id, document, expected_version=version)
+        merged = ", ".join(f"{m['type']}:{m['key']}" for m in memories[:3]) + ("..." if len(memories) > 3 else "")
+        logger.info(f"🧩 Merged {merged} into caller schema for {user_id}")
+        return True
+    
+    def rebuild_caller_schema(self, user_id: str, raw_memories: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """
+        Rebuild a caller's stored schema from scratch (initial build and drift repair).
+        
+        Args:
+            user_id: Caller identifier
+            raw_memories: Optional pre-fetched user memories (fetched if omitted)
+            
+        Returns:
+            The rebuilt schema document
+        """
+        if raw_memories is None:
+            raw_memories = self.get_user_memories(user_id, include_shared=False)
+        raw_memories = [mem for mem in raw_memories if (mem.get("type") or "").lower() != SCHEMA_MEMORY_TYPE]
+        
+        with _schema_lock(user_id):
+            document = self._new_schema_document()
+            document["schema"] = self.normalize_memories(raw_memories, seen=document["seen"])
+            document["clock"] = max(
+                (self._memory_timestamp(mem, idx) for idx, mem in enumerate(raw_memories)
+                 if (mem.get("type") or "").lower() != "person"),
+                default=0
+            )
+            document["memory_count"] = len(raw_memories)
+            document["rebuilt_at"] = datetime.now().isoformat()
+            self.save_caller_schema(user_id, document)
+        
+        logger.info(f"✅ Rebuilt caller schema for {user_id} from {len(raw_memories)} memories")
+        return document
+
     def get_shared_memories(self, limit: int = 20) -> List[Dict[str, Any]]:
         """Get shared memories."""
         try:
@@ -1291,6 +1746,64 @@ class HTTPMemoryStore:
             logger.error(f"❌ Error fetching personality averages: {e}")
             return None
 
+    def caller_exists_v2(self, user_id: str) -> Dict[str, Any]:
+        """
+        Returning-caller check without a vector search (indexed lookups in AI-Memory).
+        
+        Falls back to a k=1 memory search if the AI-Memory service predates
+        the /v2/callers endpoint.
+        
+        Args:
+            user_id: Normalized (optionally customer-namespaced) caller id
+        
+        Returns:
+            Dict with known (bool) and preferred_name
+        """
+        # 🔐 Week 2: Generate JWT token for multi-tenant authentication
+        customer_id = 1  # Peterson Insurance - Phase A
+        jwt_token = generate_memory_token(customer_id=customer_id)
+        
+        response = self.session.get(
+            f"{self.ai_memory_url}/v2/callers/{user_id}",
+            headers={"Authorization": f"Bearer {jwt_token}"},
+            timeout=3
+        )
+        if response.status_code == 200:
+            result = response.json()
+            return {"known": bool(result.get("known")), "preferred_name": result.get("preferred_name")}
+        if response.status_code in (404, 405):
+            memories = self.search("", user_id=user_id, k=1)
+            return {"known": len(memories) > 0, "preferred_name": None}
+        raise RuntimeError(f"AI-Memory /v2/callers returned {response.status_code}")
+    
+    def list_known_callers_v2(self, updated_since: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Known callers (caller_profiles) for warming the callback-detection cache.
+        
+        Args:
+            updated_since: ISO timestamp - only callers updated after it
+        
+        Returns:
+            List of {user_id, preferred_name, last_call_date} (empty if unsupported)
+        """
+        try:
+            customer_id = 1  # Peterson Insurance - Phase A
+            jwt_token = generate_memory_token(customer_id=customer_id)
+            
+            response = self.session.get(
+                f"{self.ai_memory_url}/v2/callers",
+                params={"updated_since": updated_since} if updated_since else None,
+                headers={"Authorization": f"Bearer {jwt_token}"},
+                timeout=30
+            )
+            if response.status_code == 200:
+                return response.json().get("callers", [])
+            logger.warning(f"⚠️ AI-Memory /v2/callers returned {response.status_code}")
+            return []
+        except Exception as e:
+            logger.error(f"❌ Error listing known callers: {e}")
+            return []
+
     def close(self):
         """Close the HTTP session."""
         if hasattr(self, 'session'):
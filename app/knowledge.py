@@ -0,0 +1,495 @@
+"""
+Local knowledge base: chunked documents + BM25 inverted index.
+
+Documents are split into overlapping word-window chunks and appended to
+chunks.jsonl (the source of truth). Every ingest rebuilds a versioned,
+memory-mapped index directory next to it:
+
+    <knowledge_dir>/chunks.jsonl
+    <knowledge_dir>/manifest.json          -> {"version": "...", ...}
+    <knowledge_dir>/index-<version>/terms.json
+                                   postings_ids.npy   (int32, grouped by term)
+                                   postings_tf.npy    (float32)
+                                   doc_len.npy        (float32, per chunk)
+                                   chunk_offsets.npy  (int64 byte offsets into chunks.jsonl)
+                                   vectors.npy        (float32, optional)
+
+Searchers stat manifest.json on every query and swap to the new version when
+it changes, so knowledge added from the Flask admin is picked up by the
+FastAPI tool path without a restart. A loaded version is one immutable
+snapshot swapped in with a single assignment, so a concurrent search never
+mixes arrays from two versions.
+
+Adding a document only tokenizes the new chunks: their postings are merged
+into the previous version's arrays (chunk ids only grow, so each term's
+postings stay sorted). A full rebuild happens on rebuild() or when the
+previous version cannot be extended.
+
+Optional vector fusion: set knowledge_embedding_model (e.g.
+"text-embedding-3-small") to embed chunks at ingest and fuse BM25 and
+cosine rankings with reciprocal rank fusion at query time.
+"""
+
+import os
+import re
+import json
+import time
+import fcntl
+import shutil
+import logging
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+import requests
+
+from config_loader import get_setting, get_llm_config
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Reciprocal rank fusion constant
+RRF_K = 60
+
+CHUNK_WORDS = 120
+CHUNK_OVERLAP = 20
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "do", "does", "for", "from",
+    "has", "have", "how", "i", "if", "in", "is", "it", "its", "me", "my", "of", "on", "or",
+    "our", "so", "that", "the", "their", "there", "this", "to", "was", "we", "what", "when",
+    "where", "which", "who", "will", "with", "you", "your"
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords, with a light plural strip."""
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+def chunk_text(text: str, chunk_words: int = CHUNK_WORDS, overlap: int = CHUNK_OVERLAP) -> List[str]:
+    """Split text into overlapping word windows, preferring paragraph boundaries."""
+    paragraphs = [p.strip() for p in re.split(r"\n\s*\n", text) if p.strip()]
+    chunks = []
+    current: List[str] = []
+
+    for paragraph in paragraphs:
+        words = paragraph.split()
+        if current and len(current) + len(words) > chunk_words:
+            chunks.append(" ".join(current))
+            current = current[-overlap:] if overlap else []
+        current.extend(words)
+        # Very long paragraphs are windowed on their own
+        while len(current) > chunk_words:
+            chunks.append(" ".join(current[:chunk_words]))
+            current = current[chunk_words - overlap:]
+
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+def _embed_texts(texts: List[str]) -> Optional[np.ndarray]:
+    """Embed texts with the configured OpenAI-compatible embedding model (None if disabled/failed)."""
+    model = get_setting("knowledge_embedding_model", "")
+    if not model or not texts:
+        return None
+
+    config = get_llm_config()
+    base_url = config["base_url"]
+    endpoint_url = f"{base_url}/embeddings" if base_url.endswith('/v1') else f"{base_url}/v1/embeddings"
+    headers = {"Content-Type": "application/json"}
+    if config["api_key"]:
+        headers["Authorization"] = f"Bearer {config['api_key']}"
+
+    try:
+        response = requests.post(endpoint_url, json={"model": model, "input": texts}, headers=headers, timeout=30)
+        response.raise_for_status()
+        data = sorted(response.json()["data"], key=lambda d: d["index"])
+        vectors = np.asarray([d["embedding"] for d in data], dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+    except Exception as e:
+        logger.warning(f"⚠️ Knowledge embedding failed, using BM25 only: {e}")
+        return None
+
+@dataclass(frozen=True)
+class _IndexSnapshot:
+    """One published index version (arrays are memory-mapped)."""
+    manifest: Dict[str, Any]
+    terms: Dict[str, Tuple[int, int]]
+    postings_ids: np.ndarray
+    postings_tf: np.ndarray
+    doc_len: np.ndarray
+    chunk_offsets: np.ndarray
+    vectors: Optional[np.ndarray]
+    mtime: Optional[int] = None
+
+class KnowledgeIndex:
+    """
+    Persistent BM25 index over knowledge chunks with hot reload.
+    """
+
+    def __init__(self, data_dir: Optional[str] = None):
+        self.data_dir = data_dir or get_setting("knowledge_dir", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "knowledge"))
+        self.chunks_path = os.path.join(self.data_dir, "chunks.jsonl")
+        self.manifest_path = os.path.join(self.data_dir, "manifest.json")
+        self.lock_path = os.path.join(self.data_dir, ".lock")
+        os.makedirs(self.data_dir, exist_ok=True)
+
+        self._reload_lock = threading.Lock()
+        self._snapshot: Optional[_IndexSnapshot] = None
+
+    # ------------------------------------------------------------------
+    # Ingestion
+    # ------------------------------------------------------------------
+
+    def add_document(self, title: str, text: str, doc_type: str = "fact", category: str = "general",
+                     source: str = "admin") -> Dict[str, Any]:
+        """
+        Chunk a document, append it to the knowledge base and rebuild the index.
+
+        Args:
+            title: Document title (indexed with every chunk)
+            text: Document body
+            doc_type: Knowledge type (fact, rule, procedure, requirement)
+            category: Knowledge category (general, technical, business, personal)
+            source: Where the document came from
+
+        Returns:
+            Dict with doc_id, chunk count and the new index version
+        """
+        chunks = chunk_text(text) or [title]
+        doc_id = f"doc_{int(time.time() * 1000)}"
+
+        with self._file_lock():
+            next_id = self._count_chunks()
+            with open(self.chunks_path, "a", encoding="utf-8") as f:
+                for i, chunk in enumerate(chunks):
+                    f.write(json.dumps({
+                        "id": next_id + i,
+                        "doc_id": doc_id,
+                        "title": title,
+                        "type": doc_type,
+                        "category": category,
+                        "text": chunk,
+                        "source": source,
+                        "added_at": time.time()
+                    }) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            version = self._build_index()
+
+        logger.info(f"📚 Added knowledge '{title}' as {len(chunks)} chunks (index {version})")
+        return {"doc_id": doc_id, "chunks": len(chunks), "version": version}
+
+    def rebuild(self) -> str:
+        """Rebuild the index from chunks.jsonl (e.g. after enabling embeddings)."""
+        with self._file_lock():
+            return self._build_index(full=True)
+
+    @contextmanager
+    def _file_lock(self):
+        """Cross-process exclusive lock for writers."""
+        with open(self.lock_path, "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _count_chunks(self) -> int:
+        if not os.path.exists(self.chunks_path):
+            return 0
+        with open(self.chunks_path, "rb") as f:
+            return sum(1 for line in f if line.strip())
+
+    def _build_index(self, full: bool = False) -> str:
+        """
+        Publish a new index version via manifest.json.
+
+        Extends the current version with the chunks appended since it was built,
+        unless `full` is set or it cannot be extended (then chunks.jsonl is re-read).
+        """
+        started = time.perf_counter()
+        previous = None if full else self._extendable_snapshot()
+        first_chunk = previous.manifest["num_chunks"] if previous else 0
+        offset = previous.manifest["chunks_bytes"] if previous else 0
+
+        # Tokenize the chunks this version adds
+        offsets: List[int] = []
+        doc_tokens: List[List[str]] = []
+        embed_inputs: List[str] = []
+        if os.path.exists(self.chunks_path):
+            with open(self.chunks_path, "rb") as f:
+                f.seek(offset)
+                for line in f:
+                    if line.strip():
+                        chunk = json.loads(line)
+                        offsets.append(offset)
+                        doc_tokens.append(tokenize(f"{chunk['title']} {chunk['text']}"))
+                        embed_inputs.append(f"{chunk['title']}\n{chunk['text']}")
+                    offset += len(line)
+
+        # Invert: term -> {chunk_id: tf}
+        postings: Dict[str, Dict[int, int]] = {}
+        for i, tokens in enumerate(doc_tokens):
+            for token in tokens:
+                postings.setdefault(token, {}).setdefault(first_chunk + i, 0)
+                postings[token][first_chunk + i] += 1
+
+        # Merge with the previous version's postings (new chunk ids sort after old ones)
+        old_terms = previous.terms if previous else {}
+        terms = {}
+        id_parts: List[np.ndarray] = []
+        tf_parts: List[np.ndarray] = []
+        position = 0
+        for term in sorted(old_terms.keys() | postings.keys()):
+            count = 0
+            if term in old_terms:
+                start, df = old_terms[term]
+                id_parts.append(previous.postings_ids[start:start + df])
+                tf_parts.append(previous.postings_tf[start:start + df])
+                count += df
+            if term in postings:
+                entries = postings[term]
+                chunk_ids = sorted(entries)
+                id_parts.append(np.asarray(chunk_ids, dtype=np.int32))
+                tf_parts.append(np.asarray([entries[c] for c in chunk_ids], dtype=np.float32))
+                count += len(chunk_ids)
+            terms[term] = (position, count)
+            position += count
+
+        def concat(parts: List[np.ndarray], dtype) -> np.ndarray:
+            return np.concatenate(parts).astype(dtype, copy=False) if parts else np.zeros(0, dtype=dtype)
+
+        new_doc_len = np.asarray([len(t) for t in doc_tokens], dtype=np.float32)
+        new_offsets = np.asarray(offsets, dtype=np.int64)
+        doc_len = np.concatenate([previous.doc_len, new_doc_len]) if previous else new_doc_len
+        chunk_offsets = np.concatenate([previous.chunk_offsets, new_offsets]) if previous else new_offsets
+
+        version = f"{time.time_ns()}"
+        index_dir = os.path.join(self.data_dir, f"index-{version}")
+        os.makedirs(index_dir, exist_ok=True)
+        np.save(os.path.join(index_dir, "postings_ids.npy"), concat(id_parts, np.int32))
+        np.save(os.path.join(index_dir, "postings_tf.npy"), concat(tf_parts, np.float32))
+        np.save(os.path.join(index_dir, "doc_len.npy"), doc_len)
+        np.save(os.path.join(index_dir, "chunk_offsets.npy"), chunk_offsets)
+        with open(os.path.join(index_dir, "terms.json"), "w") as f:
+            json.dump(terms, f)
+
+        vectors = self._build_vectors(embed_inputs, previous)
+        if vectors is not None:
+            np.save(os.path.join(index_dir, "vectors.npy"), vectors)
+
+        manifest = {
+            "version": version,
+            "num_chunks": len(doc_len),
+            "num_terms": len(terms),
+            "avg_doc_len": float(np.mean(doc_len)) if len(doc_len) else 0.0,
+            "chunks_bytes": offset,
+            "vectors": vectors is not None,
+            "built_at": time.time()
+        }
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.manifest_path)
+
+        # Keep the previous version for readers still holding its mmaps
+        versions = sorted(d for d in os.listdir(self.data_dir) if d.startswith("index-"))
+        for old in versions[:-2]:
+            shutil.rmtree(os.path.join(self.data_dir, old), ignore_errors=True)
+
+        mode = f"+{len(doc_tokens)} chunks" if previous else "full"
+        logger.info(f"✅ Built knowledge index {version} ({mode}): {manifest['num_chunks']} chunks, {manifest['num_terms']} terms in {(time.perf_counter() - started) * 1000:.0f}ms")
+        return version
+
+    def _extendable_snapshot(self) -> Optional[_IndexSnapshot]:
+        """The current version if new chunks can be merged into it (else None -> full build)."""
+        if not os.path.exists(self.manifest_path):
+            return None
+        try:
+            with open(self.manifest_path) as f:
+                manifest = json.load(f)
+            if "chunks_bytes" not in manifest or os.path.getsize(self.chunks_path) < manifest["chunks_bytes"]:
+                return None
+            snapshot = self._load_snapshot(manifest)
+        except (OSError, KeyError, ValueError) as e:
+            logger.warning(f"⚠️ Knowledge index not extendable, rebuilding: {e}")
+            return None
+        # Enabling (or disabling) embeddings needs vectors for every chunk
+        if bool(get_setting("knowledge_embedding_model", "")) != (snapshot.vectors is not None):
+            return None
+        return snapshot
+
+    def _build_vectors(self, embed_inputs: List[str], previous: Optional[_IndexSnapshot]) -> Optional[np.ndarray]:
+        """Embeddings for the new chunks, appended to the previous version's vectors."""
+        if not get_setting("knowledge_embedding_model", ""):
+            return None
+        if previous is None:
+            return _embed_texts(embed_inputs)
+        if not embed_inputs:
+            return np.asarray(previous.vectors)
+        new_vectors = _embed_texts(embed_inputs)
+        return np.vstack([previous.vectors, new_vectors]) if new_vectors is not None else None
+
+    # ------------------------------------------------------------------
+    # Loading (hot reload)
+    # ------------------------------------------------------------------
+
+    def _load_snapshot(self, manifest: Dict[str, Any], mtime: Optional[int] = None) -> _IndexSnapshot:
+        """Memory-map one index version."""
+        index_dir = os.path.join(self.data_dir, f"index-{manifest['version']}")
+        with open(os.path.join(index_dir, "terms.json")) as f:
+            terms = {term: tuple(entry) for term, entry in json.load(f).items()}
+        vectors_path = os.path.join(index_dir, "vectors.npy")
+        return _IndexSnapshot(
+            manifest=manifest,
+            terms=terms,
+            postings_ids=np.load(os.path.join(index_dir, "postings_ids.npy"), mmap_mode="r"),
+            postings_tf=np.load(os.path.join(index_dir, "postings_tf.npy"), mmap_mode="r"),
+            doc_len=np.load(os.path.join(index_dir, "doc_len.npy"), mmap_mode="r"),
+            chunk_offsets=np.load(os.path.join(index_dir, "chunk_offsets.npy"), mmap_mode="r"),
+            vectors=np.load(vectors_path, mmap_mode="r") if os.path.exists(vectors_path) else None,
+            mtime=mtime
+        )
+
+    def _ensure_loaded(self) -> Optional[_IndexSnapshot]:
+        """Current index snapshot, reloading if manifest.json changed (None before the first build)."""
+        snapshot = self._snapshot
+        try:
+            mtime = os.stat(self.manifest_path).st_mtime_ns
+        except FileNotFoundError:
+            return snapshot
+        if snapshot is not None and mtime == snapshot.mtime:
+            return snapshot
+
+        with self._reload_lock:
+            snapshot = self._snapshot
+            if snapshot is not None and mtime == snapshot.mtime:
+                return snapshot
+            with open(self.manifest_path) as f:
+                manifest = json.load(f)
+            snapshot = self._load_snapshot(manifest, mtime)
+            self._snapshot = snapshot  # single swap - searches hold their own reference
+            logger.info(f"🔄 Loaded knowledge index {manifest['version']} ({manifest['num_chunks']} chunks)")
+            return snapshot
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _bm25_scores(snapshot: _IndexSnapshot, query_tokens: List[str]) -> np.ndarray:
+        num_chunks = snapshot.manifest["num_chunks"]
+        scores = np.zeros(num_chunks, dtype=np.float32)
+        avg_len = snapshot.manifest["avg_doc_len"] or 1.0
+
+        for token in set(query_tokens):
+            entry = snapshot.terms.get(token)
+            if not entry:
+                continue
+            start, df = entry
+            ids = snapshot.postings_ids[start:start + df]
+            tf = snapshot.postings_tf[start:start + df]
+            idf = np.log(1.0 + (num_chunks - df + 0.5) / (df + 0.5))
+            norm = BM25_K1 * (1.0 - BM25_B + BM25_B * snapshot.doc_len[ids] / avg_len)
+            scores[ids] += idf * tf * (BM25_K1 + 1.0) / (tf + norm)
+        return scores
+
+    def _read_chunk(self, snapshot: _IndexSnapshot, chunk_id: int) -> Dict[str, Any]:
+        with open(self.chunks_path, "rb") as f:
+            f.seek(int(snapshot.chunk_offsets[chunk_id]))
+            return json.loads(f.readline())
+
+    def search(self, query: str, k: int = 5, category: Optional[str] = None,
+               use_vectors: bool = True) -> List[Dict[str, Any]]:
+        """
+        Search the knowledge base.
+
+        Args:
+            query: Search query
+            k: Maximum number of results
+            category: Optional category filter
+            use_vectors: Fuse with vector similarity when the index has embeddings
+
+        Returns:
+            List of chunk dicts with "score" (and "bm25_score"/"vector_score" when fused)
+        """
+        snapshot = self._ensure_loaded()
+        if snapshot is None or not snapshot.manifest.get("num_chunks"):
+            return []
+
+        bm25 = self._bm25_scores(snapshot, tokenize(query))
+        candidates = np.flatnonzero(bm25 > 0)
+        fused: Optional[Dict[int, float]] = None
+        cosine = None
+
+        if use_vectors and snapshot.vectors is not None:
+            query_vector = _embed_texts([query])
+            if query_vector is not None:
+                cosine = np.asarray(snapshot.vectors @ query_vector[0])
+                pool = max(k * 4, 20)
+                bm25_top = candidates[np.argsort(-bm25[candidates])][:pool]
+                vector_top = np.argsort(-cosine)[:pool]
+                fused = {}
+                for rank, chunk_id in enumerate(bm25_top):
+                    fused[int(chunk_id)] = fused.get(int(chunk_id), 0.0) + 1.0 / (RRF_K + rank + 1)
+                for rank, chunk_id in enumerate(vector_top):
+                    fused[int(chunk_id)] = fused.get(int(chunk_id), 0.0) + 1.0 / (RRF_K + rank + 1)
+
+        if fused is not None:
+            ranked = sorted(fused, key=fused.get, reverse=True)
+        elif len(candidates):
+            ranked = [int(c) for c in candidates[np.argsort(-bm25[candidates], kind="stable")]]
+        else:
+            return []
+
+        results = []
+        for chunk_id in ranked:
+            chunk = self._read_chunk(snapshot, chunk_id)
+            if category and chunk.get("category", "general") != category:
+                continue
+            chunk["bm25_score"] = float(bm25[chunk_id])
+            if fused is not None:
+                chunk["vector_score"] = float(cosine[chunk_id])
+                chunk["score"] = fused[chunk_id]
+            else:
+                chunk["score"] = float(bm25[chunk_id])
+            results.append(chunk)
+            if len(results) >= k:
+                break
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        """Current index manifest."""
+        snapshot = self._ensure_loaded()
+        return dict(snapshot.manifest) if snapshot else {}
+
+_knowledge_index: Optional[KnowledgeIndex] = None
+_knowledge_index_lock = threading.Lock()
+
+def get_knowledge_index() -> KnowledgeIndex:
+    """Process-wide knowledge index (lazy)."""
+    global _knowledge_index
+    if _knowledge_index is None:
+        with _knowledge_index_lock:
+            if _knowledge_index is None:
+                _knowledge_index = KnowledgeIndex()
+    return _knowledge_index
@@ -0,0 +1,163 @@
+"""
+Known-callers index for callback detection.
+
+Inbound calls used to decide "new or returning caller?" with one or two
+empty-query vector searches against AI-Memory (normalized and raw ids), and
+the greeting repeated the search with k=5 - all on the ring-to-voice path.
+This index answers the question from memory:
+
+    callers = get_known_callers()
+    entry = callers.lookup(caller_key(from_number, customer_id))
+    if entry["known"]: ...
+
+Keys are the normalized 10-digit number, prefixed customer_<id>_ for
+tenant calls (the same user_id the realtime flow stores memories under).
+Entries live in an LRU warmed from AI-Memory's caller_profiles at startup.
+Known callers stay cached; misses are resolved with one indexed lookup
+(/v2/callers/<id>) and negative answers expire after a short TTL so a
+caller registered by another process is picked up on their next call.
+Registration and call-summary writes call mark_known() so the local view
+is current without a round trip.
+"""
+
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+from config_loader import get_setting
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def normalize_caller_id(phone_number: Optional[str]) -> Optional[str]:
+    """Last 10 digits of a phone number (same normalization as the memory user_id)."""
+    if not phone_number:
+        return phone_number
+    digits = ''.join(filter(str.isdigit, phone_number))
+    return digits[-10:] if len(digits) >= 10 else phone_number
+
+
+def caller_key(phone_number: Optional[str], customer_id: Optional[int] = None) -> Optional[str]:
+    """Normalized, tenant-namespaced caller id."""
+    normalized = normalize_caller_id(phone_number)
+    if normalized and customer_id:
+        return f"customer_{customer_id}_{normalized}"
+    return normalized
+
+
+class KnownCallersIndex:
+    """
+    In-process LRU of caller id -> {known, name}.
+    """
+
+    def __init__(self, max_entries: int = 100000, negative_ttl_seconds: float = 60):
+        self.max_entries = max_entries
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._warmed_at = 0.0
+        self._stats = {"hits": 0, "misses": 0, "lookups_failed": 0, "marked_known": 0, "warmed": 0}
+
+    def _put(self, key: str, known: bool, name: Optional[str] = None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry["known"] and not known:
+                return  # never downgrade a known caller
+            if entry is not None and name is None:
+                name = entry.get("name")
+            self._entries[key] = {"known": known, "name": name, "checked_at": time.time()}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def lookup(self, key: Optional[str], mem_store=None) -> Dict[str, Any]:
+        """
+        Known-caller status for a caller id.
+
+        Args:
+            key: caller_key() of the caller
+            mem_store: Optional HTTPMemoryStore to reuse on a cache miss
+
+        Returns:
+            Dict with known (bool) and name (str or None). Unknown if the
+            index can't answer and AI-Memory is unreachable.
+        """
+        if not key:
+            return {"known": False, "name": None}
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry["known"] or now - entry["checked_at"] < self.negative_ttl_seconds):
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return {"known": entry["known"], "name": entry.get("name")}
+            self._stats["misses"] += 1
+
+        try:
+            if mem_store is None:
+                from app.http_memory import HTTPMemoryStore
+                mem_store = HTTPMemoryStore()
+            result = mem_store.caller_exists_v2(key)
+        except Exception as e:
+            with self._lock:
+                self._stats["lookups_failed"] += 1
+            logger.warning(f"⚠️ Known-caller lookup failed for {key}: {e}")
+            return {"known": False, "name": None}
+
+        self._put(key, result["known"], result.get("preferred_name"))
+        return {"known": result["known"], "name": result.get("preferred_name")}
+
+    def mark_known(self, key: Optional[str], name: Optional[str] = None):
+        """Record a registration / summary write so the next call is recognized."""
+        if not key:
+            return
+        self._put(key, True, name)
+        with self._lock:
+            self._stats["marked_known"] += 1
+
+    def warm(self) -> int:
+        """Load (or incrementally refresh) known callers from AI-Memory caller_profiles."""
+        from datetime import datetime
+        from app.http_memory import HTTPMemoryStore
+
+        started = time.time()
+        updated_since = datetime.utcfromtimestamp(self._warmed_at).isoformat() if self._warmed_at else None
+        callers = HTTPMemoryStore().list_known_callers_v2(updated_since=updated_since)
+        for caller in callers:
+            self._put(caller["user_id"], True, caller.get("preferred_name"))
+        self._warmed_at = started
+        with self._lock:
+            self._stats["warmed"] += len(callers)
+        logger.info(f"📇 Known-callers index warmed: {len(callers)} callers in {time.time() - started:.2f}s")
+        return len(callers)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["known"] = sum(1 for entry in self._entries.values() if entry["known"])
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        stats["warmed_at"] = self._warmed_at
+        return stats
+
+
+_known_callers: Optional[KnownCallersIndex] = None
+_known_callers_lock = threading.Lock()
+
+
+def get_known_callers() -> KnownCallersIndex:
+    """Process-wide known-callers index."""
+    global _known_callers
+    if _known_callers is None:
+        with _known_callers_lock:
+            if _known_callers is None:
+                _known_callers = KnownCallersIndex(
+                    max_entries=int(get_setting("known_callers_max_entries", 100000)),
+                    negative_ttl_seconds=float(get_setting("known_callers_negative_ttl_seconds", 60)),
+                )
+    return _known_callers
@@ -7,6 +7,7 @@ import time
 from queue import Queue
 from typing import List, Dict, Any, Tuple, Generator, Optional
 from config_loader import get_llm_config
+from app.tracing import begin_span, start_span, inject, TRACEPARENT_HEADER
 try:
     from websocket import WebSocketApp
 except ImportError:
@@ -60,29 +61,180 @@ def chat(messages: List[Dict[str, str]], temperature: float = 0.6, top_p: float
         "max_tokens": max_tokens
     }
     
+    data = _post_chat_completion(payload, base_url, headers)
     try:
-        logger.info(f"Calling LLM with {len(messages)} messages, temp={temperature}, top_p={top_p}")
-        
-        # Handle base_url that may or may not include /v1
-        endpoint_url = f"{base_url}/chat/completions" if base_url.endswith('/v1') else f"{base_url}/v1/chat/completions"
+        # Extract response content and usage stats
+        content = data["choices"][0]["message"]["content"]
+    except KeyError as e:
+        logger.error(f"Unexpected LLM response format: {e}")
+        raise Exception("Unexpected response format from LLM service.")
+    usage = data.get("usage", {})
+    
+    logger.info(f"LLM response received: {usage.get('total_tokens', 0)} total tokens")
+    
+    return content, usage
+
+def chat_with_tools(messages: List[Dict[str, Any]], tools: List[Dict[str, Any]], temperature: float = 0.6,
+                    top_p: float = 0.9, max_tokens: int = 800) -> Tuple[str, List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Call the LLM with native OpenAI function calling enabled.
+    
+    Args:
+        messages: List of message dicts (may include assistant tool_calls / tool messages)
+        tools: OpenAI function definitions (see ToolDispatcher.get_openai_tools)
+        temperature: Sampling temperature (0.0 to 2.0)
+        top_p: Top-p sampling parameter (0.0 to 1.0)
+        max_tokens: Maximum tokens to generate
         
-        response = requests.post(
-            endpoint_url,
-            json=payload,
-            headers=headers,
-            timeout=120  # Increased timeout for longer responses
-        )
-        response.raise_for_status()
+    Returns:
+        Tuple of (response_content, raw_tool_calls, usage_stats)
+    """
+    config = _get_llm_config()
+    base_url = config["base_url"]
+    
+    # Mock endpoint doesn't do function calling
+    if base_url == "http://localhost:8000" or not tools:
+        content, usage = chat(messages, temperature=temperature, top_p=top_p, max_tokens=max_tokens)
+        return content, [], usage
+    
+    payload = {
+        "model": config["model"],
+        "messages": messages,
+        "temperature": temperature,
+        "top_p": top_p,
+        "max_tokens": max_tokens,
+        "tools": tools,
+        "tool_choice": "auto"
+    }
+    
+    data = _post_chat_completion(payload, base_url, _get_headers())
+    try:
+        message = data["choices"][0]["message"]
+    except KeyError as e:
+        logger.error(f"Unexpected LLM response format: {e}")
+        raise Exception("Unexpected response format from LLM service.")
+    usage = data.get("usage", {})
+    tool_calls = message.get("tool_calls") or []
+    
+    logger.info(f"LLM response received: {usage.get('total_tokens', 0)} total tokens, {len(tool_calls)} tool calls")
+    
+    return message.get("content") or "", tool_calls, usage
+
+def chat_stream(messages: List[Dict[str, Any]], temperature: float = 0.6, top_p: float = 0.9, max_tokens: int = 800,
+                tools: Optional[List[Dict[str, Any]]] = None) -> Generator[Dict[str, Any], None, None]:
+    """
+    Stream a chat completion (SSE) as it is generated.
+    
+    Args:
+        messages: List of message dicts
+        temperature: Sampling temperature (0.0 to 2.0)
+        top_p: Top-p sampling parameter (0.0 to 1.0)
+        max_tokens: Maximum tokens to generate
+        tools: Optional OpenAI function definitions
         
-        data = response.json()
+    Yields:
+        {"type": "text", "delta": str} as content arrives, then
+        {"type": "tool_calls", "tool_calls": [...]} if the model called tools, then
+        {"type": "usage", "usage": {...}}
+    """
+    config = _get_llm_config()
+    base_url = config["base_url"]
+    
+    # Mock endpoint: stream the mock response word by word
+    if base_url == "http://localhost:8000":
+        content, usage = _mock_llm_response(messages, temperature, top_p, max_tokens)
+        for word in content.split(" "):
+            yield {"type": "text", "delta": word + " "}
+        yield {"type": "usage", "usage": usage}
+        return
+    
+    payload = {
+        "model": config["model"],
+        "messages": messages,
+        "temperature": temperature,
+        "top_p": top_p,
+        "max_tokens": max_tokens,
+        "stream": True,
+        "stream_options": {"include_usage": True}
+    }
+    if tools:
+        payload["tools"] = tools
+        payload["tool_choice"] = "auto"
+    
+    endpoint_url = f"{base_url}/chat/completions" if base_url.endswith('/v1') else f"{base_url}/v1/chat/completions"
+    logger.info(f"Streaming LLM call with {len(messages)} messages")
+    
+    # Not a context-managed span: a generator can be resumed from other contexts
+    span = begin_span("llm.chat_stream", kind="client", attributes={"llm.model": config["model"], "llm.messages": len(messages)})
+    headers = _get_headers()
+    headers[TRACEPARENT_HEADER] = span.traceparent()
+    
+    usage: Dict[str, Any] = {}
+    tool_calls: Dict[int, Dict[str, Any]] = {}
+    try:
+        with requests.post(endpoint_url, json=payload, headers=headers, timeout=120, stream=True) as response:
+            response.raise_for_status()
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                chunk = json.loads(data)
+                if chunk.get("usage"):
+                    usage = chunk["usage"]
+                choices = chunk.get("choices") or []
+                if not choices:
+                    continue
+                delta = choices[0].get("delta") or {}
+                if (delta.get("content") or delta.get("tool_calls")) and "llm.ttfb_ms" not in span.attributes:
+                    span.set_attribute("llm.ttfb_ms", round((time.time_ns() - span.start_ns) / 1e6, 3))
+                    span.add_event("first_token")
+                if delta.get("content"):
+                    yield {"type": "text", "delta": delta["content"]}
+                # Tool call names/arguments arrive in fragments keyed by index
+                for fragment in delta.get("tool_calls") or []:
+                    slot = tool_calls.setdefault(fragment.get("index", 0), {
+                        "id": None, "type": "function", "function": {"name": "", "arguments": ""}
+                    })
+                    if fragment.get("id"):
+                        slot["id"] = fragment["id"]
+                    function = fragment.get("function") or {}
+                    slot["function"]["name"] += function.get("name") or ""
+                    slot["function"]["arguments"] += function.get("arguments") or ""
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Streaming LLM request failed: {e}")
+        span.error = str(e)
+        raise Exception(f"LLM service error: {e}")
+    finally:
+        span.set_attribute("llm.total_tokens", usage.get("total_tokens"))
+        span.end()
+    
+    if tool_calls:
+        yield {"type": "tool_calls", "tool_calls": [tool_calls[i] for i in sorted(tool_calls)]}
+    yield {"type": "usage", "usage": usage}
+
+def _post_chat_completion(payload: Dict[str, Any], base_url: str, headers: Dict[str, str]) -> Dict[str, Any]:
+    """POST a chat completion request and return the decoded JSON response."""
+    try:
+        logger.info(f"Calling LLM with {len(payload['messages'])} messages, temp={payload.get('temperature')}, top_p={payload.get('top_p')}")
         
-        # Extract response content and usage stats
-        content = data["choices"][0]["message"]["content"]
-        usage = data.get("usage", {})
+        # Handle base_url that may or may not include /v1
+        endpoint_url = f"{base_url}/chat/completions" if base_url.endswith('/v1') else f"{base_url}/v1/chat/completions"
         
-        logger.info(f"LLM response received: {usage.get('total_tokens', 0)} total tokens")
+        with start_span("llm.chat_completion", kind="client",
+                        attributes={"llm.model": payload.get("model"), "llm.messages": len(payload["messages"])}) as span:
+            response = requests.post(
+                endpoint_url,
+                json=payload,
+                headers=inject(headers),
+                timeout=120  # Increased timeout for longer responses
+            )
+            response.raise_for_status()
+            data = response.json()
+            span.set_attribute("llm.total_tokens", (data.get("usage") or {}).get("total_tokens"))
         
-        return content, usage
+        return data
         
     except requests.exceptions.Timeout:
         logger.error("LLM request timeout")
@@ -93,9 +245,6 @@ def chat(messages: List[Dict[str, str]], temperature: float = 0.6, top_p: float
     except requests.exceptions.HTTPError as e:
         logger.error(f"LLM HTTP error: {e}")
         raise Exception(f"LLM service error: {e}")
-    except KeyError as e:
-        logger.error(f"Unexpected LLM response format: {e}")
-        raise Exception("Unexpected response format from LLM service.")
     except Exception as e:
         logger.error(f"Unexpected error calling LLM: {e}")
         raise Exception(f"LLM service error: {str(e)}")
@@ -7,9 +7,10 @@ from collections import defaultdict, deque
 from fastapi import FastAPI, HTTPException, Depends, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse, Response
 from contextlib import asynccontextmanager
 from starlette.websockets import WebSocketState
+import re
 import json
 import base64
 import audioop
@@ -113,10 +114,21 @@ def get_admin_setting_sync(setting_key, default=None):
             logger.error(f"❌ Sync wrapper failed for '{setting_key}': {e}, using config fallback")
             return get_setting(setting_key, default)
 from app.models import ChatRequest, ChatResponse, MemoryObject
-from app.llm import chat as llm_chat, chat_realtime_stream, _get_llm_config, validate_llm_connection
+from app.llm import chat as llm_chat, chat_with_tools as llm_chat_with_tools, chat_stream as llm_chat_stream, chat_realtime_stream, _get_llm_config, validate_llm_connection
 from app.http_memory import HTTPMemoryStore
 from app.packer import pack_prompt, should_remember, extract_carry_kit_items, detect_safety_triggers
-from app.tools import tool_dispatcher, parse_tool_calls, execute_tool_calls
+from app.tools import tool_dispatcher, parse_tool_calls, parse_openai_tool_calls, execute_tool_calls, execute_tool_calls_async, submit_tool_call
+from app.response_cache import (get_response_cache, is_response_cache_enabled, memory_context_hash,
+                                conversation_hash, has_user_specific_memories)
+from app.call_sessions import get_call_session_store, verify_call_context
+from app.call_log import get_call_log
+from app.realtime_pool import get_realtime_pool, realtime_url_and_headers
+from app.speculative_greeting import claim_speculative_greeting, compose_greeting, get_greeting_audio_cache, MULAW_BYTES_PER_SECOND
+from app import tracing
+from app import metrics
+from app.blocking import get_blocking_detector, is_blocking_diagnostics_enabled
+from app import profiling
+from app.consolidation import get_consolidation_scheduler
 
 # -----------------------------------------------------------------------------
 # Logging
@@ -131,7 +143,8 @@ logger = logging.getLogger(__name__)
 memory_store: Optional[HTTPMemoryStore] = None
 
 # In-process rolling history per thread (survives across calls in same container)
-# 500 msgs ~= ~250 user/assistant turns. Consolidation triggers at 400.
+# 500 msgs ~= ~250 user/assistant turns. Background consolidation triggers at 400
+# (consolidation_threshold_messages, see app/consolidation.py).
 THREAD_HISTORY: Dict[str, Deque[Tuple[str, str]]] = defaultdict(lambda: deque(maxlen=500))
 
 def generate_personality_instructions(sliders: Dict[str, int]) -> str:
@@ -557,143 +570,11 @@ def save_thread_history(thread_id: str, mem_store: HTTPMemoryStore, user_id: Opt
         )
         logger.info(f"✅ Successfully saved {len(messages)} messages to database for thread {thread_id}")
         
-        # ✅ Check if consolidation is needed (at 400/500 messages)
-        if len(messages) >= 400:
-            try:
-                consolidate_thread_memories(thread_id, mem_store, user_id)
-            except Exception as e:
-                logger.error(f"Memory consolidation failed: {e}")
+        # ✅ Queue consolidation once the thread is long enough (runs in the background)
+        get_consolidation_scheduler().note_messages(thread_id, THREAD_HISTORY, mem_store, user_id)
     except Exception as e:
         logger.error(f"❌ Failed to save thread history for {thread_id}: {e}", exc_info=True)
 
-def consolidate_thread_memories(thread_id: str, mem_store: HTTPMemoryStore, user_id: Optional[str] = None):
-    """
-    Extract important information from thread history and save as structured long-term memories.
-    Triggered when THREAD_HISTORY reaches 400 messages to prevent information loss.
-    """
-    import json
-    
-    history = THREAD_HISTORY.get(thread_id)
-    if not history or len(history) < 400:
-        return
-    
-    logger.info(f"🧠 Starting memory consolidation for thread {thread_id} ({len(history)} messages)")
-    
-    # Take the oldest 200 messages (100 turns) for consolidation
-    messages_to_analyze = list(history)[:200]
-    
-    # Build conversation text for LLM analysis
-    conversation_text = "\n".join([
-        f"{role.upper()}: {content[:200]}" 
-        for role, content in messages_to_analyze
-    ])
-    
-    # Ask LLM to extract structured information
-    extraction_prompt = f"""Analyze this conversation and extract important information in JSON format.
-
-Conversation:
-{conversation_text}
-
-Extract:
-1. **people**: Family members, friends (name, relationship)
-2. **facts**: Important dates, events, details (description, value)
-3. **preferences**: Likes, dislikes, interests (category, preference)
-4. **commitments**: Promises, follow-ups, action items (description, deadline)
-
-Return ONLY valid JSON in this format:
-{{
-  "people": [{{"name": "Kelly", "relationship": "wife"}}],
-  "facts": [{{"description": "Kelly's birthday", "value": "January 3rd, 1966"}}],
-  "preferences": [{{"category": "activities", "preference": "spa days"}}],
-  "commitments": [{{"description": "plan birthday celebration", "deadline": "soon"}}]
-}}"""
-    
-    try:
-        # Call LLM for extraction
-        from app.llm import chat as llm_chat
-        extracted_text, _ = llm_chat(
-            [{"role": "user", "content": extraction_prompt}],
-            temperature=0.3,  # Low temperature for structured output
-            max_tokens=1000
-        )
-        
-        # Parse JSON response
-        extracted_data = json.loads(extracted_text.strip())
-        logger.info(f"✅ Extracted data: {len(extracted_data.get('people', []))} people, {len(extracted_data.get('facts', []))} facts")
-        
-        # Store extracted information with de-duplication
-        import time
-        import hashlib
-        
-        def stable_hash(text: str) -> str:
-            """Generate stable deterministic hash for de-duplication"""
-            return hashlib.sha1(text.lower().encode('utf-8')).hexdigest()[:8]
-        
-        timestamp = int(time.time())
-        
-        # Store people
-        for person in extracted_data.get("people", []):
-            if person.get("name"):
-                key = f"person:{thread_id}:{person['name'].lower().replace(' ', '_')}"
-                mem_store.write(
-                    memory_type="person",
-                    key=key,
-                    value={**person, "extracted_at": timestamp, "source": "consolidation"},
-                    user_id=user_id,
-                    scope="user",
-                    ttl_days=365
-                )
-        
-        # Store facts
-        for fact in extracted_data.get("facts", []):
-            if fact.get("description"):
-                key = f"fact:{thread_id}:{stable_hash(fact['description'])}"
-                mem_store.write(
-                    memory_type="fact",
-                    key=key,
-                    value={**fact, "extracted_at": timestamp, "source": "consolidation"},
-                    user_id=user_id,
-                    scope="user",
-                    ttl_days=365
-                )
-        
-        # Store preferences
-        for pref in extracted_data.get("preferences", []):
-            if pref.get("preference"):
-                key = f"preference:{thread_id}:{stable_hash(pref['preference'])}"
-                mem_store.write(
-                    memory_type="preference",
-                    key=key,
-                    value={**pref, "extracted_at": timestamp, "source": "consolidation"},
-                    user_id=user_id,
-                    scope="user",
-                    ttl_days=365
-                )
-        
-        # Store commitments
-        for commit in extracted_data.get("commitments", []):
-            if commit.get("description"):
-                key = f"project:{thread_id}:{stable_hash(commit['description'])}"
-                mem_store.write(
-                    memory_type="project",
-                    key=key,
-                    value={**commit, "extracted_at": timestamp, "source": "consolidation"},
-                    user_id=user_id,
-                    scope="user",
-                    ttl_days=90  # Shorter TTL for action items
-                )
-        
-        # Prune old messages from deque (keep last 300)
-        while len(THREAD_HISTORY[thread_id]) > 300:
-            THREAD_HISTORY[thread_id].popleft()
-        
-        logger.info(f"✅ Memory consolidation complete. Pruned history to {len(THREAD_HISTORY[thread_id])} messages")
-        
-    except json.JSONDecodeError as e:
-        logger.error(f"Failed to parse LLM extraction: {e}")
-    except Exception as e:
-        logger.error(f"Memory consolidation error: {e}")
-
 # ✅ Call Transfer Detection
 def levenshtein_distance(s1: str, s2: str) -> int:
     """Calculate the Levenshtein distance between two strings"""
@@ -714,6 +595,149 @@ def levenshtein_distance(s1: str, s2: str) -> int:
     
     return previous_row[-1]
 
+def match_transfer_rule(transcript: str, rules: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Find the transfer rule a caller utterance asks for.
+    
+    Pure matching (no settings lookup, no Twilio call) so it can be benchmarked
+    and reused; check_and_execute_transfer wraps it.
+    
+    Args:
+        transcript: Caller utterance
+        rules: Transfer rules ({"keyword", "number", "description"})
+    
+    Returns:
+        The first matching rule, or None
+    """
+    transcript_lower = transcript.lower()
+    
+    # Check for explicit transfer intent keywords (talk to, speak with, etc.)
+    # Required for PERSON names to avoid triggering on self-introductions ("I'm John")
+    transfer_triggers = ["transfer", "talk to", "speak with", "speak to", "connect me", "get me", "need to talk", "want to speak"]
+    has_explicit_transfer = any(trigger in transcript_lower for trigger in transfer_triggers)
+    
+    # If no explicit transfer trigger, do quick scan for potential rule matches
+    if not has_explicit_transfer:
+        potential_match = False
+        for rule in rules:
+            keyword = rule.get("keyword", "").lower()
+            if not keyword:
+                continue
+            # Check if any word from the keyword appears in transcript
+            keyword_words = [w for w in keyword.split() if w not in ['a', 'an', 'the', 'to', 'for']]
+            if any(kw in transcript_lower for kw in keyword_words):
+                potential_match = True
+                break
+        
+        if not potential_match:
+            return None
+    
+    logger.info(f"🔍 Transfer intent detected, checking {len(rules)} transfer rules")
+    logger.info(f"📝 Transcript to check: '{transcript}'")
+    logger.info(f"📋 All rules loaded: {json.dumps(rules, indent=2)}")
+    
+    # Check each rule for keyword match (with fuzzy matching for names and phrases)
+    transcript_words = transcript_lower.split()
+    
+    for i, rule in enumerate(rules):
+        keyword = rule.get("keyword", "").lower()
+        number = rule.get("number", "")
+        description = rule.get("description", "")
+        
+        logger.info(f"🔍 Checking rule #{i+1}: keyword='{keyword}', number={number}, desc='{description}'")
+        
+        if not keyword or not number:
+            logger.info(f"⏭️ Skipping rule #{i+1} - missing keyword or number")
+            continue
+        
+        # ✅ Detect if this is a PERSON name (requires explicit transfer intent to avoid self-intro triggers)
+        # Person names are: single words, capitalized in description, or common first names
+        is_person_name = (
+            len(keyword.split()) == 1 and  # Single word
+            (description[0].isupper() if description else False) or  # Capitalized description
+            keyword in ["john", "milissa", "melissa", "colin", "kelly", "jack", "mike", "sarah", "david"]  # Common names
+        )
+        
+        # For person names, REQUIRE explicit transfer intent
+        if is_person_name and not has_explicit_transfer:
+            logger.info(f"  ⏭️ Skipping person name '{keyword}' - requires explicit transfer intent (talk to, speak with, etc.)")
+            continue
+        
+        # 1. Exact substring match
+        if keyword in transcript_lower:
+            logger.info(f"✅ Transfer rule matched (exact): '{keyword}' in transcript -> {number}")
+            return rule
+        
+        # 2. Multi-word phrase matching (e.g., "filing a claim" matches "claims department")
+        keyword_words = keyword.split()
+        if len(keyword_words) > 1:
+            # Check if important words from keyword appear in transcript (with variations)
+            important_words = [w for w in keyword_words if w not in ['a', 'an', 'the', 'to', 'for']]
+            matches = 0
+            matched_words = []
+            for kw in important_words:
+                for tw in transcript_words:
+                    # Check for exact match or verb forms (filing->file, making->make)
+                    if tw == kw or tw == kw.rstrip('ing') or kw == tw.rstrip('ing'):
+                        matches += 1
+                        matched_words.append(f"{kw}~{tw}")
+                        break
+                    # Check plural/singular: claim->claims, claims->claim
+                    if (tw == kw + 's' or tw + 's' == kw or 
+                        tw == kw.rstrip('s') or kw == tw.rstrip('s')):
+                        matches += 1
+                        matched_words.append(f"{kw}~{tw}")
+                        break
+                    # Check fuzzy match for misspellings
+                    if len(kw) > 3 and len(tw) > 3:
+                        distance = levenshtein_distance(kw, tw)
+                        if distance <= 1:
+                            matches += 1
+                            matched_words.append(f"{kw}~{tw}")
+                            break
+            
+            # Strict matching for short phrases: require ALL words for 2-3 word phrases, 75% for longer
+            if len(important_words) <= 3:
+                min_matches = len(important_words)  # Require ALL words for short phrases
+            else:
+                min_matches = int(len(important_words) * 0.75)  # 75% for longer phrases
+            if matches >= min_matches:
+                logger.info(f"✅ Transfer rule matched (phrase): '{keyword}' ({matches}/{len(important_words)} words: {matched_words}) -> {number}")
+                return rule
+            elif matches > 0:
+                logger.info(f"  ⚠️ Partial phrase match: '{keyword}' ({matches}/{len(important_words)} words: {matched_words}, need {min_matches})")
+        
+        # 3. Single-word fuzzy matching (for names like Melissa/Milissa)
+        elif len(keyword_words) == 1:
+            logger.info(f"  💭 Trying fuzzy match for single-word keyword: '{keyword}'")
+            best_match = None
+            best_distance = 999
+            
+            for word in transcript_words:
+                # Only fuzzy match words of similar length (±2 characters)
+                if abs(len(keyword) - len(word)) > 2:
+                    continue
+                    
+                if len(keyword) > 3 and len(word) > 3:
+                    distance = levenshtein_distance(keyword, word)
+                    if distance < best_distance:
+                        best_match = word
+                        best_distance = distance
+                    
+                    # Strict fuzzy matching: only 1 character difference for names
+                    max_distance = 1
+                    if distance <= max_distance:
+                        logger.info(f"✅ Transfer rule matched (fuzzy): '{keyword}' ~ '{word}' (distance={distance}) -> {number}")
+                        return rule
+            
+            if best_match:
+                logger.info(f"  ❌ Best fuzzy match: '{keyword}' ~ '{best_match}' (distance={best_distance}, need ≤1)")
+    
+    logger.info(f"⚠️ Transfer intent detected but NO matching rule found.")
+    logger.info(f"   Transcript: '{transcript}'")
+    logger.info(f"   Checked {len(rules)} rules with no matches")
+    return None
+
 def check_and_execute_transfer(transcript: str, call_sid: str) -> bool:
     """
     Check if transcript contains transfer intent and execute if rules match.
@@ -721,141 +745,15 @@ def check_and_execute_transfer(transcript: str, call_sid: str) -> bool:
     NOTE: This runs in OAIRealtime's websocket thread, so it's safe to use sync wrapper.
     """
     try:
-        transcript_lower = transcript.lower()
-        
         # Load transfer rules from admin settings (using sync wrapper - we're in a separate thread)
         rules_json = get_admin_setting_sync("transfer_rules", "[]")
         rules = json.loads(rules_json) if isinstance(rules_json, str) else rules_json if isinstance(rules_json, list) else []
         
-        # Check for explicit transfer intent keywords (talk to, speak with, etc.)
-        # Required for PERSON names to avoid triggering on self-introductions ("I'm John")
-        transfer_triggers = ["transfer", "talk to", "speak with", "speak to", "connect me", "get me", "need to talk", "want to speak"]
-        has_explicit_transfer = any(trigger in transcript_lower for trigger in transfer_triggers)
-        
-        # If no explicit transfer trigger, do quick scan for potential rule matches
-        if not has_explicit_transfer:
-            potential_match = False
-            for rule in rules:
-                keyword = rule.get("keyword", "").lower()
-                if not keyword:
-                    continue
-                # Check if any word from the keyword appears in transcript
-                keyword_words = [w for w in keyword.split() if w not in ['a', 'an', 'the', 'to', 'for']]
-                if any(kw in transcript_lower for kw in keyword_words):
-                    potential_match = True
-                    break
-            
-            if not potential_match:
-                return False
-        
-        logger.info(f"🔍 Transfer intent detected, checking {len(rules)} transfer rules")
-        logger.info(f"📝 Transcript to check: '{transcript}'")
-        logger.info(f"📋 All rules loaded: {json.dumps(rules, indent=2)}")
-        
-        # Check each rule for keyword match (with fuzzy matching for names and phrases)
-        transcript_words = transcript_lower.split()
-        
-        for i, rule in enumerate(rules):
-            keyword = rule.get("keyword", "").lower()
-            number = rule.get("number", "")
-            description = rule.get("description", "")
-            
-            logger.info(f"🔍 Checking rule #{i+1}: keyword='{keyword}', number={number}, desc='{description}'")
-            
-            if not keyword or not number:
-                logger.info(f"⏭️ Skipping rule #{i+1} - missing keyword or number")
-                continue
-            
-            # ✅ Detect if this is a PERSON name (requires explicit transfer intent to avoid self-intro triggers)
-            # Person names are: single words, capitalized in description, or common first names
-            is_person_name = (
-                len(keyword.split()) == 1 and  # Single word
-                (description[0].isupper() if description else False) or  # Capitalized description
-                keyword in ["john", "milissa", "melissa", "colin", "kelly", "jack", "mike", "sarah", "david"]  # Common names
-            )
-            
-            # For person names, REQUIRE explicit transfer intent
-            if is_person_name and not has_explicit_transfer:
-                logger.info(f"  ⏭️ Skipping person name '{keyword}' - requires explicit transfer intent (talk to, speak with, etc.)")
-                continue
-            
-            # 1. Exact substring match
-            if keyword in transcript_lower:
-                logger.info(f"✅ Transfer rule matched (exact): '{keyword}' in transcript -> {number}")
-                execute_twilio_transfer(call_sid, number, keyword)
-                return True
-            
-            # 2. Multi-word phrase matching (e.g., "filing a claim" matches "claims department")
-            keyword_words = keyword.split()
-            if len(keyword_words) > 1:
-                # Check if important words from keyword appear in transcript (with variations)
-                important_words = [w for w in keyword_words if w not in ['a', 'an', 'the', 'to', 'for']]
-                matches = 0
-                matched_words = []
-                for kw in important_words:
-                    for tw in transcript_words:
-                        # Check for exact match or verb forms (filing->file, making->make)
-                        if tw == kw or tw == kw.rstrip('ing') or kw == tw.rstrip('ing'):
-                            matches += 1
-                            matched_words.append(f"{kw}~{tw}")
-                            break
-                        # Check plural/singular: claim->claims, claims->claim
-                        if (tw == kw + 's' or tw + 's' == kw or 
-                            tw == kw.rstrip('s') or kw == tw.rstrip('s')):
-                            matches += 1
-                            matched_words.append(f"{kw}~{tw}")
-                            break
-                        # Check fuzzy match for misspellings
-                        if len(kw) > 3 and len(tw) > 3:
-                            distance = levenshtein_distance(kw, tw)
-                            if distance <= 1:
-                                matches += 1
-                                matched_words.append(f"{kw}~{tw}")
-                                break
-                
-                # Strict matching for short phrases: require ALL words for 2-3 word phrases, 75% for longer
-                if len(important_words) <= 3:
-                    min_matches = len(important_words)  # Require ALL words for short phrases
-                else:
-                    min_matches = int(len(important_words) * 0.75)  # 75% for longer phrases
-                if matches >= min_matches:
-                    logger.info(f"✅ Transfer rule matched (phrase): '{keyword}' ({matches}/{len(important_words)} words: {matched_words}) -> {number}")
-                    execute_twilio_transfer(call_sid, number, keyword)
-                    return True
-                elif matches > 0:
-                    logger.info(f"  ⚠️ Partial phrase match: '{keyword}' ({matches}/{len(important_words)} words: {matched_words}, need {min_matches})")
-            
-            # 3. Single-word fuzzy matching (for names like Melissa/Milissa)
-            elif len(keyword_words) == 1:
-                logger.info(f"  💭 Trying fuzzy match for single-word keyword: '{keyword}'")
-                best_match = None
-                best_distance = 999
-                
-                for word in transcript_words:
-                    # Only fuzzy match words of similar length (±2 characters)
-                    if abs(len(keyword) - len(word)) > 2:
-                        continue
-                        
-                    if len(keyword) > 3 and len(word) > 3:
-                        distance = levenshtein_distance(keyword, word)
-                        if distance < best_distance:
-                            best_match = word
-                            best_distance = distance
-                        
-                        # Strict fuzzy matching: only 1 character difference for names
-                        max_distance = 1
-                        if distance <= max_distance:
-                            logger.info(f"✅ Transfer rule matched (fuzzy): '{keyword}' ~ '{word}' (distance={distance}) -> {number}")
-                            execute_twilio_transfer(call_sid, number, keyword)
-                            return True
-                
-                if best_match:
-                    logger.info(f"  ❌ Best fuzzy match: '{keyword}' ~ '{best_match}' (distance={best_distance}, need ≤1)")
-        
-        logger.info(f"⚠️ Transfer intent detected but NO matching rule found.")
-        logger.info(f"   Transcript: '{transcript}'")
-        logger.info(f"   Checked {len(rules)} rules with no matches")
-        return False
+        rule = match_transfer_rule(transcript, rules)
+        if not rule:
+            return False
+        execute_twilio_transfer(call_sid, rule.get("number", ""), rule.get("keyword", "").lower())
+        return True
         
     except Exception as e:
         logger.error(f"❌ Transfer check failed: {e}")
@@ -905,6 +803,12 @@ DISCOURAGE_GUESSING = True    # add a system rail when no memories are retrieved
 async def lifespan(app: FastAPI):
     global memory_store
     logger.info("Starting NeuroSphere Orchestrator...")
+    if get_secret("OPENAI_API_KEY"):
+        get_realtime_pool().start()
+    loop_lag_task = asyncio.create_task(metrics.monitor_event_loop_lag())
+    if is_blocking_diagnostics_enabled():
+        get_blocking_detector().register_routes(app.routes)
+        get_blocking_detector().start()
     try:
         memory_store = HTTPMemoryStore()
         if memory_store.available:
@@ -926,6 +830,10 @@ async def lifespan(app: FastAPI):
         logger.info("Starting app in degraded mode...")
     finally:
         logger.info("Shutting down NeuroSphere Orchestrator...")
+        loop_lag_task.cancel()
+        get_blocking_detector().stop()
+        get_consolidation_scheduler().stop()
+        get_realtime_pool().stop()
         try:
             if memory_store:
                 memory_store.close()
@@ -954,6 +862,60 @@ app = FastAPI(
 
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
+tracing.configure("chatstack-orchestrator")
+
+metrics.register_cache("response", lambda: get_response_cache().stats())
+metrics.register_cache("realtime_pool", lambda: get_realtime_pool().stats())
+metrics.register_cache("greeting_audio", lambda: get_greeting_audio_cache().stats())
+metrics.register_collectors(realtime_pool_stats=lambda: get_realtime_pool().stats())
+
+_UNMETERED_PATHS = ("/metrics", "/static")
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Request latency per route template (never the raw path - ids would explode the label set)"""
+    if request.url.path.startswith(_UNMETERED_PATHS):
+        return await call_next(request)
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        metrics.HTTP_REQUEST_SECONDS.labels(
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=str(status)
+        ).observe(time.perf_counter() - started)
+
+_UNTRACED_PATHS = ("/health", "/static", "/v1/traces")
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """Server span per request, joined to the caller's trace via the traceparent header"""
+    if request.url.path.startswith(_UNTRACED_PATHS):
+        return await call_next(request)
+    span = tracing.begin_span(
+        f"{request.method} {request.url.path}",
+        parent=request.headers.get(tracing.TRACEPARENT_HEADER),
+        kind="server",
+        attributes={"user_id": request.query_params.get("user_id")}
+    )
+    token = tracing.activate(span)
+    try:
+        response = await call_next(request)
+        span.set_attribute("http.status_code", response.status_code)
+        response.headers["Server-Timing"] = f"app;dur={(time.time_ns() - span.start_ns) / 1e6:.1f}"
+        return response
+    except Exception as e:
+        span.error = str(e)
+        raise
+    finally:
+        tracing.deactivate(token)
+        span.end()
+
 def get_memory_store() -> HTTPMemoryStore:
     if memory_store is None:
         raise HTTPException(status_code=503, detail="Memory store not initialized - service degraded")
@@ -1015,142 +977,315 @@ async def health_check(mem_store: HTTPMemoryStore = Depends(get_memory_store)):
 # -----------------------------------------------------------------------------
 # Chat with persistent thread history + optional recap
 # -----------------------------------------------------------------------------
-@app.post("/v1/chat", response_model=ChatResponse)
-async def chat_completion(
-    request: ChatRequest,
-    thread_id: str = "default",
-    user_id: Optional[str] = None,
-    mem_store: HTTPMemoryStore = Depends(get_memory_store),
-):
-    """
-    Main chat completion endpoint with rolling thread history, durable recap,
-    long-term memory retrieval, and tool calling.
-    """
+def _response_cache_tenant(thread_id: Optional[str]) -> str:
+    """Tenant namespace for the response cache (customer_<id> thread prefix, else default)."""
+    match = re.match(r"customer_(\d+)", thread_id or "")
+    return f"customer_{match.group(1)}" if match else "default"
+
+def _record_cached_turn(thread_id: str, user_message: str, assistant_output: str,
+                        mem_store: HTTPMemoryStore, user_id: Optional[str]):
+    """Append a cache-served turn to thread history (runs off the request path)."""
     try:
-        logger.info(f"Chat request: {len(request.messages)} messages, thread={thread_id}")
-
-        if not request.messages:
-            raise HTTPException(status_code=400, detail="No messages provided")
-
-        # Latest user message
-        user_message = None
-        for msg in reversed(request.messages):
-            if msg.role == "user":
-                user_message = msg.content
-                break
-        if not user_message:
-            raise HTTPException(status_code=400, detail="No user message found")
-
-        # Safety rails
-        safety_mode = request.safety_mode or detect_safety_triggers(user_message)
-        if safety_mode:
-            logger.info("🛡️ Safety mode activated")
-
-        # Opportunistic carry-kit write
-        if should_remember(user_message):
-            for item in extract_carry_kit_items(user_message):
-                try:
-                    memory_id = mem_store.write(
-                        item["type"], item["key"], item["value"],
-                        user_id=user_id, scope="user", ttl_days=item.get("ttl_days", 365)
-                    )
-                    logger.info(f"🧠 Stored carry-kit for user {user_id}: {item['type']}:{item['key']} -> {memory_id}")
-                except Exception as e:
-                    logger.error(f"Carry-kit write failed: {e}")
+        load_thread_history(thread_id, mem_store, user_id)
+        THREAD_HISTORY[thread_id].append(("user", user_message))
+        THREAD_HISTORY[thread_id].append(("assistant", assistant_output))
+        save_thread_history(thread_id, mem_store, user_id)
+    except Exception as e:
+        logger.warning(f"Cached turn history append failed: {e}")
 
-        # ✅ CRITICAL FIX: First, explicitly fetch the manually saved normalized schema
-        # Semantic search won't find it, so we need a direct lookup
-        manual_schema_memory = None
-        if user_id:
+def _prepare_chat_turn(request: ChatRequest, thread_id: str, user_id: Optional[str],
+                       mem_store: HTTPMemoryStore) -> Dict[str, Any]:
+    """
+    Everything before the LLM call: carry-kit write, memory retrieval,
+    thread history, response-cache lookup and prompt packing.
+    
+    Returns:
+        Turn context dict. On a response-cache hit "cached" holds the cached
+        entry and "final_messages" is None (no LLM call needed).
+    """
+    turn_start = time.time()
+    logger.info(f"Chat request: {len(request.messages)} messages, thread={thread_id}")
+
+    if not request.messages:
+        raise HTTPException(status_code=400, detail="No messages provided")
+
+    # Latest user message
+    user_message = None
+    for msg in reversed(request.messages):
+        if msg.role == "user":
+            user_message = msg.content
+            break
+    if not user_message:
+        raise HTTPException(status_code=400, detail="No user message found")
+
+    # Safety rails
+    safety_mode = request.safety_mode or detect_safety_triggers(user_message)
+    if safety_mode:
+        logger.info("🛡️ Safety mode activated")
+
+    # Opportunistic carry-kit write
+    if should_remember(user_message):
+        for item in extract_carry_kit_items(user_message):
             try:
-                # Get all memories for this user to find the manual schema
-                all_user_memories = mem_store.search("", user_id=user_id, k=50, include_shared=False)
-                
-                # Find the most recent manually saved schema
-                manual_schemas = [m for m in all_user_memories 
-                                 if m.get("type") == "normalized_schema" and m.get("key") == "user_profile"]
-                
-                if manual_schemas:
-                    manual_schema_memory = manual_schemas[-1]  # Most recent
-                    logger.info(f"✅ Found manually saved schema for user {user_id}")
+                memory_id = mem_store.write(
+                    item["type"], item["key"], item["value"],
+                    user_id=user_id, scope="user", ttl_days=item.get("ttl_days", 365)
+                )
+                logger.info(f"🧠 Stored carry-kit for user {user_id}: {item['type']}:{item['key']} -> {memory_id}")
             except Exception as e:
-                logger.error(f"Failed to fetch manual schema: {e}")
-        
-        # Long-term memory retrieve (user-specific + shared)
-        search_k = 15 if any(w in (user_message.lower()) for w in
-                             ["wife","husband","family","friend","name","who is","kelly","job","work","teacher"]) else 6
-        retrieved_memories = mem_store.search(user_message, user_id=user_id, k=search_k)
-        
-        # ✅ CRITICAL: Prepend manual schema so normalize_memories() sees it first
-        if manual_schema_memory:
-            retrieved_memories = [manual_schema_memory] + retrieved_memories
-            logger.info(f"✅ Injected manual schema into memory bundle")
-        
-        logger.info(f"🔎 Retrieved {len(retrieved_memories)} relevant memories (including manual schema if exists)")
-        
-        # 🔍 DEBUG: Log what memories were actually retrieved
-        if retrieved_memories:
-            logger.info(f"🔍 DEBUG: Top 5 memories retrieved:")
-            for i, mem in enumerate(retrieved_memories[:5]):
-                mem_key = mem.get('key', 'no-key')
-                mem_type = mem.get('type', 'no-type')
-                mem_value_preview = str(mem.get('value', {}))[:100]
-                logger.info(f"  [{i+1}] {mem_type}:{mem_key} = {mem_value_preview}")
+                logger.error(f"Carry-kit write failed: {e}")
 
-        # Build current request messages
-        message_dicts = [{"role": m.role, "content": m.content} for m in request.messages]
+    # ✅ CRITICAL FIX: First, explicitly fetch the manually saved normalized schema
+    # Semantic search won't find it, so we need a direct lookup
+    manual_schema_memory = None
+    if user_id:
+        try:
+            # Get all memories for this user to find the manual schema
+            all_user_memories = mem_store.search("", user_id=user_id, k=50, include_shared=False)
+            
+            # Find the most recent manually saved schema
+            manual_schemas = [m for m in all_user_memories 
+                             if m.get("type") == "normalized_schema" and m.get("key") == "user_profile"]
+            
+            if manual_schemas:
+                manual_schema_memory = manual_schemas[-1]  # Most recent
+                logger.info(f"✅ Found manually saved schema for user {user_id}")
+        except Exception as e:
+            logger.error(f"Failed to fetch manual schema: {e}")
+    
+    # Long-term memory retrieve (user-specific + shared)
+    # Hybrid (lexical + vector) ranking in AI-Memory keeps k small
+    retrieved_memories = mem_store.search(user_message, user_id=user_id, k=6)
+    
+    # ✅ CRITICAL: Prepend manual schema so normalize_memories() sees it first
+    if manual_schema_memory:
+        retrieved_memories = [manual_schema_memory] + retrieved_memories
+        logger.info(f"✅ Injected manual schema into memory bundle")
+    
+    logger.info(f"🔎 Retrieved {len(retrieved_memories)} relevant memories (including manual schema if exists)")
+    
+    # 🔍 DEBUG: Log what memories were actually retrieved
+    if retrieved_memories:
+        logger.info(f"🔍 DEBUG: Top 5 memories retrieved:")
+        for i, mem in enumerate(retrieved_memories[:5]):
+            mem_key = mem.get('key', 'no-key')
+            mem_type = mem.get('type', 'no-type')
+            mem_value_preview = str(mem.get('value', {}))[:100]
+            logger.info(f"  [{i+1}] {mem_type}:{mem_key} = {mem_value_preview}")
+
+    # Build current request messages
+    message_dicts = [{"role": m.role, "content": m.content} for m in request.messages]
+
+    # ✅ Load thread history from database if not already loaded
+    if thread_id:
+        load_thread_history(thread_id, mem_store, user_id)
+
+    # Prepend rolling thread history (persistent across container restarts)
+    if thread_id and THREAD_HISTORY.get(thread_id):
+        hist = [{"role": r, "content": c} for (r, c) in THREAD_HISTORY[thread_id]]
+        # Take last ~100 messages to preserve more context (50 user/AI turns)
+        hist = hist[-100:]
+        message_dicts = hist + message_dicts
+        logger.info(f"🧵 Prepended {len(hist)} messages from THREAD_HISTORY[{thread_id}]")
+    else:
+        logger.info(f"🧵 No history found for thread_id={thread_id}")
+
+    turn = {
+        "turn_start": turn_start,
+        "user_message": user_message,
+        "retrieved_memories": retrieved_memories,
+        "response_cache": None,
+        "cache_tenant": _response_cache_tenant(thread_id),
+        "cache_context_hash": None,
+        "cached": None,
+        "final_messages": None,
+    }
 
-        # ✅ Load thread history from database if not already loaded
-        if thread_id:
-            load_thread_history(thread_id, mem_store, user_id)
-
-        # Prepend rolling thread history (persistent across container restarts)
-        if thread_id and THREAD_HISTORY.get(thread_id):
-            hist = [{"role": r, "content": c} for (r, c) in THREAD_HISTORY[thread_id]]
-            # Take last ~100 messages to preserve more context (50 user/AI turns)
-            hist = hist[-100:]
-            message_dicts = hist + message_dicts
-            logger.info(f"🧵 Prepended {len(hist)} messages from THREAD_HISTORY[{thread_id}]")
+    # Semantic response cache (opt-in): replay answers to repeated FAQ turns
+    if is_response_cache_enabled():
+        response_cache = get_response_cache()
+        turn["response_cache"] = response_cache
+        if has_user_specific_memories(retrieved_memories):
+            response_cache.record_bypass()
+            logger.info("🗄️ Response cache bypassed (user-specific memories in context)")
         else:
-            logger.info(f"🧵 No history found for thread_id={thread_id}")
+            # Same question after a different exchange is a different question
+            last_user_index = max(i for i, m in enumerate(message_dicts) if m["role"] == "user")
+            context = conversation_hash(message_dicts[:last_user_index])
+            turn["cache_context_hash"] = memory_context_hash(retrieved_memories,
+                                                             extra=f"safety={safety_mode}|conversation={context}")
+            cached = response_cache.lookup(turn["cache_tenant"], user_message, turn["cache_context_hash"])
+            if cached:
+                logger.info(f"🗄️ Response cache HIT for {turn['cache_tenant']} (similarity={cached['similarity']:.3f}) "
+                            f"in {(time.time() - turn_start) * 1000:.0f}ms, saved ~{cached['latency_ms']:.0f}ms")
+                turn["cached"] = cached
+                return turn
+
+    # Optional durable recap from AI-Memory (1 paragraph)
+    if ENABLE_RECAP and thread_id and user_id:
+        try:
+            rec = mem_store.search(f"thread:{thread_id}:recap", user_id=user_id, k=1)
+            if rec:
+                v = rec[0].get("value") or {}
+                summary = v.get("summary")
+                if summary:
+                    message_dicts = [{"role":"system","content":f"Conversation recap:\n{summary}"}] + message_dicts
+        except Exception as e:
+            logger.warning(f"Recap load failed: {e}")
 
-        # Optional durable recap from AI-Memory (1 paragraph)
-        if ENABLE_RECAP and thread_id and user_id:
-            try:
-                rec = mem_store.search(f"thread:{thread_id}:recap", user_id=user_id, k=1)
-                if rec:
-                    v = rec[0].get("value") or {}
-                    summary = v.get("summary")
-                    if summary:
-                        message_dicts = [{"role":"system","content":f"Conversation recap:\n{summary}"}] + message_dicts
-            except Exception as e:
-                logger.warning(f"Recap load failed: {e}")
-
-        # Add anti-guessing rail when we have no retrieved memories
-        if DISCOURAGE_GUESSING and not retrieved_memories:
-            message_dicts = [{"role":"system","content":
-                "If you are not given a fact in retrieved memories or the current messages, say you don't know rather than guessing."}] + message_dicts
-        
-        # 🔍 DEBUG: Log complete message list being sent to LLM
-        logger.info(f"🔍 DEBUG: Sending {len(message_dicts)} total messages to LLM:")
-        for i, msg in enumerate(message_dicts[-10:]):  # Last 10 messages
-            role = msg.get('role', 'unknown')
-            content_preview = msg.get('content', '')[:80]
-            logger.info(f"  [{i}] {role}: {content_preview}")
-
-        # Final pack with system context + retrieved memories
-        final_messages = pack_prompt(
+    # Add anti-guessing rail when we have no retrieved memories
+    if DISCOURAGE_GUESSING and not retrieved_memories:
+        message_dicts = [{"role":"system","content":
+            "If you are not given a fact in retrieved memories or the current messages, say you don't know rather than guessing."}] + message_dicts
+    
+    # 🔍 DEBUG: Log complete message list being sent to LLM
+    logger.info(f"🔍 DEBUG: Sending {len(message_dicts)} total messages to LLM:")
+    for i, msg in enumerate(message_dicts[-10:]):  # Last 10 messages
+        role = msg.get('role', 'unknown')
+        content_preview = msg.get('content', '')[:80]
+        logger.info(f"  [{i}] {role}: {content_preview}")
+
+    # Final pack with system context + retrieved memories
+    with tracing.start_span("prompt.pack", attributes={"messages": len(message_dicts), "memories": len(retrieved_memories)}):
+        turn["final_messages"] = pack_prompt(
             message_dicts,
             retrieved_memories,
             safety_mode=safety_mode,
             thread_id=thread_id
         )
+    return turn
+
+def _used_memory_ids(retrieved_memories: List[Dict[str, Any]]) -> List[str]:
+    return [str(mem.get("id")) for mem in retrieved_memories if isinstance(mem, dict) and mem.get("id")]
+
+def _tool_followup_messages(final_messages: List[Dict[str, Any]], assistant_output: str,
+                            raw_tool_calls: List[Dict[str, Any]], native_tool_calls: List[Dict[str, Any]],
+                            tool_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Messages that hand tool outputs back to the model so it can phrase the answer."""
+    return final_messages + [{
+        "role": "assistant",
+        "content": assistant_output or None,
+        "tool_calls": raw_tool_calls
+    }] + [{
+        "role": "tool",
+        "tool_call_id": call["id"],
+        "content": json.dumps(result, default=str)
+    } for call, result in zip(native_tool_calls, tool_results)]
+
+def _append_tool_summaries(assistant_output: str, tool_results: List[Dict[str, Any]]) -> str:
+    """Fallback when there is no tool follow-up: append raw tool results to the answer."""
+    summaries = [r["result"] if r["success"] else f"Tool error: {r['error']}" for r in tool_results]
+    if summaries:
+        assistant_output = (assistant_output + "\n\n" if assistant_output else "") + "\n".join(summaries)
+    return assistant_output
+
+def _finish_chat_turn(turn: Dict[str, Any], assistant_output: str, tool_calls: List[Dict[str, Any]],
+                      thread_id: str, user_id: Optional[str], mem_store: HTTPMemoryStore):
+    """
+    Everything after the answer is known: response-cache store, thread
+    history, durable recap and conversation moment.
+    """
+    user_message = turn["user_message"]
+
+    # Cache the computed answer (TTL capped by the cache_ttl of any tool it used)
+    response_cache = turn["response_cache"]
+    if response_cache and turn["cache_context_hash"] and assistant_output:
+        cache_ttl = None
+        if tool_calls:
+            cache_ttl = min(tool_dispatcher.get_policy(call["name"])["cache_ttl"] for call in tool_calls)
+        response_cache.store(
+            turn["cache_tenant"], user_message, turn["cache_context_hash"],
+            {
+                "output": assistant_output,
+                "used_memories": _used_memory_ids(turn["retrieved_memories"]),
+            },
+            latency_ms=(time.time() - turn["turn_start"]) * 1000,
+            ttl_seconds=cache_ttl
+        )
+
+    # Rolling in-process history append
+    try:
+        if thread_id:
+            THREAD_HISTORY[thread_id].append(("user", user_message))
+            logger.info(f"🧵 Appended USER message to THREAD_HISTORY[{thread_id}]: {user_message[:50]}")
+            THREAD_HISTORY[thread_id].append(("assistant", assistant_output))
+            logger.info(f"🧵 Appended ASSISTANT message to THREAD_HISTORY[{thread_id}]: {assistant_output[:50]}")
+            logger.info(f"🧵 Total messages in THREAD_HISTORY[{thread_id}]: {len(THREAD_HISTORY[thread_id])}")
+            
+            # ✅ Save thread history to database for persistence across restarts
+            save_thread_history(thread_id, mem_store, user_id)
+    except Exception as e:
+        logger.warning(f"THREAD_HISTORY append failed: {e}")
+
+    # Opportunistic durable recap write (tiny)
+    if ENABLE_RECAP and thread_id and user_id:
+        try:
+            recap = f"{user_message[:300]} || {assistant_output[:400]}"
+            mem_store.write(
+                "thread_recap",
+                key=f"thread:{thread_id}:recap",
+                value={"summary": recap, "updated_at": time.time()},
+                user_id=user_id,
+                scope="user",
+                source="recap"
+            )
+        except Exception as e:
+            logger.warning(f"Recap write failed: {e}")
+
+    # Store important info as short-lived "moment"
+    if should_store_memory(assistant_output, "moment"):
+        try:
+            mem_store.write(
+                "moment",
+                f"conversation_{hash(user_message) % 100000}",
+                {
+                    "user_message": user_message[:500],
+                    "assistant_response": assistant_output[:500],
+                    "summary": f"Conversation about: {user_message[:100]}..."
+                },
+                user_id=user_id,
+                scope="user",
+                ttl_days=90
+            )
+        except Exception as e:
+            logger.error(f"Failed to store conversation moment: {e}")
+
+@app.post("/v1/chat", response_model=ChatResponse)
+async def chat_completion(
+    request: ChatRequest,
+    thread_id: str = "default",
+    user_id: Optional[str] = None,
+    mem_store: HTTPMemoryStore = Depends(get_memory_store),
+):
+    """
+    Main chat completion endpoint with rolling thread history, durable recap,
+    long-term memory retrieval, and tool calling.
+    """
+    try:
+        with tracing.start_span("chat.prepare_turn"):
+            turn = _prepare_chat_turn(request, thread_id, user_id, mem_store)
+        retrieved_memories = turn["retrieved_memories"]
+        final_messages = turn["final_messages"]
+
+        cached = turn["cached"]
+        if cached:
+            assistant_output = cached["response"]["output"]
+            if thread_id:
+                asyncio.get_running_loop().run_in_executor(
+                    None, _record_cached_turn, thread_id, turn["user_message"], assistant_output, mem_store, user_id
+                )
+            return ChatResponse(
+                output=assistant_output,
+                used_memories=cached["response"].get("used_memories", []),
+                memory_count=len(retrieved_memories),
+            )
 
         # Select path based on model
         logger.info("Calling LLM...")
         config = _get_llm_config()
         logger.info(f"🟢 Model in config: {config['model']}")
 
+        native_tool_calls = []
         if "realtime" in config["model"].lower():
             logger.info("🚀 Using realtime LLM")
             tokens = []
@@ -1169,82 +1304,46 @@ async def chat_completion(
             usage_stats["total_tokens"] = usage_stats["prompt_tokens"] + usage_stats["completion_tokens"]
         else:
             logger.info("🧠 Using standard chat LLM")
-            assistant_output, usage_stats = llm_chat(
+            assistant_output, raw_tool_calls, usage_stats = llm_chat_with_tools(
                 final_messages,
+                tools=tool_dispatcher.get_openai_tools("chat"),
                 temperature=request.temperature,
                 top_p=request.top_p,
                 max_tokens=request.max_tokens
             )
+            native_tool_calls = parse_openai_tool_calls(raw_tool_calls)
 
-        # Tool calling (if present)
+        # Tool calling (if present) - independent calls run concurrently
         tool_results = []
-        tool_calls = parse_tool_calls(assistant_output)
+        tool_calls = native_tool_calls or parse_tool_calls(assistant_output)
         if tool_calls:
-            logger.info(f"🛠️ Executing {len(tool_calls)} tool calls")
-            tool_results = execute_tool_calls(tool_calls)
-            if tool_results:
-                summaries = []
-                for r in tool_results:
-                    summaries.append(r["result"] if r["success"] else f"Tool error: {r['error']}")
-                if summaries:
-                    assistant_output += "\n\n" + "\n".join(summaries)
-
-        # Rolling in-process history append
-        try:
-            if thread_id:
-                last_user = next((m for m in reversed(request.messages) if m.role == "user"), None)
-                if last_user:
-                    THREAD_HISTORY[thread_id].append(("user", last_user.content))
-                    logger.info(f"🧵 Appended USER message to THREAD_HISTORY[{thread_id}]: {last_user.content[:50]}")
-                THREAD_HISTORY[thread_id].append(("assistant", assistant_output))
-                logger.info(f"🧵 Appended ASSISTANT message to THREAD_HISTORY[{thread_id}]: {assistant_output[:50]}")
-                logger.info(f"🧵 Total messages in THREAD_HISTORY[{thread_id}]: {len(THREAD_HISTORY[thread_id])}")
-                
-                # ✅ Save thread history to database for persistence across restarts
-                save_thread_history(thread_id, mem_store, user_id)
-        except Exception as e:
-            logger.warning(f"THREAD_HISTORY append failed: {e}")
+            logger.info(f"🛠️ Executing {len(tool_calls)} tool calls concurrently")
+            tool_results = await execute_tool_calls_async(tool_calls)
+            answered = False
+            if native_tool_calls:
+                # Hand tool outputs back to the model so it can phrase the answer
+                try:
+                    assistant_output, followup_usage = llm_chat(
+                        _tool_followup_messages(final_messages, assistant_output, raw_tool_calls,
+                                                native_tool_calls, tool_results),
+                        temperature=request.temperature,
+                        top_p=request.top_p,
+                        max_tokens=request.max_tokens
+                    )
+                    for k in ("prompt_tokens", "completion_tokens", "total_tokens"):
+                        usage_stats[k] = usage_stats.get(k, 0) + followup_usage.get(k, 0)
+                    answered = True
+                except Exception as e:
+                    logger.warning(f"⚠️ Tool follow-up LLM call failed, appending raw tool results: {e}")
+            if not answered and tool_results:
+                assistant_output = _append_tool_summaries(assistant_output, tool_results)
 
-        # Opportunistic durable recap write (tiny)
-        if ENABLE_RECAP and thread_id and user_id:
-            try:
-                last_user = next((m for m in reversed(request.messages) if m.role == "user"), None)
-                snippet_user = (last_user.content if last_user else "")[:300]
-                snippet_assistant = assistant_output[:400]
-                recap = f"{snippet_user} || {snippet_assistant}"
-                mem_store.write(
-                    "thread_recap",
-                    key=f"thread:{thread_id}:recap",
-                    value={"summary": recap, "updated_at": time.time()},
-                    user_id=user_id,
-                    scope="user",
-                    source="recap"
-                )
-            except Exception as e:
-                logger.warning(f"Recap write failed: {e}")
-
-        # Store important info as short-lived "moment"
-        if should_store_memory(assistant_output, "moment"):
-            try:
-                mem_store.write(
-                    "moment",
-                    f"conversation_{hash(user_message) % 100000}",
-                    {
-                        "user_message": user_message[:500],
-                        "assistant_response": assistant_output[:500],
-                        "summary": f"Conversation about: {user_message[:100]}..."
-                    },
-                    user_id=user_id,
-                    scope="user",
-                    ttl_days=90
-                )
-            except Exception as e:
-                logger.error(f"Failed to store conversation moment: {e}")
+        _finish_chat_turn(turn, assistant_output, tool_calls, thread_id, user_id, mem_store)
 
         # Response
         response = ChatResponse(
             output=assistant_output,
-            used_memories=[str(mem.get("id")) for mem in retrieved_memories if isinstance(mem, dict) and mem.get("id")],
+            used_memories=_used_memory_ids(retrieved_memories),
             prompt_tokens=usage_stats.get("prompt_tokens", 0),
             completion_tokens=usage_stats.get("completion_tokens", 0),
             total_tokens=usage_stats.get("total_tokens", 0),
@@ -1259,6 +1358,111 @@ async def chat_completion(
         logger.error(f"Chat completion failed: {e}")
         raise HTTPException(status_code=500, detail=f"Chat completion failed: {str(e)}")
 
+@app.post("/v1/chat/stream")
+async def chat_completion_stream(
+    request: ChatRequest,
+    thread_id: str = "default",
+    user_id: Optional[str] = None,
+    mem_store: HTTPMemoryStore = Depends(get_memory_store),
+):
+    """
+    Same turn as /v1/chat, but the answer is streamed as plain-text deltas
+    while the model generates it, so the phone flow can start speaking the
+    first sentence before the last one is written. History, recap and
+    response-cache bookkeeping run after the last delta is sent.
+    """
+    try:
+        with tracing.start_span("chat.prepare_turn"):
+            turn = _prepare_chat_turn(request, thread_id, user_id, mem_store)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Chat stream setup failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Chat stream failed: {str(e)}")
+
+    def generate():
+        # Sync generator: Starlette iterates it in a worker thread, so blocking I/O is fine here
+        if turn["cached"]:
+            assistant_output = turn["cached"]["response"]["output"]
+            yield assistant_output
+            if thread_id:
+                _record_cached_turn(thread_id, turn["user_message"], assistant_output, mem_store, user_id)
+            return
+
+        final_messages = turn["final_messages"]
+        stream_start = time.time()
+        first_delta_at = None
+        parts: List[str] = []
+        raw_tool_calls: List[Dict[str, Any]] = []
+        try:
+            if "realtime" in _get_llm_config()["model"].lower():
+                deltas = ({"type": "text", "delta": token} for token in chat_realtime_stream(
+                    final_messages,
+                    temperature=request.temperature or 0.7,
+                    max_tokens=request.max_tokens or 800
+                ))
+            else:
+                deltas = llm_chat_stream(
+                    final_messages,
+                    temperature=request.temperature,
+                    top_p=request.top_p,
+                    max_tokens=request.max_tokens,
+                    tools=tool_dispatcher.get_openai_tools("chat")
+                )
+            for event in deltas:
+                if event["type"] == "text":
+                    if first_delta_at is None:
+                        first_delta_at = time.time()
+                        logger.info(f"⏱️ LLM first token in {first_delta_at - stream_start:.3f}s "
+                                    f"(turn {first_delta_at - turn['turn_start']:.3f}s)")
+                    parts.append(event["delta"])
+                    yield event["delta"]
+                elif event["type"] == "tool_calls":
+                    raw_tool_calls = event["tool_calls"]
+        except Exception as e:
+            logger.error(f"Streaming LLM call failed: {e}")
+            if not parts:
+                parts.append("I'm sorry, I'm having trouble answering right now.")
+                yield parts[-1]
+        assistant_output = "".join(parts).strip()
+
+        # Tool calls only surface at the end of the stream; run them and stream the follow-up
+        native_tool_calls = parse_openai_tool_calls(raw_tool_calls)
+        tool_calls = native_tool_calls or parse_tool_calls(assistant_output)
+        if tool_calls:
+            logger.info(f"🛠️ Executing {len(tool_calls)} tool calls concurrently")
+            tool_results = execute_tool_calls(tool_calls)
+            answered = False
+            if native_tool_calls:
+                try:
+                    followup = []
+                    for event in llm_chat_stream(
+                        _tool_followup_messages(final_messages, assistant_output, raw_tool_calls,
+                                                native_tool_calls, tool_results),
+                        temperature=request.temperature,
+                        top_p=request.top_p,
+                        max_tokens=request.max_tokens
+                    ):
+                        if event["type"] == "text":
+                            followup.append(event["delta"])
+                            yield event["delta"]
+                    assistant_output = (assistant_output + " " if assistant_output else "") + "".join(followup).strip()
+                    answered = True
+                except Exception as e:
+                    logger.warning(f"⚠️ Tool follow-up LLM stream failed, appending raw tool results: {e}")
+            if not answered and tool_results:
+                with_tools = _append_tool_summaries(assistant_output, tool_results)
+                yield with_tools[len(assistant_output):]
+                assistant_output = with_tools
+
+        logger.info(f"✅ Chat stream completed in {time.time() - turn['turn_start']:.3f}s ({len(assistant_output)} chars)")
+        _finish_chat_turn(turn, assistant_output, tool_calls, thread_id, user_id, mem_store)
+
+    return StreamingResponse(
+        tracing.trace_generator("chat.stream_response", generate, parent=tracing.current_span()),
+        media_type="text/plain; charset=utf-8"
+    )
+
 # OpenAI-style alias
 @app.post("/v1/chat/completions", response_model=ChatResponse)
 async def chat_completions_alias(
@@ -1409,11 +1613,140 @@ async def get_available_tools():
 @app.post("/v1/tools/{tool_name}")
 async def execute_tool(tool_name: str, parameters: dict):
     try:
-        return tool_dispatcher.dispatch(tool_name, parameters)
+        return await tool_dispatcher.dispatch_async(tool_name, parameters)
     except Exception as e:
         logger.error(f"Tool execution failed: {e}")
         raise HTTPException(status_code=500, detail=f"Tool execution failed: {str(e)}")
 
+@app.get("/v1/traces", dependencies=[Depends(profiling.verify_admin_token)])
+async def list_traces(limit: int = 50):
+    return {"traces": tracing.get_tracer().recent_traces(limit=limit), "stats": tracing.get_tracer().stats()}
+
+@app.get("/v1/traces/{trace_id}", dependencies=[Depends(profiling.verify_admin_token)])
+async def get_trace(trace_id: str):
+    """All buffered spans of one trace (a CallSid is accepted too)"""
+    if trace_id.startswith("CA"):
+        trace_id = tracing.trace_id_for_call(trace_id)
+    return {"trace_id": trace_id, "spans": tracing.get_tracer().get_trace(trace_id)}
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus scrape endpoint"""
+    if not metrics.PROMETHEUS_AVAILABLE:
+        raise HTTPException(status_code=503, detail="prometheus_client is not installed")
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE_LATEST)
+
+def _require_blocking_diagnostics():
+    if not is_blocking_diagnostics_enabled():
+        raise HTTPException(status_code=404, detail="Blocking diagnostics are off - set blocking_diagnostics_enabled")
+
+@app.get("/debug/blocking", dependencies=[Depends(profiling.verify_admin_token)])
+async def debug_blocking(limit: int = 20, sort: str = "total_ms"):
+    """Top event-loop stalls by route and code location (blocking_diagnostics_enabled only)"""
+    _require_blocking_diagnostics()
+    return get_blocking_detector().report(limit=limit, sort=sort)
+
+@app.delete("/debug/blocking", dependencies=[Depends(profiling.verify_admin_token)])
+async def reset_debug_blocking():
+    """Start a fresh blocking report (e.g. before a load test)."""
+    _require_blocking_diagnostics()
+    removed = get_blocking_detector().reset()
+    return {"success": True, "removed": removed}
+
+# -----------------------------------------------------------------------------
+# Runtime profiling (admin only - ADMIN_API_TOKEN)
+# -----------------------------------------------------------------------------
+@app.post("/debug/profile/cpu/start", dependencies=[Depends(profiling.verify_admin_token)])
+async def start_cpu_profile(interval_ms: float = 10, duration_seconds: float = 60,
+                            include_idle: bool = False, lines: bool = False):
+    """Start sampling every thread's stack; stops by itself after duration_seconds (max 600)"""
+    try:
+        return profiling.start_cpu_profile(interval_ms, duration_seconds, include_idle=include_idle, lines=lines)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@app.post("/debug/profile/cpu/stop", dependencies=[Depends(profiling.verify_admin_token)])
+async def stop_cpu_profile(limit: int = 25):
+    profiler = profiling.stop_cpu_profile()
+    if not profiler:
+        raise HTTPException(status_code=404, detail="No CPU profile has been started")
+    return profiler.summary(limit=limit)
+
+@app.get("/debug/profile/cpu", dependencies=[Depends(profiling.verify_admin_token)])
+async def get_cpu_profile(format: str = "json", limit: int = 25):
+    """Current or last CPU profile: top functions (json) or flamegraph-ready collapsed stacks (collapsed)"""
+    profiler = profiling.get_cpu_profile()
+    if not profiler:
+        raise HTTPException(status_code=404, detail="No CPU profile has been started")
+    if format == "collapsed":
+        return Response(content=await asyncio.to_thread(profiler.collapsed), media_type="text/plain")
+    return await asyncio.to_thread(profiler.summary, limit)
+
+@app.post("/debug/profile/heap/start", dependencies=[Depends(profiling.verify_admin_token)])
+async def start_heap_profile(frames: int = 10):
+    """Start tracemalloc (allocations before this point are not tracked)"""
+    return profiling.get_heap_profiler().start(frames)
+
+@app.post("/debug/profile/heap/stop", dependencies=[Depends(profiling.verify_admin_token)])
+async def stop_heap_profile():
+    """Stop tracemalloc and drop all snapshots"""
+    return profiling.get_heap_profiler().stop()
+
+@app.get("/debug/profile/heap", dependencies=[Depends(profiling.verify_admin_token)])
+async def heap_profile_status():
+    return profiling.get_heap_profiler().status()
+
+@app.post("/debug/profile/heap/snapshot", dependencies=[Depends(profiling.verify_admin_token)])
+async def take_heap_snapshot(label: str = "", limit: int = 25):
+    """Take a tracemalloc snapshot; returns its id and top allocation sites"""
+    heap = profiling.get_heap_profiler()
+    try:
+        snapshot_id = await asyncio.to_thread(heap.snapshot, label)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return await asyncio.to_thread(heap.top, snapshot_id, limit)
+
+@app.get("/debug/profile/heap/snapshots/{snapshot_id}", dependencies=[Depends(profiling.verify_admin_token)])
+async def get_heap_snapshot(snapshot_id: int, limit: int = 25, group_by: str = "lineno"):
+    """Top allocation sites of a snapshot (group_by: lineno, filename or traceback)"""
+    try:
+        return await asyncio.to_thread(profiling.get_heap_profiler().top, snapshot_id, limit, group_by)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/debug/profile/heap/diff", dependencies=[Depends(profiling.verify_admin_token)])
+async def diff_heap_snapshots(base: int, target: int, limit: int = 25, group_by: str = "lineno"):
+    """Allocation sites that grew most from snapshot `base` to snapshot `target`"""
+    try:
+        return await asyncio.to_thread(profiling.get_heap_profiler().diff, base, target, limit, group_by)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/v1/realtime-pool/stats")
+async def realtime_pool_stats():
+    return get_realtime_pool().stats()
+
+@app.get("/v1/response-cache/stats")
+async def response_cache_stats():
+    """Semantic response cache hit/miss/bypass counts and estimated latency saved."""
+    return get_response_cache().stats()
+
+@app.get("/v1/consolidation/stats")
+async def consolidation_stats():
+    """Background thread-history consolidation: queue depth, running jobs, outcomes."""
+    return get_consolidation_scheduler().stats()
+
+@app.delete("/v1/response-cache")
+async def clear_response_cache(tenant: Optional[str] = None):
+    """Drop cached responses (all tenants, or one e.g. customer_42)."""
+    removed = get_response_cache().clear(tenant)
+    logger.info(f"🗄️ Cleared {removed} cached responses (tenant={tenant or 'all'})")
+    return {"success": True, "removed": removed}
+
 # -----------------------------------------------------------------------------
 # OpenAI Realtime API Bridge for Twilio Media Streams
 # -----------------------------------------------------------------------------
@@ -1441,7 +1774,7 @@ def pcm16_8k_to_pcmu8k(pcm16_8k: bytes) -> bytes:
 class OAIRealtime:
     """OpenAI Realtime API WebSocket client"""
     
-    def __init__(self, system_instructions: str, on_audio_delta, on_text_delta, thread_id: Optional[str] = None, user_id: Optional[str] = None, call_sid: Optional[str] = None, voice: str = "alloy"):
+    def __init__(self, system_instructions: str, on_audio_delta, on_text_delta, thread_id: Optional[str] = None, user_id: Optional[str] = None, call_sid: Optional[str] = None, voice: str = "alloy", greeting_played: Optional[str] = None, tenant: str = "unknown"):
         self.ws = None
         self.system_instructions = system_instructions
         self.on_audio_delta = on_audio_delta
@@ -1450,8 +1783,25 @@ class OAIRealtime:
         self.thread_id = thread_id
         self.user_id = user_id
         self.call_sid = call_sid  # For transfer functionality
+        self.greeting_played = greeting_played  # Speculative greeting already sent to Twilio
+        self.tenant = tenant  # metrics label (customer_id)
+        self.last_event_at = 0.0  # perf_counter when the latest OpenAI event arrived
+        self._speech_stopped_at: Optional[float] = None
         self._connected = threading.Event()
         self.audio_buffer_size = 0  # Track buffered audio bytes (24kHz PCM16)
+        
+        # Function calling: arguments stream in per call_id; tools start as soon as
+        # their arguments are complete and run concurrently. One response.create is
+        # sent once every call from a response has returned its output.
+        try:
+            self._loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._loop = None
+        self._tool_lock = threading.Lock()
+        self._tool_calls: Dict[str, Dict[str, Any]] = {}  # call_id -> {"name", "arguments"}
+        self._started_tool_calls = set()
+        self._pending_tool_calls: Dict[str, set] = {}  # response_id -> call_ids still running
+        self._finished_responses = set()  # response_ids whose response.done already arrived
     
     def _on_open(self, ws):
         """Configure session when WebSocket opens"""
@@ -1473,31 +1823,14 @@ class OAIRealtime:
                 },
                 "temperature": 0.7,
                 "voice": self.voice,  # Dynamic voice from admin panel
-                "tools": [
-                    {
-                        "type": "function",
-                        "name": "get_current_time",
-                        "description": "Get the current time in Pacific Time Zone (PT). Use this when someone asks what time it is.",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "format": {
-                                    "type": "string",
-                                    "description": "Time format to return",
-                                    "enum": ["12-hour", "24-hour"]
-                                }
-                            },
-                            "required": []
-                        }
-                    }
-                ],
+                "tools": tool_dispatcher.get_openai_tools("realtime"),
                 "tool_choice": "auto"
             }
         }
         logger.info(f"🔊 VOICE DEBUG: Sending session.update with voice='{self.voice}'")
         logger.info(f"🔊 VOICE DEBUG: Full session config: {json.dumps(session_update['session'], indent=2)}")
         ws.send(json.dumps(session_update))
-        logger.info(f"✅ OpenAI Realtime session configured with voice: {self.voice} and time tool")
+        logger.info(f"✅ OpenAI Realtime session configured with voice: {self.voice} and {len(session_update['session']['tools'])} tools")
         
         # =====================================================
         # 🆕 EACH PHONE CALL STARTS FRESH - NO OLD MESSAGES
@@ -1507,6 +1840,23 @@ class OAIRealtime:
         # This ensures each call starts with a proper greeting, not mid-conversation
         logger.info("🆕 Starting fresh call - AI has no old conversation messages (will greet properly)")
         
+        if self.greeting_played:
+            # The caller is already hearing the pre-synthesized greeting - record it as
+            # the assistant's first turn and let server VAD pick up their reply
+            ws.send(json.dumps({
+                "type": "conversation.item.create",
+                "item": {
+                    "type": "message",
+                    "role": "assistant",
+                    "content": [{"type": "text", "text": self.greeting_played}]
+                }
+            }))
+            if self.thread_id:
+                THREAD_HISTORY[self.thread_id].append(("assistant", self.greeting_played))
+            logger.info(f"📞 Speculative greeting handed over to Realtime session")
+            self._connected.set()
+            return
+        
         # Trigger immediate greeting - tell AI to start speaking first
         # CRITICAL: Reference the exact section header used in system instructions
         greeting_instruction = "IMPORTANT: You MUST start the call by speaking first. Look at the === GREETING - START SPEAKING FIRST! === section in your instructions and say that exact greeting now. Do not wait for the caller to speak. Speak in English."
@@ -1525,6 +1875,7 @@ class OAIRealtime:
     
     def _on_message(self, ws, msg):
         """Handle incoming messages from OpenAI"""
+        self.last_event_at = time.perf_counter()
         try:
             ev = json.loads(msg)
         except Exception:
@@ -1538,6 +1889,9 @@ class OAIRealtime:
         if event_type == "response.audio.delta":
             b64 = ev.get("delta", "")
             if b64:
+                if self._speech_stopped_at is not None:
+                    metrics.REALTIME_RESPONSE_SECONDS.labels(tenant=self.tenant).observe(self.last_event_at - self._speech_stopped_at)
+                    self._speech_stopped_at = None
                 pcm24 = base64.b64decode(b64)
                 logger.info(f"🔊 Received audio delta: {len(pcm24)} bytes")
                 self.on_audio_delta(pcm24)
@@ -1568,6 +1922,7 @@ class OAIRealtime:
         elif event_type == "input_audio_buffer.speech_stopped":
             logger.info("🎤 User stopped speaking")
             self.audio_buffer_size = 0  # Reset buffer after speech
+            self._speech_stopped_at = self.last_event_at
         
         elif event_type == "conversation.item.created":
             # Capture user or assistant messages
@@ -1611,69 +1966,37 @@ class OAIRealtime:
                 if hasattr(self, 'call_sid') and self.call_sid:
                     check_and_execute_transfer(transcript, self.call_sid)
         
+        elif event_type == "response.output_item.added":
+            # Function call announced - arguments will stream in as deltas
+            item = ev.get("item", {})
+            if item.get("type") == "function_call" and item.get("call_id"):
+                with self._tool_lock:
+                    self._tool_calls[item["call_id"]] = {"name": item.get("name"), "arguments": []}
+        
+        elif event_type == "response.function_call_arguments.delta":
+            call_id = ev.get("call_id")
+            if call_id:
+                with self._tool_lock:
+                    self._tool_calls.setdefault(call_id, {"name": None, "arguments": []})["arguments"].append(ev.get("delta", ""))
+        
+        elif event_type == "response.function_call_arguments.done":
+            call_id = ev.get("call_id")
+            with self._tool_lock:
+                streamed = self._tool_calls.get(call_id, {})
+            function_name = ev.get("name") or streamed.get("name")
+            arguments_str = ev.get("arguments") or "".join(streamed.get("arguments", []))
+            self._start_tool_call(ws, call_id, function_name, arguments_str, ev.get("response_id"))
+        
         elif event_type == "response.output_item.done":
-            # Check if this is a function call
+            # Fallback for sessions that only report the completed function call item
             item = ev.get("item", {})
             if item.get("type") == "function_call":
-                function_name = item.get("name")
-                call_id = item.get("call_id")
-                arguments_str = item.get("arguments", "{}")
-                
-                logger.info(f"🔧 Function call requested: {function_name} with args: {arguments_str}")
-                
-                # Execute the time tool
-                if function_name == "get_current_time":
-                    try:
-                        from datetime import datetime
-                        from zoneinfo import ZoneInfo
-                        
-                        # Parse arguments
-                        args = json.loads(arguments_str) if arguments_str else {}
-                        time_format = args.get("format", "12-hour")
-                        
-                        # Get current Pacific time
-                        pacific_tz = ZoneInfo("America/Los_Angeles")
-                        now = datetime.now(pacific_tz)
-                        
-                        # Format the time casually
-                        if time_format == "24-hour":
-                            time_str = now.strftime("%H:%M")
-                        else:
-                            time_str = now.strftime("%-I:%M%p").lower()  # e.g., "4:11pm"
-                        
-                        # Simple, casual result
-                        result = f"{time_str} Pacific time"
-                        
-                        logger.info(f"⏰ Returning time: {result}")
-                        
-                        # Send function result back to OpenAI
-                        ws.send(json.dumps({
-                            "type": "conversation.item.create",
-                            "item": {
-                                "type": "function_call_output",
-                                "call_id": call_id,
-                                "output": result
-                            }
-                        }))
-                        
-                        # Trigger AI to respond with the result
-                        ws.send(json.dumps({"type": "response.create"}))
-                        
-                    except Exception as e:
-                        logger.error(f"Error executing get_current_time: {e}")
-                        # Send error back
-                        ws.send(json.dumps({
-                            "type": "conversation.item.create",
-                            "item": {
-                                "type": "function_call_output",
-                                "call_id": call_id,
-                                "output": f"Error getting time: {str(e)}"
-                            }
-                        }))
+                self._start_tool_call(ws, item.get("call_id"), item.get("name"), item.get("arguments", "{}"), ev.get("response_id"))
         
         elif event_type == "response.done":
             logger.info("✅ OpenAI response complete")
             self.audio_buffer_size = 0  # Reset buffer after response
+            self._finish_tool_response(ws, ev.get("response", {}).get("id"))
             
             # Save thread history to database after each response
             if hasattr(self, 'thread_id') and self.thread_id and hasattr(self, 'user_id') and self.user_id:
@@ -1730,16 +2053,99 @@ class OAIRealtime:
         else:
             logger.info("OpenAI WebSocket closed")
     
+    def _start_tool_call(self, ws, call_id: Optional[str], function_name: Optional[str], arguments_str: str, response_id: Optional[str]):
+        """Start a function call as soon as its arguments are complete (runs concurrently with others)."""
+        if not call_id or not function_name:
+            return
+        with self._tool_lock:
+            if call_id in self._started_tool_calls:
+                return
+            self._started_tool_calls.add(call_id)
+            self._tool_calls.pop(call_id, None)
+            self._pending_tool_calls.setdefault(response_id, set()).add(call_id)
+        
+        logger.info(f"🔧 Function call requested: {function_name} with args: {arguments_str}")
+        try:
+            params = json.loads(arguments_str) if arguments_str else {}
+        except json.JSONDecodeError as e:
+            self._on_tool_result(ws, call_id, response_id, {"success": False, "result": None, "error": f"Invalid arguments: {e}"})
+            return
+        
+        future = submit_tool_call(function_name, params, self._loop)
+        
+        def _done(fut):
+            try:
+                result = fut.result()
+            except Exception as e:
+                result = {"success": False, "result": None, "error": str(e)}
+            self._on_tool_result(ws, call_id, response_id, result)
+        
+        future.add_done_callback(_done)
+    
+    def _on_tool_result(self, ws, call_id: str, response_id: Optional[str], result: Dict[str, Any]):
+        """Send a function call output; trigger the follow-up response once all calls are back."""
+        if result.get("success"):
+            output = result.get("spoken") or result.get("result") or ""
+            logger.info(f"🔧 Function call {call_id} returned: {str(output)[:100]}")
+        else:
+            output = f"Error: {result.get('error')}"
+            logger.error(f"❌ Function call {call_id} failed: {result.get('error')}")
+        
+        try:
+            ws.send(json.dumps({
+                "type": "conversation.item.create",
+                "item": {
+                    "type": "function_call_output",
+                    "call_id": call_id,
+                    "output": str(output)
+                }
+            }))
+        except Exception as e:
+            logger.error(f"Failed to send function call output: {e}")
+        
+        with self._tool_lock:
+            pending = self._pending_tool_calls.get(response_id, set())
+            pending.discard(call_id)
+            ready = not pending and response_id in self._finished_responses
+            if ready:
+                self._pending_tool_calls.pop(response_id, None)
+                self._finished_responses.discard(response_id)
+        if ready:
+            self._request_tool_followup(ws)
+    
+    def _finish_tool_response(self, ws, response_id: Optional[str]):
+        """Called on response.done - respond now if its function calls already returned."""
+        with self._tool_lock:
+            if response_id not in self._pending_tool_calls:
+                return
+            ready = not self._pending_tool_calls[response_id]
+            if ready:
+                self._pending_tool_calls.pop(response_id, None)
+            else:
+                self._finished_responses.add(response_id)
+        if ready:
+            self._request_tool_followup(ws)
+    
+    def _request_tool_followup(self, ws):
+        """Trigger AI to respond with the function call results"""
+        try:
+            ws.send(json.dumps({"type": "response.create"}))
+        except Exception as e:
+            logger.error(f"Failed to request response after function calls: {e}")
+    
     def connect(self):
-        """Establish WebSocket connection to OpenAI Realtime API"""
-        openai_key = get_secret("OPENAI_API_KEY")
-        model = get_setting("realtime_model", "gpt-realtime")
-        realtime_url = f"wss://api.openai.com/v1/realtime?model={model}"
+        """Establish WebSocket connection to OpenAI Realtime API (pre-connected from the warm pool when possible)"""
+        pooled = get_realtime_pool().acquire()
+        if pooled:
+            # Handshake and auth already done - just configure the session for this call
+            pooled.bind(self)
+            self.ws = pooled.ws
+            logger.info(f"⚡ Using pre-connected Realtime session {pooled.session_id} "
+                        f"(warm for {time.time() - pooled.created_at:.0f}s)")
+            self._on_open(self.ws)
+            return
         
-        headers = [
-            f"Authorization: Bearer {openai_key}",
-            "OpenAI-Beta: realtime=v1"
-        ]
+        model, realtime_url, headers = realtime_url_and_headers()
         
         self.ws = WebSocketApp(
             realtime_url,
@@ -1799,9 +2205,27 @@ async def media_stream_endpoint(websocket: WebSocket):
     thread_id = None  # Track thread_id for memory continuity
     oai = None
     last_media_ts = time.time()
+    call_span = None  # Root span of this call's media stream (trace derived from call_sid)
+    stream_started_at = None
+    first_audio_sent = threading.Event()
+    tenant = "unknown"  # metrics label, set once the customer context is resolved
+    counted_call_tenant = None  # tenant the active-calls gauge was incremented for
+    
+    def mark_first_audio(source):
+        """Span from the Twilio start event to the first audio frame sent back"""
+        if call_span and stream_started_at and not first_audio_sent.is_set():
+            first_audio_sent.set()
+            tracing.record_span("audio.first_frame", stream_started_at, parent=call_span, attributes={"source": source})
+    
+    async def send_realtime_audio(message, received_at):
+        await websocket.send_text(message)
+        metrics.TWILIO_MEDIA_FRAMES.labels(direction="out", tenant=tenant).inc()
+        metrics.OPENAI_EVENT_LAG_SECONDS.observe(time.perf_counter() - received_at)
     
     def on_oai_audio(pcm24):
         """Handle audio from OpenAI - send to Twilio"""
+        received_at = oai.last_event_at if oai else time.perf_counter()
+        mark_first_audio("realtime")
         logger.info(f"📤 Sending audio to Twilio: {len(pcm24)} bytes PCM24 -> mulaw")
         pcm8 = downsample_24k_to_8k(pcm24)
         mulaw = pcm16_8k_to_pcmu8k(pcm8)
@@ -1810,11 +2234,11 @@ async def media_stream_endpoint(websocket: WebSocket):
         if websocket.application_state == WebSocketState.CONNECTED:
             # Schedule coroutine in the FastAPI event loop from this thread
             asyncio.run_coroutine_threadsafe(
-                websocket.send_text(json.dumps({
+                send_realtime_audio(json.dumps({
                     "event": "media",
                     "streamSid": stream_sid,
                     "media": {"payload": payload}
-                })),
+                }), received_at),
                 event_loop
             )
             logger.info(f"✅ Audio sent to Twilio ({len(payload)} base64 chars)")
@@ -1865,6 +2289,7 @@ async def media_stream_endpoint(websocket: WebSocket):
                             })),
                             event_loop
                         )
+                        metrics.TWILIO_MEDIA_FRAMES.labels(direction="out", tenant=tenant).inc()
             
             logger.info("✅ ElevenLabs audio streaming complete")
             
@@ -1884,6 +2309,45 @@ async def media_stream_endpoint(websocket: WebSocket):
                 call_sid = custom_params.get("call_sid")
                 is_callback = custom_params.get("is_callback") == "True"
                 
+                stream_started_at = time.time()
+                call_span = tracing.begin_span(
+                    "call.media_stream",
+                    trace_id=tracing.trace_id_for_call(call_sid) if call_sid else None,
+                    kind="server",
+                    attributes={"call_sid": call_sid, "stream_sid": stream_sid, "is_callback": is_callback}
+                )
+                tracing.activate(call_span)
+                
+                async def traced(name, awaitable):
+                    with tracing.start_span(name):
+                        return await awaitable
+                
+                # ⚡ Play the greeting pre-synthesized by the webhook while the session is set up
+                async def play_speculative_greeting():
+                    if not get_setting("speculative_greeting_enabled", True):
+                        return None
+                    wait = float(get_setting("speculative_greeting_wait_ms", 1500)) / 1000
+                    with tracing.start_span("greeting.speculative_claim") as span:
+                        greeting = await asyncio.to_thread(claim_speculative_greeting, call_sid, wait)
+                        span.set_attribute("hit", greeting is not None)
+                    if not greeting:
+                        logger.info(f"⏳ No speculative greeting for {call_sid}, Realtime will greet")
+                        return None
+                    mark_first_audio("speculative_greeting")
+                    audio = greeting["audio"]
+                    chunk_size = MULAW_BYTES_PER_SECOND // 5
+                    for i in range(0, len(audio), chunk_size):
+                        await websocket.send_text(json.dumps({
+                            "event": "media",
+                            "streamSid": stream_sid,
+                            "media": {"payload": base64.b64encode(audio[i:i + chunk_size]).decode("ascii")}
+                        }))
+                        metrics.TWILIO_MEDIA_FRAMES.labels(direction="out", tenant=tenant).inc()
+                    logger.info(f"⚡ Speculative greeting playing ({len(audio) / MULAW_BYTES_PER_SECOND:.1f}s): '{greeting['text']}'")
+                    return greeting
+                
+                speculative_greeting_task = asyncio.create_task(play_speculative_greeting())
+                
                 # SECURITY: Retrieve customer context server-side using call_sid (prevents spoofing)
                 customer_id = None
                 agent_name_override = None
@@ -1893,18 +2357,32 @@ async def media_stream_endpoint(websocket: WebSocket):
                 
                 if call_sid:
                     try:
-                        import requests
-                        # Call Flask API to get customer context (server-side lookup)
-                        # SECURITY: Include shared secret for authentication
-                        internal_secret = get_secret("SESSION_SECRET")
-                        response = requests.get(
-                            f"http://127.0.0.1:5000/api/internal/customer-context/{call_sid}",
-                            headers={"X-Internal-Secret": internal_secret},
-                            timeout=2
-                        )
+                        customer_data = None
+                        # 1) Signed call_sid -> customer_id binding from the <Stream> parameters
+                        signed = verify_call_context(custom_params["ctx"], call_sid=call_sid) if custom_params.get("ctx") else None
+                        # 2) Shared call-session store (sqlite/redis backends are visible across processes)
+                        if get_call_session_store().backend != "memory":
+                            customer_data = await asyncio.to_thread(get_call_session_store().get, call_sid)
+                        # 3) Ask the Flask process that owns the in-memory session
+                        if customer_data is None:
+                            import requests
+                            # SECURITY: Include shared secret for authentication
+                            internal_secret = get_secret("SESSION_SECRET")
+                            response = await asyncio.to_thread(
+                                requests.get,
+                                f"http://127.0.0.1:5000/api/internal/customer-context/{call_sid}",
+                                headers={"X-Internal-Secret": internal_secret},
+                                timeout=2
+                            )
+                            if response.status_code == 200:
+                                customer_data = response.json()
+                        # The signed customer_id wins over whatever the session lookup returned
+                        if signed and (customer_data or {}).get('customer_id') != signed['customer_id']:
+                            if customer_data:
+                                logger.warning(f"⚠️ Session context for {call_sid} doesn't match the signed customer, ignoring it")
+                            customer_data = {'customer_id': signed['customer_id']}
                         
-                        if response.status_code == 200:
-                            customer_data = response.json()
+                        if customer_data:
                             customer_id = customer_data.get('customer_id')
                             agent_name_override = customer_data.get('agent_name')
                             greeting_override = customer_data.get('greeting_template')
@@ -1925,6 +2403,11 @@ async def media_stream_endpoint(websocket: WebSocket):
                     thread_id = f"user_{user_id}" if user_id else None
                     logger.info(f"📞 Default mode: No customer context, using admin settings")
                 
+                tenant = metrics.tenant_label(customer_id)
+                if counted_call_tenant is None:
+                    counted_call_tenant = tenant
+                    metrics.REALTIME_ACTIVE_CALLS.labels(tenant=tenant).inc()
+                
                 logger.info(f"📞 Stream started: {stream_sid}, User: {user_id}, Call: {call_sid}, Thread: {thread_id}, Callback: {is_callback}")
                 
                 # Initialize admin settings with defaults (will be fetched in parallel inside try block)
@@ -1951,10 +2434,14 @@ async def media_stream_endpoint(websocket: WebSocket):
                                 logger.info(f"⚡ Using Memory V2 FAST enriched context (<1 second retrieval!)")
                                 return {"version": "v2", "context": v2_context, "pre_formatted": True}
                             
-                            # Fall back to V1 (slower, raw memories)
-                            logger.info(f"⚠️ Memory V2 not available, falling back to V1 raw memories (2-3 seconds)")
-                            memories_v1 = await asyncio.to_thread(mem_store.get_user_memories, user_id, limit=500, include_shared=True)
-                            return {"version": "v1", "memories": memories_v1, "pre_formatted": False}
+                            # Fall back to V1 stored caller schema (single keyed read)
+                            logger.info(f"⚠️ Memory V2 not available, falling back to V1 stored caller schema")
+                            schema_doc = await asyncio.to_thread(mem_store.load_caller_schema, user_id)
+                            if schema_doc is None:
+                                # First call since schemas were introduced - build it once from raw memories
+                                logger.info(f"🔄 No stored caller schema for {user_id}, building from raw memories")
+                                schema_doc = await asyncio.to_thread(mem_store.rebuild_caller_schema, user_id)
+                            return {"version": "v1", "schema_doc": schema_doc, "pre_formatted": False}
                         return {"version": "none", "memories": [], "pre_formatted": False}
                     
                     async def fetch_thread_history():
@@ -1970,24 +2457,29 @@ async def media_stream_endpoint(websocket: WebSocket):
                     
                     # Fetch EVERYTHING in parallel
                     (
-                        agent_name_val,
-                        existing_greeting_val,
-                        new_greeting_val,
-                        transfer_rules_val,
-                        voice_val,
-                        prompt_block_results,
+                        (
+                            agent_name_val,
+                            existing_greeting_val,
+                            new_greeting_val,
+                            transfer_rules_val,
+                            voice_val,
+                            prompt_block_results
+                        ),
                         caller_data,
                         history_count
                     ) = await asyncio.gather(
-                        get_admin_setting("agent_name", "AI Assistant"),
-                        get_admin_setting("existing_user_greeting", "Hi, this is {agent_name}. Is this {user_name}?"),
-                        get_admin_setting("new_caller_greeting", "{time_greeting}! This is {agent_name}. How can I help you?"),
-                        get_admin_setting("transfer_rules", "[]"),
-                        get_admin_setting("openai_voice", "alloy"),
-                        get_admin_setting("prompt_blocks", {}),
-                        fetch_caller_profile(),
-                        fetch_thread_history()
+                        traced("settings.fetch", asyncio.gather(
+                            get_admin_setting("agent_name", "AI Assistant"),
+                            get_admin_setting("existing_user_greeting", "Hi, this is {agent_name}. Is this {user_name}?"),
+                            get_admin_setting("new_caller_greeting", "{time_greeting}! This is {agent_name}. How can I help you?"),
+                            get_admin_setting("transfer_rules", "[]"),
+                            get_admin_setting("openai_voice", "alloy"),
+                            get_admin_setting("prompt_blocks", {})
+                        )),
+                        traced("memory.profile_fetch", fetch_caller_profile()),
+                        traced("memory.history_fetch", fetch_thread_history())
                     )
+                    prompt_build_start = time.time()
                     
                     memory_version = caller_data.get("version", "none")
                     logger.info(f"✅ Parallel fetch complete: agent={agent_name_val}, voice={voice_val}, memory_version={memory_version}, history={history_count}")
@@ -2023,12 +2515,12 @@ async def media_stream_endpoint(websocket: WebSocket):
                         logger.info(f"⚡ Memory V2 FAST context loaded ({len(v2_pre_formatted_context)} chars) - 10x faster!")
                         
                     elif memory_version == "v1":
-                        # ⚠️ MEMORY V1: Raw memories (slower normalization)
-                        memories = caller_data.get("memories", [])
-                        if memories:
-                            normalized = await asyncio.to_thread(mem_store.normalize_memories, memories)
+                        # ⚠️ MEMORY V1: Stored caller schema (maintained incrementally on write)
+                        schema_doc = caller_data.get("schema_doc") or {}
+                        if schema_doc.get("memory_count"):
+                            normalized = schema_doc.get("schema", {})
                             user_name = normalized.get("identity", {}).get("caller_name")  # Extract from normalized V1 data
-                            logger.info(f"⚠️ Normalized {len(memories)} V1 memories, extracted name: {user_name}")
+                            logger.info(f"⚠️ Loaded V1 caller schema ({schema_doc['memory_count']} memories), extracted name: {user_name}")
                         else:
                             # 🆕 AUTO-REGISTER NEW CALLERS (only for V1 empty case)
                             if user_id:
@@ -2082,31 +2574,24 @@ async def media_stream_endpoint(websocket: WebSocket):
                         instructions += "=== END_MEMORY ===\n"
                     
                     # Build personalized greeting
-                    if is_callback and user_name:
+                    speculative_greeting = await speculative_greeting_task
+                    if speculative_greeting:
+                        greeting = speculative_greeting["text"]
+                        instructions += f"\n\n=== GREETING ALREADY GIVEN ===\nYou have already greeted the caller with: '{greeting}' Do NOT greet them again. Wait for the caller to respond, then continue naturally."
+                        logger.info(f"✅ Using speculative greeting")
+                    elif is_callback and user_name:
                         # Returning caller with name
-                        greeting_template = greeting_override or existing_greeting_val
-                        greeting = greeting_template.replace("{user_name}", user_name).replace("{agent_name}", agent_name)
+                        greeting = compose_greeting(True, user_name, agent_name, existing_greeting_val, new_greeting_val, greeting_override)
                         instructions += f"\n\n=== GREETING - START SPEAKING FIRST! ===\nThis is a returning caller named {user_name}. START the call by speaking first. Say this exact greeting: '{greeting}' Then continue naturally."
                         logger.info(f"✅ Built personalized greeting for {user_name}")
                     elif is_callback:
                         # Returning caller without name
-                        greeting_template = greeting_override or existing_greeting_val
-                        greeting = greeting_template.replace("{user_name}", "").replace("{agent_name}", agent_name)
+                        greeting = compose_greeting(True, None, agent_name, existing_greeting_val, new_greeting_val, greeting_override)
                         instructions += f"\n\n=== GREETING - START SPEAKING FIRST! ===\nThis is a returning caller. START the call by speaking first. Say this greeting: '{greeting}' Then continue naturally."
                         logger.info(f"✅ Built generic returning caller greeting")
                     else:
                         # New caller
-                        import datetime
-                        hour = datetime.datetime.now().hour
-                        if hour < 12:
-                            time_greeting = "Good morning"
-                        elif hour < 18:
-                            time_greeting = "Good afternoon"
-                        else:
-                            time_greeting = "Good evening"
-                        
-                        greeting_template = greeting_override or new_greeting_val
-                        greeting = greeting_template.replace("{time_greeting}", time_greeting).replace("{agent_name}", agent_name)
+                        greeting = compose_greeting(False, None, agent_name, existing_greeting_val, new_greeting_val, greeting_override)
                         instructions += f"\n\n=== GREETING - START SPEAKING FIRST! ===\nThis is a new caller. START the call by speaking first. Say this exact greeting: '{greeting}' Then continue naturally."
                         logger.info(f"✅ Built new caller greeting")
                     
@@ -2128,6 +2613,8 @@ async def media_stream_endpoint(websocket: WebSocket):
                     except Exception as e:
                         logger.error(f"❌ Failed to inject transfer rules: {e}")
                     
+                    tracing.record_span("prompt.build", prompt_build_start, attributes={"chars": len(instructions)})
+                    
                     # Connect to OpenAI with full context
                     openai_voice = voice_override or voice_val
                     logger.info(f"🎤 Connecting to OpenAI with full memory context...")
@@ -2139,9 +2626,12 @@ async def media_stream_endpoint(websocket: WebSocket):
                         thread_id=thread_id, 
                         user_id=user_id,
                         call_sid=call_sid,
-                        voice=openai_voice
+                        voice=openai_voice,
+                        greeting_played=speculative_greeting["text"] if speculative_greeting else None,
+                        tenant=tenant
                     )
-                    oai.connect()
+                    with tracing.start_span("realtime.connect"):
+                        oai.connect()
                     memory_info = f"v2_profile" if memory_version == "v2" else f"{len(caller_data.get('memories', []))} v1_memories"
                     logger.info(f"✅ Greeting sent with full context! (thread={thread_id}, memory={memory_info}, history={history_count})")
                 
@@ -2155,6 +2645,7 @@ async def media_stream_endpoint(websocket: WebSocket):
                 # Audio from Twilio (mulaw 8kHz base64)
                 b64 = ev["media"]["payload"]
                 mulaw = base64.b64decode(b64)
+                metrics.TWILIO_MEDIA_FRAMES.labels(direction="in", tenant=tenant).inc()
                 pcm16_8k = pcmu8k_to_pcm16_8k(mulaw)
                 pcm16_24k = upsample_8k_to_24k(pcm16_8k)
                 
@@ -2183,6 +2674,10 @@ async def media_stream_endpoint(websocket: WebSocket):
     finally:
         if oai:
             oai.close()
+        if counted_call_tenant is not None:
+            metrics.REALTIME_ACTIVE_CALLS.labels(tenant=counted_call_tenant).dec()
+        if call_span:
+            call_span.end()
         
         # =====================================================
         # 📨 SAVE TRANSCRIPT & SEND CALL SUMMARY
@@ -2206,7 +2701,7 @@ async def media_stream_endpoint(websocket: WebSocket):
                     transcript_token = generate_memory_token(customer_id=1, scope="memory:read")
                     
                     memory_response = requests.post(
-                        "http://209.38.143.71:8100/memory/retrieve",
+                        f"{get_setting('ai_memory_url', 'http://209.38.143.71:8100')}/memory/retrieve",
                         headers={
                             "Content-Type": "application/json",
                             "Authorization": f"Bearer {transcript_token}"  # ✅ ADD JWT AUTH
@@ -2328,37 +2823,17 @@ async def media_stream_endpoint(websocket: WebSocket):
                 except Exception as e:
                     logger.error(f"❌ Error during V2 call summarization: {e}")
                 
-                # Update calls.json index with file locking to prevent race conditions
-                import fcntl
-                calls_index_path = os.path.join(calls_dir, "calls.json")
-                calls_data = []
-                
-                # Acquire exclusive lock before reading/writing
-                with open(calls_index_path, 'a+') as lock_file:
-                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
-                    try:
-                        lock_file.seek(0)
-                        content = lock_file.read()
-                        if content:
-                            calls_data = json.loads(content)
-                    except:
-                        calls_data = []
-                    
-                    calls_data.append({
-                        "call_sid": call_sid,
-                        "date": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
-                        "caller": from_number,
-                        "summary": summary_text[:200] + "..." if len(summary_text) > 200 else summary_text,
-                        "transcript_file": f"{call_sid}.txt",
-                        "audio_file": f"{call_sid}.mp3"
-                    })
-                    
-                    lock_file.seek(0)
-                    lock_file.truncate()
-                    lock_file.write(json.dumps(calls_data, indent=2))
-                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
-                
-                logger.info(f"📒 Updated calls index: {calls_index_path}")
+                # Index the call (single-row insert - constant cost per hangup)
+                get_call_log().record({
+                    "call_sid": call_sid,
+                    "date": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
+                    "caller": from_number,
+                    "customer_id": customer_id,
+                    "summary": summary_text[:200] + "..." if len(summary_text) > 200 else summary_text,
+                    "transcript_file": f"{call_sid}.txt",
+                    "audio_file": f"{call_sid}.mp3"
+                })
+                logger.info(f"📒 Indexed call {call_sid} in call log")
                 
                 # Send to send_text service for SMS notification
                 # Truncate summary to 500 chars to avoid SMS 1600 char limit
@@ -2388,7 +2863,7 @@ async def media_stream_endpoint(websocket: WebSocket):
                 
                 # Send to send_text service (use Docker host gateway to reach host machine)
                 response = requests.post(
-                    "http://172.17.0.1:3000/call-summary",
+                    get_setting("call_summary_url", "http://172.17.0.1:3000/call-summary"),
                     headers={"Content-Type": "application/json"},
                     json=payload,
                     timeout=2
@@ -2406,7 +2881,7 @@ async def media_stream_endpoint(websocket: WebSocket):
                 try:
                     from app.notion_client import NotionClient
                     
-                    notion = NotionClient(base_url="http://172.17.0.1:8200")
+                    notion = NotionClient(base_url=get_setting("notion_service_url", "http://172.17.0.1:8200"))
                     
                     # Check if Notion service is available
                     if notion.health_check():
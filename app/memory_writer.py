@@ -0,0 +1,206 @@
+"""
+Fire-and-forget memory writes for the phone call path.
+
+/phone/process-speech used to block the caller on up to seven sequential
+AI-Memory writes (each through a freshly constructed HTTPMemoryStore and its
+health check) before the LLM was even asked for a reply. Those writes don't
+affect the reply, so they are queued here instead and drained by a single
+background thread:
+
+    get_memory_writer().submit([
+        {"type": "moment", "key": "...", "value": {...}, "user_id": user_id, "ttl_days": 365},
+    ])
+
+The worker drains the queue in batches (up to memory_writer_batch_size
+items, or whatever arrived within memory_writer_batch_wait_ms), drops
+duplicates of the same (user_id, type, key) within a batch (last one wins),
+and sends each user's items in one HTTPMemoryStore.write_many request
+(shared-scope items are written one by one). The long-lived HTTPMemoryStore
+is rebuilt after a failure.
+
+Caller-schema merges (HTTPMemoryStore.write / write_many queue them with
+submit_schema_merge) ride the same queue and run after each batch's writes,
+coalesced to one load-and-save per caller.
+"""
+
+import time
+import queue
+import logging
+import threading
+from typing import Dict, Any, List, Optional
+
+from config_loader import get_setting
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class BackgroundMemoryWriter:
+    """
+    Queue + daemon thread that batches memory writes off the request path.
+    """
+
+    def __init__(self, batch_size: int = 20, batch_wait_ms: float = 50, max_queue: int = 5000):
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait_ms / 1000.0
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max_queue)
+        self._store = None
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._pending = 0
+        self._stats = {"submitted": 0, "written": 0, "deduped": 0, "failed": 0, "dropped": 0, "batches": 0,
+                       "schema_merges": 0}
+        self._thread = threading.Thread(target=self._run, name="memory-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, items: List[Dict[str, Any]]) -> int:
+        """
+        Queue memory items for writing. Never blocks the caller.
+
+        Args:
+            items: Dicts with type, key, value, user_id and optional scope / ttl_days
+
+        Returns:
+            Number of items queued (items are dropped if the queue is full)
+        """
+        queued = sum(1 for item in items if self._put(item))
+        with self._lock:
+            self._stats["submitted"] += queued
+        return queued
+
+    def submit_schema_merge(self, user_id: str, memories: List[Dict[str, Any]]) -> bool:
+        """
+        Queue a caller-schema merge of memories that were just written. Never blocks the caller.
+
+        Args:
+            user_id: Caller identifier
+            memories: Dicts with type, key and value, in write order
+
+        Returns:
+            False if the queue was full and the merge was dropped
+        """
+        return self._put({"op": "schema_merge", "user_id": user_id, "memories": memories})
+
+    def _put(self, item: Dict[str, Any]) -> bool:
+        with self._lock:
+            self._pending += 1
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except queue.Full:
+            with self._lock:
+                self._pending -= 1
+                self._stats["dropped"] += 1
+            logger.warning(f"⚠️ Memory write queue full, dropped {item.get('op') or item.get('type')}:{item.get('key') or item.get('user_id')}")
+            return False
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until every queued item has been written (or failed). Returns False on timeout."""
+        deadline = time.time() + timeout
+        with self._lock:
+            while self._pending > 0:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    def _get_store(self):
+        if self._store is None:
+            from app.http_memory import HTTPMemoryStore
+            self._store = HTTPMemoryStore()
+        return self._store
+
+    def _next_batch(self) -> List[Dict[str, Any]]:
+        batch = [self._queue.get()]
+        deadline = time.time() + self.batch_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            merges: Dict[str, List[Dict[str, Any]]] = {}
+            unique: Dict[tuple, Dict[str, Any]] = {}
+            for item in batch:
+                if item.get("op") == "schema_merge":
+                    merges.setdefault(item["user_id"], []).extend(item["memories"])
+                else:
+                    unique[(item.get("user_id"), item["type"], item["key"])] = item
+            writes = len(batch) - sum(1 for item in batch if item.get("op") == "schema_merge")
+            groups: Dict[tuple, List[Dict[str, Any]]] = {}
+            for item in unique.values():
+                groups.setdefault((item.get("user_id"), item.get("scope", "user")), []).append(item)
+            written = failed = 0
+            for (user_id, scope), items in groups.items():
+                try:
+                    written += self._write_group(user_id, scope, items)
+                except Exception as e:
+                    failed += len(items)
+                    self._store = None  # reconnect on the next write
+                    logger.error(f"❌ Background memory write failed for {len(items)} item(s) of user {user_id}: {e}")
+            # Merges go last so they see this batch's writes
+            for user_id, memories in merges.items():
+                try:
+                    self._get_store().merge_many_into_caller_schema(user_id, memories)
+                except Exception as e:
+                    self._store = None
+                    logger.error(f"❌ Background caller schema merge failed for {user_id}: {e}")
+            with self._lock:
+                self._stats["batches"] += 1
+                self._stats["written"] += written
+                self._stats["failed"] += failed
+                self._stats["deduped"] += writes - len(unique)
+                self._stats["schema_merges"] += len(merges)
+                self._pending -= len(batch)
+                if self._pending <= 0:
+                    self._idle.notify_all()
+            logger.info(f"💾 Background memory batch: {written} written, {failed} failed, {writes - len(unique)} deduped, "
+                        f"{len(merges)} schema merge(s)")
+
+    def _write_group(self, user_id: Optional[str], scope: str, items: List[Dict[str, Any]]) -> int:
+        """Write one user's items with a single bulk request; returns the number written."""
+        store = self._get_store()
+        if scope == "user" and user_id:
+            store.write_many(
+                [{"type": i["type"], "key": i["key"], "value": i["value"], "ttl_days": i.get("ttl_days", 365)}
+                 for i in items],
+                user_id=user_id
+            )
+            return len(items)
+        for item in items:
+            store.write(item["type"], item["key"], item["value"], user_id=user_id, scope=scope,
+                        ttl_days=item.get("ttl_days", 365))
+        return len(items)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["pending"] = self._pending
+        stats["queue_depth"] = self._queue.qsize()
+        return stats
+
+
+_memory_writer: Optional[BackgroundMemoryWriter] = None
+_memory_writer_lock = threading.Lock()
+
+
+def get_memory_writer() -> BackgroundMemoryWriter:
+    """Process-wide background memory writer."""
+    global _memory_writer
+    if _memory_writer is None:
+        with _memory_writer_lock:
+            if _memory_writer is None:
+                _memory_writer = BackgroundMemoryWriter(
+                    batch_size=int(get_setting("memory_writer_batch_size", 20)),
+                    batch_wait_ms=float(get_setting("memory_writer_batch_wait_ms", 50)),
+                )
+    return _memory_writer
@@ -0,0 +1,203 @@
+"""
+Prometheus metrics for the orchestrator (served on GET /metrics).
+
+Covers what capacity planning for concurrent calls needs: per-route request
+latency, active Realtime calls, Twilio media frames in/out, OpenAI event
+lag, AI-Memory call latency, event-loop lag and the hit rates of the
+in-process caches. Labels are kept low-cardinality on purpose - tenant
+(customer_id) at most, never the caller, CallSid or user_id - and
+memory-store paths are normalized so ids do not become label values.
+
+prometheus_client is optional: without it every metric is a no-op and
+/metrics answers 503, so the call path never depends on it.
+"""
+
+import re
+import asyncio
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+
+try:
+    from prometheus_client import Counter, Gauge, Histogram, REGISTRY, generate_latest, CONTENT_TYPE_LATEST
+    from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+    Counter = Gauge = Histogram = None
+    CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+class _NoopMetric:
+    """Stand-in when prometheus_client is not installed."""
+
+    def labels(self, *args, **kwargs):
+        return self
+
+    def inc(self, amount: float = 1):
+        pass
+
+    def dec(self, amount: float = 1):
+        pass
+
+    def set(self, value: float):
+        pass
+
+    def observe(self, value: float):
+        pass
+
+
+def _metric(kind, name: str, documentation: str, labelnames=(), **kwargs):
+    if not PROMETHEUS_AVAILABLE:
+        return _NoopMetric()
+    return kind(name, documentation, labelnames, **kwargs)
+
+
+HTTP_REQUEST_SECONDS = _metric(
+    Histogram, "chatstack_http_request_duration_seconds",
+    "HTTP request latency by route template", ("method", "route", "status"), buckets=LATENCY_BUCKETS)
+REALTIME_ACTIVE_CALLS = _metric(
+    Gauge, "chatstack_realtime_active_calls",
+    "Twilio media streams currently bridged to OpenAI Realtime", ("tenant",))
+TWILIO_MEDIA_FRAMES = _metric(
+    Counter, "chatstack_twilio_media_frames",
+    "Twilio media frames received (in) and sent (out)", ("direction", "tenant"))
+OPENAI_EVENT_LAG_SECONDS = _metric(
+    Histogram, "chatstack_openai_event_lag_seconds",
+    "Time from an OpenAI Realtime audio event arriving to its frame being written to Twilio",
+    buckets=LAG_BUCKETS)
+REALTIME_RESPONSE_SECONDS = _metric(
+    Histogram, "chatstack_realtime_response_latency_seconds",
+    "Caller stops speaking -> first response audio from OpenAI", ("tenant",), buckets=LATENCY_BUCKETS)
+MEMORY_STORE_SECONDS = _metric(
+    Histogram, "chatstack_memory_store_request_duration_seconds",
+    "AI-Memory HTTP call latency", ("method", "endpoint", "status"), buckets=LATENCY_BUCKETS)
+EVENT_LOOP_LAG_SECONDS = _metric(
+    Histogram, "chatstack_event_loop_lag_seconds",
+    "How late the asyncio event loop ran a scheduled wake-up", buckets=LAG_BUCKETS)
+EVENT_LOOP_BLOCKS = _metric(
+    Counter, "chatstack_event_loop_blocks",
+    "Event-loop stalls over the blocking-diagnostics threshold, by the route that caused them", ("route",))
+MEMORY_CONSOLIDATIONS = _metric(
+    Counter, "chatstack_memory_consolidations",
+    "Background thread-history consolidation jobs by outcome (completed, failed, dropped)", ("outcome",))
+
+
+def tenant_label(customer_id: Any) -> str:
+    """Tenant label value (customer_id, or 'unknown' before the context is resolved)."""
+    return str(customer_id) if customer_id not in (None, "") else "unknown"
+
+
+_ID_SEGMENT = re.compile(r"\d{3,}|@|\+|^[0-9a-fA-F-]{16,}$")
+
+
+def normalize_endpoint(path: str) -> str:
+    """
+    Collapse id-like path segments so a URL is safe as a label value.
+
+    Returns:
+        e.g. /v2/profile/+15551234567 -> /v2/profile/:id
+    """
+    segments = [":id" if (_ID_SEGMENT.search(s) or len(s) > 32) else s for s in path.split("/")]
+    return "/".join(segments) or "/"
+
+
+def observe_memory_store(method: str, path: str, status: Any, seconds: float):
+    """TracedSession observer for HTTPMemoryStore."""
+    MEMORY_STORE_SECONDS.labels(method=method, endpoint=normalize_endpoint(path), status=str(status)).observe(seconds)
+
+
+# -----------------------------------------------------------------------------
+# Cache hit rates
+# -----------------------------------------------------------------------------
+_cache_sources: Dict[str, Callable[[], Dict[str, Any]]] = {}
+_cache_sources_lock = threading.Lock()
+
+
+def register_cache(name: str, stats: Callable[[], Dict[str, Any]]):
+    """
+    Export a cache's hit/miss counters.
+
+    Args:
+        name: Value of the `cache` label
+        stats: Returns the cache's stats() dict (needs "hits" and "misses")
+    """
+    with _cache_sources_lock:
+        _cache_sources[name] = stats
+
+
+class _CacheCollector:
+    """Reads hits/misses from the registered caches at scrape time."""
+
+    def collect(self):
+        hits = CounterMetricFamily("chatstack_cache_hits", "Cache hits", labels=["cache"])
+        misses = CounterMetricFamily("chatstack_cache_misses", "Cache misses", labels=["cache"])
+        with _cache_sources_lock:
+            sources = list(_cache_sources.items())
+        for name, stats in sources:
+            try:
+                values = stats()
+            except Exception as e:
+                logger.warning(f"⚠️ Cache stats for {name} failed: {e}")
+                continue
+            hits.add_metric([name], values.get("hits", 0))
+            misses.add_metric([name], values.get("misses", 0))
+        yield hits
+        yield misses
+
+
+class _RealtimePoolCollector:
+    """Warm pool occupancy (idle / opening sessions vs configured size)."""
+
+    def __init__(self, stats: Callable[[], Dict[str, Any]]):
+        self.stats = stats
+
+    def collect(self):
+        stats = self.stats()
+        pool = GaugeMetricFamily("chatstack_realtime_pool_sessions", "Realtime warm pool sessions", labels=["state"])
+        pool.add_metric(["idle"], stats.get("idle", 0))
+        pool.add_metric(["opening"], stats.get("opening", 0))
+        pool.add_metric(["size"], stats.get("size", 0))
+        yield pool
+
+
+_collectors_registered = False
+
+
+def register_collectors(realtime_pool_stats: Optional[Callable[[], Dict[str, Any]]] = None):
+    """Register the scrape-time collectors once per process."""
+    global _collectors_registered
+    if not PROMETHEUS_AVAILABLE or _collectors_registered:
+        return
+    _collectors_registered = True
+    REGISTRY.register(_CacheCollector())
+    if realtime_pool_stats:
+        REGISTRY.register(_RealtimePoolCollector(realtime_pool_stats))
+
+
+# -----------------------------------------------------------------------------
+# Event loop lag
+# -----------------------------------------------------------------------------
+async def monitor_event_loop_lag(interval: float = 0.25):
+    """
+    Sleep for `interval` in a loop and record how late each wake-up was.
+    Anything blocking the loop (sync I/O, heavy CPU in a handler) shows up here.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        scheduled = loop.time() + interval
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG_SECONDS.observe(max(0.0, loop.time() - scheduled))
+
+
+def render() -> bytes:
+    """Current metrics in the Prometheus text exposition format."""
+    return generate_latest(REGISTRY)
+
@@ -93,13 +93,13 @@ def pack_prompt(
         try:
             from app.http_memory import HTTPMemoryStore
             from app.prompt_templates import build_complete_prompt, get_all_preset_categories
-            from app.main import get_admin_setting
+            from app.main import get_admin_setting_sync
             mem_store = HTTPMemoryStore()
             
             # Load agent_name from admin panel using cached retrieval for speed
             agent_name = settings_cache.get("agent_name")
             if not agent_name:
-                agent_name = get_admin_setting("agent_name", "Amanda")
+                agent_name = get_admin_setting_sync("agent_name", "Amanda")
                 settings_cache.set("agent_name", agent_name)
                 logger.info(f"✅ Loaded agent name from AI-Memory: {agent_name}")
             else:
@@ -215,11 +215,7 @@ def pack_prompt(
                 elif memory["key"] == "user_info" and "name" in memory["value"]:
                     relationship_context = f" (USER'S NAME: {memory['value'].get('name', 'Unknown')})"
             
-            # Highlight Kelly's job information specially
-            if "kelly" in memory['key'].lower() and any(word in str(value).lower() for word in ['teacher', 'job', 'profession']):
-                memory_lines.append(f"*** KELLY'S JOB: {memory['key']} → {summary}{relationship_context} ***")
-            else:
-                memory_lines.append(f"- {memory['type']}:{memory['key']} → {summary}{relationship_context}")
+            memory_lines.append(f"- {memory['type']}:{memory['key']} → {summary}{relationship_context}")
     
     memory_block = "\n".join(memory_lines) if memory_lines else "(none)"
     
@@ -0,0 +1,317 @@
+"""
+Runtime CPU and heap profiling, toggled over HTTP without a restart.
+
+CPU: a sampling profiler thread reads every thread's Python stack via
+sys._current_frames() at a fixed interval - nothing is hooked into the
+profiled code, so overhead is one stack walk per thread per sample. Results
+are collapsed stacks ("thread;outer;...;inner count"), the format
+flamegraph.pl, speedscope and py-spy's raw output use. Samples where a
+thread is parked (lock wait, selector poll, queue get) are dropped unless
+idle stacks are requested, so the profile shows CPU rather than waiting.
+
+Heap: tracemalloc snapshots kept in memory by id, with top allocation
+sites per snapshot and a diff between two snapshots - take one, let traffic
+run, take another, and growing sites (a dict that is never pruned, a
+session store that only grows) rise to the top.
+
+Endpoints are admin-only: they require ADMIN_API_TOKEN as a bearer token
+(or X-Admin-Token) and are disabled while that secret is unset.
+
+The module is self-contained so the orchestrator and AI-Memory ship the
+same copy.
+"""
+
+import os
+import sys
+import hmac
+import time
+import logging
+import threading
+import tracemalloc
+from collections import Counter, OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import Header, HTTPException
+
+from config_loader import get_secret
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAX_PROFILE_SECONDS = 600
+MAX_HEAP_SNAPSHOTS = 6
+
+# Innermost frames of a parked thread: (file suffix, function)
+_IDLE_FRAMES = {
+    ("threading.py", "wait"), ("threading.py", "_wait_for_tstate_lock"), ("threading.py", "join"),
+    ("selectors.py", "select"), ("queue.py", "get"), ("socket.py", "accept"),
+    ("socket.py", "readinto"), ("ssl.py", "read"), ("ssl.py", "recv_into"), ("_base.py", "result"),
+    ("connection.py", "wait"), ("synchronize.py", "__enter__"), ("thread.py", "_worker"),
+}
+
+
+def admin_token_error(authorization: Optional[str], x_admin_token: Optional[str]) -> Optional[Tuple[int, str]]:
+    """(status, detail) if the request doesn't carry ADMIN_API_TOKEN, else None (framework-neutral)."""
+    expected = get_secret("ADMIN_API_TOKEN")
+    if not expected:
+        return 503, "Admin endpoints are disabled - set ADMIN_API_TOKEN"
+    supplied = x_admin_token or ""
+    if authorization and authorization.lower().startswith("bearer "):
+        supplied = authorization[7:].strip()
+    if not supplied or not hmac.compare_digest(supplied.encode(), expected.encode()):
+        return 401, "Admin token required"
+    return None
+
+
+def verify_admin_token(authorization: Optional[str] = Header(None),
+                       x_admin_token: Optional[str] = Header(None)):
+    """FastAPI dependency: require ADMIN_API_TOKEN (Bearer or X-Admin-Token)."""
+    error = admin_token_error(authorization, x_admin_token)
+    if error:
+        raise HTTPException(status_code=error[0], detail=error[1])
+
+
+def _short_path(filename: str) -> str:
+    if filename.startswith(REPO_ROOT):
+        return os.path.relpath(filename, REPO_ROOT)
+    marker = "site-packages" + os.sep
+    if marker in filename:
+        return filename.split(marker, 1)[1]
+    return os.path.basename(filename)
+
+
+def _frame_label(frame, lines: bool) -> str:
+    code = frame.f_code
+    where = f"{_short_path(code.co_filename)}:{frame.f_lineno}" if lines else _short_path(code.co_filename)
+    return f"{code.co_qualname} ({where})"
+
+
+def _is_idle(frame) -> bool:
+    name = frame.f_code.co_name
+    filename = frame.f_code.co_filename
+    return any(filename.endswith(suffix) and name == func for suffix, func in _IDLE_FRAMES)
+
+
+class SamplingProfiler:
+    """
+    Wall-clock stack sampler over all threads of this process.
+
+    Args:
+        interval_ms: Time between samples
+        include_idle: Keep samples of parked threads (wall-clock instead of CPU view)
+        lines: Label frames with line numbers (finer, larger output)
+    """
+
+    def __init__(self, interval_ms: float = 10, include_idle: bool = False, lines: bool = False):
+        self.interval = max(1.0, interval_ms) / 1000
+        self.include_idle = include_idle
+        self.lines = lines
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.idle_samples = 0
+        self.started_at: Optional[float] = None
+        self.stopped_at: Optional[float] = None
+        self._deadline = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, duration_seconds: float = 60):
+        self.started_at = time.time()
+        self._deadline = time.monotonic() + min(duration_seconds, MAX_PROFILE_SECONDS)
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2)
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            if time.monotonic() >= self._deadline:
+                break
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                if not self.include_idle and _is_idle(frame):
+                    self.idle_samples += 1
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame, self.lines))
+                    frame = frame.f_back
+                labels.append(f"thread:{names.get(thread_id, thread_id)}")
+                self.stacks[";".join(reversed(labels))] += 1
+                self.samples += 1
+        self.stopped_at = time.time()
+
+    def collapsed(self) -> str:
+        """Flamegraph input: one "frame;frame;frame count" line per distinct stack."""
+        stacks = Counter(dict(self.stacks))  # C-level copy - the sampler thread keeps adding
+        return "\n".join(f"{stack} {count}" for stack, count in stacks.most_common()) + "\n"
+
+    def summary(self, limit: int = 25) -> Dict[str, Any]:
+        """Top functions by self time (innermost frame) and by total time (anywhere on the stack)."""
+        self_counts: Counter = Counter()
+        total_counts: Counter = Counter()
+        for stack, count in dict(self.stacks).items():
+            frames = stack.split(";")[1:]
+            if not frames:
+                continue
+            self_counts[frames[-1]] += count
+            for label in set(frames):
+                total_counts[label] += count
+        samples = max(1, self.samples)
+        end = self.stopped_at or time.time()
+        return {
+            "running": self.running,
+            "interval_ms": self.interval * 1000,
+            "include_idle": self.include_idle,
+            "seconds": round(end - self.started_at, 1) if self.started_at else 0,
+            "samples": self.samples,
+            "idle_samples": self.idle_samples,
+            "distinct_stacks": len(self.stacks),
+            "top_self": [{"frame": f, "samples": c, "percent": round(100 * c / samples, 1)}
+                         for f, c in self_counts.most_common(limit)],
+            "top_total": [{"frame": f, "samples": c, "percent": round(100 * c / samples, 1)}
+                          for f, c in total_counts.most_common(limit)],
+        }
+
+
+class HeapProfiler:
+    """tracemalloc control plus a small store of numbered snapshots."""
+
+    def __init__(self):
+        self.snapshots: "OrderedDict[int, Tuple[float, str, tracemalloc.Snapshot]]" = OrderedDict()
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def start(self, frames: int = 10) -> Dict[str, Any]:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        return self.status()
+
+    def stop(self) -> Dict[str, Any]:
+        tracemalloc.stop()
+        with self._lock:
+            self.snapshots.clear()
+        return self.status()
+
+    def status(self) -> Dict[str, Any]:
+        tracing = tracemalloc.is_tracing()
+        current, peak = tracemalloc.get_traced_memory() if tracing else (0, 0)
+        with self._lock:
+            snapshots = [{"id": sid, "taken_at": taken, "label": label} for sid, (taken, label, _) in self.snapshots.items()]
+        return {
+            "tracing": tracing,
+            "frames": tracemalloc.get_traceback_limit() if tracing else 0,
+            "traced_mb": round(current / 1e6, 2),
+            "peak_mb": round(peak / 1e6, 2),
+            "overhead_mb": round(tracemalloc.get_tracemalloc_memory() / 1e6, 2) if tracing else 0,
+            "snapshots": snapshots,
+        }
+
+    def snapshot(self, label: str = "") -> int:
+        """Take a snapshot (oldest is dropped beyond MAX_HEAP_SNAPSHOTS); returns its id."""
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc is not running - start heap profiling first")
+        snap = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),  # the sampler's own stacks
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        ))
+        with self._lock:
+            snapshot_id = self._next_id
+            self._next_id += 1
+            self.snapshots[snapshot_id] = (time.time(), label, snap)
+            while len(self.snapshots) > MAX_HEAP_SNAPSHOTS:
+                self.snapshots.popitem(last=False)
+        return snapshot_id
+
+    def _get(self, snapshot_id: int) -> tracemalloc.Snapshot:
+        with self._lock:
+            entry = self.snapshots.get(snapshot_id)
+        if entry is None:
+            raise KeyError(f"snapshot {snapshot_id} not found")
+        return entry[2]
+
+    def top(self, snapshot_id: int, limit: int = 25, group_by: str = "lineno") -> Dict[str, Any]:
+        """Largest allocation sites of one snapshot."""
+        snap = self._get(snapshot_id)
+        stats = snap.statistics(group_by)
+        return {
+            "id": snapshot_id,
+            "group_by": group_by,
+            "total_mb": round(sum(s.size for s in stats) / 1e6, 2),
+            "top": [_stat_dict(s) for s in stats[:limit]],
+        }
+
+    def diff(self, base_id: int, target_id: int, limit: int = 25, group_by: str = "lineno") -> Dict[str, Any]:
+        """Allocation sites that grew most between two snapshots."""
+        stats = self._get(target_id).compare_to(self._get(base_id), group_by)
+        return {
+            "base": base_id,
+            "target": target_id,
+            "group_by": group_by,
+            "size_diff_mb": round(sum(s.size_diff for s in stats) / 1e6, 2),
+            "top": [dict(_stat_dict(s), size_diff_kb=round(s.size_diff / 1024, 1), count_diff=s.count_diff)
+                    for s in stats[:limit]],
+        }
+
+
+def _stat_dict(stat) -> Dict[str, Any]:
+    # tracemalloc orders oldest first; report the allocating line first
+    frames = [f"{_short_path(frame.filename)}:{frame.lineno}" for frame in reversed(stat.traceback)]
+    return {"site": frames[0] if frames else "?", "size_kb": round(stat.size / 1024, 1),
+            "count": stat.count, "traceback": frames}
+
+
+_cpu_profiler: Optional[SamplingProfiler] = None
+_heap_profiler: Optional[HeapProfiler] = None
+_profiler_lock = threading.Lock()
+
+
+def start_cpu_profile(interval_ms: float = 10, duration_seconds: float = 60,
+                      include_idle: bool = False, lines: bool = False) -> Dict[str, Any]:
+    """Start a new CPU profile (replaces the previous result); stops itself after duration_seconds."""
+    global _cpu_profiler
+    with _profiler_lock:
+        if _cpu_profiler and _cpu_profiler.running:
+            raise RuntimeError("a CPU profile is already running")
+        _cpu_profiler = SamplingProfiler(interval_ms, include_idle=include_idle, lines=lines)
+        _cpu_profiler.start(duration_seconds)
+    logger.info(f"🔬 CPU profiling started ({interval_ms}ms interval, up to {min(duration_seconds, MAX_PROFILE_SECONDS):.0f}s)")
+    return _cpu_profiler.summary(limit=0)
+
+
+def stop_cpu_profile() -> Optional[SamplingProfiler]:
+    with _profiler_lock:
+        profiler = _cpu_profiler
+    if profiler:
+        profiler.stop()
+        logger.info(f"🔬 CPU profiling stopped ({profiler.samples} samples)")
+    return profiler
+
+
+def get_cpu_profile() -> Optional[SamplingProfiler]:
+    """Current or most recent CPU profile."""
+    return _cpu_profiler
+
+
+def get_heap_profiler() -> HeapProfiler:
+    """Process-wide (per-worker) heap profiler."""
+    global _heap_profiler
+    if _heap_profiler is None:
+        with _profiler_lock:
+            if _heap_profiler is None:
+                _heap_profiler = HeapProfiler()
+    return _heap_profiler
@@ -0,0 +1,277 @@
+"""
+Warm pool of pre-connected OpenAI Realtime WebSocket sessions.
+
+Opening a Realtime session costs a DNS lookup, TLS and WebSocket handshakes
+and the auth round trip before session.update can even be sent - and
+media_stream_endpoint used to pay all of it after Twilio's "start" event,
+while the caller listened to silence. The pool keeps a few sessions open
+and authenticated ahead of time; at call start OAIRealtime takes one, binds
+its event handlers to it and only sends the caller-specific session.update.
+
+Pooled sessions are single-use: a session that served a call is closed
+with the call (it carries that conversation), and the pool opens a
+replacement in the background. Idle sessions are kept alive with WebSocket
+pings and recycled after realtime_pool_idle_timeout_seconds so a handed-out
+session is never close to OpenAI's maximum session duration.
+"""
+
+import time
+import logging
+import threading
+from collections import deque
+from typing import Deque, Dict, Any, Optional
+
+from websocket import WebSocketApp
+
+from config_loader import get_secret, get_setting
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MAX_RETRY_BACKOFF_SECONDS = 60
+
+
+def realtime_url_and_headers():
+    """Realtime endpoint for the configured model, plus auth headers."""
+    model = get_setting("realtime_model", "gpt-realtime")
+    headers = [
+        f"Authorization: Bearer {get_secret('OPENAI_API_KEY')}",
+        "OpenAI-Beta: realtime=v1"
+    ]
+    base_url = get_setting("openai_realtime_url", "wss://api.openai.com/v1/realtime")
+    return model, f"{base_url}?model={model}", headers
+
+
+class PooledRealtimeConnection:
+    """
+    One pre-opened Realtime WebSocket. Events are swallowed while idle and
+    forwarded to the bound listener (an OAIRealtime) once a call takes it.
+    """
+
+    def __init__(self, model: str, url: str, headers, ping_interval: float):
+        self.model = model
+        self.listener = None
+        self.session_id: Optional[str] = None
+        self.created_at = time.time()
+        self.opened = threading.Event()
+        self.closed = threading.Event()
+        self.ws = WebSocketApp(
+            url,
+            header=headers,
+            on_open=self._on_open,
+            on_message=self._on_message,
+            on_error=self._on_error,
+            on_close=self._on_close
+        )
+        self._thread = threading.Thread(
+            target=self.ws.run_forever,
+            kwargs={"ping_interval": ping_interval, "ping_timeout": min(10, ping_interval / 2)},
+            name="realtime-pool-conn",
+            daemon=True
+        )
+
+    def start(self):
+        self._thread.start()
+
+    def bind(self, listener):
+        """Route all further events to listener._on_message / _on_error / _on_close."""
+        self.listener = listener
+
+    @property
+    def healthy(self) -> bool:
+        return self.opened.is_set() and not self.closed.is_set()
+
+    def _on_open(self, ws):
+        self.opened.set()
+
+    def _on_message(self, ws, msg):
+        if self.listener:
+            self.listener._on_message(ws, msg)
+        elif '"session.created"' in msg:
+            try:
+                import json
+                self.session_id = json.loads(msg).get("session", {}).get("id")
+            except Exception:
+                pass
+        elif '"error"' in msg:
+            logger.warning(f"⚠️ Idle Realtime session reported an error: {msg[:200]}")
+
+    def _on_error(self, ws, err):
+        if self.listener:
+            self.listener._on_error(ws, err)
+        else:
+            logger.warning(f"⚠️ Idle Realtime session error: {err}")
+
+    def _on_close(self, ws, *args):
+        self.closed.set()
+        if self.listener:
+            self.listener._on_close(ws, *args)
+
+    def close(self):
+        self.closed.set()
+        try:
+            self.ws.close()
+        except Exception:
+            pass
+
+
+class RealtimeSessionPool:
+    """
+    Keeps `size` idle, authenticated Realtime sessions ready per worker.
+    """
+
+    def __init__(self, size: int = 2, idle_timeout_seconds: float = 600, ping_interval_seconds: float = 20,
+                 connect_timeout_seconds: float = 5):
+        self.size = size
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self.ping_interval_seconds = ping_interval_seconds
+        self.connect_timeout_seconds = connect_timeout_seconds
+        self._idle: Deque[PooledRealtimeConnection] = deque()
+        self._opening = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._failures = 0
+        self._retry_at = 0.0
+        self._stats = {"hits": 0, "misses": 0, "opened": 0, "open_failures": 0, "recycled": 0}
+
+    def start(self):
+        """Start the background maintainer (no-op if the pool is disabled)."""
+        if self.size <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="realtime-pool", daemon=True)
+        self._thread.start()
+        logger.info(f"🏊 Realtime warm pool started (size={self.size}, idle_timeout={self.idle_timeout_seconds:.0f}s)")
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for conn in idle:
+            conn.close()
+
+    def acquire(self) -> Optional[PooledRealtimeConnection]:
+        """
+        Take a ready session for a call.
+
+        Returns:
+            An open, authenticated connection (caller must bind() it and send
+            session.update), or None if none is ready - the caller then
+            connects directly.
+        """
+        if self.size <= 0:
+            return None
+        model = get_setting("realtime_model", "gpt-realtime")
+        stale = []
+        conn = None
+        with self._lock:
+            while self._idle:
+                candidate = self._idle.pop()  # newest first: most session lifetime left
+                if candidate.healthy and candidate.model == model and not self._expired(candidate):
+                    conn = candidate
+                    break
+                stale.append(candidate)
+            if conn:
+                self._stats["hits"] += 1
+            else:
+                self._stats["misses"] += 1
+            self._stats["recycled"] += len(stale)
+        for candidate in stale:
+            candidate.close()
+        self._wake.set()  # refill in the background
+        return conn
+
+    def _expired(self, conn: PooledRealtimeConnection) -> bool:
+        return time.time() - conn.created_at > self.idle_timeout_seconds
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._prune()
+            self._fill()
+            self._wake.wait(timeout=self.ping_interval_seconds)
+            self._wake.clear()
+
+    def _prune(self):
+        """Close dead, expired or wrong-model idle sessions."""
+        model = get_setting("realtime_model", "gpt-realtime")
+        with self._lock:
+            keep, drop = deque(), []
+            for conn in self._idle:
+                if conn.healthy and conn.model == model and not self._expired(conn):
+                    keep.append(conn)
+                else:
+                    drop.append(conn)
+            self._idle = keep
+            self._stats["recycled"] += len(drop)
+        for conn in drop:
+            conn.close()
+
+    def _fill(self):
+        if time.time() < self._retry_at:
+            return
+        with self._lock:
+            needed = self.size - len(self._idle) - self._opening
+            if needed <= 0:
+                return
+            self._opening += needed
+        for _ in range(needed):
+            threading.Thread(target=self._open_one, name="realtime-pool-open", daemon=True).start()
+
+    def _open_one(self):
+        try:
+            model, url, headers = realtime_url_and_headers()
+            conn = PooledRealtimeConnection(model, url, headers, self.ping_interval_seconds)
+            started = time.time()
+            conn.start()
+            if conn.opened.wait(self.connect_timeout_seconds) and conn.healthy:
+                with self._lock:
+                    self._idle.append(conn)
+                    self._stats["opened"] += 1
+                    self._failures = 0
+                logger.info(f"🏊 Realtime session pre-connected in {time.time() - started:.2f}s")
+            else:
+                conn.close()
+                self._record_failure("handshake timed out")
+        except Exception as e:
+            self._record_failure(str(e))
+        finally:
+            with self._lock:
+                self._opening -= 1
+
+    def _record_failure(self, reason: str):
+        with self._lock:
+            self._stats["open_failures"] += 1
+            self._failures += 1
+            backoff = min(MAX_RETRY_BACKOFF_SECONDS, 2 ** self._failures)
+            self._retry_at = time.time() + backoff
+        logger.warning(f"⚠️ Realtime pool connect failed ({reason}), retrying in {backoff}s")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["idle"] = len(self._idle)
+            stats["opening"] = self._opening
+        stats["size"] = self.size
+        stats["idle_timeout_seconds"] = self.idle_timeout_seconds
+        return stats
+
+
+_realtime_pool: Optional[RealtimeSessionPool] = None
+_realtime_pool_lock = threading.Lock()
+
+
+def get_realtime_pool() -> RealtimeSessionPool:
+    """Process-wide (per-worker) Realtime warm pool."""
+    global _realtime_pool
+    if _realtime_pool is None:
+        with _realtime_pool_lock:
+            if _realtime_pool is None:
+                _realtime_pool = RealtimeSessionPool(
+                    size=int(get_setting("realtime_pool_size", 2)),
+                    idle_timeout_seconds=float(get_setting("realtime_pool_idle_timeout_seconds", 600)),
+                    ping_interval_seconds=float(get_setting("realtime_pool_ping_interval_seconds", 20)),
+                )
+    return _realtime_pool
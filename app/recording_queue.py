@@ -0,0 +1,326 @@
+"""
+Background download queue for Twilio call recordings.
+
+/recording-complete used to stream the MP3 (up to 100 MB) inside the
+webhook request, holding one of the web app's four threads for as long as
+the download took and risking Twilio's webhook timeout and retries. The
+webhook now only enqueues the job:
+
+    get_recording_queue().enqueue(call_sid, recording_sid, recording_url)
+
+Jobs live in a small SQLite table (so queued and half-finished downloads
+survive a restart) and are worked by a bounded pool of threads. Downloads
+are written to <call_sid>.mp3.part and resumed with an HTTP Range request
+after a failure; the finished file is checked against the advertised size
+(and the MD5 ETag when the storage backend provides one) before being
+renamed to <call_sid>.mp3. Failed attempts are retried with exponential
+backoff.
+"""
+
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import deque
+from typing import Dict, Any, Optional, Tuple
+
+from config_loader import get_setting
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MAX_RECORDING_BYTES = 100 * 1024 * 1024  # 100MB
+CHUNK_SIZE = 64 * 1024
+THROUGHPUT_WINDOW = 50  # completed downloads averaged in stats()
+
+_MD5_ETAG_RE = re.compile(r'^"?([0-9a-f]{32})"?$')
+
+
+class PermanentDownloadError(Exception):
+    """Download can't succeed by retrying (too large, bad checksum on a fresh download...)."""
+
+
+class RecordingDownloadQueue:
+    """
+    Persistent queue of recording downloads with a bounded worker pool.
+    """
+
+    def __init__(self, db_path: str, dest_dir: str, auth: Tuple[str, str], workers: int = 2,
+                 max_attempts: int = 6, retry_base_seconds: float = 5):
+        self.db_path = db_path
+        self.dest_dir = dest_dir
+        self.auth = auth
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        os.makedirs(dest_dir, exist_ok=True)
+        self._local = threading.local()
+        self._claim_lock = threading.Lock()
+        self._wake = threading.Condition()
+        self._threads = []
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._in_flight = 0
+        self._recent = deque(maxlen=THROUGHPUT_WINDOW)  # (bytes, seconds) of completed downloads
+        self._stats = {"enqueued": 0, "completed": 0, "failed": 0, "retries": 0, "resumed": 0, "bytes_downloaded": 0}
+
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS recording_jobs (
+                recording_sid TEXT PRIMARY KEY,
+                call_sid TEXT NOT NULL,
+                url TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL,
+                bytes INTEGER,
+                sha256 TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                completed_at REAL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_recording_jobs_due ON recording_jobs (status, next_attempt_at)")
+        # Downloads interrupted by a restart resume from their .part file
+        conn.execute("UPDATE recording_jobs SET status = 'pending' WHERE status = 'downloading'")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5.0, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def start(self):
+        """Start the worker threads (idempotent)."""
+        with self._start_lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f"recording-download-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        logger.info(f"🎙️ Recording download queue started ({self.workers} workers, {self.depth()} queued)")
+
+    def enqueue(self, call_sid: str, recording_sid: str, recording_url: str) -> bool:
+        """
+        Queue a recording for download (Twilio retries of the same recording are ignored).
+
+        Returns:
+            True if a new job was queued
+        """
+        cursor = self._connect().execute(
+            "INSERT OR IGNORE INTO recording_jobs (recording_sid, call_sid, url, status, next_attempt_at, created_at) "
+            "VALUES (?, ?, ?, 'pending', ?, ?)",
+            (recording_sid or call_sid, call_sid, f"{recording_url}.mp3", time.time(), time.time())
+        )
+        if cursor.rowcount > 0:
+            with self._stats_lock:
+                self._stats["enqueued"] += 1
+            with self._wake:
+                self._wake.notify()
+            return True
+        return False
+
+    def depth(self) -> int:
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM recording_jobs WHERE status IN ('pending', 'downloading')"
+        ).fetchone()[0]
+
+    def _claim(self) -> Tuple[Optional[Dict[str, Any]], float]:
+        """Take the next due job; otherwise return how long until one is due."""
+        now = time.time()
+        with self._claim_lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT * FROM recording_jobs WHERE status = 'pending' ORDER BY next_attempt_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None, 60.0
+            if row["next_attempt_at"] > now:
+                return None, row["next_attempt_at"] - now
+            conn.execute(
+                "UPDATE recording_jobs SET status = 'downloading', attempts = attempts + 1 WHERE recording_sid = ?",
+                (row["recording_sid"],)
+            )
+            return dict(row), 0.0
+
+    def _worker(self):
+        while True:
+            job, wait = self._claim()
+            if job is None:
+                with self._wake:
+                    self._wake.wait(timeout=min(wait, 60.0))
+                continue
+            with self._stats_lock:
+                self._in_flight += 1
+            try:
+                self._run_job(job)
+            finally:
+                with self._stats_lock:
+                    self._in_flight -= 1
+
+    def _run_job(self, job: Dict[str, Any]):
+        conn = self._connect()
+        attempts = job["attempts"] + 1
+        started = time.time()
+        try:
+            size, sha256, downloaded = self._download(job)
+        except Exception as e:
+            permanent = isinstance(e, PermanentDownloadError) or attempts >= self.max_attempts
+            if permanent:
+                conn.execute(
+                    "UPDATE recording_jobs SET status = 'failed', error = ?, completed_at = ? WHERE recording_sid = ?",
+                    (str(e), time.time(), job["recording_sid"])
+                )
+                with self._stats_lock:
+                    self._stats["failed"] += 1
+                logger.error(f"❌ Recording {job['recording_sid']} failed after {attempts} attempts: {e}")
+            else:
+                delay = self.retry_base_seconds * (2 ** (attempts - 1))
+                conn.execute(
+                    "UPDATE recording_jobs SET status = 'pending', error = ?, next_attempt_at = ? WHERE recording_sid = ?",
+                    (str(e), time.time() + delay, job["recording_sid"])
+                )
+                with self._stats_lock:
+                    self._stats["retries"] += 1
+                logger.warning(f"⚠️ Recording {job['recording_sid']} attempt {attempts} failed ({e}), retrying in {delay:.0f}s")
+            return
+
+        elapsed = time.time() - started
+        conn.execute(
+            "UPDATE recording_jobs SET status = 'done', bytes = ?, sha256 = ?, error = NULL, completed_at = ? "
+            "WHERE recording_sid = ?",
+            (size, sha256, time.time(), job["recording_sid"])
+        )
+        with self._stats_lock:
+            self._stats["completed"] += 1
+            self._stats["bytes_downloaded"] += downloaded
+            self._recent.append((downloaded, elapsed))
+        logger.info(f"✅ Recording saved: {job['call_sid']}.mp3 ({size} bytes, {elapsed:.1f}s)")
+
+    def _download(self, job: Dict[str, Any]) -> Tuple[int, str, int]:
+        """
+        Stream (or resume) one recording into dest_dir.
+
+        Returns:
+            (final size, sha256 hex, bytes transferred by this attempt)
+        """
+        import requests
+
+        final_path = os.path.join(self.dest_dir, f"{job['call_sid']}.mp3")
+        part_path = f"{final_path}.part"
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+
+        response = requests.get(job["url"], auth=self.auth, headers=headers, stream=True, timeout=(5, 30))
+        try:
+            if response.status_code == 416 and offset:
+                # Everything was already downloaded before the last attempt was cut off
+                expected_size, etag = offset, None
+                mode = 'ab'
+            elif response.status_code == 206 and offset:
+                expected_size = _content_range_total(response.headers.get("Content-Range"))
+                etag = response.headers.get("ETag")
+                mode = 'ab'
+                with self._stats_lock:
+                    self._stats["resumed"] += 1
+                logger.info(f"⏯️ Resuming recording {job['recording_sid']} at {offset} bytes")
+            elif response.status_code == 200:
+                content_length = response.headers.get("Content-Length")
+                expected_size = int(content_length) if content_length else None
+                etag = response.headers.get("ETag")
+                offset, mode = 0, 'wb'
+            else:
+                raise RuntimeError(f"HTTP {response.status_code}")
+
+            if expected_size and expected_size > MAX_RECORDING_BYTES:
+                raise PermanentDownloadError(f"Recording too large ({expected_size} bytes)")
+
+            downloaded = 0
+            with open(part_path, mode) as f:
+                if response.status_code != 416:
+                    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                        if offset + downloaded + len(chunk) > MAX_RECORDING_BYTES:
+                            f.close()
+                            os.remove(part_path)
+                            raise PermanentDownloadError(f"Recording too large (>{MAX_RECORDING_BYTES} bytes)")
+                        f.write(chunk)
+                        downloaded += len(chunk)
+        finally:
+            response.close()
+
+        size = os.path.getsize(part_path)
+        if expected_size is not None and size != expected_size:
+            raise RuntimeError(f"Incomplete download ({size} of {expected_size} bytes)")
+        sha256, md5 = _file_digests(part_path)
+        match = _MD5_ETAG_RE.match(etag or "")
+        if match and md5 != match.group(1):
+            os.remove(part_path)  # corrupt - start over from scratch
+            raise RuntimeError(f"Checksum mismatch (md5 {md5} != ETag {match.group(1)})")
+
+        os.replace(part_path, final_path)
+        return size, sha256, downloaded
+
+    def stats(self) -> Dict[str, Any]:
+        counts = {row["status"]: row["n"] for row in self._connect().execute(
+            "SELECT status, COUNT(*) AS n FROM recording_jobs GROUP BY status"
+        )}
+        with self._stats_lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = self._in_flight
+            recent_bytes = sum(b for b, _ in self._recent)
+            recent_seconds = sum(s for _, s in self._recent)
+        stats["queue_depth"] = counts.get("pending", 0) + counts.get("downloading", 0)
+        stats["jobs_by_status"] = counts
+        stats["throughput_bytes_per_second"] = round(recent_bytes / recent_seconds) if recent_seconds else 0
+        stats["workers"] = self.workers
+        return stats
+
+
+def _content_range_total(content_range: Optional[str]) -> Optional[int]:
+    """Total size from a "bytes start-end/total" header."""
+    if content_range and "/" in content_range:
+        total = content_range.rsplit("/", 1)[1]
+        if total.isdigit():
+            return int(total)
+    return None
+
+
+def _file_digests(path: str) -> Tuple[str, str]:
+    sha256, md5 = hashlib.sha256(), hashlib.md5()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            sha256.update(block)
+            md5.update(block)
+    return sha256.hexdigest(), md5.hexdigest()
+
+
+_recording_queue: Optional[RecordingDownloadQueue] = None
+_recording_queue_lock = threading.Lock()
+
+
+def get_recording_queue(dest_dir: Optional[str] = None, auth: Optional[Tuple[str, str]] = None) -> RecordingDownloadQueue:
+    """Process-wide recording download queue (dest_dir and auth are needed on first use)."""
+    global _recording_queue
+    if _recording_queue is None:
+        with _recording_queue_lock:
+            if _recording_queue is None:
+                _recording_queue = RecordingDownloadQueue(
+                    db_path=get_setting("recording_queue_db_path", "data/calls/recording_jobs.db"),
+                    dest_dir=dest_dir,
+                    auth=auth,
+                    workers=int(get_setting("recording_download_workers", 2)),
+                    max_attempts=int(get_setting("recording_download_max_attempts", 6)),
+                    retry_base_seconds=float(get_setting("recording_download_retry_base_seconds", 5)),
+                )
+    return _recording_queue
@@ -0,0 +1,270 @@
+"""
+Semantic response cache for repeated caller questions.
+
+Phone traffic is full of near-duplicate turns ("what are your hours?",
+"can you transfer me", greetings). When enabled, chat_completion looks the
+turn up here before packing the prompt and calling the LLM.
+
+Entries are keyed on (tenant, normalized prompt fingerprint, context hash).
+The context hash covers the retrieved memory set and the recent conversation
+turns, so a short follow-up ("yes", "what about tomorrow?") only reuses an
+answer given after the same preceding exchange. A lookup first tries the
+exact fingerprint, then falls back to cosine similarity between hashed
+n-gram embeddings of prompts that share the same context. Each tenant gets its own LRU with a size cap, and entries
+expire after a TTL (capped further by the cache_ttl of any tool that
+produced the answer).
+
+Turns that retrieved user-specific memories are never cached - their answers
+depend on who is calling, not just on what was asked.
+"""
+
+import re
+import time
+import zlib
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from config_loader import get_setting
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+EMBED_DIM = 512
+CONTEXT_MESSAGES = 6  # Preceding messages (3 turns) that feed the context hash
+FILLER_WORDS = {"um", "uh", "er", "uhh", "umm", "hmm", "please", "okay", "ok"}
+
+_WORD_RE = re.compile(r"[a-z0-9']+")
+
+
+def normalize_prompt(text: str) -> str:
+    """Lowercase, strip punctuation and filler words, collapse whitespace."""
+    words = [w.strip("'") for w in _WORD_RE.findall(text.lower())]
+    return " ".join(w for w in words if w and w not in FILLER_WORDS)
+
+
+def prompt_fingerprint(normalized: str) -> str:
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def embed_prompt(normalized: str) -> np.ndarray:
+    """
+    Hashed bag-of-n-grams embedding (words, word bigrams, char trigrams).
+
+    Local and deterministic, so a lookup costs microseconds rather than an
+    embedding API round trip.
+    """
+    vec = np.zeros(EMBED_DIM, dtype=np.float32)
+    words = normalized.split()
+    features = list(words)
+    features.extend(f"{a} {b}" for a, b in zip(words, words[1:]))
+    for w in words:
+        padded = f"#{w}#"
+        features.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+    for feature in features:
+        h = zlib.crc32(feature.encode("utf-8"))
+        vec[h % EMBED_DIM] += 1.0 if (h >> 16) & 1 else -1.0
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm > 0 else vec
+
+
+def memory_context_hash(memories: List[Dict[str, Any]], extra: str = "") -> str:
+    """Stable hash of the retrieved memory set (ids/keys) plus any extra context."""
+    parts = sorted(str(m.get("id") or f"{m.get('type')}:{m.get('key')}") for m in memories if isinstance(m, dict))
+    parts.append(extra)
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
+
+
+def conversation_hash(messages: List[Dict[str, Any]], max_messages: int = CONTEXT_MESSAGES) -> str:
+    """Stable hash of the last few messages before the current user message (role + normalized text)."""
+    recent = messages[-max_messages:] if max_messages > 0 else []
+    parts = [f"{m.get('role')}:{normalize_prompt(str(m.get('content') or ''))}" for m in recent]
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
+
+
+def has_user_specific_memories(memories: List[Dict[str, Any]]) -> bool:
+    """True if any retrieved memory belongs to a specific caller (scope user)."""
+    for m in memories:
+        if not isinstance(m, dict):
+            continue
+        if m.get("scope", "user") not in ("shared", "global"):
+            return True
+    return False
+
+
+class ResponseCache:
+    """
+    Per-tenant LRU of LLM responses with exact and semantic lookup.
+    """
+
+    def __init__(self, max_entries_per_tenant: int = 256, ttl_seconds: float = 600,
+                 similarity_threshold: float = 0.85):
+        self.max_entries_per_tenant = max_entries_per_tenant
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self._tenants: Dict[str, "OrderedDict[str, Dict[str, Any]]"] = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "semantic_hits": 0,
+            "misses": 0,
+            "bypasses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "expired": 0,
+            "latency_saved_ms": 0.0,
+        }
+
+    def _entry_key(self, fingerprint: str, context_hash: str) -> str:
+        return f"{fingerprint}:{context_hash}"
+
+    def lookup(self, tenant: str, prompt: str, context_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Find a cached response for this turn.
+
+        Args:
+            tenant: Tenant namespace (e.g. customer id)
+            prompt: Latest user message
+            context_hash: Hash of the retrieved memories and recent conversation
+
+        Returns:
+            Cached entry dict (response, similarity, latency_ms) or None on miss
+        """
+        normalized = normalize_prompt(prompt)
+        if not normalized:
+            return None
+        key = self._entry_key(prompt_fingerprint(normalized), context_hash)
+        now = time.time()
+
+        with self._lock:
+            entries = self._tenants.get(tenant)
+            if not entries:
+                self._stats["misses"] += 1
+                return None
+
+            entry = entries.get(key)
+            similarity = 1.0
+            if entry is None:
+                query_vec = embed_prompt(normalized)
+                best_sim = 0.0
+                for candidate in entries.values():
+                    if candidate["context_hash"] != context_hash or candidate["expires_at"] <= now:
+                        continue
+                    sim = float(np.dot(query_vec, candidate["vector"]))
+                    if sim > best_sim:
+                        best_sim, entry = sim, candidate
+                if entry is None or best_sim < self.similarity_threshold:
+                    self._stats["misses"] += 1
+                    return None
+                similarity = best_sim
+                self._stats["semantic_hits"] += 1
+
+            if entry["expires_at"] <= now:
+                entries.pop(entry["key"], None)
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return None
+
+            entries.move_to_end(entry["key"])
+            entry["hits"] += 1
+            self._stats["hits"] += 1
+            self._stats["latency_saved_ms"] += entry["latency_ms"]
+            return {
+                "response": entry["response"],
+                "similarity": similarity,
+                "latency_ms": entry["latency_ms"],
+                "cached_prompt": entry["prompt"],
+            }
+
+    def store(self, tenant: str, prompt: str, context_hash: str, response: Dict[str, Any],
+              latency_ms: float, ttl_seconds: Optional[float] = None):
+        """
+        Cache a computed response.
+
+        Args:
+            tenant: Tenant namespace
+            prompt: Latest user message
+            context_hash: Hash of the retrieved memories and recent conversation
+            response: Response payload to replay on a hit
+            latency_ms: Time it took to compute the response (reported as saved on hits)
+            ttl_seconds: Optional TTL override (capped at the cache TTL)
+        """
+        normalized = normalize_prompt(prompt)
+        if not normalized:
+            return
+        ttl = self.ttl_seconds if ttl_seconds is None else min(ttl_seconds, self.ttl_seconds)
+        if ttl <= 0:
+            return
+        key = self._entry_key(prompt_fingerprint(normalized), context_hash)
+
+        entry = {
+            "key": key,
+            "prompt": normalized,
+            "vector": embed_prompt(normalized),
+            "context_hash": context_hash,
+            "response": response,
+            "latency_ms": latency_ms,
+            "expires_at": time.time() + ttl,
+            "hits": 0,
+        }
+        with self._lock:
+            entries = self._tenants.setdefault(tenant, OrderedDict())
+            entries[key] = entry
+            entries.move_to_end(key)
+            self._stats["stores"] += 1
+            while len(entries) > self.max_entries_per_tenant:
+                entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def record_bypass(self):
+        with self._lock:
+            self._stats["bypasses"] += 1
+
+    def clear(self, tenant: Optional[str] = None) -> int:
+        """Drop all entries (or one tenant's). Returns the number removed."""
+        with self._lock:
+            if tenant is None:
+                removed = sum(len(e) for e in self._tenants.values())
+                self._tenants.clear()
+            else:
+                removed = len(self._tenants.pop(tenant, {}))
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = {tenant: len(entries) for tenant, entries in self._tenants.items()}
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        stats["latency_saved_ms"] = round(stats["latency_saved_ms"], 1)
+        stats["enabled"] = is_response_cache_enabled()
+        stats["similarity_threshold"] = self.similarity_threshold
+        stats["ttl_seconds"] = self.ttl_seconds
+        return stats
+
+
+def is_response_cache_enabled() -> bool:
+    return bool(get_setting("response_cache_enabled", False))
+
+
+_response_cache: Optional[ResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Process-wide response cache built from config settings."""
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                _response_cache = ResponseCache(
+                    max_entries_per_tenant=int(get_setting("response_cache_max_entries_per_tenant", 256)),
+                    ttl_seconds=float(get_setting("response_cache_ttl_seconds", 600)),
+                    similarity_threshold=float(get_setting("response_cache_similarity_threshold", 0.85)),
+                )
+    return _response_cache
@@ -0,0 +1,228 @@
+"""
+Speculative greeting for the Realtime call flow.
+
+media_stream_endpoint used to greet only after the settings / profile /
+history fetches, the instructions build, the OpenAI connect and a
+response.create - the caller heard nothing for several seconds. The
+greeting text, though, only depends on the tenant templates and the
+caller's name, which /phone/incoming-realtime already knows. So:
+
+    # Flask webhook (background thread, TwiML returns immediately)
+    prepare_speculative_greeting(call_sid, text, voice)
+
+    # Orchestrator, on the Twilio "start" event
+    greeting = claim_speculative_greeting(call_sid, timeout=1.5)
+    if greeting: send greeting["audio"] to Twilio, then configure Realtime
+
+Audio is rendered with OpenAI TTS in the call's Realtime voice as 8kHz
+mu-law (Twilio's native format, no conversion on the hot path) and kept in
+a content-addressed cache under data/greetings, so a repeat caller's
+greeting is ready instantly. A small per-call ticket written next to it is
+the hand-off between the web and orchestrator containers, which share
+./data; it only appears once the audio is complete.
+"""
+
+import os
+import json
+import time
+import audioop
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Any, Iterable, Iterator, Optional
+
+from config_loader import get_secret, get_setting
+from app.tts_cache import TTSCache, tts_cache_key
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+GREETING_AUDIO_DIR = os.path.join("data", "greetings")
+GREETING_AUDIO_EXTENSION = ".ulaw"
+TICKET_DIR = os.path.join(GREETING_AUDIO_DIR, "tickets")
+TICKET_TTL_SECONDS = 300
+
+# Twilio media frames: 8kHz mu-law, one byte per sample
+MULAW_BYTES_PER_SECOND = 8000
+
+
+def time_of_day_greeting(now: Optional[datetime] = None) -> str:
+    hour = (now or datetime.now()).hour
+    if hour < 12:
+        return "Good morning"
+    elif hour < 18:
+        return "Good afternoon"
+    return "Good evening"
+
+
+def compose_greeting(is_callback: bool, user_name: Optional[str], agent_name: str,
+                     existing_template: str, new_template: str,
+                     template_override: Optional[str] = None, now: Optional[datetime] = None) -> str:
+    """
+    Greeting text for a call (same rules in the webhook and the media stream).
+
+    Args:
+        is_callback: Caller has called before
+        user_name: Caller's name, if known
+        agent_name: Agent name to fill in
+        existing_template: existing_user_greeting template
+        new_template: new_caller_greeting template
+        template_override: Tenant greeting_template (used for both cases)
+
+    Returns:
+        Greeting with {agent_name}, {user_name} and {time_greeting} filled in
+    """
+    if is_callback:
+        template = template_override or existing_template
+        return template.replace("{user_name}", user_name or "").replace("{agent_name}", agent_name)
+    template = template_override or new_template
+    return template.replace("{time_greeting}", time_of_day_greeting(now)).replace("{agent_name}", agent_name)
+
+
+def greeting_audio_key(text: str, voice: str) -> str:
+    return tts_cache_key(text, voice, get_setting("speculative_greeting_tts_model", "gpt-4o-mini-tts"),
+                         {"format": "ulaw_8000"})
+
+
+def pcm16_24k_to_mulaw_8k(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Resample streamed 24kHz PCM16 to 8kHz mu-law (keeps resampler state across chunks)."""
+    state = None
+    carry = b""
+    for chunk in chunks:
+        data = carry + chunk
+        usable = len(data) - (len(data) % 2)
+        carry = data[usable:]
+        if not usable:
+            continue
+        pcm8, state = audioop.ratecv(data[:usable], 2, 1, 24000, 8000, state)
+        yield audioop.lin2ulaw(pcm8, 2)
+
+
+def synthesize_greeting(text: str, voice: str) -> Optional[str]:
+    """
+    Render a greeting in a Realtime voice into the greeting cache.
+
+    Returns:
+        Path of the mu-law file, or None if synthesis failed
+    """
+    import requests
+
+    cache = get_greeting_audio_cache()
+    key = greeting_audio_key(text, voice)
+    path = cache.lookup(key)
+    if path:
+        logger.info(f"🔊 Greeting audio cache hit: {key[:12]}")
+        return path
+
+    started = time.time()
+    response = requests.post(
+        "https://api.openai.com/v1/audio/speech",
+        headers={"Authorization": f"Bearer {get_secret('OPENAI_API_KEY')}"},
+        json={
+            "model": get_setting("speculative_greeting_tts_model", "gpt-4o-mini-tts"),
+            "voice": voice,
+            "input": text,
+            "response_format": "pcm"
+        },
+        stream=True,
+        timeout=10
+    )
+    if response.status_code != 200:
+        logger.warning(f"⚠️ Greeting TTS failed ({response.status_code}): {response.text[:200]}")
+        return None
+    path = cache.store(key, pcm16_24k_to_mulaw_8k(response.iter_content(chunk_size=4800)))
+    if path:
+        logger.info(f"🔊 Greeting synthesized in {time.time() - started:.2f}s ({os.path.getsize(path)} bytes)")
+    return path
+
+
+def _ticket_path(call_sid: str) -> str:
+    return os.path.join(TICKET_DIR, f"{call_sid}.json")
+
+
+def prepare_speculative_greeting(call_sid: str, text: str, voice: str) -> bool:
+    """
+    Synthesize (or reuse) the greeting audio and publish it for this call.
+
+    Returns:
+        True if the orchestrator can now claim it
+    """
+    if not call_sid or not text:
+        return False
+    try:
+        path = synthesize_greeting(text, voice)
+        if not path:
+            return False
+        os.makedirs(TICKET_DIR, exist_ok=True)
+        _sweep_tickets()
+        ticket = _ticket_path(call_sid)
+        tmp_path = f"{ticket}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({"text": text, "voice": voice, "audio_key": greeting_audio_key(text, voice),
+                       "created_at": time.time()}, f)
+        os.replace(tmp_path, ticket)
+        return True
+    except Exception as e:
+        logger.warning(f"⚠️ Speculative greeting failed for {call_sid}: {e}")
+        return False
+
+
+def claim_speculative_greeting(call_sid: str, timeout: float) -> Optional[Dict[str, Any]]:
+    """
+    Wait up to timeout seconds for this call's greeting and take it.
+
+    Returns:
+        Dict with text, voice and audio (mu-law 8kHz bytes), or None
+    """
+    if not call_sid:
+        return None
+    ticket = _ticket_path(call_sid)
+    deadline = time.time() + timeout
+    while not os.path.exists(ticket):
+        if time.time() >= deadline:
+            return None
+        time.sleep(0.05)
+    try:
+        with open(ticket, 'r') as f:
+            data = json.load(f)
+        os.remove(ticket)
+        path = get_greeting_audio_cache().lookup(data["audio_key"])
+        if not path:
+            return None
+        with open(path, 'rb') as f:
+            data["audio"] = f.read()
+        return data
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"⚠️ Could not claim speculative greeting for {call_sid}: {e}")
+        return None
+
+
+def _sweep_tickets():
+    """Drop tickets for calls that never claimed them."""
+    cutoff = time.time() - TICKET_TTL_SECONDS
+    for name in os.listdir(TICKET_DIR):
+        path = os.path.join(TICKET_DIR, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
+
+
+_greeting_cache: Optional[TTSCache] = None
+_greeting_cache_lock = threading.Lock()
+
+
+def get_greeting_audio_cache() -> TTSCache:
+    """Process-wide greeting audio cache (shared on disk by web and orchestrator)."""
+    global _greeting_cache
+    if _greeting_cache is None:
+        with _greeting_cache_lock:
+            if _greeting_cache is None:
+                _greeting_cache = TTSCache(
+                    cache_dir=GREETING_AUDIO_DIR,
+                    max_bytes=int(get_setting("speculative_greeting_cache_max_mb", 50)) * 1024 * 1024,
+                    extension=GREETING_AUDIO_EXTENSION,
+                )
+    return _greeting_cache
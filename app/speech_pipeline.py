@@ -0,0 +1,249 @@
+"""
+Sentence pipeline for a Gather-flow speech turn.
+
+TwiML is a complete document, so Twilio can't start playing a reply while
+it is still being written. Instead the reply is cut into sentences as the
+LLM streams it: /phone/process-speech returns as soon as the first sentence
+exists (a <Play> of it plus a <Redirect>), and /phone/continue-turn/<id>
+picks up the sentences generated - and synthesized - while the first one
+was playing.
+
+    turn = start_turn(call_sid, store=call_sessions)
+    # producer thread: turn.add_text(delta) ... turn.finish()
+    sentences, done = turn.wait_for_more(0, timeout=4.0)
+
+The producing worker keeps the live turn in-process. With a shared
+call-session store (sqlite/redis) every new sentence is also published to
+the call's session under "speech_turn", so a /phone/continue-turn request
+that lands on another worker reads the turn from there (SharedSpeechTurn).
+"""
+
+import re
+import time
+import uuid
+import logging
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Turns are dropped this long after they finish (or if the call went away)
+TURN_TTL_SECONDS = 300
+
+# How often another worker re-reads a turn from the shared session store
+SHARED_POLL_SECONDS = 0.1
+
+_SENTENCE_END_RE = re.compile(r"[.!?](?:[\"')\]]*)\s+")
+
+
+class SentenceSplitter:
+    """
+    Incrementally splits streamed text into speakable sentences.
+
+    A sentence ends at . ! or ? followed by whitespace. Fragments shorter
+    than min_chars ("Hi.", "Sure!") are joined with the next sentence so
+    each TTS request is worth its round trip.
+    """
+
+    def __init__(self, min_chars: int = 12):
+        self.min_chars = min_chars
+        self._buffer = ""
+
+    def feed(self, delta: str) -> List[str]:
+        """Add streamed text; returns any sentences completed by it."""
+        self._buffer += delta
+        sentences = []
+        start = 0
+        for match in _SENTENCE_END_RE.finditer(self._buffer):
+            candidate = self._buffer[start:match.end()].strip()
+            if len(candidate) < self.min_chars:
+                continue
+            sentences.append(candidate)
+            start = match.end()
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self) -> Optional[str]:
+        """Whatever is left once the stream has ended."""
+        rest = self._buffer.strip()
+        self._buffer = ""
+        return rest or None
+
+
+class SpeechTurn:
+    """
+    Sentences of one assistant reply, produced by the LLM stream and
+    consumed by TwiML requests.
+    """
+
+    def __init__(self, call_sid: Optional[str], store=None):
+        self.turn_id = uuid.uuid4().hex
+        self.call_sid = call_sid
+        self.sentences: List[str] = []
+        self.done = False
+        self.marks: Dict[str, float] = {"start": time.time()}
+        self._cond = threading.Condition()
+        self._splitter = SentenceSplitter()
+        self._store = store if call_sid else None  # shared call-session store (None = this process only)
+
+    def mark(self, stage: str):
+        """Record when a pipeline stage happened (first occurrence wins)."""
+        self.marks.setdefault(stage, time.time())
+
+    def add_text(self, delta: str):
+        sentences = self._splitter.feed(delta)
+        if sentences:
+            with self._cond:
+                if not self.sentences:
+                    self.mark("first_sentence")
+                self.sentences.extend(sentences)
+                self._cond.notify_all()
+            self._publish()
+
+    def finish(self, fallback_text: Optional[str] = None):
+        """End of the stream: flush the tail (or use fallback_text if nothing was produced)."""
+        rest = self._splitter.flush()
+        with self._cond:
+            if rest:
+                if not self.sentences:
+                    self.mark("first_sentence")
+                self.sentences.append(rest)
+            if not self.sentences and fallback_text:
+                self.mark("first_sentence")
+                self.sentences.append(fallback_text)
+            self.done = True
+            self.mark("llm_done")
+            self._cond.notify_all()
+        self._publish()
+
+    def _publish(self):
+        """Mirror the turn into the call's shared session (single producer thread, so writes stay ordered)."""
+        if self._store is None:
+            return
+        with self._cond:
+            state = {"turn_id": self.turn_id, "sentences": list(self.sentences), "done": self.done,
+                     "started_at": self.marks["start"]}
+
+        def put_turn(session_data):
+            session_data["speech_turn"] = state
+        try:
+            self._store.update(self.call_sid, put_turn)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not publish speech turn {self.turn_id} to the session store: {e}")
+
+    def wait_for_more(self, from_index: int, timeout: float) -> Tuple[List[str], bool]:
+        """
+        Block until there are sentences past from_index or the turn is done.
+
+        Returns:
+            (new sentences, whether the reply is complete)
+        """
+        deadline = time.time() + timeout
+        with self._cond:
+            while len(self.sentences) <= from_index and not self.done:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            return list(self.sentences[from_index:]), self.done
+
+    @property
+    def text(self) -> str:
+        return " ".join(self.sentences)
+
+    def breakdown(self) -> Dict[str, float]:
+        """Seconds from turn start to each recorded stage."""
+        start = self.marks["start"]
+        return {stage: round(at - start, 3) for stage, at in self.marks.items() if stage != "start"}
+
+
+class SharedSpeechTurn:
+    """
+    Read-only view of a turn produced by another worker, polled from the
+    call's session in the shared store.
+    """
+
+    def __init__(self, turn_id: str, call_sid: str, store):
+        self.turn_id = turn_id
+        self.call_sid = call_sid
+        self._store = store
+
+    def state(self) -> Optional[Dict[str, Any]]:
+        """The published turn, or None if the session or turn is gone."""
+        state = (self._store.get(self.call_sid) or {}).get("speech_turn")
+        if not state or state.get("turn_id") != self.turn_id:
+            return None
+        if state.get("started_at", 0) < time.time() - TURN_TTL_SECONDS:
+            return None
+        return state
+
+    def wait_for_more(self, from_index: int, timeout: float) -> Tuple[List[str], bool]:
+        """Same contract as SpeechTurn.wait_for_more (a vanished turn counts as done)."""
+        deadline = time.time() + timeout
+        while True:
+            state = self.state()
+            if state is None:
+                return [], True
+            sentences = state["sentences"]
+            if len(sentences) > from_index or state["done"] or time.time() >= deadline:
+                return list(sentences[from_index:]), state["done"]
+            time.sleep(min(SHARED_POLL_SECONDS, max(deadline - time.time(), 0)))
+
+
+_turns: Dict[str, SpeechTurn] = {}
+_turns_lock = threading.Lock()
+
+
+def _shared(store):
+    """The store if other workers can see it (an in-process store adds nothing)."""
+    return store if store is not None and getattr(store, "backend", "memory") != "memory" else None
+
+
+def start_turn(call_sid: Optional[str], store=None) -> SpeechTurn:
+    """
+    Register a new speech turn (and drop stale ones).
+
+    Args:
+        call_sid: Twilio CallSid
+        store: Call-session store; when shared across workers the turn is published to it
+    """
+    turn = SpeechTurn(call_sid, store=_shared(store))
+    cutoff = time.time() - TURN_TTL_SECONDS
+    with _turns_lock:
+        for turn_id in [t for t, existing in _turns.items() if existing.marks["start"] < cutoff]:
+            _turns.pop(turn_id, None)
+        _turns[turn.turn_id] = turn
+    turn._publish()  # visible to other workers before the first sentence arrives
+    return turn
+
+
+def get_turn(turn_id: str, call_sid: Optional[str] = None, store=None):
+    """
+    A speech turn by id: the live SpeechTurn when this worker produces it,
+    else a SharedSpeechTurn read from the call's session (None if unknown).
+    """
+    with _turns_lock:
+        turn = _turns.get(turn_id)
+    if turn is not None:
+        return turn
+    store = _shared(store)
+    if store is None or not call_sid:
+        return None
+    shared = SharedSpeechTurn(turn_id, call_sid, store)
+    return shared if shared.state() is not None else None
+
+
+def end_turn(turn_id: str, call_sid: Optional[str] = None, store=None):
+    with _turns_lock:
+        _turns.pop(turn_id, None)
+    store = _shared(store)
+    if store is not None and call_sid:
+        def drop_turn(session_data):
+            if (session_data.get("speech_turn") or {}).get("turn_id") == turn_id:
+                session_data.pop("speech_turn", None)
+        try:
+            store.update(call_sid, drop_turn)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not clear speech turn {turn_id} from the session store: {e}")
@@ -1,7 +1,12 @@
+import re
 import json
+import asyncio
 import logging
-from typing import Dict, Any, List, Optional
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Callable
 from datetime import datetime
+from time import time
 from zoneinfo import ZoneInfo
 
 # Configure logging
@@ -60,7 +65,7 @@ TOOL_SCHEMAS = {
         }
     },
     "search_knowledge": {
-        "description": "Search internal knowledge base or documents",
+        "description": "Search the internal knowledge base (policies, coverage rules, office procedures, FAQs). Use this for factual business questions instead of guessing.",
         "parameters": {
             "type": "object",
             "properties": {
@@ -123,13 +128,61 @@ TOOL_SCHEMAS = {
     }
 }
 
+# Execution policy per tool:
+#   timeout   - seconds before an async call is abandoned with an error result
+#   cache_ttl - seconds to reuse results of idempotent tools (0 = never cache)
+#   realtime  - offered to the phone agent's OpenAI Realtime session
+TOOL_POLICIES = {
+    "book_meeting": {"timeout": 10.0, "cache_ttl": 0, "realtime": False},
+    "send_message": {"timeout": 10.0, "cache_ttl": 0, "realtime": False},
+    "search_knowledge": {"timeout": 5.0, "cache_ttl": 60, "realtime": True},
+    "text_to_speech": {"timeout": 15.0, "cache_ttl": 0, "realtime": False},
+    "get_current_time": {"timeout": 2.0, "cache_ttl": 15, "realtime": True},
+}
+
+DEFAULT_TOOL_POLICY = {"timeout": 10.0, "cache_ttl": 0, "realtime": False}
+
+TOOL_CACHE_MAX_ENTRIES = 500
+
 class ToolDispatcher:
     """
-    Tool calling dispatcher with validation and execution.
+    Tool registry and dispatcher with validation, timeouts and result caching.
     """
     
     def __init__(self):
         self.tools = TOOL_SCHEMAS
+        self.policies = TOOL_POLICIES
+        self.handlers: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+            "book_meeting": self._book_meeting,
+            "send_message": self._send_message,
+            "search_knowledge": self._search_knowledge,
+            "text_to_speech": self._text_to_speech,
+            "get_current_time": self._get_current_time,
+        }
+        self._cache: Dict[str, tuple] = {}  # cache_key -> (expires_at, result)
+        self._cache_lock = threading.Lock()
+    
+    def register(self, tool_name: str, schema: Dict[str, Any], handler: Callable[[Dict[str, Any]], Dict[str, Any]],
+                 timeout: float = 10.0, cache_ttl: int = 0, realtime: bool = False):
+        """
+        Register (or replace) a tool.
+        
+        Args:
+            tool_name: Name the model calls the tool by
+            schema: {"description": ..., "parameters": JSON schema}
+            handler: Callable taking validated parameters and returning a result dict
+            timeout: Seconds before an async call is abandoned
+            cache_ttl: Seconds to cache successful results (only for idempotent tools)
+            realtime: Whether to offer the tool to the Realtime phone agent
+        """
+        self.tools[tool_name] = schema
+        self.handlers[tool_name] = handler
+        self.policies[tool_name] = {"timeout": timeout, "cache_ttl": cache_ttl, "realtime": realtime}
+        logger.info(f"🛠️ Registered tool: {tool_name}")
+    
+    def get_policy(self, tool_name: str) -> Dict[str, Any]:
+        """Get the execution policy for a tool."""
+        return self.policies.get(tool_name, DEFAULT_TOOL_POLICY)
         
     def validate_tool_call(self, tool_name: str, parameters: Dict[str, Any]) -> tuple[bool, str]:
         """
@@ -188,23 +241,15 @@ class ToolDispatcher:
             }
         
         try:
-            # Dispatch to appropriate handler
-            if tool_name == "book_meeting":
-                return self._book_meeting(parameters)
-            elif tool_name == "send_message":
-                return self._send_message(parameters)
-            elif tool_name == "search_knowledge":
-                return self._search_knowledge(parameters)
-            elif tool_name == "text_to_speech":
-                return self._text_to_speech(parameters)
-            elif tool_name == "get_current_time":
-                return self._get_current_time(parameters)
-            else:
+            # Dispatch to registered handler
+            handler = self.handlers.get(tool_name)
+            if handler is None:
                 return {
                     "success": False,
                     "result": None,
                     "error": f"Tool {tool_name} not implemented"
                 }
+            return handler(parameters)
                 
         except Exception as e:
             logger.error(f"Tool execution error for {tool_name}: {e}")
@@ -214,6 +259,64 @@ class ToolDispatcher:
                 "error": f"Tool execution failed: {str(e)}"
             }
     
+    async def dispatch_async(self, tool_name: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Dispatch a tool call off the event loop with its per-tool timeout.
+        
+        Successful results of idempotent tools (cache_ttl > 0) are cached by
+        (tool name, parameters).
+        
+        Args:
+            tool_name: Name of the tool to call
+            parameters: Parameters for the tool call
+            
+        Returns:
+            Tool execution result
+        """
+        policy = self.get_policy(tool_name)
+        cache_key = None
+        if policy["cache_ttl"]:
+            cache_key = f"{tool_name}:{json.dumps(parameters, sort_keys=True, default=str)}"
+            cached = self._get_cached(cache_key)
+            if cached is not None:
+                logger.info(f"⚡ Tool cache hit: {tool_name}")
+                return cached
+        
+        try:
+            result = await asyncio.wait_for(
+                asyncio.to_thread(self.dispatch, tool_name, parameters),
+                timeout=policy["timeout"]
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"⚠️ Tool {tool_name} timed out after {policy['timeout']}s")
+            return {
+                "success": False,
+                "result": None,
+                "error": f"Tool {tool_name} timed out after {policy['timeout']}s"
+            }
+        
+        if cache_key and result.get("success"):
+            self._set_cached(cache_key, result, policy["cache_ttl"])
+        return result
+    
+    def _get_cached(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        with self._cache_lock:
+            entry = self._cache.get(cache_key)
+            if entry and entry[0] > time():
+                return dict(entry[1])
+            self._cache.pop(cache_key, None)
+        return None
+    
+    def _set_cached(self, cache_key: str, result: Dict[str, Any], ttl: float):
+        with self._cache_lock:
+            if len(self._cache) >= TOOL_CACHE_MAX_ENTRIES:
+                now = time()
+                for key in [k for k, (expires_at, _) in self._cache.items() if expires_at <= now]:
+                    del self._cache[key]
+                while len(self._cache) >= TOOL_CACHE_MAX_ENTRIES:
+                    self._cache.pop(next(iter(self._cache)))  # Oldest insertion first
+            self._cache[cache_key] = (time() + ttl, dict(result))
+    
     def _book_meeting(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """
         Book a meeting using Cal.com or similar service.
@@ -278,7 +381,7 @@ class ToolDispatcher:
     
     def _search_knowledge(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Search internal knowledge base.
+        Search the local knowledge base (BM25 index, optionally fused with vectors).
         
         Args:
             params: Search parameters
@@ -286,29 +389,31 @@ class ToolDispatcher:
         Returns:
             Search results
         """
-        # TODO: Integrate with actual knowledge base or document search
+        from app.knowledge import get_knowledge_index
         
         query = params["query"]
-        category = params.get("category", "general")
+        category = params.get("category")
         limit = params.get("limit", 5)
         
-        # Simulate knowledge search
-        mock_results = [
-            f"Knowledge item 1 related to '{query}' in {category} category",
-            f"Knowledge item 2 about '{query}' with relevant information",
-            f"Additional resource on '{query}' topic"
-        ]
+        started = time()
+        # "general" searches everything; other categories filter
+        hits = get_knowledge_index().search(query, k=limit, category=None if category in (None, "general") else category)
+        took_ms = (time() - started) * 1000
         
-        results = mock_results[:limit]
-        result_text = f"🔍 Found {len(results)} knowledge items for '{query}':\n" + "\n".join(f"• {item}" for item in results)
+        results = [f"{hit['title']}: {hit['text']}" for hit in hits]
+        if results:
+            result_text = f"🔍 Found {len(results)} knowledge items for '{query}':\n" + "\n".join(f"• {item}" for item in results)
+        else:
+            result_text = f"🔍 No knowledge base entries found for '{query}'"
         
-        logger.info(f"Knowledge search: '{query}' in {category} - {len(results)} results")
+        logger.info(f"Knowledge search: '{query}' in {category or 'all'} - {len(results)} results in {took_ms:.1f}ms")
         
         return {
             "success": True,
             "result": result_text,
             "error": None,
-            "results": results
+            "results": results,
+            "sources": [{"title": hit["title"], "doc_id": hit["doc_id"], "score": hit["score"]} for hit in hits]
         }
     
     def _text_to_speech(self, params: Dict[str, Any]) -> Dict[str, Any]:
@@ -387,7 +492,9 @@ class ToolDispatcher:
             "day": day_name,
             "date": date_str,
             "timezone": timezone_name,
-            "timestamp": now.isoformat()
+            "timestamp": now.isoformat(),
+            # Casual form for the phone agent, e.g. "4:11pm Pacific time"
+            "spoken": f"{now.strftime('%H:%M') if time_format == '24-hour' else now.strftime('%-I:%M%p').lower()} Pacific time"
         }
     
     def get_available_tools(self) -> List[Dict[str, Any]]:
@@ -405,16 +512,137 @@ class ToolDispatcher:
             }
             for name, schema in self.tools.items()
         ]
+    
+    def get_openai_tools(self, api: str = "chat") -> List[Dict[str, Any]]:
+        """
+        Build OpenAI function-calling definitions from the registry.
+        
+        Args:
+            api: "chat" for Chat Completions ({"type": "function", "function": {...}}),
+                 "realtime" for Realtime session.update (flat, realtime-enabled tools only)
+                 
+        Returns:
+            List of tool definitions
+        """
+        definitions = []
+        for name, schema in self.tools.items():
+            function = {
+                "name": name,
+                "description": schema["description"],
+                "parameters": _strip_defaults(schema["parameters"])
+            }
+            if api == "realtime":
+                if self.get_policy(name)["realtime"]:
+                    definitions.append({"type": "function", **function})
+            else:
+                definitions.append({"type": "function", "function": function})
+        return definitions
+
+def _strip_defaults(parameters: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop "default" keys, which OpenAI function schemas don't use."""
+    cleaned = dict(parameters)
+    cleaned["properties"] = {
+        name: {k: v for k, v in prop.items() if k != "default"}
+        for name, prop in parameters.get("properties", {}).items()
+    }
+    return cleaned
 
 # Global tool dispatcher instance
 tool_dispatcher = ToolDispatcher()
 
+# Worker pool for tool calls scheduled from non-async threads (Realtime WebSocket)
+_tool_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="tool-call")
+
+# Legacy inline syntax: TOOL:tool_name(param1=value1, param2="value, with commas")
+_TOOL_CALL_START = re.compile(r'TOOL:(\w+)\(')
+_TOOL_PARAM = re.compile(r'\s*(\w+)\s*=\s*("(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\'|[^,]*)\s*(?:,|$)', re.DOTALL)
+
+def _find_closing_paren(text: str, start: int) -> int:
+    """Index of the ")" closing the call that starts at text[start], skipping quoted and nested parens."""
+    depth = 1
+    quote = None
+    i = start
+    while i < len(text):
+        ch = text[i]
+        if quote:
+            if ch == "\\":
+                i += 1
+            elif ch == quote:
+                quote = None
+        elif ch in ("'", '"'):
+            quote = ch
+        elif ch in "({[":
+            depth += 1
+        elif ch in ")}]":
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    return -1
+
+def _parse_legacy_arguments(args_str: str) -> Dict[str, Any]:
+    """Parse key=value pairs (quoted values may contain commas) or a JSON object."""
+    args_str = args_str.strip()
+    if args_str.startswith("{"):
+        return json.loads(args_str)
+    
+    params = {}
+    pos = 0
+    while pos < len(args_str):
+        match = _TOOL_PARAM.match(args_str, pos)
+        if not match or match.end() == pos:
+            break
+        key, value = match.group(1), match.group(2).strip()
+        if len(value) >= 2 and value[0] in ("'", '"') and value[-1] == value[0]:
+            value = value[1:-1].replace("\\" + value[0], value[0])
+        params[key] = value
+        pos = match.end()
+    return params
+
+def _coerce_parameters(tool_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert string values to the schema's integer type where possible."""
+    properties = TOOL_SCHEMAS.get(tool_name, {}).get("parameters", {}).get("properties", {})
+    for key, value in params.items():
+        if properties.get(key, {}).get("type") == "integer" and isinstance(value, str) and value.strip().lstrip("-").isdigit():
+            params[key] = int(value)
+    return params
+
+def parse_openai_tool_calls(raw_tool_calls: Optional[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Parse native OpenAI tool calls (Chat Completions message.tool_calls).
+    
+    Args:
+        raw_tool_calls: tool_calls list from the assistant message
+        
+    Returns:
+        List of tool calls: {"id", "name", "parameters", "arguments"}
+        (parameters is None and "error" is set if the arguments are not valid JSON)
+    """
+    tool_calls = []
+    for raw in raw_tool_calls or []:
+        function = raw.get("function", {})
+        arguments = function.get("arguments") or "{}"
+        tool_call = {
+            "id": raw.get("id"),
+            "name": function.get("name"),
+            "arguments": arguments,
+            "parameters": None
+        }
+        try:
+            tool_call["parameters"] = json.loads(arguments)
+        except json.JSONDecodeError as e:
+            logger.error(f"Invalid tool call arguments for {tool_call['name']}: {arguments[:200]} - {e}")
+            tool_call["error"] = f"Invalid JSON arguments: {e}"
+        tool_calls.append(tool_call)
+    return tool_calls
+
 def parse_tool_calls(assistant_response: str) -> List[Dict[str, Any]]:
     """
-    Parse tool calls from assistant response.
+    Parse legacy inline tool calls from assistant response text.
     
-    This is a simple pattern-based parser. In production, you might want
-    to use function calling capabilities of modern LLMs.
+    Native function calling (parse_openai_tool_calls) is preferred; this handles
+    models that still emit TOOL:name(...) text. Quoted values may contain commas
+    and parentheses, and a JSON object is accepted as the argument list.
     
     Args:
         assistant_response: The assistant's response text
@@ -424,25 +652,16 @@ def parse_tool_calls(assistant_response: str) -> List[Dict[str, Any]]:
     """
     tool_calls = []
     
-    # Look for tool call patterns like: TOOL:tool_name(param1=value1, param2=value2)
-    import re
-    
-    # Pattern to match tool calls
-    pattern = r'TOOL:(\w+)\((.*?)\)'
-    matches = re.findall(pattern, assistant_response, re.DOTALL)
-    
-    for tool_name, params_str in matches:
+    for match in _TOOL_CALL_START.finditer(assistant_response or ""):
+        tool_name = match.group(1)
+        end = _find_closing_paren(assistant_response, match.end())
+        if end == -1:
+            logger.error(f"Unterminated tool call: {assistant_response[match.start():match.start() + 100]}")
+            continue
+        params_str = assistant_response[match.end():end]
+        
         try:
-            # Parse parameters (simple key=value format)
-            params = {}
-            if params_str.strip():
-                for param_pair in params_str.split(','):
-                    if '=' in param_pair:
-                        key, value = param_pair.split('=', 1)
-                        key = key.strip()
-                        value = value.strip().strip('"\'')
-                        params[key] = value
-            
+            params = _coerce_parameters(tool_name, _parse_legacy_arguments(params_str))
             tool_calls.append({
                 "name": tool_name,
                 "parameters": params
@@ -453,9 +672,34 @@ def parse_tool_calls(assistant_response: str) -> List[Dict[str, Any]]:
     
     return tool_calls
 
+async def _execute_one(tool_call: Dict[str, Any]) -> Dict[str, Any]:
+    if tool_call.get("error"):
+        return {"success": False, "result": None, "error": tool_call["error"]}
+    try:
+        return await tool_dispatcher.dispatch_async(tool_call["name"], tool_call["parameters"] or {})
+    except Exception as e:
+        logger.error(f"Tool execution failed: {e}")
+        return {
+            "success": False,
+            "result": None,
+            "error": f"Execution failed: {str(e)}"
+        }
+
+async def execute_tool_calls_async(tool_calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Execute independent tool calls concurrently, each with its own timeout.
+    
+    Args:
+        tool_calls: List of tool calls to execute
+        
+    Returns:
+        List of execution results (same order as tool_calls)
+    """
+    return list(await asyncio.gather(*(_execute_one(tool_call) for tool_call in tool_calls)))
+
 def execute_tool_calls(tool_calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """
-    Execute a list of tool calls.
+    Execute a list of tool calls (sync wrapper - not for use inside a running event loop).
     
     Args:
         tool_calls: List of tool calls to execute
@@ -463,22 +707,22 @@ def execute_tool_calls(tool_calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]
     Returns:
         List of execution results
     """
-    results = []
-    
-    for tool_call in tool_calls:
-        try:
-            result = tool_dispatcher.dispatch(
-                tool_call["name"],
-                tool_call["parameters"]
-            )
-            results.append(result)
-            
-        except Exception as e:
-            logger.error(f"Tool execution failed: {e}")
-            results.append({
-                "success": False,
-                "result": None,
-                "error": f"Execution failed: {str(e)}"
-            })
+    return asyncio.run(execute_tool_calls_async(tool_calls))
+
+def submit_tool_call(tool_name: str, parameters: Dict[str, Any],
+                     loop: Optional[asyncio.AbstractEventLoop] = None) -> Future:
+    """
+    Schedule a tool call from a non-async thread (e.g. the Realtime WebSocket thread).
     
-    return results
+    Args:
+        tool_name: Name of the tool to call
+        parameters: Parameters for the tool call
+        loop: Running event loop to execute on (falls back to a worker thread)
+        
+    Returns:
+        concurrent.futures.Future resolving to the tool result
+    """
+    tool_call = {"name": tool_name, "parameters": parameters}
+    if loop is not None and loop.is_running():
+        return asyncio.run_coroutine_threadsafe(_execute_one(tool_call), loop)
+    return _tool_executor.submit(asyncio.run, _execute_one(tool_call))
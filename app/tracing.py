@@ -0,0 +1,438 @@
+"""
+Lightweight per-call latency tracing.
+
+One phone turn crosses the Flask webhooks, the orchestrator, AI-Memory,
+the LLM and ElevenLabs. Spans record where the time goes:
+
+    with start_span("memory.profile_fetch", attributes={"user_id": user_id}):
+        ...
+
+Every span of a call shares one trace id derived from the Twilio CallSid
+(trace_id_for_call), so webhooks, the media stream and the orchestrator
+requests of the same call line up without Twilio carrying any header.
+Between our own services the W3C traceparent header carries the parent span
+(inject() / TracedSession); AI-Memory reports its handler time back in a
+Server-Timing header, recorded on the client span.
+
+Finished spans go to an in-process ring buffer (admin-only /api/traces on the web app,
+/v1/traces on the orchestrator) and, if tracing_otlp_endpoint is set, are
+batched to an OTLP/HTTP JSON collector (trace_collector.py is a local
+stand-in that prints per-call waterfalls).
+"""
+
+import time
+import queue
+import secrets
+import hashlib
+import logging
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, Any, Iterator, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+import requests
+
+from config_loader import get_setting
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TRACEPARENT_HEADER = "traceparent"
+
+# OTLP SpanKind
+SPAN_KINDS = {"internal": 1, "server": 2, "client": 3}
+
+
+def trace_id_for_call(call_sid: str) -> str:
+    """Stable trace id for every span of one phone call."""
+    return hashlib.sha256(f"call:{call_sid}".encode("utf-8")).hexdigest()[:32]
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[Tuple[str, str]]:
+    """(trace_id, parent span_id) from a W3C traceparent header, or None if malformed."""
+    if not value:
+        return None
+    parts = value.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    return parts[1], parts[2]
+
+
+class Span:
+    """
+    One timed stage. Ended spans are handed to the tracer.
+    """
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "kind", "start_ns", "end_ns",
+                 "attributes", "events", "error")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str] = None, kind: str = "internal",
+                 attributes: Optional[Dict[str, Any]] = None, start_ns: Optional[int] = None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.kind = kind
+        self.start_ns = start_ns or time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.events: List[Tuple[int, str, Dict[str, Any]]] = []
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def add_event(self, name: str, **attributes):
+        """Mark a point inside the span (e.g. first_token)."""
+        self.events.append((time.time_ns(), name, attributes))
+
+    def end(self, end_ns: Optional[int] = None):
+        if self.end_ns is None:
+            self.end_ns = end_ns or time.time_ns()
+            get_tracer().record(self)
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        return round((self.end_ns - self.start_ns) / 1e6, 3) if self.end_ns else None
+
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "kind": self.kind,
+            "start": self.start_ns / 1e9,
+            "duration_ms": self.duration_ms,
+            "attributes": self.attributes,
+            "events": [{"name": name, "offset_ms": round((at - self.start_ns) / 1e6, 3), **attrs}
+                       for at, name, attrs in self.events],
+            "error": self.error,
+        }
+
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+
+ParentLike = Union[Span, str, None]
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def begin_span(name: str, parent: ParentLike = None, trace_id: Optional[str] = None, kind: str = "internal",
+               attributes: Optional[Dict[str, Any]] = None, start_time: Optional[float] = None) -> Span:
+    """
+    Create a span without making it current (the caller ends it).
+
+    Args:
+        name: Stage name
+        parent: Parent Span or traceparent header (default: the current span)
+        trace_id: Trace to join when there is no parent (default: a new trace)
+        kind: "internal", "server" or "client"
+        attributes: Initial attributes
+        start_time: Start as a time.time() value, for stages timed elsewhere
+    """
+    if parent is None:
+        parent = _current_span.get()
+    parent_id = None
+    if isinstance(parent, Span):
+        trace_id, parent_id = parent.trace_id, parent.span_id
+    elif isinstance(parent, str):
+        parsed = parse_traceparent(parent)
+        if parsed:
+            trace_id, parent_id = parsed
+    start_ns = int(start_time * 1e9) if start_time else None
+    return Span(name, trace_id or secrets.token_hex(16), parent_id, kind, attributes, start_ns)
+
+
+def activate(span: Span):
+    """Make span current; returns the token for deactivate()."""
+    return _current_span.set(span)
+
+
+def deactivate(token):
+    _current_span.reset(token)
+
+
+@contextmanager
+def start_span(name: str, parent: ParentLike = None, trace_id: Optional[str] = None, kind: str = "internal",
+               attributes: Optional[Dict[str, Any]] = None):
+    """Time a block as a span (current for the duration of the block)."""
+    span = begin_span(name, parent, trace_id, kind, attributes)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except Exception as e:
+        span.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end()
+
+
+def record_span(name: str, start_time: float, end_time: Optional[float] = None, parent: ParentLike = None,
+                trace_id: Optional[str] = None, attributes: Optional[Dict[str, Any]] = None) -> Span:
+    """Record a stage timed elsewhere (time.time() values)."""
+    span = begin_span(name, parent, trace_id, attributes=attributes, start_time=start_time)
+    span.end(int((end_time or time.time()) * 1e9))
+    return span
+
+
+def trace_generator(name: str, make_generator: Callable[[], Iterator], parent: ParentLike = None,
+                    attributes: Optional[Dict[str, Any]] = None) -> Iterator:
+    """
+    Iterate make_generator() inside its own span.
+
+    Streaming responses are resumed from worker threads with fresh context
+    copies, so the span is kept in a private context that every step runs in.
+    """
+    span = begin_span(name, parent, attributes=attributes)
+    ctx = contextvars.copy_context()
+    ctx.run(_current_span.set, span)
+    generator = ctx.run(make_generator)
+    try:
+        while True:
+            try:
+                item = ctx.run(next, generator)
+            except StopIteration:
+                return
+            yield item
+    except Exception as e:
+        span.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        ctx.run(generator.close)
+        span.end()
+
+
+def inject(headers: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Add the current span's traceparent to outgoing request headers."""
+    headers = dict(headers or {})
+    span = _current_span.get()
+    if span is not None:
+        headers[TRACEPARENT_HEADER] = span.traceparent()
+    return headers
+
+
+def server_timing_ms(value: Optional[str]) -> Optional[float]:
+    """Total dur= of a Server-Timing header."""
+    if not value:
+        return None
+    total = None
+    for metric in value.split(","):
+        for param in metric.split(";")[1:]:
+            key, _, number = param.strip().partition("=")
+            if key == "dur":
+                try:
+                    total = (total or 0.0) + float(number)
+                except ValueError:
+                    pass
+    return total
+
+
+class TracedSession(requests.Session):
+    """
+    requests.Session that records a client span per request and propagates it.
+    """
+
+    def __init__(self, peer_service: str, observe: Optional[Callable[[str, str, Any, float], None]] = None):
+        """
+        Args:
+            peer_service: Name recorded as peer.service on the client spans
+            observe: Optional callback(method, path, status, seconds) per request
+                     (status is "error" when no response came back)
+        """
+        super().__init__()
+        self.peer_service = peer_service
+        self.observe = observe
+
+    def request(self, method, url, *args, **kwargs):
+        path = urlsplit(url).path
+        status: Any = "error"
+        started = time.perf_counter()
+        try:
+            with start_span(f"{self.peer_service} {method} {path}", kind="client",
+                            attributes={"peer.service": self.peer_service, "http.method": method}) as span:
+                kwargs["headers"] = dict(kwargs.get("headers") or {}, **{TRACEPARENT_HEADER: span.traceparent()})
+                response = super().request(method, url, *args, **kwargs)
+                status = response.status_code
+                span.set_attribute("http.status_code", response.status_code)
+                server_ms = server_timing_ms(response.headers.get("Server-Timing"))
+                if server_ms is not None:
+                    span.set_attribute("server.duration_ms", server_ms)
+                return response
+        finally:
+            if self.observe:
+                self.observe(method, path, status, time.perf_counter() - started)
+
+
+class OTLPJSONExporter:
+    """
+    Batches finished spans to an OTLP/HTTP JSON endpoint from a background thread.
+    """
+
+    def __init__(self, endpoint: str, service_name: str, batch_size: int = 256, flush_seconds: float = 2.0):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._queue: "queue.Queue[Span]" = queue.Queue(maxsize=10000)
+        self._stats = {"exported": 0, "dropped": 0, "export_failures": 0}
+        self._thread = threading.Thread(target=self._run, name="otlp-exporter", daemon=True)
+        self._thread.start()
+
+    def submit(self, span: Span):
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self._stats["dropped"] += 1
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.time() + self.flush_seconds
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                response = requests.post(self.endpoint, json=self.payload(batch), timeout=5)
+                response.raise_for_status()
+                self._stats["exported"] += len(batch)
+            except Exception as e:
+                self._stats["export_failures"] += 1
+                logger.warning(f"⚠️ OTLP export of {len(batch)} spans failed: {e}")
+
+    def payload(self, spans: List[Span]) -> Dict[str, Any]:
+        return {"resourceSpans": [{
+            "resource": {"attributes": _otlp_attributes({"service.name": self.service_name})},
+            "scopeSpans": [{
+                "scope": {"name": "chatstack.tracing"},
+                "spans": [_otlp_span(span) for span in spans]
+            }]
+        }]}
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(self._stats, queued=self._queue.qsize(), endpoint=self.endpoint)
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+
+def _otlp_span(span: Span) -> Dict[str, Any]:
+    data = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": SPAN_KINDS.get(span.kind, 1),
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": _otlp_attributes(span.attributes),
+        "events": [{"timeUnixNano": str(at), "name": name, "attributes": _otlp_attributes(attrs)}
+                   for at, name, attrs in span.events],
+        "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+    }
+    if span.parent_id:
+        data["parentSpanId"] = span.parent_id
+    return data
+
+
+class Tracer:
+    """
+    Ring buffer of finished spans plus the optional OTLP exporter.
+    """
+
+    def __init__(self, service_name: str, buffer_size: int = 20000, otlp_endpoint: Optional[str] = None):
+        self.service_name = service_name
+        self._spans: deque = deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+        self.exporter = OTLPJSONExporter(otlp_endpoint, service_name) if otlp_endpoint else None
+
+    def record(self, span: Span):
+        with self._lock:
+            self._spans.append(span)
+        if self.exporter:
+            self.exporter.submit(span)
+
+    def get_trace(self, trace_id: str) -> List[Dict[str, Any]]:
+        """All buffered spans of one trace, in start order."""
+        with self._lock:
+            spans = [span for span in self._spans if span.trace_id == trace_id]
+        return [span.to_dict() for span in sorted(spans, key=lambda s: s.start_ns)]
+
+    def recent_traces(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Newest traces with their root span, span count and wall time."""
+        with self._lock:
+            spans = list(self._spans)
+        traces: Dict[str, Dict[str, Any]] = {}
+        for span in spans:
+            entry = traces.setdefault(span.trace_id, {"trace_id": span.trace_id, "spans": 0, "call_sid": None,
+                                                      "root": None, "start_ns": span.start_ns, "end_ns": span.end_ns})
+            entry["spans"] += 1
+            entry["start_ns"] = min(entry["start_ns"], span.start_ns)
+            entry["end_ns"] = max(entry["end_ns"], span.end_ns)
+            entry["call_sid"] = entry["call_sid"] or span.attributes.get("call_sid")
+            if entry["root"] is None or span.start_ns == entry["start_ns"]:
+                entry["root"] = span.name
+        recent = sorted(traces.values(), key=lambda t: t["end_ns"], reverse=True)[:limit]
+        return [{
+            "trace_id": t["trace_id"],
+            "call_sid": t["call_sid"],
+            "root": t["root"],
+            "spans": t["spans"],
+            "start": t["start_ns"] / 1e9,
+            "duration_ms": round((t["end_ns"] - t["start_ns"]) / 1e6, 3),
+        } for t in recent]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = {"service": self.service_name, "buffered_spans": len(self._spans), "buffer_size": self._spans.maxlen}
+        if self.exporter:
+            stats["exporter"] = self.exporter.stats()
+        return stats
+
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def configure(service_name: str) -> Tracer:
+    """Name this process's spans (call once at startup, before the first span)."""
+    global _tracer
+    with _tracer_lock:
+        if _tracer is None or _tracer.service_name != service_name:
+            _tracer = Tracer(
+                service_name,
+                buffer_size=int(get_setting("tracing_buffer_spans", 20000)),
+                otlp_endpoint=get_setting("tracing_otlp_endpoint", "") or None,
+            )
+    return _tracer
+
+
+def get_tracer() -> Tracer:
+    """Process-wide tracer."""
+    if _tracer is None:
+        return configure("chatstack")
+    return _tracer
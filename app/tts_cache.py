@@ -0,0 +1,229 @@
+"""
+Content-addressed TTS audio cache for the Gather/ElevenLabs call flow.
+
+Audio is stored as <sha256>.mp3, where the hash covers everything that
+changes the rendered audio: text, voice_id, model_id and voice settings.
+The same phrase in the same voice is synthesized once and replayed from
+disk after that - greetings, "didn't catch that", goodbyes - so repeated
+phrases play instantly and stop costing ElevenLabs credits.
+
+Files are written to a temp name and atomically renamed into place, so
+concurrent calls never see (or overwrite) partial audio. The directory is
+kept under a byte budget with LRU eviction (last use = file mtime, touched
+on every hit, so recency survives restarts).
+"""
+
+import os
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Iterable, Iterator, List, Optional
+
+from config_loader import get_setting
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+AUDIO_EXTENSION = ".mp3"
+
+# Under static/audio so the existing /static/audio/<path> route serves it
+TTS_CACHE_DIR = os.path.join("static", "audio", "tts")
+
+
+def tts_cache_key(text: str, voice_id: str, model_id: str, voice_settings: Dict[str, Any]) -> str:
+    """Content address for a rendered phrase."""
+    payload = json.dumps({
+        "text": text.strip(),
+        "voice_id": voice_id,
+        "model_id": model_id,
+        "voice_settings": voice_settings,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def iter_audio_bytes(audio_stream: Iterable[Any]) -> Iterable[bytes]:
+    """Normalize ElevenLabs stream chunks (bytes / str / buffer) to bytes."""
+    for chunk in audio_stream:
+        if isinstance(chunk, bytes):
+            yield chunk
+        elif isinstance(chunk, (bytearray, memoryview)):
+            yield bytes(chunk)
+        elif hasattr(chunk, 'encode'):
+            yield chunk.encode()
+        else:
+            yield bytes(chunk)
+
+
+class TTSCache:
+    """
+    Disk cache of synthesized audio with an LRU byte budget.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int, extension: str = AUDIO_EXTENSION):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.extension = extension
+        self._entries: "OrderedDict[str, int]" = OrderedDict()  # key -> size, oldest first
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "bytes_synthesized": 0, "bytes_served_from_cache": 0}
+        os.makedirs(cache_dir, exist_ok=True)
+        self._scan()
+
+    def _scan(self):
+        """Rebuild the LRU index from the directory (oldest mtime first)."""
+        found = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(self.extension):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            found.append((st.st_mtime, name[:-len(self.extension)], st.st_size))
+        found.sort()
+        with self._lock:
+            self._entries = OrderedDict((key, size) for _, key, size in found)
+            self._total_bytes = sum(size for _, _, size in found)
+        logger.info(f"🔊 TTS cache: {len(found)} files, {self._total_bytes / 1e6:.1f} MB in {self.cache_dir}")
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}{self.extension}")
+
+    def filename_for(self, key: str) -> str:
+        return f"{key}{self.extension}"
+
+    def lookup(self, key: str) -> Optional[str]:
+        """Return the cached file path on a hit (and mark it recently used)."""
+        path = self.path_for(key)
+        with self._lock:
+            size = self._entries.get(key)
+            if size is None and os.path.exists(path):
+                # Written by another process sharing the directory
+                size = os.path.getsize(path)
+                self._entries[key] = size
+                self._total_bytes += size
+            if size is None or not os.path.exists(path):
+                self._entries.pop(key, None)
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            self._stats["bytes_served_from_cache"] += size
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return path
+
+    def tee(self, key: str, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """
+        Yield audio chunks as they arrive while writing them into the cache.
+        
+        The file is renamed into place only if the stream completes; if the
+        consumer stops early (caller hung up) the partial temp file is dropped.
+        
+        Args:
+            key: Content address from tts_cache_key()
+            chunks: Audio byte chunks
+        """
+        path = self.path_for(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        size = 0
+        completed = False
+        f = open(tmp_path, 'wb')
+        try:
+            for chunk in chunks:
+                f.write(chunk)
+                size += len(chunk)
+                yield chunk
+            completed = True
+        finally:
+            f.close()
+            if completed and size > 0:
+                os.replace(tmp_path, path)
+                self._record_store(key, size)
+            else:
+                os.remove(tmp_path)
+
+    def store(self, key: str, chunks: Iterable[bytes]) -> Optional[str]:
+        """
+        Write audio chunks to the cache atomically.
+
+        Args:
+            key: Content address from tts_cache_key()
+            chunks: Audio byte chunks (consumed as they arrive)
+
+        Returns:
+            Final file path, or None if no audio was produced
+        """
+        for _ in self.tee(key, chunks):
+            pass
+        path = self.path_for(key)
+        return path if os.path.exists(path) else None
+
+    def _record_store(self, key: str, size: int):
+        with self._lock:
+            previous = self._entries.pop(key, 0)
+            self._entries[key] = size
+            self._total_bytes += size - previous
+            self._stats["stores"] += 1
+            self._stats["bytes_synthesized"] += size
+        self._evict()
+
+    def _evict(self):
+        """Drop least recently used files until the directory fits the byte budget."""
+        victims = []
+        with self._lock:
+            while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                key, size = self._entries.popitem(last=False)
+                self._total_bytes -= size
+                self._stats["evictions"] += 1
+                victims.append(key)
+        for key in victims:
+            try:
+                os.remove(self.path_for(key))
+            except FileNotFoundError:
+                pass
+        if victims:
+            logger.info(f"🧹 TTS cache evicted {len(victims)} files (budget {self.max_bytes / 1e6:.0f} MB)")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = self._total_bytes
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        stats["max_bytes"] = self.max_bytes
+        return stats
+
+
+def default_prewarm_phrases() -> List[str]:
+    """Static phrases worth rendering before the first call needs them."""
+    return list(get_setting("tts_prewarm_phrases", [
+        "Sorry, I didn't catch that. Could you repeat?",
+        "Thank you for calling. Goodbye!",
+        "Is there anything else I can help you with?",
+    ]))
+
+
+_tts_cache: Optional[TTSCache] = None
+_tts_cache_lock = threading.Lock()
+
+
+def get_tts_cache() -> TTSCache:
+    """Process-wide TTS cache."""
+    global _tts_cache
+    if _tts_cache is None:
+        with _tts_cache_lock:
+            if _tts_cache is None:
+                _tts_cache = TTSCache(
+                    cache_dir=TTS_CACHE_DIR,
+                    max_bytes=int(get_setting("tts_cache_max_mb", 500)) * 1024 * 1024,
+                )
+    return _tts_cache
@@ -0,0 +1,30 @@
+"""
+Media-stream audio conversions, timed the way the bridge calls them: one
+20 ms Twilio frame at a time over a 10-minute call.
+"""
+
+from app.main import pcmu8k_to_pcm16_8k, upsample_8k_to_24k, downsample_24k_to_8k, pcm16_8k_to_pcmu8k
+
+FRAME_BYTES = 160  # 20 ms of 8 kHz mu-law
+
+
+def _frames(audio):
+    return [audio[i:i + FRAME_BYTES] for i in range(0, len(audio), FRAME_BYTES)]
+
+
+def test_caller_audio_to_realtime_10min(benchmark, call_audio):
+    frames = _frames(call_audio)
+
+    def run():
+        return [upsample_8k_to_24k(pcmu8k_to_pcm16_8k(frame)) for frame in frames]
+    converted = benchmark(run)
+    assert len(converted[0]) == FRAME_BYTES * 2 * 3
+
+
+def test_realtime_audio_to_caller_10min(benchmark, call_audio):
+    pcm24 = [upsample_8k_to_24k(pcmu8k_to_pcm16_8k(frame)) for frame in _frames(call_audio)]
+
+    def run():
+        return [pcm16_8k_to_pcmu8k(downsample_24k_to_8k(chunk)) for chunk in pcm24]
+    converted = benchmark(run)
+    assert len(converted[0]) == FRAME_BYTES
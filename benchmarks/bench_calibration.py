@@ -0,0 +1,19 @@
+"""
+Fixed reference workload that never changes with the app code. The
+regression gate divides every timing by this one, so a baseline recorded on
+one machine still gates runs on a faster or slower one.
+"""
+
+import json
+
+
+def _workload():
+    rows = [{"id": i, "name": f"caller-{i}", "tags": ["a", "b", str(i % 7)]} for i in range(2000)]
+    text = json.dumps(rows)
+    parsed = json.loads(text)
+    words = sorted(text.replace('"', " ").split(), key=len)
+    return len(parsed) + sum(len(w) for w in words[:500])
+
+
+def test_calibration(benchmark):
+    assert benchmark(_workload) > 0
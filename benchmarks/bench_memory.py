@@ -0,0 +1,15 @@
+"""
+Memory read path: AI-Memory's newline-JSON parsing and schema normalization.
+"""
+
+from app.http_memory import parse_memory_lines
+
+
+def test_parse_memory_lines_2000(benchmark, memory_lines):
+    memories = benchmark(parse_memory_lines, memory_lines, "+15551234567")
+    assert len(memories) == 2000
+
+
+def test_normalize_memories_2000(benchmark, memory_store, user_memories):
+    schema = benchmark(memory_store.normalize_memories, user_memories)
+    assert schema["identity"]["caller_name"]
@@ -0,0 +1,32 @@
+"""
+Chat path: prompt packing, the remember/carry-kit heuristics run on every
+turn, and legacy inline tool-call parsing.
+"""
+
+import fixtures
+from app.packer import pack_prompt, should_remember, extract_carry_kit_items
+from app.tools import parse_tool_calls
+
+
+def test_pack_prompt(benchmark, conversation, user_memories):
+    # safety_mode skips the admin-settings fetch, leaving the local packing work
+    packed = benchmark(pack_prompt, conversation, user_memories, True, "bench-thread")
+    assert packed[0]["role"] == "system"
+
+
+def test_should_remember_10min(benchmark, transcript_turns):
+    def run():
+        return sum(should_remember(turn) for turn in transcript_turns)
+    assert benchmark(run) > 0
+
+
+def test_extract_carry_kit_items_10min(benchmark, transcript_turns):
+    def run():
+        return [item for turn in transcript_turns for item in extract_carry_kit_items(turn)]
+    assert benchmark(run)
+
+
+def test_parse_tool_calls(benchmark):
+    response = fixtures.make_tool_call_response(20)
+    calls = benchmark(parse_tool_calls, response)
+    assert len(calls) == 20
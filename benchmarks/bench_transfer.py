@@ -0,0 +1,22 @@
+"""
+Transfer detection, run on every caller transcript during a phone call.
+"""
+
+from app.main import levenshtein_distance, match_transfer_rule
+
+
+def test_match_transfer_rule_10min(benchmark, transfer_rules, transcript_turns):
+    # Unique keywords: turns that don't match scan the whole 100-rule table
+    def run():
+        return [match_transfer_rule(turn, transfer_rules) for turn in transcript_turns]
+    benchmark(run)
+
+
+def test_match_transfer_rule_explicit(benchmark, transfer_rules):
+    # Explicit intent forces the fuzzy pass over every rule
+    transcript = "Could you transfer me, I need to talk to somebody about underwriting for my business policy"
+    assert benchmark(match_transfer_rule, transcript, transfer_rules) is None
+
+
+def test_levenshtein_distance(benchmark):
+    assert benchmark(levenshtein_distance, "commercial lines department", "comercial line departments") == 3
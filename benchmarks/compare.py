@@ -0,0 +1,124 @@
+"""
+Regression gate for the microbenchmarks.
+
+Compares a pytest-benchmark JSON report with the baseline stored in
+benchmarks/baseline.json and exits non-zero when any benchmark got slower
+than the threshold allows. Each benchmark's median round is divided by the
+calibration benchmark's median, so the gate compares relative cost rather
+than raw machine speed. Sub-millisecond benchmarks jitter more than the rest
+and get their own, wider threshold.
+
+    python -m pytest benchmarks --benchmark-json=.benchmarks/current.json
+    python benchmarks/compare.py .benchmarks/current.json               # gate
+    python benchmarks/compare.py .benchmarks/current.json --update      # accept new timings
+"""
+
+import os
+import sys
+import json
+import argparse
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+CALIBRATION_NAME = "test_calibration"
+DEFAULT_THRESHOLD = 0.5  # fail when relative cost grows by more than 50%
+DEFAULT_SUB_MS_THRESHOLD = 1.0  # ...or by more than 100% for benchmarks under a millisecond
+SUB_MS_SECONDS = 0.001
+
+
+def load_report(path: str) -> Dict[str, float]:
+    """Benchmark name -> median round in seconds from a pytest-benchmark JSON report."""
+    with open(path) as f:
+        report = json.load(f)
+    return {bench["name"]: bench["stats"]["median"] for bench in report["benchmarks"]}
+
+
+def relative(timings: Dict[str, float]) -> Dict[str, float]:
+    """Timings as multiples of the calibration timing."""
+    if CALIBRATION_NAME not in timings:
+        raise SystemExit(f"report has no {CALIBRATION_NAME} result - run the whole suite")
+    calibration = timings[CALIBRATION_NAME]
+    return {name: seconds / calibration for name, seconds in timings.items() if name != CALIBRATION_NAME}
+
+
+def compare(baseline: Dict[str, float], current: Dict[str, float], threshold: float,
+            sub_ms_threshold: float, seconds: Dict[str, float]) -> Tuple[List[str], List[str]]:
+    """
+    Compare relative costs.
+
+    Args:
+        baseline: Baseline relative costs
+        current: Current relative costs
+        threshold: Allowed relative slowdown
+        sub_ms_threshold: Allowed relative slowdown for benchmarks under SUB_MS_SECONDS
+        seconds: Median seconds per benchmark, to pick the threshold
+
+    Returns:
+        (report lines, names of regressed benchmarks)
+    """
+    lines = [f"{'benchmark':<42}{'baseline':>10}{'current':>10}{'change':>9}"]
+    regressions = []
+    for name in sorted(current):
+        if name not in baseline:
+            lines.append(f"{name:<42}{'-':>10}{current[name]:>10.3f}{'new':>9}")
+            continue
+        change = current[name] / baseline[name] - 1
+        limit = sub_ms_threshold if seconds.get(name, 0) < SUB_MS_SECONDS else threshold
+        flag = ""
+        if change > limit:
+            regressions.append(name)
+            flag = "  REGRESSED"
+        lines.append(f"{name:<42}{baseline[name]:>10.3f}{current[name]:>10.3f}{change:>+9.0%}{flag}")
+    for name in sorted(set(baseline) - set(current)):
+        lines.append(f"{name:<42}{baseline[name]:>10.3f}{'-':>10}{'missing':>9}")
+    return lines, regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Fail when a microbenchmark slows down past the threshold.")
+    parser.add_argument("report", help="pytest-benchmark JSON (--benchmark-json)")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float,
+                        default=float(os.environ.get("BENCHMARK_THRESHOLD", DEFAULT_THRESHOLD)),
+                        help="allowed relative slowdown, e.g. 0.5 = 50%% (env BENCHMARK_THRESHOLD)")
+    parser.add_argument("--sub-ms-threshold", type=float,
+                        default=float(os.environ.get("BENCHMARK_SUB_MS_THRESHOLD", DEFAULT_SUB_MS_THRESHOLD)),
+                        help="allowed relative slowdown for sub-millisecond benchmarks (env BENCHMARK_SUB_MS_THRESHOLD)")
+    parser.add_argument("--update", action="store_true", help="write the report's timings as the new baseline")
+    args = parser.parse_args(argv)
+
+    timings = load_report(args.report)
+    current = relative(timings)
+
+    if args.update:
+        with open(args.baseline, "w") as f:
+            json.dump({
+                "recorded_at": datetime.utcnow().isoformat(timespec="seconds"),
+                "statistic": "median",
+                "calibration_median_seconds": timings[CALIBRATION_NAME],
+                "median_seconds": {name: timings[name] for name in sorted(current)},
+                "relative_cost": {name: round(value, 4) for name, value in sorted(current.items())},
+            }, f, indent=2)
+            f.write("\n")
+        print(f"Baseline updated: {args.baseline} ({len(current)} benchmarks)")
+        return 0
+
+    with open(args.baseline) as f:
+        recorded = json.load(f)
+    if recorded.get("statistic") != "median":
+        raise SystemExit(f"{args.baseline} was not recorded from medians - re-record it with --update")
+    # Sub-millisecond is decided on the baseline's timings so the threshold can't flip between runs
+    seconds = dict(timings, **recorded.get("median_seconds", {}))
+    lines, regressions = compare(recorded["relative_cost"], current, args.threshold, args.sub_ms_threshold, seconds)
+    print("\n".join(lines))
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) regressed more than {args.threshold:.0%} "
+              f"({args.sub_ms_threshold:.0%} under 1 ms): {', '.join(regressions)}")
+        return 1
+    print(f"\nNo regressions beyond {args.threshold:.0%} ({args.sub_ms_threshold:.0%} under 1 ms).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""
+Shared fixtures for the microbenchmarks.
+
+Run from the repository root (config.json is read from the working
+directory). AI-Memory is pointed at a closed local port so constructing
+HTTPMemoryStore fails fast instead of waiting on a real service, and INFO
+logging is switched off so the timings measure the code rather than the
+terminal - the f-strings passed to logger.info are still built.
+"""
+
+import os
+import sys
+import logging
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault("AI_MEMORY_URL", "http://127.0.0.1:9")
+os.environ.setdefault("TRACING_OTLP_ENDPOINT", "")
+
+import fixtures  # noqa: E402
+
+
+@pytest.fixture(autouse=True, scope="session")
+def quiet_logging():
+    logging.disable(logging.INFO)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+@pytest.fixture(scope="session")
+def user_memories():
+    """2000 raw memories for one caller."""
+    return fixtures.make_user_memories(2000)
+
+
+@pytest.fixture(scope="session")
+def memory_lines(user_memories):
+    """The same 2000 memories as AI-Memory's newline-JSON "memory" string."""
+    return fixtures.make_memory_lines(user_memories)
+
+
+@pytest.fixture(scope="session")
+def memory_store():
+    """HTTPMemoryStore in degraded mode - only its pure normalization methods are timed."""
+    from app.http_memory import HTTPMemoryStore
+    return HTTPMemoryStore()
+
+
+@pytest.fixture(scope="session")
+def transfer_rules():
+    """100-rule transfer table."""
+    return fixtures.make_transfer_rules(100)
+
+
+@pytest.fixture(scope="session")
+def transcript_turns():
+    """Caller turns of a 10-minute call."""
+    return fixtures.make_transcript_turns(10)
+
+
+@pytest.fixture(scope="session")
+def conversation():
+    """Messages of a 10-minute conversation."""
+    return fixtures.make_conversation(10)
+
+
+@pytest.fixture(scope="session")
+def call_audio():
+    """10 minutes of 8 kHz mu-law audio."""
+    return fixtures.make_mulaw_audio(600)
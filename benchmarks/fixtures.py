@@ -0,0 +1,180 @@
+"""
+Deterministic, production-shaped inputs for the microbenchmarks.
+
+Everything is generated from a fixed seed so two runs (and the stored
+baseline) time exactly the same work.
+"""
+
+import json
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+SEED = 20240611
+
+FIRST_NAMES = ["Kelly", "Jack", "Arlene", "Sarah", "David", "Colin", "Melissa", "Maria", "James", "Linda",
+               "Robert", "Patricia", "Michael", "Jennifer", "William", "Elizabeth", "Thomas", "Susan"]
+LAST_NAMES = ["Peterson", "Garcia", "Nguyen", "Smith", "Johnson", "Brown", "Miller", "Davis", "Lopez", "Wilson"]
+RELATIONSHIPS = ["wife", "husband", "mom", "dad", "son", "daughter", "friend", "brother", "sister"]
+VEHICLES = [("Toyota", "Camry"), ("Honda", "Accord"), ("Ford", "F-150"), ("BMW", "X5"), ("Chevrolet", "Tahoe"),
+            ("Tesla", "Model 3"), ("Subaru", "Outback")]
+POLICY_TYPES = ["auto", "home", "umbrella", "life", "commercial"]
+PREFERENCES = ["likes Ahi Tuna sushi", "prefers email over phone calls", "enjoys golf on weekends",
+               "favorite team is the Dodgers", "prefers morning appointments", "likes hiking with the dog"]
+CALLER_LINES = [
+    "Hi, I'm calling about my auto policy renewal.",
+    "My wife Kelly is going to be driving the new car too.",
+    "We just bought a 2022 Toyota Camry, the VIN is 4T1B11HK5JU123456.",
+    "Can you remind me what my deductible is on the home policy?",
+    "I think I got a letter saying my premium went up, can you check on that?",
+    "My son Jack just got his learner's permit, do we need to add him?",
+    "Please remember that I prefer email, not phone calls.",
+    "I'd also like to talk about an umbrella policy at some point.",
+    "My birthday is January 3rd, 1966, in case you need it.",
+    "Is there a discount if we bundle the home and auto together?",
+    "Actually, can I talk to someone in the claims department?",
+    "We had a little fender bender in the parking lot last week.",
+]
+AGENT_LINES = [
+    "Of course, let me pull that up for you.",
+    "Thanks, I've made a note of that.",
+    "Your current deductible on the home policy is one thousand dollars.",
+    "I can have Colin follow up with you by email this afternoon.",
+    "Bundling usually saves around fifteen percent; I'll include a quote.",
+]
+
+
+def _rng(offset: int = 0) -> random.Random:
+    return random.Random(SEED + offset)
+
+
+def _phone(rng: random.Random) -> str:
+    return f"+1{rng.randint(200, 999)}{rng.randint(200, 999)}{rng.randint(1000, 9999)}"
+
+
+def make_user_memories(count: int = 2000, user_id: str = "+15551234567") -> List[Dict[str, Any]]:
+    """
+    Raw memories for one long-standing caller, in AI-Memory's row shape
+    (id/type/key/value/user_id/created_at), oldest first.
+    """
+    rng = _rng(1)
+    started = datetime(2023, 1, 1)
+    memories = []
+    for idx in range(count):
+        kind = rng.choices(["person", "vehicle", "policy", "preference", "fact", "call_summary", "registration",
+                            "thread_history"], weights=[10, 5, 5, 10, 30, 25, 2, 13])[0]
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        if kind == "person":
+            value = {"name": f"{first} {last}", "relationship": rng.choice(RELATIONSHIPS),
+                     "birthday": f"{rng.choice(['January', 'March', 'July', 'October'])} {rng.randint(1, 28)}"}
+            key = f"contact_{first.lower()}"
+        elif kind == "vehicle":
+            make, model = rng.choice(VEHICLES)
+            value = {"year": str(rng.randint(2005, 2024)), "make": make, "model": model,
+                     "vin": "".join(rng.choice("ABCDEFGHJKLMNPRSTUVWXYZ0123456789") for _ in range(17))}
+            key = f"vehicle_{make.lower()}"
+        elif kind == "policy":
+            value = {"policy_number": f"POL-{rng.randint(100000, 999999)}", "type": rng.choice(POLICY_TYPES),
+                     "carrier": rng.choice(["Travelers", "Safeco", "Progressive"]),
+                     "description": f"{rng.choice(POLICY_TYPES)} policy renews in {rng.choice(['March', 'June'])}"}
+            key = "policy_info"
+        elif kind == "preference":
+            value = {"description": f"{first} {rng.choice(PREFERENCES)}"}
+            key = "preference"
+        elif kind == "fact":
+            value = rng.choice([
+                {"description": f"Caller mentioned {rng.choice(CALLER_LINES).lower()}"},
+                f"{first} {last} works at {rng.choice(LAST_NAMES)} Construction and follows up on Fridays",
+            ])
+            key = f"fact_{idx}"
+        elif kind == "call_summary":
+            value = {"summary": " ".join(rng.sample(CALLER_LINES, 3)), "call_sid": f"CA{rng.getrandbits(64):016x}",
+                     "sentiment": rng.choice(["positive", "neutral"])}
+            key = "call_summary"
+        elif kind == "registration":
+            value = {"phone_number": user_id, "name": f"{first} {last}"}
+            key = "registration"
+        else:
+            value = {"user_message": rng.choice(CALLER_LINES), "assistant_response": rng.choice(AGENT_LINES)}
+            key = f"thread_{idx}"
+        memories.append({
+            "id": f"mem-{idx:05d}",
+            "type": kind,
+            "key": key,
+            "value": value,
+            "user_id": user_id,
+            "scope": "user",
+            "created_at": (started + timedelta(hours=idx * 3)).isoformat(),
+        })
+    return memories
+
+
+def make_memory_lines(memories: List[Dict[str, Any]], plain_text_every: int = 50) -> str:
+    """AI-Memory's concatenated "memory" string: one JSON row per line, with some plain-text lines."""
+    lines = []
+    for idx, memory in enumerate(memories):
+        if plain_text_every and idx % plain_text_every == 0:
+            lines.append(f"{FIRST_NAMES[idx % len(FIRST_NAMES)]} likes Ahi Tuna sushi")
+        else:
+            lines.append(json.dumps(memory))
+    return "\n".join(lines)
+
+
+def make_transfer_rules(count: int = 100) -> List[Dict[str, str]]:
+    """A large tenant's transfer table: departments, phrases and staff names."""
+    rng = _rng(2)
+    departments = ["claims department", "billing office", "new business sales", "commercial lines team",
+                   "life insurance specialist", "roadside assistance", "underwriting review", "policy changes desk",
+                   "certificate requests", "payroll audit team"]
+    rules = []
+    for idx in range(count):
+        if idx % 3 == 0:
+            name = FIRST_NAMES[idx % len(FIRST_NAMES)].lower() + str(idx)  # unique staff keyword
+            rules.append({"keyword": name, "number": _phone(rng), "description": f"{name.title()} - account manager"})
+        else:
+            department = departments[idx % len(departments)]
+            rules.append({"keyword": f"{department} {idx}", "number": _phone(rng),
+                          "description": f"route to {department}"})
+    return rules
+
+
+def make_transcript_turns(minutes: float = 10.0) -> List[str]:
+    """Caller utterances of a call lasting `minutes` (about five turns a minute)."""
+    rng = _rng(3)
+    return [rng.choice(CALLER_LINES) for _ in range(int(minutes * 5))]
+
+
+def make_conversation(minutes: float = 10.0) -> List[Dict[str, str]]:
+    """Alternating user/assistant messages for a `minutes`-long conversation."""
+    rng = _rng(4)
+    messages = []
+    for line in make_transcript_turns(minutes):
+        messages.append({"role": "user", "content": line})
+        messages.append({"role": "assistant", "content": rng.choice(AGENT_LINES)})
+    return messages
+
+
+def make_tool_call_response(calls: int = 20) -> str:
+    """Assistant text carrying legacy TOOL:name(...) calls between prose."""
+    rng = _rng(5)
+    parts = []
+    for idx in range(calls):
+        parts.append(rng.choice(AGENT_LINES))
+        if idx % 2:
+            parts.append(f'TOOL:send_email(to="caller{idx}@example.com", subject="Quote, bundle (home + auto)", '
+                         f'body="Hi {rng.choice(FIRST_NAMES)}, as discussed: {rng.choice(AGENT_LINES)}")')
+        else:
+            parts.append('TOOL:schedule_callback({"phone": "%s", "when": "tomorrow 9am", "reason": "renewal"})'
+                         % _phone(rng))
+    return "\n".join(parts)
+
+
+def make_mulaw_audio(seconds: float = 600.0) -> bytes:
+    """`seconds` of 8 kHz mu-law caller audio (speech-like noise bursts between silence)."""
+    rng = _rng(6)
+    samples = int(seconds * 8000)
+    out = bytearray(samples)
+    for i in range(0, samples, 160):
+        loud = (i // 8000) % 3 != 2  # two seconds talking, one second pause
+        out[i:i + 160] = rng.randbytes(160) if loud else b"\xff" * 160
+    return bytes(out)
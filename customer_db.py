@@ -0,0 +1,190 @@
+"""
+Shared customer database engine and inbound-number routing table.
+
+One pooled SQLAlchemy engine serves every customer query in the Flask
+process (previously each request built its own engine). On top of it,
+CustomerRoutingTable keeps an in-memory map of normalized E.164 Twilio
+number -> customer call config, so call pickup is a dict lookup:
+
+    route = get_routing_table().lookup(request.form.get('To'))
+    if route:
+        route["customer_id"], route["agent_name"], route["openai_voice"], ...
+
+The table is built at startup, rebuilt whenever /api/customers/* writes
+call invalidate(), and refreshed every customer_routing_refresh_seconds as
+a safety net for numbers provisioned directly in the database. Misses fall
+back to an indexed query on customers.twilio_phone_normalized.
+"""
+
+import time
+import logging
+import threading
+from typing import Dict, Any, List, Optional
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from config_loader import get_secret, get_setting
+from customer_models import Customer, normalize_e164
+
+logger = logging.getLogger(__name__)
+
+ROUTING_RETRY_SECONDS = 30
+
+_engine = None
+_Session = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """Module-level pooled engine (created on first use)."""
+    global _engine, _Session
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                database_url = get_secret("DATABASE_URL")
+                if not database_url:
+                    raise RuntimeError("DATABASE_URL is not configured")
+                _engine = create_engine(
+                    database_url,
+                    pool_size=int(get_setting("db_pool_size", 5)),
+                    max_overflow=int(get_setting("db_pool_max_overflow", 5)),
+                    pool_pre_ping=True,
+                    pool_recycle=1800,
+                )
+                _Session = sessionmaker(bind=_engine)
+                logger.info("✅ Customer database engine created (pooled)")
+    return _engine
+
+
+def get_db_session():
+    """New ORM session bound to the shared engine. Callers must close() it."""
+    get_engine()
+    return _Session()
+
+
+def _route_from_customer(customer: Customer) -> Dict[str, Any]:
+    return {
+        "customer_id": customer.id,
+        "business_name": customer.business_name,
+        "agent_name": customer.agent_name or 'AI Assistant',
+        "openai_voice": customer.openai_voice or 'alloy',
+        "greeting_template": customer.greeting_template or 'Hello! How can I help you today?',
+        "personality_sliders": customer.personality_sliders,
+        "twilio_phone_number": customer.twilio_phone_number,
+    }
+
+
+class CustomerRoutingTable:
+    """
+    In-memory map of normalized E.164 inbound number -> customer call config.
+    """
+
+    def __init__(self, refresh_seconds: float = 300):
+        self.refresh_seconds = refresh_seconds
+        self._routes: Dict[str, Dict[str, Any]] = {}
+        self._built_at = 0.0
+        self._stale = True
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+
+    def refresh(self) -> int:
+        """
+        Rebuild the table from the customers table.
+
+        Returns:
+            Number of routable customers
+        """
+        with self._lock:
+            db_session = get_db_session()
+            try:
+                customers = db_session.query(Customer).filter(Customer.twilio_phone_number.isnot(None)).all()
+                routes = {}
+                for customer in customers:
+                    number = normalize_e164(customer.twilio_phone_number)
+                    if number:
+                        routes[number] = _route_from_customer(customer)
+            finally:
+                db_session.close()
+
+            self._routes = routes
+            self._built_at = time.time()
+            self._stale = False
+        logger.info(f"📇 Customer routing table built: {len(routes)} numbers")
+        return len(routes)
+
+    def invalidate(self):
+        """Rebuild after a customer write (falls back to a lazy rebuild on failure)."""
+        self._stale = True
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.error(f"❌ Customer routing table rebuild failed (will retry on next call): {e}")
+
+    def lookup(self, to_number: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        Resolve the customer config for an inbound Twilio number.
+
+        Args:
+            to_number: The called number as sent by Twilio (any formatting)
+
+        Returns:
+            Route dict (customer_id, agent_name, openai_voice, greeting_template,
+            personality_sliders, business_name) or None if no customer owns it
+        """
+        number = normalize_e164(to_number)
+        if not number:
+            return None
+
+        now = time.time()
+        if (self._stale or now - self._built_at > self.refresh_seconds) and now >= self._retry_at:
+            try:
+                self.refresh()
+            except Exception as e:
+                # Don't hammer a failing database on every inbound call
+                self._retry_at = now + ROUTING_RETRY_SECONDS
+                logger.error(f"❌ Customer routing table refresh failed, using last table: {e}")
+
+        route = self._routes.get(number)
+        if route is not None:
+            return route
+
+        # Miss: indexed lookup catches numbers provisioned since the last refresh
+        db_session = get_db_session()
+        try:
+            customer = db_session.query(Customer).filter_by(twilio_phone_normalized=number).first()
+            if customer is None:
+                return None
+            route = _route_from_customer(customer)
+        finally:
+            db_session.close()
+        self._routes[number] = route
+        return route
+
+    def routes(self) -> List[Dict[str, Any]]:
+        """Snapshot of all routes in the current table."""
+        return list(self._routes.values())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "numbers": len(self._routes),
+            "built_at": self._built_at,
+            "stale": self._stale,
+            "refresh_seconds": self.refresh_seconds,
+        }
+
+
+_routing_table: Optional[CustomerRoutingTable] = None
+_routing_table_lock = threading.Lock()
+
+
+def get_routing_table() -> CustomerRoutingTable:
+    """Process-wide routing table."""
+    global _routing_table
+    if _routing_table is None:
+        with _routing_table_lock:
+            if _routing_table is None:
+                _routing_table = CustomerRoutingTable(
+                    refresh_seconds=float(get_setting("customer_routing_refresh_seconds", 300))
+                )
+    return _routing_table
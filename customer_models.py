@@ -4,10 +4,26 @@ Customer Management Database Models
 from datetime import datetime
 from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, JSON
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 
 Base = declarative_base()
 
+
+def normalize_e164(number):
+    """
+    Normalize a phone number to E.164 (US numbers assumed when no country code).
+
+    "(949) 707-1290", "9497071290", "+1 949 707 1290" -> "+19497071290"
+    """
+    if not number:
+        return None
+    digits = ''.join(filter(str.isdigit, str(number)))
+    if not digits:
+        return None
+    if len(digits) == 10:
+        return f"+1{digits}"
+    return f"+{digits}"
+
 class Customer(Base):
     """Customer account model"""
     __tablename__ = 'customers'
@@ -31,6 +47,7 @@ class Customer(Base):
     
     # Twilio/Phone config
     twilio_phone_number = Column(String(50))
+    twilio_phone_normalized = Column(String(20), index=True)  # E.164, kept in sync with twilio_phone_number
     
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -39,6 +56,11 @@ class Customer(Base):
     # Relationships
     configurations = relationship("CustomerConfiguration", back_populates="customer", cascade="all, delete-orphan")
     
+    @validates('twilio_phone_number')
+    def _sync_normalized_phone(self, key, value):
+        self.twilio_phone_normalized = normalize_e164(value)
+        return value
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -0,0 +1,405 @@
+"""
+Memory V2 backfill engine.
+
+Generates call summaries and personality metrics for historical conversation
+memories. Rows are streamed from a server-side cursor (filtered by type in
+SQL, newest first, keyed on (created_at, id)), conversations are analyzed by
+a bounded worker pool behind an LLM rate limiter and stored in batches, and
+progress is checkpointed to a JSON file so a crashed or interrupted run
+resumes where it stopped.
+
+A memory is backfilled under call_id "backfill_<memory id>"; rows whose call_id
+already has a call_summaries row are excluded by the query itself, so re-runs
+(and rows finished after the last checkpoint of a crashed run) cost nothing.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from app.memory import MemoryStore, connect_db
+from app.memory_integration import MemoryV2Integration
+
+logger = logging.getLogger(__name__)
+
+CONVERSATION_TYPES = ("moment", "thread_history")
+CALL_ID_PREFIX = "backfill_"
+MAX_RECORDED_FAILURES = 1000
+
+
+def backfill_call_id(memory_id: Any) -> str:
+    return f"{CALL_ID_PREFIX}{memory_id}"
+
+
+def extract_conversation_from_memory(memory_value: dict) -> list:
+    """
+    Extract conversation history from a memory record.
+
+    Args:
+        memory_value: The value_json field from memories table
+
+    Returns:
+        List of (role, content) tuples
+    """
+    # Handle different memory formats
+    if isinstance(memory_value, dict):
+        if "messages" in memory_value:
+            # Thread history format
+            messages = memory_value["messages"]
+            return [(msg["role"], msg["content"]) for msg in messages]
+        elif "content" in memory_value:
+            # Single message format
+            return [("user", memory_value.get("content", ""))]
+
+    return []
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket: at most `rate_per_minute` acquisitions per minute,
+    with bursts of up to `burst`.
+    """
+
+    def __init__(self, rate_per_minute: float, burst: int = 1):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.waited_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                delay = (1 - self.tokens) / self.rate
+                self.waited_seconds += delay
+            time.sleep(delay)
+
+    def wrap(self, func: Callable) -> Callable:
+        """Rate-limited version of an LLM chat function."""
+        def limited(*args, **kwargs):
+            self.acquire()
+            return func(*args, **kwargs)
+        return limited
+
+
+@dataclass
+class Checkpoint:
+    """
+    Durable backfill progress.
+
+    `after_created_at`/`after_id` is the key of the last row such that every
+    row before it (in stream order) has finished; a resumed run starts after it.
+    """
+    types: List[str] = field(default_factory=lambda: list(CONVERSATION_TYPES))
+    after_created_at: Optional[str] = None
+    after_id: Optional[str] = None
+    processed: int = 0
+    skipped: int = 0
+    failed: int = 0
+    failed_ids: List[str] = field(default_factory=list)
+    started_at: Optional[str] = None
+    updated_at: Optional[str] = None
+
+    @classmethod
+    def load(cls, path: str) -> Optional["Checkpoint"]:
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            data = json.load(f)
+        return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
+
+    def save(self, path: str):
+        """Write atomically (temp file + fsync + rename) so a crash never leaves a torn checkpoint."""
+        self.updated_at = datetime.utcnow().isoformat(timespec="seconds")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(asdict(self), f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+
+class BackfillEngine:
+    """
+    Parallel, resumable Memory V2 backfill.
+
+    Args:
+        memory_store: Store the summaries/personality rows are written through
+        llm_chat_function: LLM chat function (wrapped in the rate limiter)
+        checkpoint_path: JSON checkpoint file (None = no checkpointing)
+        workers: Conversations processed concurrently
+        rate_per_minute: LLM requests per minute across all workers (0 = unlimited)
+        fetch_size: Rows per round trip from the server-side cursor
+        limit: Maximum rows to take from the stream this run (None = all)
+        types: Memory types that hold conversations
+        resume: Continue from an existing checkpoint
+        dry_run: Stream and count eligible conversations without LLM calls or writes
+        progress_interval: Seconds between throughput/ETA log lines
+        checkpoint_interval: Seconds between checkpoint writes
+        write_batch_size: Analyzed calls stored per store_call_summaries batch
+    """
+
+    def __init__(
+        self,
+        memory_store: MemoryStore,
+        llm_chat_function: Callable,
+        checkpoint_path: Optional[str] = "backfill_checkpoint.json",
+        workers: int = 4,
+        rate_per_minute: float = 120,
+        fetch_size: int = 200,
+        limit: Optional[int] = None,
+        types: Sequence[str] = CONVERSATION_TYPES,
+        resume: bool = True,
+        dry_run: bool = False,
+        progress_interval: float = 30,
+        checkpoint_interval: float = 5,
+        write_batch_size: int = 50,
+    ):
+        self.memory_store = memory_store
+        self.workers = max(1, workers)
+        self.limiter = RateLimiter(rate_per_minute, burst=self.workers) if rate_per_minute > 0 else None
+        chat = self.limiter.wrap(llm_chat_function) if self.limiter else llm_chat_function
+        self.integration = MemoryV2Integration(memory_store, chat)
+        self.checkpoint_path = checkpoint_path
+        self.fetch_size = fetch_size
+        self.limit = limit
+        self.types = list(types)
+        self.resume = resume
+        self.dry_run = dry_run
+        self.progress_interval = progress_interval
+        self.checkpoint_interval = checkpoint_interval
+        self.write_batch_size = max(1, write_batch_size)
+
+        self.checkpoint = Checkpoint(types=self.types)
+        # Rows in stream order: [key, finished]; the finished prefix advances the checkpoint
+        self._window: Deque[List[Any]] = deque()
+        # Analyzed by the workers, waiting for the next batched write: (entry, memory_id, summary, personality)
+        self._analyzed: List[Tuple[List[Any], str, dict, dict]] = []
+        self._lock = threading.Lock()
+        self._done_this_run = 0
+        self._total = 0
+        self._started = 0.0
+        self._last_progress = 0.0
+        self._last_checkpoint = 0.0
+
+    # ------------------------------------------------------------------
+    # Query
+    # ------------------------------------------------------------------
+
+    def _where(self) -> Tuple[str, List[Any]]:
+        clauses = [
+            "m.type = ANY(%s)",
+            "m.created_at IS NOT NULL",
+            "NOT EXISTS (SELECT 1 FROM call_summaries cs WHERE cs.call_id = %s || m.id::text)",
+        ]
+        params: List[Any] = [self.types, CALL_ID_PREFIX]
+        if self.checkpoint.after_created_at:
+            # Keyset continuation - no OFFSET scan, stable while new rows arrive
+            clauses.append("(m.created_at, m.id) < (%s::timestamptz, %s::uuid)")
+            params += [self.checkpoint.after_created_at, self.checkpoint.after_id]
+        return " AND ".join(clauses), params
+
+    def _count_remaining(self, conn) -> int:
+        where, params = self._where()
+        with conn.cursor() as cur:
+            cur.execute(f"SELECT count(*) FROM memories m WHERE {where}", params)
+            count = cur.fetchone()[0]
+        return min(count, self.limit) if self.limit else count
+
+    def _stream(self, conn):
+        """Yield (id, value_json, user_id, created_at) from a named (server-side) cursor."""
+        where, params = self._where()
+        query = f"""
+            SELECT m.id, m.value_json, m.user_id, m.created_at
+            FROM memories m
+            WHERE {where}
+            ORDER BY m.created_at DESC, m.id DESC
+        """
+        if self.limit:
+            query += " LIMIT %s"
+            params.append(self.limit)
+        with conn.cursor(name="memory_v2_backfill") as cur:
+            cur.itersize = self.fetch_size
+            cur.execute(query, params)
+            for row in cur:
+                yield row
+
+    # ------------------------------------------------------------------
+    # Progress bookkeeping
+    # ------------------------------------------------------------------
+
+    def _finish(self, entry: List[Any], outcome: str, memory_id: Optional[str] = None):
+        with self._lock:
+            entry[1] = True
+            if outcome == "processed":
+                self.checkpoint.processed += 1
+            elif outcome == "skipped":
+                self.checkpoint.skipped += 1
+            else:
+                self.checkpoint.failed += 1
+                if memory_id and len(self.checkpoint.failed_ids) < MAX_RECORDED_FAILURES:
+                    self.checkpoint.failed_ids.append(memory_id)
+            self._done_this_run += 1
+            while self._window and self._window[0][1]:
+                created_at, row_id = self._window.popleft()[0]
+                self.checkpoint.after_created_at = created_at
+                self.checkpoint.after_id = row_id
+
+    def _maybe_report(self, force: bool = False):
+        """Write analyzed calls, checkpoint and log progress when due (main thread only)."""
+        now = time.monotonic()
+        checkpoint_due = force or now - self._last_checkpoint >= self.checkpoint_interval
+        if checkpoint_due or len(self._analyzed) >= self.write_batch_size:
+            self._write_analyzed()
+        if checkpoint_due:
+            self._save_checkpoint()
+            self._last_checkpoint = now
+        if force or now - self._last_progress >= self.progress_interval:
+            self._last_progress = now
+            logger.info(f"📈 {self.progress()}")
+
+    def _save_checkpoint(self):
+        if self.dry_run or not self.checkpoint_path:
+            return
+        with self._lock:
+            self.checkpoint.save(self.checkpoint_path)
+
+    def progress(self) -> str:
+        """One-line throughput / ETA summary."""
+        elapsed = max(time.monotonic() - self._started, 1e-6)
+        done = self._done_this_run
+        rate = done / elapsed
+        remaining = max(self._total - done, 0)
+        eta = f"{remaining / rate / 60:.1f}min" if rate > 0 else "?"
+        cp = self.checkpoint
+        throttled = f" | throttled {self.limiter.waited_seconds:.0f}s" if self.limiter else ""
+        return (f"{done}/{self._total} rows | {rate * 60:.1f}/min | ETA {eta} | "
+                f"✅ {cp.processed} ⏭️ {cp.skipped} ❌ {cp.failed}{throttled}")
+
+    # ------------------------------------------------------------------
+    # Work
+    # ------------------------------------------------------------------
+
+    def _process(self, entry: List[Any], memory_id: str, conversation: list, user_id: Optional[str]):
+        """Worker: analyze one conversation (LLM only - rows are written in batches by the main thread)."""
+        try:
+            summary_data, personality_data = self.integration.analyzer.analyze(
+                conversation,
+                user_id or "unknown",
+                backfill_call_id(memory_id),
+            )
+            with self._lock:
+                self._analyzed.append((entry, memory_id, summary_data, personality_data))
+        except Exception as e:
+            logger.error(f"❌ Backfill error for memory {memory_id}: {e}", exc_info=True)
+            self._finish(entry, "failed", memory_id)
+
+    def _write_analyzed(self):
+        """Store everything analyzed so far with one store_call_summaries batch."""
+        with self._lock:
+            batch, self._analyzed = self._analyzed, []
+        if not batch:
+            return
+        try:
+            self.integration.store_analyses([(summary, personality) for _, _, summary, personality in batch])
+            outcome = "processed"
+        except Exception as e:
+            logger.error(f"❌ Backfill write of {len(batch)} calls failed: {e}", exc_info=True)
+            outcome = "failed"
+        for entry, memory_id, _, _ in batch:
+            self._finish(entry, outcome, memory_id)
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Run the backfill until the stream is exhausted, the limit is reached or Ctrl-C.
+
+        Returns:
+            Final checkpoint counters plus rows handled and elapsed seconds for this run
+        """
+        if self.resume and self.checkpoint_path:
+            saved = Checkpoint.load(self.checkpoint_path)
+            if saved:
+                if sorted(saved.types) != sorted(self.types):
+                    raise ValueError(f"checkpoint {self.checkpoint_path} was written for types {saved.types}, "
+                                     f"not {self.types} - use a different --checkpoint or --restart")
+                self.checkpoint = saved
+                logger.info(f"♻️ Resuming after {saved.after_created_at} / {saved.after_id} "
+                            f"(✅ {saved.processed} ⏭️ {saved.skipped} ❌ {saved.failed} so far)")
+        self.checkpoint.started_at = self.checkpoint.started_at or datetime.utcnow().isoformat(timespec="seconds")
+
+        reader = connect_db(autocommit=False)
+        reader.set_session(readonly=True)
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="backfill")
+        pending: set = set()
+        self._started = self._last_progress = self._last_checkpoint = time.monotonic()
+        interrupted = False
+        try:
+            self._total = self._count_remaining(reader)
+            mode = "DRY RUN - " if self.dry_run else ""
+            rate = f"{self.limiter.rate * 60:.0f} LLM req/min" if self.limiter else "no LLM rate limit"
+            logger.info(f"🚀 {mode}Backfilling {self._total} memories of type {self.types} "
+                        f"with {self.workers} workers, {rate}")
+
+            for memory_id, value, user_id, created_at in self._stream(reader):
+                memory_id = str(memory_id)
+                entry = [(created_at.isoformat(), memory_id), False]
+                with self._lock:
+                    self._window.append(entry)
+
+                conversation = extract_conversation_from_memory(value)
+                if len(conversation) < 2:
+                    self._finish(entry, "skipped")
+                elif self.dry_run:
+                    self._finish(entry, "processed")
+                else:
+                    # Bounded in-flight work so the cursor never runs far ahead of the workers
+                    while len(pending) >= self.workers * 2:
+                        _, pending = wait(pending, timeout=self.progress_interval, return_when=FIRST_COMPLETED)
+                        self._maybe_report()
+                    future: Future = executor.submit(self._process, entry, memory_id, conversation, user_id)
+                    pending.add(future)
+                self._maybe_report()
+            while pending:
+                _, pending = wait(pending, timeout=self.progress_interval)
+                self._maybe_report()
+        except KeyboardInterrupt:
+            interrupted = True
+            logger.warning("⏸️ Interrupted - letting running conversations finish before saving the checkpoint")
+        finally:
+            # Queued-but-unstarted rows stay unfinished, so the checkpoint stops before them
+            executor.shutdown(wait=True, cancel_futures=True)
+            reader.rollback()
+            reader.close()
+            self._maybe_report(force=True)
+
+        elapsed = time.monotonic() - self._started
+        logger.info("=" * 80)
+        logger.info(f"{'⏸️ Backfill interrupted' if interrupted else '🎉 Backfill complete'} in {elapsed / 60:.1f}min")
+        logger.info(f"✅ Processed: {self.checkpoint.processed}  ⏭️ Skipped: {self.checkpoint.skipped}  "
+                    f"❌ Failed: {self.checkpoint.failed}")
+        if self.checkpoint.failed_ids:
+            logger.info(f"Failed memory ids are listed in {self.checkpoint_path}; they are retried by a --restart run")
+        logger.info("=" * 80)
+        return {
+            "processed": self.checkpoint.processed,
+            "skipped": self.checkpoint.skipped,
+            "failed": self.checkpoint.failed,
+            "rows_this_run": self._done_this_run,
+            "elapsed_seconds": round(elapsed, 1),
+            "interrupted": interrupted,
+        }
@@ -0,0 +1,266 @@
+"""
+Call Analysis Module
+Extracts the call summary and personality metrics in a single LLM pass
+
+CallSummarizer and PersonalityTracker each prompt the LLM separately with
+overlapping text. CallAnalyzer sends the transcript once in JSON mode and
+validates the reply against CallAnalysis (app/models.py), so post-call
+processing costs one request instead of two. Transcripts longer than
+call_analysis_chunk_chars are analyzed chunk by chunk and the chunk summaries
+merged in one more request (map-reduce).
+
+When the LLM fails or returns an invalid reply, the rule-based
+CallSummarizer/PersonalityTracker fallbacks are used. After a failed request
+the LLM is skipped for call_analysis_llm_cooldown_seconds, so a backfill does
+not keep paying for timeouts against an endpoint that is down. Successful analyses are
+cached by transcript, so reprocessing the same call does not call the LLM.
+"""
+
+import re
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+
+from config_loader import get_setting
+from app.models import CallAnalysis, CallSummaryFields, PersonalityMetrics, SENTIMENTS, RESOLUTION_STATUSES
+from app.summarizer import CallSummarizer
+from app.personality import PersonalityTracker
+
+logger = logging.getLogger(__name__)
+
+CHUNK_CHARS = int(get_setting("call_analysis_chunk_chars", 24000))
+LLM_COOLDOWN_SECONDS = float(get_setting("call_analysis_llm_cooldown_seconds", 60))
+CACHE_SIZE = int(get_setting("call_analysis_cache_size", 256))
+
+SYSTEM_PROMPT = ("You are a conversation analysis expert. Extract structured information from phone calls "
+                 "and give objective personality ratings based on observable communication patterns.")
+
+_SUMMARY_FIELDS = f"""  "summary": brief 2-3 sentence summary of what was discussed,
+  "key_topics": list of main topics (e.g. ["billing", "technical_support"]),
+  "key_variables": object of important details mentioned (e.g. {{{{"account_id": "12345", "issue_type": "billing error"}}}}),
+  "sentiment": overall caller sentiment, one of {", ".join(SENTIMENTS)},
+  "resolution_status": was the issue resolved, one of {", ".join(RESOLUTION_STATUSES)}"""
+
+ANALYSIS_PROMPT = f"""Analyze this phone call between a caller (User) and an assistant.
+
+CONVERSATION:
+{{transcript}}
+
+Respond ONLY with a JSON object with these keys:
+{_SUMMARY_FIELDS},
+  "personality": the CALLER's traits judged from their own messages, each a number 0-100:
+    openness (0=traditional, 100=very open), conscientiousness (0=spontaneous, 100=very organized),
+    extraversion (0=introverted, 100=extraverted), agreeableness (0=competitive, 100=very agreeable),
+    neuroticism (0=very stable, 100=highly reactive), formality (0=very casual, 100=very formal),
+    directness (0=very indirect, 100=very direct), detail_orientation (0=high-level only, 100=very detailed),
+    patience (0=very impatient, 100=very patient), technical_comfort (0=non-technical, 100=very technical),
+    frustration_level (0=none, 100=extremely frustrated), satisfaction_level (0=very unsatisfied, 100=very satisfied),
+    urgency_level (0=no rush, 100=extremely urgent)"""
+
+MERGE_PROMPT = f"""These are analyses of consecutive parts of one long phone call, in order:
+
+{{parts}}
+
+Combine them into one analysis of the whole call. Respond ONLY with a JSON object with these keys:
+{_SUMMARY_FIELDS}"""
+
+
+def _response_text(response: Any) -> str:
+    """Content of an llm_chat reply: app.llm.chat returns (content, usage); tolerate dicts and plain strings."""
+    if isinstance(response, tuple):
+        response = response[0]
+    if isinstance(response, dict):
+        response = response.get("content", "")
+    return str(response or "")
+
+
+class CallAnalyzer:
+    """
+    One-request post-call analysis: summary fields plus the 13 personality metrics.
+
+    Args:
+        llm_chat_function: Function that takes messages and returns LLM response
+        chunk_chars: Transcripts longer than this are analyzed with map-reduce
+    """
+
+    def __init__(self, llm_chat_function, chunk_chars: int = CHUNK_CHARS):
+        self.llm_chat = llm_chat_function
+        self.chunk_chars = chunk_chars
+        # Rule-based fallbacks (and transcript building) live on the single-purpose extractors
+        self.summarizer = CallSummarizer(llm_chat_function)
+        self.personality_tracker = PersonalityTracker(llm_chat_function)
+        self._json_mode = True  # dropped if the endpoint rejects response_format
+        self._llm_down_until = 0.0
+        self._cache: "OrderedDict[str, CallAnalysis]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def analyze(self, conversation_history: List[Tuple[str, str]], user_id: str, call_id: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Summarize a call and measure the caller's personality.
+
+        Args:
+            conversation_history: List of (role, content) tuples
+            user_id: Identifier for the caller
+            call_id: Unique call identifier
+
+        Returns:
+            (summary_data, personality_data) in the shapes returned by
+            CallSummarizer.summarize_call and PersonalityTracker.analyze_personality
+        """
+        transcript = self.summarizer._build_transcript(conversation_history)
+        user_messages = [content for role, content in conversation_history if role == "user"]
+
+        analysis = self._cached(transcript)
+        if analysis is None:
+            analysis = self._analyze_with_llm(conversation_history, transcript)
+            if analysis is not None:
+                self._remember(transcript, analysis)
+        if analysis is None:
+            analysis = self._fallback_analysis(transcript, user_messages)
+
+        # Nothing the caller said to measure - same neutral profile as PersonalityTracker
+        metrics = analysis.personality if user_messages else PersonalityMetrics()
+
+        summary_data = {
+            "call_id": call_id,
+            "user_id": user_id,
+            "call_date": datetime.now(),
+            "summary": analysis.summary,
+            "key_topics": analysis.key_topics,
+            "key_variables": analysis.key_variables,
+            "sentiment": analysis.sentiment,
+            "resolution_status": analysis.resolution_status,
+            "duration_seconds": self.summarizer._estimate_duration(conversation_history)
+        }
+        personality_data = {
+            "user_id": user_id,
+            "call_id": call_id,
+            "measured_at": datetime.now(),
+            **metrics.model_dump()
+        }
+
+        logger.info(f"✅ Analyzed call {call_id} for user {user_id}: {len(analysis.summary)} char summary, "
+                    f"sentiment={analysis.sentiment}, formality={metrics.formality:.0f}")
+        return summary_data, personality_data
+
+    # ------------------------------------------------------------------
+    # LLM pass
+    # ------------------------------------------------------------------
+
+    def _analyze_with_llm(self, conversation_history: List[Tuple[str, str]], transcript: str) -> Optional[CallAnalysis]:
+        if time.monotonic() < self._llm_down_until:
+            return None
+        try:
+            if len(transcript) <= self.chunk_chars:
+                return self._request(ANALYSIS_PROMPT.format(transcript=transcript), CallAnalysis, max_tokens=900)
+            return self._map_reduce(conversation_history)
+        except ValueError as e:
+            # Reply was not valid analysis JSON - the endpoint itself is fine
+            logger.error(f"LLM call analysis unusable, using rule-based extraction: {e}")
+            return None
+        except Exception as e:
+            self._llm_down_until = time.monotonic() + LLM_COOLDOWN_SECONDS
+            logger.error(f"LLM call analysis failed, using rule-based extraction for {LLM_COOLDOWN_SECONDS:.0f}s: {e}")
+            return None
+
+    def _request(self, prompt: str, model: Type[BaseModel], max_tokens: int) -> BaseModel:
+        """One JSON-mode request, parsed and validated against `model`."""
+        messages = [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
+        kwargs: Dict[str, Any] = {"temperature": 0.2, "max_tokens": max_tokens}
+        if self._json_mode:
+            kwargs["response_format"] = {"type": "json_object"}
+        try:
+            response = self.llm_chat(messages, **kwargs)
+        except Exception as e:
+            # Endpoints (or chat functions) without JSON mode: retry once as plain text and stop asking
+            if not self._json_mode or not (isinstance(e, TypeError) or "400" in str(e)):
+                raise
+            logger.warning(f"LLM rejected response_format, continuing without JSON mode: {e}")
+            self._json_mode = False
+            kwargs.pop("response_format")
+            response = self.llm_chat(messages, **kwargs)
+
+        # Remove markdown code blocks if present
+        response_text = re.sub(r'```json\s*|\s*```', '', _response_text(response)).strip()
+        try:
+            return model.model_validate(json.loads(response_text))
+        except (json.JSONDecodeError, ValidationError) as e:
+            raise ValueError(f"invalid analysis JSON: {e}") from e
+
+    def _map_reduce(self, conversation_history: List[Tuple[str, str]]) -> CallAnalysis:
+        """Analyze each chunk, merge the summaries with one more request and weight metrics by caller text."""
+        chunks = self._chunk(conversation_history)
+        logger.info(f"📚 Long call ({len(chunks)} chunks) - analyzing with map-reduce")
+
+        partials: List[CallAnalysis] = []
+        weights: List[int] = []
+        for chunk in chunks:
+            transcript = self.summarizer._build_transcript(chunk)
+            partials.append(self._request(ANALYSIS_PROMPT.format(transcript=transcript), CallAnalysis, max_tokens=900))
+            weights.append(sum(len(content) for role, content in chunk if role == "user"))
+
+        parts = "\n\n".join(
+            f"PART {i}:\n{json.dumps(p.model_dump(exclude={'personality'}), ensure_ascii=False)}"
+            for i, p in enumerate(partials, 1)
+        )
+        merged = self._request(MERGE_PROMPT.format(parts=parts), CallSummaryFields, max_tokens=600)
+
+        if not any(weights):
+            weights = [1] * len(partials)
+        total = sum(weights)
+        personality = PersonalityMetrics(**{
+            name: sum(getattr(p.personality, name) * w for p, w in zip(partials, weights)) / total
+            for name in PersonalityMetrics.model_fields
+        })
+        return CallAnalysis(**merged.model_dump(), personality=personality)
+
+    def _chunk(self, conversation_history: List[Tuple[str, str]]) -> List[List[Tuple[str, str]]]:
+        """Split on message boundaries into chunks of about chunk_chars (a longer single message is cut)."""
+        chunks: List[List[Tuple[str, str]]] = [[]]
+        size = 0
+        for role, content in conversation_history:
+            content = content[:self.chunk_chars]
+            if chunks[-1] and size + len(content) > self.chunk_chars:
+                chunks.append([])
+                size = 0
+            chunks[-1].append((role, content))
+            size += len(content) + 8  # "User: " prefix and newline
+        return chunks
+
+    # ------------------------------------------------------------------
+    # Cache and fallback
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _cache_key(transcript: str) -> str:
+        return hashlib.sha256(transcript.encode("utf-8")).hexdigest()
+
+    def _cached(self, transcript: str) -> Optional[CallAnalysis]:
+        key = self._cache_key(transcript)
+        with self._lock:
+            analysis = self._cache.get(key)
+            if analysis is not None:
+                self._cache.move_to_end(key)
+        return analysis
+
+    def _remember(self, transcript: str, analysis: CallAnalysis):
+        with self._lock:
+            self._cache[self._cache_key(transcript)] = analysis
+            while len(self._cache) > CACHE_SIZE:
+                self._cache.popitem(last=False)
+
+    def _fallback_analysis(self, transcript: str, user_messages: List[str]) -> CallAnalysis:
+        """Rule-based summary and personality (the CallSummarizer/PersonalityTracker fallbacks)."""
+        summary = self.summarizer._fallback_extraction(transcript)
+        metrics = self.personality_tracker._fallback_personality_analysis(user_messages) if user_messages else {}
+        return CallAnalysis(**summary, personality=PersonalityMetrics(**metrics))
@@ -0,0 +1,349 @@
+"""
+Rolling conversation consolidation, off the request path.
+
+Once a thread's rolling history reaches consolidation_threshold_messages, its
+oldest messages are summarized by the LLM into long-term people / facts /
+preferences / commitments memories and then pruned from the history. This
+used to run inline in save_thread_history, so the /v1/chat turn or realtime
+response.done that crossed the threshold waited on a 1000-token extraction
+plus a dozen sequential AI-Memory writes.
+
+save_thread_history now only reports the thread's history:
+
+    get_consolidation_scheduler().note_messages(thread_id, THREAD_HISTORY, mem_store, user_id)
+
+The scheduler tracks per-thread message counts, queues one job per thread
+that is over the threshold (never two at once for the same thread), and runs
+jobs on consolidation_max_concurrent worker threads. Workers never touch the
+live history deques - request paths iterate and append to them without
+locks. A job gets a snapshot of the oldest messages, and the prune of the
+analyzed messages is applied on the thread's next note_messages call (on the
+request path) by swapping in a new deque with one assignment. Extracted memories are
+written in one batch (mem_store.write_many - a single AI-Memory bulk request
+from the orchestrator, a single multi-row INSERT inside AI-Memory).
+"""
+
+import time
+import json
+import queue
+import hashlib
+import logging
+import threading
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, MutableMapping, Optional, Tuple
+
+from config_loader import get_setting
+
+from app import metrics
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MAX_TRACKED_THREADS = 10000
+RETRY_BACKOFF_SECONDS = 60
+
+
+def stable_hash(text: str) -> str:
+    """Generate stable deterministic hash for de-duplication"""
+    return hashlib.sha1(text.lower().encode('utf-8')).hexdigest()[:8]
+
+
+def extract_consolidation_data(messages: List[Tuple[str, str]]) -> Dict[str, Any]:
+    """
+    Ask the LLM for the people, facts, preferences and commitments in a stretch of conversation.
+
+    Args:
+        messages: (role, content) tuples, oldest first
+
+    Returns:
+        Parsed extraction ({"people": [...], "facts": [...], "preferences": [...], "commitments": [...]})
+    """
+    from app.llm import chat as llm_chat
+
+    # Build conversation text for LLM analysis
+    conversation_text = "\n".join([
+        f"{role.upper()}: {content[:200]}"
+        for role, content in messages
+    ])
+
+    extraction_prompt = f"""Analyze this conversation and extract important information in JSON format.
+
+Conversation:
+{conversation_text}
+
+Extract:
+1. **people**: Family members, friends (name, relationship)
+2. **facts**: Important dates, events, details (description, value)
+3. **preferences**: Likes, dislikes, interests (category, preference)
+4. **commitments**: Promises, follow-ups, action items (description, deadline)
+
+Return ONLY valid JSON in this format:
+{{
+  "people": [{{"name": "Kelly", "relationship": "wife"}}],
+  "facts": [{{"description": "Kelly's birthday", "value": "January 3rd, 1966"}}],
+  "preferences": [{{"category": "activities", "preference": "spa days"}}],
+  "commitments": [{{"description": "plan birthday celebration", "deadline": "soon"}}]
+}}"""
+
+    extracted_text, _ = llm_chat(
+        [{"role": "user", "content": extraction_prompt}],
+        temperature=0.3,  # Low temperature for structured output
+        max_tokens=1000
+    )
+    return json.loads(extracted_text.strip())
+
+
+def consolidation_memories(thread_id: str, extracted: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Turn an extraction into memory items (keys are stable, so re-consolidating de-duplicates).
+
+    Args:
+        thread_id: Thread the conversation came from
+        extracted: Result of extract_consolidation_data
+
+    Returns:
+        Dicts with type, key, value and ttl_days
+    """
+    timestamp = int(time.time())
+    memories = []
+
+    def add(memory_type: str, key: str, item: Dict[str, Any], ttl_days: int = 365):
+        memories.append({
+            "type": memory_type,
+            "key": key,
+            "value": {**item, "extracted_at": timestamp, "source": "consolidation"},
+            "ttl_days": ttl_days
+        })
+
+    for person in extracted.get("people", []):
+        if person.get("name"):
+            add("person", f"person:{thread_id}:{person['name'].lower().replace(' ', '_')}", person)
+    for fact in extracted.get("facts", []):
+        if fact.get("description"):
+            add("fact", f"fact:{thread_id}:{stable_hash(fact['description'])}", fact)
+    for pref in extracted.get("preferences", []):
+        if pref.get("preference"):
+            add("preference", f"preference:{thread_id}:{stable_hash(pref['preference'])}", pref)
+    for commit in extracted.get("commitments", []):
+        if commit.get("description"):
+            # Shorter TTL for action items
+            add("project", f"project:{thread_id}:{stable_hash(commit['description'])}", commit, ttl_days=90)
+    return memories
+
+
+@dataclass
+class _Job:
+    thread_id: str
+    messages: List[Tuple[str, str]]  # snapshot of the oldest messages
+    mem_store: Any
+    user_id: Optional[str]
+    queued_at: float
+
+
+class ConsolidationScheduler:
+    """
+    Per-thread message counting + a bounded job queue drained by a few worker threads.
+
+    Args:
+        threshold: Consolidate a thread once its history has this many messages
+        batch_messages: Oldest messages analyzed per job
+        keep_messages: History is pruned down to this many (analyzed messages only)
+        max_concurrent: Jobs running at once (worker threads)
+        max_queue: Queued jobs; beyond this a thread is picked up on its next save
+    """
+
+    def __init__(self, threshold: int = 400, batch_messages: int = 200, keep_messages: int = 300,
+                 max_concurrent: int = 2, max_queue: int = 100):
+        self.threshold = threshold
+        self.batch_messages = batch_messages
+        self.keep_messages = keep_messages
+        self.max_concurrent = max(1, max_concurrent)
+        self._queue: "queue.Queue[_Job]" = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._counts: "OrderedDict[str, int]" = OrderedDict()
+        self._scheduled: set = set()  # queued or running
+        self._retry_after: Dict[str, float] = {}
+        self._pending_prunes: Dict[str, List[Tuple[str, str]]] = {}  # thread -> analyzed messages
+        self._running = 0
+        self._workers: List[threading.Thread] = []
+        self._stats = {"queued": 0, "completed": 0, "failed": 0, "dropped": 0, "memories_written": 0,
+                       "messages_pruned": 0}
+
+    def note_messages(self, thread_id: str, histories: MutableMapping[str, Deque[Tuple[str, str]]],
+                      mem_store: Any, user_id: Optional[str] = None) -> bool:
+        """
+        Apply a finished job's prune, record the thread's size and queue consolidation
+        if it is over the threshold. Never blocks the caller on the LLM or AI-Memory.
+
+        Args:
+            thread_id: Thread identifier
+            histories: Thread id -> rolling history deque (THREAD_HISTORY); a pruned
+                history is swapped in with one assignment
+            mem_store: Store the extracted memories are written through (needs write_many)
+            user_id: Owner of the extracted memories
+
+        Returns:
+            True if a job was queued
+        """
+        with self._lock:
+            analyzed = self._pending_prunes.pop(thread_id, None)
+        if analyzed:
+            self._apply_prune(thread_id, histories, analyzed)
+
+        history = histories.get(thread_id)
+        if not history:
+            return False
+        count = len(history)
+        with self._lock:
+            self._counts[thread_id] = count
+            self._counts.move_to_end(thread_id)
+            while len(self._counts) > MAX_TRACKED_THREADS:
+                evicted, _ = self._counts.popitem(last=False)
+                self._pending_prunes.pop(evicted, None)
+            if (count < self.threshold or thread_id in self._scheduled
+                    or time.time() < self._retry_after.get(thread_id, 0)):
+                return False
+            self._scheduled.add(thread_id)
+
+        # Snapshot on the request path - workers never iterate the live deque
+        messages = list(history)[:self.batch_messages]
+        try:
+            self._queue.put_nowait(_Job(thread_id, messages, mem_store, user_id, time.time()))
+        except queue.Full:
+            with self._lock:
+                self._scheduled.discard(thread_id)
+                self._stats["dropped"] += 1
+            metrics.MEMORY_CONSOLIDATIONS.labels(outcome="dropped").inc()
+            logger.warning(f"⚠️ Consolidation queue full, thread {thread_id} will be retried on its next save")
+            return False
+
+        with self._lock:
+            self._stats["queued"] += 1
+        self._ensure_workers()
+        logger.info(f"🧠 Queued memory consolidation for thread {thread_id} ({count} messages)")
+        return True
+
+    def _apply_prune(self, thread_id: str, histories: MutableMapping[str, Deque[Tuple[str, str]]],
+                     analyzed: List[Tuple[str, str]]):
+        """
+        Drop the analyzed messages still at the front of the history, down to keep_messages.
+
+        Matching is by identity, so a history reloaded from AI-Memory (new tuples)
+        is left alone. The new deque replaces the old one in a single assignment;
+        anything still iterating the old deque is unaffected.
+        """
+        history = histories.get(thread_id)
+        if not history:
+            return
+        current = list(history)
+        analyzed_ids = {id(message): index for index, message in enumerate(analyzed)}
+        # maxlen may already have evicted some analyzed messages from the front
+        start = analyzed_ids.get(id(current[0]))
+        if start is None or analyzed[start] is not current[0]:
+            return
+        pruned = 0
+        while (start + pruned < len(analyzed) and len(current) - pruned > self.keep_messages
+               and current[pruned] is analyzed[start + pruned]):
+            pruned += 1
+        if not pruned:
+            return
+        histories[thread_id] = deque(current[pruned:], maxlen=history.maxlen)
+        with self._lock:
+            self._stats["messages_pruned"] += pruned
+            self._counts[thread_id] = len(current) - pruned
+        logger.info(f"✂️ Pruned {pruned} consolidated messages from thread {thread_id} "
+                    f"({len(current) - pruned} remain)")
+
+    def _ensure_workers(self):
+        with self._lock:
+            while len(self._workers) < self.max_concurrent:
+                worker = threading.Thread(target=self._run, name=f"consolidation-{len(self._workers)}", daemon=True)
+                self._workers.append(worker)
+                worker.start()
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            with self._lock:
+                self._running += 1
+            try:
+                self._consolidate(job)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._scheduled.discard(job.thread_id)
+
+    def _consolidate(self, job: _Job):
+        started = time.time()
+        logger.info(f"🧠 Starting memory consolidation for thread {job.thread_id} ({len(job.messages)} messages, "
+                    f"queued {started - job.queued_at:.1f}s)")
+        try:
+            extracted = extract_consolidation_data(job.messages)
+            logger.info(f"✅ Extracted data: {len(extracted.get('people', []))} people, {len(extracted.get('facts', []))} facts")
+            memories = consolidation_memories(job.thread_id, extracted)
+            if memories:
+                job.mem_store.write_many(memories, user_id=job.user_id)
+        except Exception as e:
+            with self._lock:
+                self._stats["failed"] += 1
+                self._retry_after[job.thread_id] = time.time() + RETRY_BACKOFF_SECONDS
+            metrics.MEMORY_CONSOLIDATIONS.labels(outcome="failed").inc()
+            logger.error(f"Memory consolidation error for thread {job.thread_id}: {e}")
+            return
+
+        with self._lock:
+            self._stats["completed"] += 1
+            self._stats["memories_written"] += len(memories)
+            self._retry_after.pop(job.thread_id, None)
+            # The request path prunes on the thread's next save
+            self._pending_prunes[job.thread_id] = job.messages
+        metrics.MEMORY_CONSOLIDATIONS.labels(outcome="completed").inc()
+        logger.info(f"✅ Memory consolidation complete in {time.time() - started:.1f}s: {len(memories)} memories "
+                    f"from thread {job.thread_id}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["running"] = self._running
+            stats["tracked_threads"] = len(self._counts)
+            stats["prunes_pending"] = len(self._pending_prunes)
+            stats["threads_over_threshold"] = sum(1 for c in self._counts.values() if c >= self.threshold)
+        stats["queue_depth"] = self._queue.qsize()
+        stats["threshold"] = self.threshold
+        stats["max_concurrent"] = self.max_concurrent
+        return stats
+
+    def stop(self):
+        """Let workers exit after their current job (queued jobs are abandoned)."""
+        with self._lock:
+            workers, self._workers = self._workers, []
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        for _ in workers:
+            self._queue.put(None)
+        with self._lock:
+            self._scheduled.clear()
+
+
+_consolidation_scheduler: Optional[ConsolidationScheduler] = None
+_consolidation_scheduler_lock = threading.Lock()
+
+
+def get_consolidation_scheduler() -> ConsolidationScheduler:
+    """Process-wide consolidation scheduler."""
+    global _consolidation_scheduler
+    if _consolidation_scheduler is None:
+        with _consolidation_scheduler_lock:
+            if _consolidation_scheduler is None:
+                _consolidation_scheduler = ConsolidationScheduler(
+                    threshold=int(get_setting("consolidation_threshold_messages", 400)),
+                    max_concurrent=int(get_setting("consolidation_max_concurrent", 2)),
+                )
+    return _consolidation_scheduler
@@ -29,7 +29,8 @@ def _get_headers():
         headers["Authorization"] = f"Bearer {config['api_key']}"
     return headers
 
-def chat(messages: List[Dict[str, str]], temperature: float = 0.6, top_p: float = 0.9, max_tokens: int = 800) -> Tuple[str, Dict[str, Any]]:
+def chat(messages: List[Dict[str, str]], temperature: float = 0.6, top_p: float = 0.9, max_tokens: int = 800,
+         response_format: Optional[Dict[str, Any]] = None) -> Tuple[str, Dict[str, Any]]:
     """
     Call the LLM endpoint with the provided messages and parameters.
     
@@ -38,6 +39,7 @@ def chat(messages: List[Dict[str, str]], temperature: float = 0.6, top_p: float
         temperature: Sampling temperature (0.0 to 2.0)
         top_p: Top-p sampling parameter (0.0 to 1.0)
         max_tokens: Maximum tokens to generate
+        response_format: Optional OpenAI response_format, e.g. {"type": "json_object"}
         
     Returns:
         Tuple of (response_content, usage_stats)
@@ -59,6 +61,8 @@ def chat(messages: List[Dict[str, str]], temperature: float = 0.6, top_p: float
         "top_p": top_p,
         "max_tokens": max_tokens
     }
+    if response_format:
+        payload["response_format"] = response_format
     
     try:
         logger.info(f"Calling LLM with {len(messages)} messages, temp={temperature}, top_p={top_p}")
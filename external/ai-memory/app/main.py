@@ -7,7 +7,7 @@ from collections import defaultdict, deque
 from fastapi import FastAPI, HTTPException, Depends, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response
 from contextlib import asynccontextmanager
 from starlette.websockets import WebSocketState
 import json
@@ -29,9 +29,12 @@ except ImportError:
     # Fallback if main.py not available
     def get_admin_setting(setting_key, default=None):
         return get_setting(setting_key, default)
-from app.models import ChatRequest, ChatResponse, MemoryObject
+from app.models import ChatRequest, ChatResponse, MemoryObject, BulkMemoryRequest
 from app.llm import chat as llm_chat, chat_realtime_stream, _get_llm_config, validate_llm_connection
 from app.memory import MemoryStore
+from app import metrics
+from app import profiling
+from app.consolidation import get_consolidation_scheduler
 from app.packer import pack_prompt, should_remember, extract_carry_kit_items, detect_safety_triggers
 from app.tools import tool_dispatcher, parse_tool_calls, execute_tool_calls
 
@@ -48,7 +51,8 @@ logger = logging.getLogger(__name__)
 memory_store: Optional[MemoryStore] = None
 
 # In-process rolling history per thread (survives across calls in same container)
-# 500 msgs ~= ~250 user/assistant turns. Consolidation triggers at 400.
+# 500 msgs ~= ~250 user/assistant turns. Background consolidation triggers at 400
+# (consolidation_threshold_messages, see app/consolidation.py).
 THREAD_HISTORY: Dict[str, Deque[Tuple[str, str]]] = defaultdict(lambda: deque(maxlen=500))
 
 # Track which threads have been loaded from database
@@ -138,143 +142,11 @@ def save_thread_history(thread_id: str, mem_store: MemoryStore, user_id: Optiona
         )
         logger.info(f"✅ Successfully saved {len(messages)} messages to database for thread {thread_id}")
         
-        # ✅ Check if consolidation is needed (at 400/500 messages)
-        if len(messages) >= 400:
-            try:
-                consolidate_thread_memories(thread_id, mem_store, user_id)
-            except Exception as e:
-                logger.error(f"Memory consolidation failed: {e}")
+        # ✅ Queue consolidation once the thread is long enough (runs in the background)
+        get_consolidation_scheduler().note_messages(thread_id, THREAD_HISTORY, mem_store, user_id)
     except Exception as e:
         logger.error(f"❌ Failed to save thread history for {thread_id}: {e}", exc_info=True)
 
-def consolidate_thread_memories(thread_id: str, mem_store: MemoryStore, user_id: Optional[str] = None):
-    """
-    Extract important information from thread history and save as structured long-term memories.
-    Triggered when THREAD_HISTORY reaches 400 messages to prevent information loss.
-    """
-    import json
-    
-    history = THREAD_HISTORY.get(thread_id)
-    if not history or len(history) < 400:
-        return
-    
-    logger.info(f"🧠 Starting memory consolidation for thread {thread_id} ({len(history)} messages)")
-    
-    # Take the oldest 200 messages (100 turns) for consolidation
-    messages_to_analyze = list(history)[:200]
-    
-    # Build conversation text for LLM analysis
-    conversation_text = "\n".join([
-        f"{role.upper()}: {content[:200]}" 
-        for role, content in messages_to_analyze
-    ])
-    
-    # Ask LLM to extract structured information
-    extraction_prompt = f"""Analyze this conversation and extract important information in JSON format.
-
-Conversation:
-{conversation_text}
-
-Extract:
-1. **people**: Family members, friends (name, relationship)
-2. **facts**: Important dates, events, details (description, value)
-3. **preferences**: Likes, dislikes, interests (category, preference)
-4. **commitments**: Promises, follow-ups, action items (description, deadline)
-
-Return ONLY valid JSON in this format:
-{{
-  "people": [{{"name": "Kelly", "relationship": "wife"}}],
-  "facts": [{{"description": "Kelly's birthday", "value": "January 3rd, 1966"}}],
-  "preferences": [{{"category": "activities", "preference": "spa days"}}],
-  "commitments": [{{"description": "plan birthday celebration", "deadline": "soon"}}]
-}}"""
-    
-    try:
-        # Call LLM for extraction
-        from app.llm import chat as llm_chat
-        extracted_text, _ = llm_chat(
-            [{"role": "user", "content": extraction_prompt}],
-            temperature=0.3,  # Low temperature for structured output
-            max_tokens=1000
-        )
-        
-        # Parse JSON response
-        extracted_data = json.loads(extracted_text.strip())
-        logger.info(f"✅ Extracted data: {len(extracted_data.get('people', []))} people, {len(extracted_data.get('facts', []))} facts")
-        
-        # Store extracted information with de-duplication
-        import time
-        import hashlib
-        
-        def stable_hash(text: str) -> str:
-            """Generate stable deterministic hash for de-duplication"""
-            return hashlib.sha1(text.lower().encode('utf-8')).hexdigest()[:8]
-        
-        timestamp = int(time.time())
-        
-        # Store people
-        for person in extracted_data.get("people", []):
-            if person.get("name"):
-                key = f"person:{thread_id}:{person['name'].lower().replace(' ', '_')}"
-                mem_store.write(
-                    memory_type="person",
-                    key=key,
-                    value={**person, "extracted_at": timestamp, "source": "consolidation"},
-                    user_id=user_id,
-                    scope="user",
-                    ttl_days=365
-                )
-        
-        # Store facts
-        for fact in extracted_data.get("facts", []):
-            if fact.get("description"):
-                key = f"fact:{thread_id}:{stable_hash(fact['description'])}"
-                mem_store.write(
-                    memory_type="fact",
-                    key=key,
-                    value={**fact, "extracted_at": timestamp, "source": "consolidation"},
-                    user_id=user_id,
-                    scope="user",
-                    ttl_days=365
-                )
-        
-        # Store preferences
-        for pref in extracted_data.get("preferences", []):
-            if pref.get("preference"):
-                key = f"preference:{thread_id}:{stable_hash(pref['preference'])}"
-                mem_store.write(
-                    memory_type="preference",
-                    key=key,
-                    value={**pref, "extracted_at": timestamp, "source": "consolidation"},
-                    user_id=user_id,
-                    scope="user",
-                    ttl_days=365
-                )
-        
-        # Store commitments
-        for commit in extracted_data.get("commitments", []):
-            if commit.get("description"):
-                key = f"project:{thread_id}:{stable_hash(commit['description'])}"
-                mem_store.write(
-                    memory_type="project",
-                    key=key,
-                    value={**commit, "extracted_at": timestamp, "source": "consolidation"},
-                    user_id=user_id,
-                    scope="user",
-                    ttl_days=90  # Shorter TTL for action items
-                )
-        
-        # Prune old messages from deque (keep last 300)
-        while len(THREAD_HISTORY[thread_id]) > 300:
-            THREAD_HISTORY[thread_id].popleft()
-        
-        logger.info(f"✅ Memory consolidation complete. Pruned history to {len(THREAD_HISTORY[thread_id])} messages")
-        
-    except json.JSONDecodeError as e:
-        logger.error(f"Failed to parse LLM extraction: {e}")
-    except Exception as e:
-        logger.error(f"Memory consolidation error: {e}")
-
 # Feature flags
 ENABLE_RECAP = True           # write/read tiny durable recap to AI-Memory
 DISCOURAGE_GUESSING = True    # add a system rail when no memories are retrieved
@@ -286,6 +158,7 @@ DISCOURAGE_GUESSING = True    # add a system rail when no memories are retrieved
 async def lifespan(app: FastAPI):
     global memory_store
     logger.info("Starting NeuroSphere Orchestrator...")
+    loop_lag_task = asyncio.create_task(metrics.monitor_event_loop_lag())
     try:
         memory_store = MemoryStore()
         if memory_store.available:
@@ -307,6 +180,8 @@ async def lifespan(app: FastAPI):
         logger.info("Starting app in degraded mode...")
     finally:
         logger.info("Shutting down NeuroSphere Orchestrator...")
+        loop_lag_task.cancel()
+        get_consolidation_scheduler().stop()
         try:
             if memory_store:
                 memory_store.close()
@@ -335,6 +210,41 @@ app = FastAPI(
 
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
+metrics.register_connection(lambda: memory_store.conn if memory_store else None)
+
+def _route_template(request: Request) -> str:
+    """Matched route path (e.g. /v2/profile/{user_id}), never the raw URL"""
+    route = request.scope.get("route")
+    return getattr(route, "path", "unmatched")
+
+@app.middleware("http")
+async def server_timing(request: Request, call_next):
+    """
+    Report handler time in a Server-Timing header; callers record it on their
+    client span, so AI-Memory time shows up in the call's trace without this
+    service exporting spans itself. The caller's trace id is logged for slow
+    requests.
+    """
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+    except Exception:
+        metrics.HTTP_REQUEST_SECONDS.labels(
+            method=request.method, route=_route_template(request), status="500"
+        ).observe(time.perf_counter() - started)
+        raise
+    duration_ms = (time.perf_counter() - started) * 1000
+    response.headers["Server-Timing"] = f"handler;dur={duration_ms:.1f}"
+    if request.url.path != "/metrics":
+        metrics.HTTP_REQUEST_SECONDS.labels(
+            method=request.method, route=_route_template(request), status=str(response.status_code)
+        ).observe(duration_ms / 1000)
+    if duration_ms > float(get_setting("slow_request_log_ms", 500)):
+        traceparent = request.headers.get("traceparent", "")
+        trace_id = traceparent.split("-")[1] if traceparent.count("-") == 3 else "-"
+        logger.warning(f"🐢 {request.method} {request.url.path} took {duration_ms:.0f}ms (trace {trace_id})")
+    return response
+
 def get_memory_store() -> MemoryStore:
     if memory_store is None:
         raise HTTPException(status_code=503, detail="Memory store not initialized - service degraded")
@@ -368,6 +278,91 @@ async def root():
 async def admin_interface():
     return FileResponse("static/admin.html")
 
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus scrape endpoint"""
+    if not metrics.PROMETHEUS_AVAILABLE:
+        raise HTTPException(status_code=503, detail="prometheus_client is not installed")
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE_LATEST)
+
+@app.get("/v1/consolidation/stats")
+async def consolidation_stats():
+    """Background thread-history consolidation: queue depth, running jobs, outcomes."""
+    return get_consolidation_scheduler().stats()
+
+# -----------------------------------------------------------------------------
+# Runtime profiling (admin only - ADMIN_API_TOKEN)
+# -----------------------------------------------------------------------------
+@app.post("/debug/profile/cpu/start", dependencies=[Depends(profiling.verify_admin_token)])
+async def start_cpu_profile(interval_ms: float = 10, duration_seconds: float = 60,
+                            include_idle: bool = False, lines: bool = False):
+    """Start sampling every thread's stack; stops by itself after duration_seconds (max 600)"""
+    try:
+        return profiling.start_cpu_profile(interval_ms, duration_seconds, include_idle=include_idle, lines=lines)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@app.post("/debug/profile/cpu/stop", dependencies=[Depends(profiling.verify_admin_token)])
+async def stop_cpu_profile(limit: int = 25):
+    profiler = profiling.stop_cpu_profile()
+    if not profiler:
+        raise HTTPException(status_code=404, detail="No CPU profile has been started")
+    return profiler.summary(limit=limit)
+
+@app.get("/debug/profile/cpu", dependencies=[Depends(profiling.verify_admin_token)])
+async def get_cpu_profile(format: str = "json", limit: int = 25):
+    """Current or last CPU profile: top functions (json) or flamegraph-ready collapsed stacks (collapsed)"""
+    profiler = profiling.get_cpu_profile()
+    if not profiler:
+        raise HTTPException(status_code=404, detail="No CPU profile has been started")
+    if format == "collapsed":
+        return Response(content=await asyncio.to_thread(profiler.collapsed), media_type="text/plain")
+    return await asyncio.to_thread(profiler.summary, limit)
+
+@app.post("/debug/profile/heap/start", dependencies=[Depends(profiling.verify_admin_token)])
+async def start_heap_profile(frames: int = 10):
+    """Start tracemalloc (allocations before this point are not tracked)"""
+    return profiling.get_heap_profiler().start(frames)
+
+@app.post("/debug/profile/heap/stop", dependencies=[Depends(profiling.verify_admin_token)])
+async def stop_heap_profile():
+    """Stop tracemalloc and drop all snapshots"""
+    return profiling.get_heap_profiler().stop()
+
+@app.get("/debug/profile/heap", dependencies=[Depends(profiling.verify_admin_token)])
+async def heap_profile_status():
+    return profiling.get_heap_profiler().status()
+
+@app.post("/debug/profile/heap/snapshot", dependencies=[Depends(profiling.verify_admin_token)])
+async def take_heap_snapshot(label: str = "", limit: int = 25):
+    """Take a tracemalloc snapshot; returns its id and top allocation sites"""
+    heap = profiling.get_heap_profiler()
+    try:
+        snapshot_id = await asyncio.to_thread(heap.snapshot, label)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return await asyncio.to_thread(heap.top, snapshot_id, limit)
+
+@app.get("/debug/profile/heap/snapshots/{snapshot_id}", dependencies=[Depends(profiling.verify_admin_token)])
+async def get_heap_snapshot(snapshot_id: int, limit: int = 25, group_by: str = "lineno"):
+    """Top allocation sites of a snapshot (group_by: lineno, filename or traceback)"""
+    try:
+        return await asyncio.to_thread(profiling.get_heap_profiler().top, snapshot_id, limit, group_by)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/debug/profile/heap/diff", dependencies=[Depends(profiling.verify_admin_token)])
+async def diff_heap_snapshots(base: int, target: int, limit: int = 25, group_by: str = "lineno"):
+    """Allocation sites that grew most from snapshot `base` to snapshot `target`"""
+    try:
+        return await asyncio.to_thread(profiling.get_heap_profiler().diff, base, target, limit, group_by)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @app.get("/health")
 async def health_check(mem_store: MemoryStore = Depends(get_memory_store)):
     try:
@@ -458,9 +453,8 @@ async def chat_completion(
                 logger.error(f"Failed to fetch manual schema: {e}")
         
         # Long-term memory retrieve (user-specific + shared)
-        search_k = 15 if any(w in (user_message.lower()) for w in
-                             ["wife","husband","family","friend","name","who is","kelly","job","work","teacher"]) else 6
-        retrieved_memories = mem_store.search(user_message, user_id=user_id, k=search_k)
+        # Hybrid (lexical + vector) ranking in AI-Memory keeps k small
+        retrieved_memories = mem_store.search(user_message, user_id=user_id, k=6)
         
         # ✅ CRITICAL: Prepend manual schema so normalize_memories() sees it first
         if manual_schema_memory:
@@ -749,6 +743,66 @@ async def store_user_memory(
         logger.error(f"Failed to store user memory: {e}")
         raise HTTPException(status_code=500, detail="Failed to store user memory")
 
+@app.post("/v1/memories/user/bulk")
+async def store_user_memories_bulk(
+    request: BulkMemoryRequest,
+    user_id: str,
+    mem_store: MemoryStore = Depends(get_memory_store)
+):
+    """Store many memories for one user in a single INSERT (background consolidation)."""
+    try:
+        memory_ids = mem_store.write_many(
+            [m.model_dump() for m in request.memories],
+            user_id=user_id, scope="user", source="api"
+        )
+        return {"success": True, "memory_ids": memory_ids, "count": len(memory_ids), "user_id": user_id,
+                "message": f"Stored {len(memory_ids)} user memories"}
+    except Exception as e:
+        logger.error(f"Failed to store user memories in bulk: {e}")
+        raise HTTPException(status_code=500, detail="Failed to store user memories")
+
+@app.put("/v1/memories/user")
+async def upsert_user_memory(
+    memory: MemoryObject,
+    user_id: str,
+    expected_version: Optional[str] = None,
+    mem_store: MemoryStore = Depends(get_memory_store)
+):
+    """
+    Replace the user's memory with this type and key, or create it (keyed documents like the caller schema).
+    
+    expected_version (the created_at from the keyed GET) makes it a compare-and-swap:
+    409 if the memory was saved by someone else since it was read.
+    """
+    try:
+        memory_id = mem_store.upsert(
+            memory.type, memory.key, memory.value,
+            user_id=user_id, scope="user",
+            ttl_days=memory.ttl_days, source=memory.source or "api",
+            expected_version=expected_version
+        )
+    except Exception as e:
+        logger.error(f"Failed to upsert user memory: {e}")
+        raise HTTPException(status_code=500, detail="Failed to upsert user memory")
+    if memory_id is None:
+        raise HTTPException(status_code=409, detail="Memory changed since expected_version - reload and retry")
+    return {"success": True, "memory_id": memory_id, "user_id": user_id,
+            "message": f"User memory upserted: {memory.type}:{memory.key}"}
+
+@app.get("/v1/memories/user/{user_id}/key")
+async def get_user_memory_by_key(
+    user_id: str,
+    memory_type: str,
+    key: str,
+    mem_store: MemoryStore = Depends(get_memory_store)
+):
+    """The user's newest memory with this type and key ({"memory": null} if there is none); its created_at is the version for PUT expected_version."""
+    try:
+        return {"user_id": user_id, "memory": mem_store.get_by_key(user_id, memory_type, key)}
+    except Exception as e:
+        logger.error(f"Failed to get user memory by key: {e}")
+        raise HTTPException(status_code=500, detail="Failed to retrieve user memory")
+
 @app.post("/v1/memories/shared")
 async def store_shared_memory(
     memory: MemoryObject,
@@ -772,13 +826,19 @@ async def get_user_memories(
     query: str = "",
     limit: int = 10,
     include_shared: bool = True,
+    memory_type: Optional[str] = None,
     mem_store: MemoryStore = Depends(get_memory_store)
 ):
     try:
         if query:
-            memories = mem_store.search(query, user_id=user_id, k=limit, include_shared=include_shared)
+            # Hybrid lexical + vector ranking (the orchestrator's per-turn retrieval)
+            memory_types = memory_type.split(",") if memory_type else None
+            memories = mem_store.search(query, user_id=user_id, k=limit, memory_types=memory_types,
+                                        include_shared=include_shared)
         else:
             memories = mem_store.get_user_memories(user_id, limit=limit, include_shared=include_shared)
+            if memory_type:
+                memories = [m for m in memories if m.get("type") in memory_type.split(",")]
         return {"user_id": user_id, "memories": memories, "count": len(memories)}
     except Exception as e:
         logger.error(f"Failed to get user memories: {e}")
@@ -928,6 +988,37 @@ async def get_enriched_context(request: Request, mem_store: MemoryStore = Depend
         logger.error(f"❌ V2 enriched context error: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to build enriched context: {str(e)}")
 
+@app.get("/v2/callers")
+async def list_known_callers(
+    updated_since: Optional[str] = None,
+    limit: int = 50000,
+    mem_store: MemoryStore = Depends(get_memory_store)
+):
+    """Known callers (caller_profiles) for warming the phone front end's callback-detection cache"""
+    try:
+        from datetime import datetime
+        since = datetime.fromisoformat(updated_since) if updated_since else None
+        callers = mem_store.list_known_callers(updated_since=since, limit=limit)
+        return {"callers": callers, "count": len(callers)}
+    except ValueError:
+        raise HTTPException(status_code=400, detail="updated_since must be an ISO timestamp")
+    except Exception as e:
+        logger.error(f"Failed to list known callers: {e}")
+        raise HTTPException(status_code=500, detail="Failed to list known callers")
+
+@app.get("/v2/callers/{user_id}")
+async def get_known_caller(
+    user_id: str,
+    mem_store: MemoryStore = Depends(get_memory_store)
+):
+    """Is this a returning caller? Indexed lookups only - no vector search"""
+    try:
+        result = mem_store.caller_exists(user_id)
+        return {"user_id": user_id, **result}
+    except Exception as e:
+        logger.error(f"Failed to check caller {user_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to check caller")
+
 # -----------------------------------------------------------------------------
 # OpenAI Realtime API Bridge for Twilio Media Streams
 # -----------------------------------------------------------------------------
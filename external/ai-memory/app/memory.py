@@ -1,15 +1,19 @@
 import os
+import re
 import json
+import math
 import uuid
 import logging
 from typing import List, Dict, Any, Optional
 import numpy as np
 import psycopg2
-from psycopg2.extras import Json, RealDictCursor
+from psycopg2 import errors as pg_errors
+from psycopg2.extras import Json, RealDictCursor, execute_values
 from datetime import datetime, timedelta
 
 # Import centralized configuration
 from config_loader import get_setting, get_database_url
+from app.metrics import InstrumentedConnection
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -19,6 +23,46 @@ logger = logging.getLogger(__name__)
 EMBED_DIM = int(get_setting("embed_dim", 768))
 DB_URL = get_database_url()
 
+# ============================================================================
+# Hybrid search tuning (lexical + vector ranks fused with RRF)
+# ============================================================================
+RRF_K = int(get_setting("memory_search_rrf_k", 60))
+SEARCH_POOL_MULTIPLIER = int(get_setting("memory_search_pool_multiplier", 4))
+VECTOR_WEIGHT = float(get_setting("memory_search_vector_weight", 1.0))
+LEXICAL_WEIGHT = float(get_setting("memory_search_lexical_weight", 1.0))
+RECENCY_BOOST = float(get_setting("memory_search_recency_boost", 0.25))
+RECENCY_HALF_LIFE_DAYS = float(get_setting("memory_search_recency_half_life_days", 30))
+TYPE_BOOSTS = get_setting("memory_search_type_boosts", {
+    "person": 0.3,
+    "preference": 0.2,
+    "fact": 0.1,
+    "project": 0.1,
+    "rule": 0.1,
+    "thread_recap": -0.3,
+    "thread_history": -0.5,
+})
+
+_QUERY_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def build_tsquery(query_text: str) -> str:
+    """
+    Build an OR-style to_tsquery() string from free text.
+    
+    Natural-language questions ("what does my wife do for work") rarely have
+    every word in one memory, so terms are OR'ed and ts_rank_cd rewards
+    memories matching more of them. Stopwords are dropped by Postgres.
+    
+    Args:
+        query_text: Raw user query
+        
+    Returns:
+        tsquery string, or "" when the query has no searchable terms
+    """
+    tokens = [t for t in _QUERY_TOKEN.findall(query_text.lower()) if len(t) > 1]
+    return " | ".join(dict.fromkeys(tokens))
+
+
 def embed(text: str) -> np.ndarray:
     """
     Generate embedding vector for the given text.
@@ -46,6 +90,51 @@ def embed(text: str) -> np.ndarray:
     
     return vector
 
+def embed_many(texts: List[str]) -> np.ndarray:
+    """
+    Embed a batch of texts in one call (same vectors as embed()).
+    
+    Identical texts are embedded once and normalization is vectorized. When
+    embed() is replaced by a real embedding service, this is the place for
+    its batch endpoint.
+    
+    Args:
+        texts: Input texts
+        
+    Returns:
+        (len(texts), EMBED_DIM) array of normalized embedding vectors
+    """
+    if not texts:
+        return np.zeros((0, EMBED_DIM))
+    unique = list(dict.fromkeys(texts))
+    vectors = np.stack([
+        np.random.default_rng(abs(hash(text.lower().strip())) % (2**32)).normal(size=EMBED_DIM)
+        for text in unique
+    ])
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    vectors /= norms
+    row = {text: i for i, text in enumerate(unique)}
+    return vectors[[row[text] for text in texts]]
+
+def connect_db(autocommit: bool = True):
+    """
+    Open an instrumented connection to the memory database.
+    
+    Args:
+        autocommit: False for callers that need a transaction (e.g. server-side cursors)
+        
+    Returns:
+        psycopg2 connection
+    """
+    # Ensure SSL is enabled for managed databases
+    db_url = DB_URL
+    if 'sslmode=' not in db_url:
+        db_url += ('&' if '?' in db_url else '?') + 'sslmode=require'
+    conn = psycopg2.connect(db_url, connect_timeout=5, connection_factory=InstrumentedConnection)
+    conn.autocommit = autocommit
+    return conn
+
 class MemoryStore:
     """
     PostgreSQL-based memory store with vector similarity search using pgvector.
@@ -56,15 +145,12 @@ class MemoryStore:
         if not DB_URL:
             raise ValueError("DATABASE_URL environment variable is required")
             
-        # Ensure SSL is enabled for managed databases
-        db_url = DB_URL
-        if 'sslmode=' not in db_url:
-            db_url += ('&' if '?' in db_url else '?') + 'sslmode=require'
-            
+        # Flipped off if migrations/002 (search_tsv) has not been applied
+        self.hybrid_available = True
+        
         try:
             logger.info("Connecting to PostgreSQL database...")
-            self.conn = psycopg2.connect(db_url, connect_timeout=5)
-            self.conn.autocommit = True
+            self.conn = connect_db()
             self.available = True
             logger.info("✅ Connected to PostgreSQL database")
             
@@ -140,9 +226,166 @@ class MemoryStore:
             logger.error(f"Failed to write memory: {e}")
             raise
 
+    def write_many(self, memories: List[Dict[str, Any]], user_id: Optional[str] = None, scope: str = "user", source: str = "orchestrator") -> List[str]:
+        """
+        Store several memory objects with one embedding batch and one multi-row INSERT.
+        
+        Args:
+            memories: Dicts with type, key, value and optional ttl_days / source
+            user_id: User ID for user-scoped memories (None for shared)
+            scope: Memory scope ('user', 'shared', 'global')
+            source: Default source for memories that don't set one
+            
+        Returns:
+            UUIDs of the stored memories, in input order
+        """
+        if not memories:
+            return []
+        try:
+            embeddings = embed_many([json.dumps(m["value"], sort_keys=True) for m in memories])
+            values = [
+                (m["type"], m["key"], Json(m["value"]), embedding.tolist(), user_id, scope,
+                 m.get("ttl_days", 365), m.get("source") or source)
+                for m, embedding in zip(memories, embeddings)
+            ]
+            with self.conn.cursor() as cur:
+                rows = execute_values(
+                    cur,
+                    """
+                    INSERT INTO memories (type, k, value_json, embedding, user_id, scope, ttl_days, source)
+                    VALUES %s
+                    RETURNING id
+                    """,
+                    values,
+                    template="(%s, %s, %s, %s::vector, %s, %s, %s, %s)",
+                    page_size=len(values),
+                    fetch=True
+                )
+            
+            scope_info = f" [{scope}]" + (f" user:{user_id}" if user_id else "")
+            logger.info(f"Stored {len(rows)} memories in one batch{scope_info}")
+            return [str(row[0]) for row in rows]
+            
+        except Exception as e:
+            logger.error(f"Failed to write memories: {e}")
+            raise
+
+    def get_by_key(self, user_id: str, memory_type: str, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a user's newest memory with this type and key (single indexed lookup).
+        
+        Args:
+            user_id: Owner of the memory
+            memory_type: Memory type
+            key: Memory key
+            
+        Returns:
+            Memory object, or None if the user has no such memory
+        """
+        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(
+                """
+                SELECT id, type, k, value_json, user_id, scope, created_at
+                FROM memories
+                WHERE user_id = %s AND type = %s AND k = %s
+                ORDER BY created_at DESC
+                LIMIT 1
+                """,
+                (user_id, memory_type, key)
+            )
+            row = cur.fetchone()
+        if not row:
+            return None
+        return {
+            "id": str(row["id"]),
+            "type": row["type"],
+            "key": row["k"],
+            "value": row["value_json"],
+            "user_id": row["user_id"],
+            "scope": row["scope"],
+            "created_at": row["created_at"].isoformat()
+        }
+
+    def upsert(self, memory_type: str, key: str, value: Dict[str, Any], user_id: str, scope: str = "user", ttl_days: int = 365, source: str = "orchestrator", expected_version: Optional[str] = None) -> Optional[str]:
+        """
+        Replace a user's memory with this type and key in place, or insert it.
+        
+        For documents that are rewritten often (the caller schema): the newest
+        row is updated (TTL restarts from now), so the table keeps one row per
+        key instead of growing by one row per save.
+        
+        With expected_version (the created_at returned by get_by_key) this is a
+        compare-and-swap: the row is only replaced if nobody saved it since it
+        was read, so read-modify-write from several processes can't lose an
+        update. Postgres re-checks the condition on the locked row, so two
+        concurrent saves with the same version can't both succeed.
+        
+        Args:
+            memory_type: Memory type
+            key: Memory key
+            value: Memory content as dictionary
+            user_id: Owner of the memory
+            scope: Memory scope
+            ttl_days: Time to live in days
+            source: Source of the memory
+            expected_version: Only replace the row if its created_at still equals this
+            
+        Returns:
+            UUID of the updated or inserted memory, or None if expected_version is stale
+        """
+        try:
+            embedding = embed(json.dumps(value, sort_keys=True)).tolist()
+            params = {"type": memory_type, "k": key, "value": Json(value), "embedding": embedding,
+                      "user_id": user_id, "scope": scope, "ttl_days": ttl_days, "source": source,
+                      "expected": expected_version}
+            with self.conn.cursor() as cur:
+                cur.execute(
+                    """
+                    WITH updated AS (
+                        UPDATE memories
+                        SET value_json = %(value)s, embedding = %(embedding)s::vector, scope = %(scope)s,
+                            ttl_days = %(ttl_days)s, source = %(source)s, created_at = NOW()
+                        WHERE id = (
+                            SELECT id FROM memories
+                            WHERE user_id = %(user_id)s AND type = %(type)s AND k = %(k)s
+                            ORDER BY created_at DESC
+                            LIMIT 1
+                        )
+                        AND (%(expected)s::timestamp IS NULL OR created_at = %(expected)s::timestamp)
+                        RETURNING id
+                    ),
+                    inserted AS (
+                        INSERT INTO memories (type, k, value_json, embedding, user_id, scope, ttl_days, source)
+                        SELECT %(type)s, %(k)s, %(value)s, %(embedding)s::vector, %(user_id)s, %(scope)s,
+                               %(ttl_days)s, %(source)s
+                        WHERE NOT EXISTS (SELECT 1 FROM updated) AND %(expected)s::timestamp IS NULL
+                        RETURNING id
+                    )
+                    SELECT id FROM updated UNION ALL SELECT id FROM inserted
+                    """,
+                    params
+                )
+                row = cur.fetchone()
+            if row is None:
+                logger.info(f"Upsert of {memory_type}:{key} for user:{user_id} skipped - version {expected_version} is stale")
+                return None
+            memory_id = row[0]
+            
+            logger.info(f"Upserted memory: {memory_type}:{key} with ID {memory_id} [{scope}] user:{user_id}")
+            return str(memory_id)
+            
+        except Exception as e:
+            logger.error(f"Failed to upsert memory: {e}")
+            raise
+
     def search(self, query_text: str, user_id: Optional[str] = None, k: int = 6, memory_types: Optional[List[str]] = None, include_shared: bool = True) -> List[Dict[str, Any]]:
         """
-        Search for relevant memories using vector similarity.
+        Search for relevant memories using hybrid lexical + vector ranking.
+        
+        Candidates come from two rankings over the same filters: pgvector
+        distance and Postgres full-text (ts_rank_cd on key + value). The ranks
+        are fused with reciprocal rank fusion, then scaled by a per-type boost
+        and a recency boost that decays with memory age.
         
         Args:
             query_text: Text to search for
@@ -152,7 +395,8 @@ class MemoryStore:
             include_shared: Whether to include shared/global memories
             
         Returns:
-            List of memory objects with similarity scores
+            List of memory objects with fused `score`, `vector_rank`,
+            `lexical_rank`, `lexical_score` and `distance`
         """
         try:
             # Generate query embedding
@@ -160,42 +404,53 @@ class MemoryStore:
             
             # Build query with filtering
             filters = ["created_at > NOW() - INTERVAL '1 year'"]
-            params = [query_embedding]
+            params: Dict[str, Any] = {"qvec": query_embedding}
             
             # User and scope filtering
             if user_id is not None:
                 if include_shared:
-                    filters.append("(user_id = %s OR scope IN ('shared', 'global'))")
-                    params.append(user_id)
+                    filters.append("(user_id = %(user_id)s OR scope IN ('shared', 'global'))")
                 else:
-                    filters.append("user_id = %s")
-                    params.append(user_id)
+                    filters.append("user_id = %(user_id)s")
+                params["user_id"] = user_id
             elif include_shared:
                 filters.append("scope IN ('shared', 'global')")
             
             # Type filtering
             if memory_types:
-                filters.append("type = ANY(%s)")
-                params.append(memory_types)
-            
-            params.append(query_embedding)
-            params.append(k)
+                filters.append("type = ANY(%(memory_types)s)")
+                params["memory_types"] = memory_types
             
             where_clause = " AND ".join(filters)
-            query = f"""
-                SELECT id, type, k, value_json, user_id, scope, embedding <-> %s::vector as distance
-                FROM memories
-                WHERE {where_clause}
-                ORDER BY embedding <-> %s::vector
-                LIMIT %s
-            """
-            
-            with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
-                cur.execute(query, params)
-                rows = cur.fetchall()
+            params["pool"] = max(k * SEARCH_POOL_MULTIPLIER, 20)
+            params["k"] = k
+            tsquery = build_tsquery(query_text)
+            
+            rows = None
+            if tsquery and self.hybrid_available:
+                params["tsq"] = tsquery
+                try:
+                    rows = self._hybrid_candidates(where_clause, params)
+                except pg_errors.UndefinedColumn:
+                    # search_tsv not migrated yet (migrations/002) - vector only
+                    logger.warning("⚠️ memories.search_tsv missing - run scripts/migrate_database.py; using vector-only search")
+                    self.hybrid_available = False
+            if rows is None:
+                rows = self._vector_candidates(where_clause, params)
             
             results = []
             for row in rows:
+                vector_rank = row.get("vector_rank")
+                lexical_rank = row.get("lexical_rank")
+                score = 0.0
+                if vector_rank:
+                    score += VECTOR_WEIGHT / (RRF_K + vector_rank)
+                if lexical_rank:
+                    score += LEXICAL_WEIGHT / (RRF_K + lexical_rank)
+                score *= 1.0 + float(TYPE_BOOSTS.get(row["type"], 0.0))
+                age_days = max(float(row.get("age_days") or 0.0), 0.0)
+                score *= 1.0 + RECENCY_BOOST * math.pow(0.5, age_days / RECENCY_HALF_LIFE_DAYS)
+                
                 results.append({
                     "id": str(row["id"]),
                     "type": row["type"],
@@ -203,9 +458,16 @@ class MemoryStore:
                     "value": row["value_json"],
                     "user_id": row["user_id"],
                     "scope": row["scope"],
-                    "distance": float(row["distance"])
+                    "score": round(score, 6),
+                    "vector_rank": vector_rank,
+                    "lexical_rank": lexical_rank,
+                    "lexical_score": float(row["lexical_score"]) if row.get("lexical_score") is not None else None,
+                    "distance": float(row["distance"]) if row.get("distance") is not None else None
                 })
             
+            results.sort(key=lambda r: r["score"], reverse=True)
+            results = results[:k]
+            
             logger.info(f"Memory search for '{query_text[:50]}...' returned {len(results)} results")
             return results
             
@@ -213,6 +475,58 @@ class MemoryStore:
             logger.error(f"Failed to search memories: {e}")
             return []
     
+    def _hybrid_candidates(self, where_clause: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Fetch the union of the top vector and top full-text candidates.
+        
+        Each CTE repeats the filters (rather than sharing a filtered CTE) so
+        Postgres can still use the GIN/vector indexes for each ranking.
+        """
+        query = f"""
+            WITH vec AS (
+                SELECT id, embedding <-> %(qvec)s::vector AS distance,
+                       ROW_NUMBER() OVER (ORDER BY embedding <-> %(qvec)s::vector) AS vector_rank
+                FROM memories
+                WHERE {where_clause}
+                ORDER BY embedding <-> %(qvec)s::vector
+                LIMIT %(pool)s
+            ),
+            lex AS (
+                SELECT id, ts_rank_cd(search_tsv, to_tsquery('english', %(tsq)s)) AS lexical_score,
+                       ROW_NUMBER() OVER (ORDER BY ts_rank_cd(search_tsv, to_tsquery('english', %(tsq)s)) DESC) AS lexical_rank
+                FROM memories
+                WHERE {where_clause} AND search_tsv @@ to_tsquery('english', %(tsq)s)
+                ORDER BY lexical_score DESC
+                LIMIT %(pool)s
+            )
+            SELECT m.id, m.type, m.k, m.value_json, m.user_id, m.scope,
+                   EXTRACT(EPOCH FROM (NOW() - m.created_at)) / 86400.0 AS age_days,
+                   vec.distance, vec.vector_rank, lex.lexical_score, lex.lexical_rank
+            FROM memories m
+            LEFT JOIN vec ON vec.id = m.id
+            LEFT JOIN lex ON lex.id = m.id
+            WHERE m.id IN (SELECT id FROM vec UNION SELECT id FROM lex)
+        """
+        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(query, params)
+            return cur.fetchall()
+    
+    def _vector_candidates(self, where_clause: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Fetch the top vector candidates only (no lexical match or no search_tsv)."""
+        query = f"""
+            SELECT id, type, k, value_json, user_id, scope,
+                   EXTRACT(EPOCH FROM (NOW() - created_at)) / 86400.0 AS age_days,
+                   embedding <-> %(qvec)s::vector AS distance,
+                   ROW_NUMBER() OVER (ORDER BY embedding <-> %(qvec)s::vector) AS vector_rank
+            FROM memories
+            WHERE {where_clause}
+            ORDER BY embedding <-> %(qvec)s::vector
+            LIMIT %(pool)s
+        """
+        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(query, params)
+            return cur.fetchall()
+    
     def get_user_memories(self, user_id: str, limit: int = 10, include_shared: bool = True) -> List[Dict[str, Any]]:
         """
         Get recent memories for a specific user.
@@ -433,7 +747,7 @@ class MemoryStore:
     
     def store_call_summary(self, summary_data: Dict[str, Any]) -> str:
         """
-        Store a call summary in the database.
+        Store a call summary in the database (upserts on call_id).
         
         Args:
             summary_data: Dictionary with call_id, user_id, summary, key_topics,
@@ -442,43 +756,86 @@ class MemoryStore:
         Returns:
             UUID of the stored summary
         """
-        try:
-            # Generate embedding for the summary
-            summary_text = summary_data.get("summary", "")
-            embedding = embed(summary_text).tolist() if summary_text else None
+        return self.store_call_summaries([summary_data])[0]
+    
+    def store_call_summaries(self, summaries: List[Dict[str, Any]], page_size: int = 200) -> List[str]:
+        """
+        Store many call summaries with one embedding batch and multi-row INSERTs.
+        
+        An existing summary with the same call_id is replaced, so reprocessing
+        a call (or a re-run backfill) updates it instead of failing. When a
+        call_id appears more than once in the batch, the last one wins.
+        
+        Args:
+            summaries: Dictionaries as accepted by store_call_summary
+            page_size: Rows per INSERT statement
             
+        Returns:
+            UUIDs of the stored summaries, in input order
+        """
+        if not summaries:
+            return []
+        try:
+            latest = {s["call_id"]: s for s in summaries}
+            rows = list(latest.values())
+            
+            # Generate embeddings for all non-empty summaries at once
+            texts = [s.get("summary", "") for s in rows]
+            with_text = [i for i, text in enumerate(texts) if text]
+            vectors = embed_many([texts[i] for i in with_text])
+            embeddings: List[Optional[List[float]]] = [None] * len(rows)
+            for i, vector in zip(with_text, vectors):
+                embeddings[i] = vector.tolist()
+            
+            values = [
+                (
+                    s["call_id"],
+                    s["user_id"],
+                    s.get("call_date", datetime.now()),
+                    s.get("summary", ""),
+                    Json(s.get("key_topics", [])),
+                    Json(s.get("key_variables", {})),
+                    s.get("sentiment", "neutral"),
+                    s.get("duration_seconds", 0),
+                    s.get("resolution_status", "unknown"),
+                    embedding
+                )
+                for s, embedding in zip(rows, embeddings)
+            ]
             with self.conn.cursor() as cur:
-                cur.execute(
+                returned = execute_values(
+                    cur,
                     """
                     INSERT INTO call_summaries (
                         call_id, user_id, call_date, summary, key_topics,
                         key_variables, sentiment, duration_seconds, 
                         resolution_status, embedding
                     )
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    RETURNING id
+                    VALUES %s
+                    ON CONFLICT (call_id) DO UPDATE SET
+                        user_id = EXCLUDED.user_id,
+                        call_date = EXCLUDED.call_date,
+                        summary = EXCLUDED.summary,
+                        key_topics = EXCLUDED.key_topics,
+                        key_variables = EXCLUDED.key_variables,
+                        sentiment = EXCLUDED.sentiment,
+                        duration_seconds = EXCLUDED.duration_seconds,
+                        resolution_status = EXCLUDED.resolution_status,
+                        embedding = EXCLUDED.embedding
+                    RETURNING call_id, id
                     """,
-                    (
-                        summary_data["call_id"],
-                        summary_data["user_id"],
-                        summary_data.get("call_date", datetime.now()),
-                        summary_data.get("summary", ""),
-                        Json(summary_data.get("key_topics", [])),
-                        Json(summary_data.get("key_variables", {})),
-                        summary_data.get("sentiment", "neutral"),
-                        summary_data.get("duration_seconds", 0),
-                        summary_data.get("resolution_status", "unknown"),
-                        embedding
-                    )
+                    values,
+                    template="(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s::vector)",
+                    page_size=page_size,
+                    fetch=True
                 )
-                result = cur.fetchone()
-                summary_id = result[0] if result else None
+            ids = {call_id: str(summary_id) for call_id, summary_id in returned}
             
-            logger.info(f"✅ Stored call summary {summary_data['call_id']} for user {summary_data['user_id']}")
-            return str(summary_id)
+            logger.info(f"✅ Stored {len(rows)} call summaries ({len({s['user_id'] for s in rows})} users)")
+            return [ids[s["call_id"]] for s in summaries]
             
         except Exception as e:
-            logger.error(f"❌ Failed to store call summary: {e}")
+            logger.error(f"❌ Failed to store call summaries: {e}")
             raise
     
     def store_personality_metrics(self, metrics_data: Dict[str, Any]) -> str:
@@ -575,6 +932,78 @@ class MemoryStore:
             logger.error(f"❌ Failed to get/create caller profile: {e}")
             return {}
     
+    def caller_exists(self, user_id: str) -> Dict[str, Any]:
+        """
+        Cheap known-caller check for callback detection (no vector search).
+        
+        A caller is known if they have a caller profile, or - for callers
+        from before Memory V2 - any user-scoped memory.
+        
+        Args:
+            user_id: Caller identifier (normalized, optionally customer-namespaced)
+            
+        Returns:
+            Dict with known (bool) and preferred_name
+        """
+        self._check_connection()
+        with self.conn.cursor() as cur:
+            cur.execute(
+                "SELECT preferred_name FROM caller_profiles WHERE user_id = %s",
+                (user_id,)
+            )
+            row = cur.fetchone()
+            if row:
+                return {"known": True, "preferred_name": row[0]}
+            cur.execute(
+                "SELECT EXISTS (SELECT 1 FROM memories WHERE user_id = %s)",
+                (user_id,)
+            )
+            return {"known": bool(cur.fetchone()[0]), "preferred_name": None}
+    
+    def list_known_callers(self, updated_since: Optional[datetime] = None, limit: int = 50000) -> List[Dict[str, Any]]:
+        """
+        Known callers for warming a front-end cache, most recent first.
+        
+        Args:
+            updated_since: Only profiles updated after this time
+            limit: Maximum callers to return
+            
+        Returns:
+            List of {user_id, preferred_name, last_call_date}
+        """
+        self._check_connection()
+        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+            if updated_since:
+                cur.execute(
+                    """
+                    SELECT user_id, preferred_name, last_call_date
+                    FROM caller_profiles
+                    WHERE updated_at > %s
+                    ORDER BY last_call_date DESC
+                    LIMIT %s
+                    """,
+                    (updated_since, limit)
+                )
+            else:
+                cur.execute(
+                    """
+                    SELECT user_id, preferred_name, last_call_date
+                    FROM caller_profiles
+                    ORDER BY last_call_date DESC
+                    LIMIT %s
+                    """,
+                    (limit,)
+                )
+            rows = cur.fetchall()
+        return [
+            {
+                "user_id": row["user_id"],
+                "preferred_name": row["preferred_name"],
+                "last_call_date": row["last_call_date"].isoformat() if row["last_call_date"] else None,
+            }
+            for row in rows
+        ]
+    
     def update_caller_profile(self, user_id: str, updates: Dict[str, Any]) -> bool:
         """
         Update caller profile information.
@@ -7,8 +7,7 @@ import logging
 import uuid
 from typing import List, Tuple, Optional
 from app.memory import MemoryStore
-from app.summarizer import CallSummarizer
-from app.personality import PersonalityTracker
+from app.call_analysis import CallAnalyzer
 
 logger = logging.getLogger(__name__)
 
@@ -27,8 +26,9 @@ class MemoryV2Integration:
             llm_chat_function: LLM chat function for summarization
         """
         self.memory_store = memory_store
-        self.summarizer = CallSummarizer(llm_chat_function)
-        self.personality_tracker = PersonalityTracker(llm_chat_function)
+        self.analyzer = CallAnalyzer(llm_chat_function)
+        self.summarizer = self.analyzer.summarizer
+        self.personality_tracker = self.analyzer.personality_tracker
     
     def process_completed_call(
         self, 
@@ -54,26 +54,15 @@ class MemoryV2Integration:
             
             logger.info(f"🔄 Processing call {call_id} for user {user_id}")
             
-            # Step 1: Generate call summary
-            summary_data = self.summarizer.summarize_call(
-                conversation_history, 
-                user_id, 
-                call_id
-            )
-            
-            # Step 2: Analyze personality
-            personality_data = self.personality_tracker.analyze_personality(
+            # Steps 1-2: Summary and personality in one LLM request
+            summary_data, personality_data = self.analyzer.analyze(
                 conversation_history,
                 user_id,
                 call_id
             )
             
-            # Step 3: Store in database
-            summary_id = self.memory_store.store_call_summary(summary_data)
-            personality_id = self.memory_store.store_personality_metrics(personality_data)
-            
-            # Step 4: Update caller profile
-            self.memory_store.update_caller_profile(user_id, {})
+            # Steps 3-4: Store in database, update caller profile
+            summary_id, personality_id = self.store_analyses([(summary_data, personality_data)])[0]
             
             logger.info(f"✅ Processed call {call_id}: summary={summary_id}, personality={personality_id}")
             
@@ -93,6 +82,24 @@ class MemoryV2Integration:
                 "error": str(e)
             }
     
+    def store_analyses(self, analyses: List[Tuple[dict, dict]]) -> List[Tuple[str, str]]:
+        """
+        Store analyzed calls, with all summaries written in one batch.
+        
+        Args:
+            analyses: (summary_data, personality_data) pairs from CallAnalyzer.analyze
+            
+        Returns:
+            (summary_id, personality_id) per analysis, in input order
+        """
+        summary_ids = self.memory_store.store_call_summaries([summary for summary, _ in analyses])
+        personality_ids = [self.memory_store.store_personality_metrics(personality) for _, personality in analyses]
+        
+        for user_id in dict.fromkeys(summary["user_id"] for summary, _ in analyses):
+            self.memory_store.update_caller_profile(user_id, {})
+        
+        return list(zip(summary_ids, personality_ids))
+    
     def get_enriched_context_for_call(self, user_id: str) -> str:
         """
         Get enriched context for starting a new call.
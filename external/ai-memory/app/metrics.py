@@ -0,0 +1,161 @@
+"""
+Prometheus metrics for AI-Memory (served on GET /metrics).
+
+Per-route request latency, database query latency and connection usage, and
+event-loop lag. MemoryStore holds a single autocommit psycopg2 connection
+shared by all request threads rather than a pool, so "pool usage" here is
+that connection's state plus how many queries are running on it at once -
+queries in flight above 1 means requests are queueing behind each other.
+
+prometheus_client is optional: without it every metric is a no-op and
+/metrics answers 503.
+"""
+
+import time
+import asyncio
+import logging
+from functools import lru_cache
+from typing import Any, Callable, Optional
+
+import psycopg2.extensions
+
+try:
+    from prometheus_client import Counter, Gauge, Histogram, REGISTRY, generate_latest, CONTENT_TYPE_LATEST
+    from prometheus_client.core import GaugeMetricFamily
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+    Counter = Gauge = Histogram = None
+    CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+class _NoopMetric:
+    """Stand-in when prometheus_client is not installed."""
+
+    def labels(self, *args, **kwargs):
+        return self
+
+    def inc(self, amount: float = 1):
+        pass
+
+    def dec(self, amount: float = 1):
+        pass
+
+    def observe(self, value: float):
+        pass
+
+
+def _metric(kind, name: str, documentation: str, labelnames=(), **kwargs):
+    if not PROMETHEUS_AVAILABLE:
+        return _NoopMetric()
+    return kind(name, documentation, labelnames, **kwargs)
+
+
+HTTP_REQUEST_SECONDS = _metric(
+    Histogram, "ai_memory_http_request_duration_seconds",
+    "HTTP request latency by route template", ("method", "route", "status"), buckets=LATENCY_BUCKETS)
+DB_QUERY_SECONDS = _metric(
+    Histogram, "ai_memory_db_query_duration_seconds",
+    "PostgreSQL query latency by statement type", ("operation", "status"), buckets=LATENCY_BUCKETS)
+DB_QUERIES_IN_FLIGHT = _metric(
+    Gauge, "ai_memory_db_queries_in_flight",
+    "Queries currently executing on the shared database connection")
+EVENT_LOOP_LAG_SECONDS = _metric(
+    Histogram, "ai_memory_event_loop_lag_seconds",
+    "How late the asyncio event loop ran a scheduled wake-up", buckets=LAG_BUCKETS)
+MEMORY_CONSOLIDATIONS = _metric(
+    Counter, "ai_memory_memory_consolidations",
+    "Background thread-history consolidation jobs by outcome (completed, failed, dropped)", ("outcome",))
+
+_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "CREATE", "ALTER"}
+
+
+def _operation(query: Any) -> str:
+    """Statement type of a query, e.g. SELECT (low-cardinality label)."""
+    if isinstance(query, bytes):
+        query = query.decode("utf-8", "ignore")
+    if not isinstance(query, str):
+        return "OTHER"
+    words = query.lstrip().split(None, 1)
+    keyword = words[0].upper() if words else ""
+    return keyword if keyword in _OPERATIONS else "OTHER"
+
+
+class _TimedCursorMixin:
+    def execute(self, query, vars=None):
+        DB_QUERIES_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        status = "ok"
+        try:
+            return super().execute(query, vars)
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            DB_QUERIES_IN_FLIGHT.dec()
+            DB_QUERY_SECONDS.labels(operation=_operation(query), status=status).observe(time.perf_counter() - started)
+
+
+@lru_cache(maxsize=None)
+def _timed_cursor_class(cursor_class):
+    return type(f"Timed{cursor_class.__name__}", (_TimedCursorMixin, cursor_class), {})
+
+
+class InstrumentedConnection(psycopg2.extensions.connection):
+    """
+    psycopg2 connection whose cursors time every execute(), whatever
+    cursor_factory the caller asks for (RealDictCursor included).
+
+        psycopg2.connect(db_url, connection_factory=InstrumentedConnection)
+    """
+
+    def cursor(self, *args, **kwargs):
+        cursor_class = kwargs.get("cursor_factory") or self.cursor_factory or psycopg2.extensions.cursor
+        kwargs["cursor_factory"] = _timed_cursor_class(cursor_class)
+        return super().cursor(*args, **kwargs)
+
+
+class _ConnectionCollector:
+    """Open/closed state of MemoryStore's database connection at scrape time."""
+
+    def __init__(self, get_connection: Callable[[], Optional[Any]]):
+        self.get_connection = get_connection
+
+    def collect(self):
+        conn = self.get_connection()
+        gauge = GaugeMetricFamily("ai_memory_db_connections", "Database connections by state", labels=["state"])
+        is_open = 1 if conn is not None and not conn.closed else 0
+        gauge.add_metric(["open"], is_open)
+        gauge.add_metric(["closed"], 1 - is_open)
+        yield gauge
+
+
+_collector_registered = False
+
+
+def register_connection(get_connection: Callable[[], Optional[Any]]):
+    """Export the state of the connection returned by get_connection (once per process)."""
+    global _collector_registered
+    if not PROMETHEUS_AVAILABLE or _collector_registered:
+        return
+    _collector_registered = True
+    REGISTRY.register(_ConnectionCollector(get_connection))
+
+
+async def monitor_event_loop_lag(interval: float = 0.25):
+    """Sleep for `interval` in a loop and record how late each wake-up was."""
+    loop = asyncio.get_running_loop()
+    while True:
+        scheduled = loop.time() + interval
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG_SECONDS.observe(max(0.0, loop.time() - scheduled))
+
+
+def render() -> bytes:
+    """Current metrics in the Prometheus text exposition format."""
+    return generate_latest(REGISTRY)
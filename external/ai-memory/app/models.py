@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from typing import List, Optional, Dict, Any
 from enum import Enum
 
@@ -34,6 +34,9 @@ class MemoryObject(BaseModel):
     ttl_days: int = 365
     source: str = "orchestrator"
 
+class BulkMemoryRequest(BaseModel):
+    memories: List[MemoryObject] = Field(min_length=1, max_length=500)
+
 class ToolCall(BaseModel):
     name: str
     parameters: Dict[str, Any]
@@ -42,3 +45,59 @@ class ToolResponse(BaseModel):
     result: str
     success: bool
     error: Optional[str] = None
+
+# ---------------------------------------------------------------------------
+# Post-call analysis (single LLM pass: summary + personality)
+# ---------------------------------------------------------------------------
+
+SENTIMENTS = ("positive", "neutral", "negative", "frustrated", "satisfied")
+RESOLUTION_STATUSES = ("resolved", "pending", "escalated", "unknown")
+
+class PersonalityMetrics(BaseModel):
+    """The 13 per-call personality metrics, each 0-100 (out-of-range values are clamped)."""
+    # Big 5
+    openness: float = 50
+    conscientiousness: float = 50
+    extraversion: float = 50
+    agreeableness: float = 50
+    neuroticism: float = 50
+    # Communication style
+    formality: float = 50
+    directness: float = 50
+    detail_orientation: float = 50
+    patience: float = 50
+    technical_comfort: float = 50
+    # Emotional state (this call)
+    frustration_level: float = 0
+    satisfaction_level: float = 50
+    urgency_level: float = 30
+
+    @field_validator("*", mode="before")
+    @classmethod
+    def clamp_score(cls, value, info):
+        try:
+            return max(0.0, min(100.0, float(value)))
+        except (ValueError, TypeError):
+            return cls.model_fields[info.field_name].default
+
+class CallSummaryFields(BaseModel):
+    summary: str = Field(min_length=1)
+    key_topics: List[str] = Field(default_factory=list)
+    key_variables: Dict[str, Any] = Field(default_factory=dict)
+    sentiment: str = "neutral"
+    resolution_status: str = "unknown"
+
+    @field_validator("sentiment", mode="before")
+    @classmethod
+    def normalize_sentiment(cls, value):
+        value = str(value or "").strip().lower()
+        return value if value in SENTIMENTS else "neutral"
+
+    @field_validator("resolution_status", mode="before")
+    @classmethod
+    def normalize_resolution(cls, value):
+        value = str(value or "").strip().lower()
+        return value if value in RESOLUTION_STATUSES else "unknown"
+
+class CallAnalysis(CallSummaryFields):
+    personality: PersonalityMetrics
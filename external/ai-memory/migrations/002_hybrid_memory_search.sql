@@ -0,0 +1,16 @@
+-- Migration: Hybrid Memory Search
+-- Adds a full-text search document to memories so MemoryStore.search can
+-- fuse lexical (tsvector) and vector (pgvector) rankings.
+
+-- 1. Full-text document over the memory key (weight A) and value text (weight B)
+ALTER TABLE memories ADD COLUMN IF NOT EXISTS search_tsv tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(k, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(value_json::text, '')), 'B')
+    ) STORED;
+
+-- 2. Indexes
+CREATE INDEX IF NOT EXISTS idx_memories_search_tsv ON memories USING GIN (search_tsv);
+CREATE INDEX IF NOT EXISTS idx_memories_user_created ON memories (user_id, created_at DESC);
+
+COMMENT ON COLUMN memories.search_tsv IS 'Full-text document (key + value) for hybrid lexical/vector memory search';
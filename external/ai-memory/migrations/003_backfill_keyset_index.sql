@@ -0,0 +1,5 @@
+-- Migration: Backfill keyset index
+-- Lets scripts/backfill_memories.py stream conversation memories newest first
+-- and resume from its checkpoint with an index range scan instead of a sort.
+
+CREATE INDEX IF NOT EXISTS idx_memories_type_created_id ON memories (type, created_at DESC, id DESC);
@@ -0,0 +1,15 @@
+-- Migration: Call summary indexes
+-- search_call_summaries orders by embedding distance (<->, L2) and the
+-- enriched-context path reads a caller's most recent summaries; neither had
+-- an index to use beyond the single-column user_id / call_date ones.
+
+-- 1. Approximate nearest-neighbour index for summary similarity search (pgvector >= 0.5)
+CREATE INDEX IF NOT EXISTS idx_call_summaries_embedding_hnsw
+    ON call_summaries USING hnsw (embedding vector_l2_ops);
+
+-- 2. Per-caller recency: WHERE user_id = ? ORDER BY call_date DESC LIMIT n
+CREATE INDEX IF NOT EXISTS idx_call_summaries_user_call_date
+    ON call_summaries (user_id, call_date DESC);
+
+-- Superseded by idx_call_summaries_user_call_date (same leading column)
+DROP INDEX IF EXISTS idx_call_summaries_user_id;
@@ -0,0 +1,6 @@
+-- Migration: Keyed memory lookup
+-- Serves MemoryStore.get_by_key / upsert (GET /v1/memories/user/{user_id}/key,
+-- PUT /v1/memories/user): the newest memory per (user_id, type, k), used for
+-- the per-caller schema document.
+
+CREATE INDEX IF NOT EXISTS idx_memories_user_type_key ON memories (user_id, type, k, created_at DESC);
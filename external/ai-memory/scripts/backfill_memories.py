@@ -2,22 +2,27 @@
 Backfill Script for Memory V2
 Processes historical memories (5,755+ records) to generate summaries and personality data
 
+Conversations are streamed from the database and processed in parallel under an
+LLM rate limit (see app/backfill.py). Progress is checkpointed, so rerunning the
+same command after a crash or Ctrl-C resumes where it stopped.
+
 Usage:
-    python scripts/backfill_memories.py --limit 100 --batch-size 10
+    python scripts/backfill_memories.py --workers 8 --rate-per-minute 300
+    python scripts/backfill_memories.py --limit 100 --dry-run
+    python scripts/backfill_memories.py --restart        # ignore the checkpoint (retries failures)
 """
 
 import sys
 import os
 import argparse
 import logging
-from datetime import datetime
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.memory import MemoryStore
 from app.llm import chat as llm_chat
-from app.memory_integration import MemoryV2Integration
+from app.backfill import BackfillEngine, CONVERSATION_TYPES
 
 logging.basicConfig(
     level=logging.INFO,
@@ -25,133 +30,77 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def extract_conversation_from_memory(memory_value: dict) -> list:
-    """
-    Extract conversation history from a memory record.
-    
-    Args:
-        memory_value: The value_json field from memories table
-        
-    Returns:
-        List of (role, content) tuples
-    """
-    # Handle different memory formats
-    if isinstance(memory_value, dict):
-        if "messages" in memory_value:
-            # Thread history format
-            messages = memory_value["messages"]
-            return [(msg["role"], msg["content"]) for msg in messages]
-        elif "content" in memory_value:
-            # Single message format
-            return [("user", memory_value.get("content", ""))]
-    
-    return []
-
-def backfill_memories(limit: int = None, batch_size: int = 10, skip: int = 0):
+def backfill_memories(limit: int = None, workers: int = 4, rate_per_minute: float = 120,
+                      fetch_size: int = 200, checkpoint: str = "backfill_checkpoint.json",
+                      resume: bool = True, dry_run: bool = False, types=CONVERSATION_TYPES,
+                      write_batch_size: int = 50) -> dict:
     """
     Backfill historical memories with summaries and personality data.
-    
+
     Args:
-        limit: Maximum number of memories to process (None = all)
-        batch_size: Number of memories to process before committing
-        skip: Number of memories to skip (for resuming)
+        limit: Maximum number of memories to process this run (None = all)
+        workers: Conversations processed concurrently
+        rate_per_minute: LLM requests per minute across all workers (one per conversation)
+        fetch_size: Rows fetched per round trip from the server-side cursor
+        checkpoint: Checkpoint file path
+        resume: Continue from the checkpoint if it exists
+        dry_run: Count eligible conversations without LLM calls or writes
+        types: Memory types that hold conversations
+        write_batch_size: Call summaries written per batch
+
+    Returns:
+        Run counters from BackfillEngine.run()
     """
-    logger.info("🚀 Starting Memory V2 backfill process")
-    logger.info(f"Parameters: limit={limit}, batch_size={batch_size}, skip={skip}")
-    
-    # Initialize
     memory_store = MemoryStore()
-    integration = MemoryV2Integration(memory_store, llm_chat)
-    
-    # Get all memories
+    if not memory_store.available:
+        raise SystemExit("❌ Database unavailable - check DATABASE_URL")
     try:
-        with memory_store.conn.cursor() as cur:
-            query = "SELECT id, type, k, value_json, user_id, created_at FROM memories ORDER BY created_at DESC"
-            if limit:
-                query += f" LIMIT {limit} OFFSET {skip}"
-            
-            cur.execute(query)
-            all_memories = cur.fetchall()
-        
-        total = len(all_memories)
-        logger.info(f"📊 Found {total} memories to process")
-        
-        processed = 0
-        skipped = 0
-        failed = 0
-        
-        for i, memory_row in enumerate(all_memories, 1):
-            memory_id, memory_type, key, value, user_id, created_at = memory_row
-            
-            try:
-                # Skip if not a conversation memory
-                if memory_type not in ["moment", "thread_history"]:
-                    skipped += 1
-                    continue
-                
-                # Extract conversation
-                conversation = extract_conversation_from_memory(value)
-                if not conversation or len(conversation) < 2:
-                    skipped += 1
-                    continue
-                
-                # Generate call_id from memory
-                call_id = f"backfill_{memory_id}"
-                
-                # Process the conversation
-                logger.info(f"Processing {i}/{total}: memory_id={memory_id}, user={user_id}, messages={len(conversation)}")
-                
-                result = integration.process_completed_call(
-                    conversation,
-                    user_id or "unknown",
-                    call_id
-                )
-                
-                if result.get("success"):
-                    processed += 1
-                    logger.info(f"✅ {i}/{total} - Processed: {result.get('summary', '')[:100]}...")
-                else:
-                    failed += 1
-                    logger.error(f"❌ {i}/{total} - Failed: {result.get('error')}")
-                
-                # Progress report every batch
-                if i % batch_size == 0:
-                    logger.info(f"📈 Progress: {i}/{total} | ✅ {processed} | ⏭️ {skipped} | ❌ {failed}")
-                
-            except Exception as e:
-                failed += 1
-                logger.error(f"❌ Error processing memory {memory_id}: {e}", exc_info=True)
-        
-        # Final report
-        logger.info("=" * 80)
-        logger.info(f"🎉 Backfill complete!")
-        logger.info(f"Total memories: {total}")
-        logger.info(f"✅ Processed: {processed}")
-        logger.info(f"⏭️ Skipped: {skipped}")
-        logger.info(f"❌ Failed: {failed}")
-        logger.info("=" * 80)
-        
-    except Exception as e:
-        logger.error(f"❌ Backfill failed: {e}", exc_info=True)
+        engine = BackfillEngine(
+            memory_store,
+            llm_chat,
+            checkpoint_path=checkpoint,
+            workers=workers,
+            rate_per_minute=rate_per_minute,
+            fetch_size=fetch_size,
+            limit=limit,
+            types=types,
+            resume=resume,
+            dry_run=dry_run,
+            write_batch_size=write_batch_size,
+        )
+        return engine.run()
     finally:
         memory_store.close()
 
 def main():
     parser = argparse.ArgumentParser(description="Backfill Memory V2 summaries and personality data")
-    parser.add_argument("--limit", type=int, default=None, help="Maximum number of memories to process")
-    parser.add_argument("--batch-size", type=int, default=10, help="Batch size for processing")
-    parser.add_argument("--skip", type=int, default=0, help="Number of memories to skip (for resuming)")
+    parser.add_argument("--limit", type=int, default=None, help="Maximum number of memories to process this run")
+    parser.add_argument("--workers", type=int, default=4, help="Conversations processed concurrently")
+    parser.add_argument("--rate-per-minute", type=float, default=120,
+                        help="LLM requests per minute across all workers, 0 = unlimited (one per conversation)")
+    parser.add_argument("--fetch-size", type=int, default=200, help="Rows per round trip from the database cursor")
+    parser.add_argument("--write-batch-size", type=int, default=50, help="Call summaries written per database batch")
+    parser.add_argument("--checkpoint", default="backfill_checkpoint.json", help="Checkpoint file for resuming")
+    parser.add_argument("--restart", action="store_true",
+                        help="Ignore an existing checkpoint (already-summarized memories are still skipped)")
+    parser.add_argument("--types", nargs="+", default=list(CONVERSATION_TYPES), help="Memory types to backfill")
     parser.add_argument("--dry-run", action="store_true", help="Preview without writing to database")
-    
+
     args = parser.parse_args()
-    
+
     if args.dry_run:
         logger.info("🔍 DRY RUN MODE - No data will be written")
-    
+
     backfill_memories(
         limit=args.limit,
-        batch_size=args.batch_size,
-        skip=args.skip
+        workers=args.workers,
+        rate_per_minute=args.rate_per_minute,
+        fetch_size=args.fetch_size,
+        checkpoint=args.checkpoint,
+        resume=not args.restart,
+        dry_run=args.dry_run,
+        types=args.types,
+        write_batch_size=args.write_batch_size,
     )
 
 if __name__ == "__main__":
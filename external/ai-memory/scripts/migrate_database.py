@@ -1,14 +1,17 @@
 """
 Database Migration Script for Memory V2
-Runs the SQL migration to create new tables
+Runs the SQL migrations in migrations/ (in file name order) to create new
+tables and indexes. Every migration is idempotent, so re-running is safe.
 
 Usage:
     python scripts/migrate_database.py
+    python scripts/migrate_database.py 002_hybrid_memory_search.sql
 """
 
 import sys
 import os
 import logging
+from typing import List, Optional
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -22,33 +25,38 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def run_migration():
-    """Run the Memory V2 database migration."""
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+
+
+def list_migrations(only: Optional[List[str]] = None) -> List[str]:
+    """Return migration file paths in apply order (optionally restricted to `only`)."""
+    names = sorted(n for n in os.listdir(MIGRATIONS_DIR) if n.endswith(".sql"))
+    if only:
+        names = [n for n in names if n in only]
+    return [os.path.join(MIGRATIONS_DIR, n) for n in names]
+
+
+def run_migration(only: Optional[List[str]] = None):
+    """Run the Memory V2 database migrations."""
     logger.info("🚀 Starting Memory V2 database migration")
     
     memory_store = MemoryStore()
     
     try:
-        # Read migration SQL
-        migration_file = os.path.join(
-            os.path.dirname(os.path.dirname(__file__)),
-            "migrations",
-            "001_add_memory_v2_tables.sql"
-        )
-        
-        with open(migration_file, 'r') as f:
-            migration_sql = f.read()
-        
-        logger.info(f"📖 Read migration file: {migration_file}")
-        logger.info(f"📝 SQL length: {len(migration_sql)} characters")
-        
-        # Execute migration
-        logger.info("⚙️ Executing migration...")
-        
-        with memory_store.conn.cursor() as cur:
-            cur.execute(migration_sql)
-        
-        memory_store.conn.commit()
+        for migration_file in list_migrations(only):
+            with open(migration_file, 'r') as f:
+                migration_sql = f.read()
+            
+            logger.info(f"📖 Read migration file: {migration_file}")
+            logger.info(f"📝 SQL length: {len(migration_sql)} characters")
+            
+            # Execute migration
+            logger.info("⚙️ Executing migration...")
+            
+            with memory_store.conn.cursor() as cur:
+                cur.execute(migration_sql)
+            
+            memory_store.conn.commit()
         
         logger.info("✅ Migration completed successfully!")
         logger.info("")
@@ -57,6 +65,7 @@ def run_migration():
         logger.info("  - caller_profiles")
         logger.info("  - personality_metrics")
         logger.info("  - personality_averages")
+        logger.info("  - memories.search_tsv (hybrid search)")
         logger.info("")
         logger.info("Next steps:")
         logger.info("  1. Test the new tables: python scripts/test_memory_v2.py")
@@ -70,4 +79,4 @@ def run_migration():
         memory_store.close()
 
 if __name__ == "__main__":
-    run_migration()
+    run_migration(sys.argv[1:] or None)
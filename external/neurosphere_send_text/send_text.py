@@ -1,10 +1,16 @@
 from flask import Flask, request, jsonify
 from twilio.rest import Client
 import os
+import sys
 import json
 import base64
 from datetime import datetime
 
+# Use the web app's call log (app/call_log.py) instead of rewriting calls.json
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, REPO_ROOT)
+from app.call_log import CallLogStore  # noqa: E402
+
 app = Flask(__name__)
 
 # 🔐 Twilio credentials (from environment variables)
@@ -17,7 +23,10 @@ twilio_from = "+18633433339"  # Your Twilio number
 
 # Master directory for all calls
 CALLS_DIR = "/opt/ChatStack/static/calls"
-CALLS_INDEX = os.path.join(CALLS_DIR, "calls.json")
+
+# Same SQLite index as the orchestrator (config.json call_log_db_path, relative to the repo root)
+CALL_LOG_DB = os.getenv("CALL_LOG_DB_PATH", os.path.join(REPO_ROOT, "data", "calls", "call_index.db"))
+call_log = CallLogStore(CALL_LOG_DB)
 
 
 @app.route("/call-summary", methods=["POST"])
@@ -66,7 +75,7 @@ def call_summary():
                 f.write(summary)
             print(f"📝 Transcript saved: {transcript_path}")
 
-            # Update calls.json
+            # Record the call in the call log (single-row insert)
             record = {
                 "call_sid": call_sid,
                 "date": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
@@ -76,18 +85,9 @@ def call_summary():
                 "audio_file": f"{call_sid}.mp3"
             }
 
-            calls_data = []
-            if os.path.exists(CALLS_INDEX):
-                with open(CALLS_INDEX, "r") as f:
-                    try:
-                        calls_data = json.load(f)
-                    except json.JSONDecodeError:
-                        calls_data = []
-
-            calls_data.append(record)
-            with open(CALLS_INDEX, "w") as f:
-                json.dump(calls_data, f, indent=2)
-            print(f"📒 Updated call index: {CALLS_INDEX}")
+            # The orchestrator usually indexed this call already (with its customer_id) - only fill in
+            call_log.merge(record)
+            print(f"📒 Recorded call {call_sid} in call log: {CALL_LOG_DB}")
 
             # Send SMS
             transcript_url = f"https://voice.theinsurancedoctors.com/calls/{call_sid}.txt"
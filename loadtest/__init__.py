@@ -0,0 +1,11 @@
+"""
+Offline load-test harness for the orchestrator.
+
+Ships local stand-ins for everything a call touches - a fake Twilio Media
+Streams client, a fake OpenAI (Realtime WebSocket + Chat Completions) and an
+in-memory AI-Memory - and drives N concurrent calls against
+/phone/media-stream and N chat sessions against /v1/chat, reporting
+p50/p95/p99 greeting latency, turn latency, audio jitter and memory growth.
+
+    python -m loadtest --calls 20 --chats 20
+"""
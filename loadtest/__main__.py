@@ -0,0 +1,83 @@
+"""
+CLI for the load-test harness.
+
+    python -m loadtest --calls 20 --chats 20 --turns 3
+    python -m loadtest --calls 5 --audio caller.wav --json report.json
+    python -m loadtest --max-p95-greeting-ms 2500 --max-p95-turn-ms 3000   # CI gate
+
+    # Against an orchestrator you started yourself:
+    python -m loadtest --serve-fakes --openai-port 9101 --memory-port 9102   # prints env to export
+    python -m loadtest --target http://127.0.0.1:8001 --orchestrator-pid <pid>
+"""
+
+import sys
+import json
+import asyncio
+import logging
+import argparse
+
+from loadtest.harness import LoadTestConfig, run_load_test, serve_fakes
+from loadtest.report import format_table
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m loadtest", description="Offline orchestrator load test")
+    parser.add_argument("--calls", type=int, default=10, help="concurrent phone calls on /phone/media-stream")
+    parser.add_argument("--chats", type=int, default=10, help="concurrent chat sessions on /v1/chat")
+    parser.add_argument("--turns", type=int, default=3, help="caller / user turns per call and chat session")
+    parser.add_argument("--ramp-seconds", type=float, default=2.0, help="spread session starts over this long")
+    parser.add_argument("--audio", help="caller recording (.wav or 8kHz .ulaw), split into --turns utterances")
+    parser.add_argument("--tenants", type=int, default=2, help="distinct customer_ids the calls are spread over")
+    parser.add_argument("--memory-latency-ms", type=float, default=20, help="added latency of the fake AI-Memory")
+    parser.add_argument("--openai-delay-ms", type=float, default=300, help="fake OpenAI time to first audio / completion")
+    parser.add_argument("--reply-seconds", type=float, default=2.0, help="length of each scripted spoken reply")
+    parser.add_argument("--realtime-pool-size", type=int, default=2, help="REALTIME_POOL_SIZE for the spawned orchestrator")
+    parser.add_argument("--target", help="use a running orchestrator (http://host:port) instead of spawning one")
+    parser.add_argument("--orchestrator-pid", type=int, help="pid to sample memory from when using --target")
+    parser.add_argument("--serve-fakes", action="store_true", help="only run the fakes and print their env")
+    parser.add_argument("--openai-port", type=int, default=0, help="fake OpenAI port for --serve-fakes")
+    parser.add_argument("--memory-port", type=int, default=0, help="fake AI-Memory port for --serve-fakes")
+    parser.add_argument("--json", help="also write the full report to this file")
+    parser.add_argument("--max-p95-greeting-ms", type=float, help="fail if p95 greeting latency is above this")
+    parser.add_argument("--max-p95-turn-ms", type=float, help="fail if p95 call turn latency is above this")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    config = LoadTestConfig(
+        calls=args.calls, chats=args.chats, turns=args.turns, ramp_seconds=args.ramp_seconds,
+        audio_path=args.audio, target=args.target, tenants=max(1, args.tenants),
+        memory_latency_ms=args.memory_latency_ms, openai_delay_ms=args.openai_delay_ms,
+        reply_seconds=args.reply_seconds, realtime_pool_size=args.realtime_pool_size,
+        orchestrator_pid=args.orchestrator_pid,
+    )
+
+    if args.serve_fakes:
+        try:
+            asyncio.run(serve_fakes(config, args.openai_port, args.memory_port))
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    report = asyncio.run(run_load_test(config))
+    print(f"\n📈 {report['calls']} calls + {report['chats']} chat sessions in {report['elapsed_seconds']}s\n")
+    print(format_table(report["metrics"]))
+    growth = report["metrics"]["memory_growth_mb"]
+    if growth.get("count"):
+        print(f"\n🧠 RSS {growth['baseline_mb']} MB -> peak {growth['peak_mb']} MB, end {growth['end_mb']} MB")
+    for error in report["errors"]:
+        print(f"❌ {error}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    failed = bool(report["errors"])
+    for name, limit in (("greeting_latency_ms", args.max_p95_greeting_ms), ("call_turn_latency_ms", args.max_p95_turn_ms)):
+        p95 = report["metrics"][name].get("p95")
+        if limit is not None and (p95 is None or p95 > limit):
+            print(f"❌ {name} p95 {p95} ms exceeds {limit:.0f} ms")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""
+Caller audio for the fake Twilio client: 8kHz mu-law, cut into 20 ms media
+frames exactly like Twilio Media Streams sends them.
+
+Utterances come from a recording (WAV of any rate, or raw .ulaw) or, when
+none is given, a synthetic voiced signal loud enough for server VAD.
+"""
+
+import math
+import wave
+import audioop
+from typing import Iterator, List
+
+SAMPLE_RATE = 8000
+FRAME_MS = 20
+FRAME_BYTES = SAMPLE_RATE * FRAME_MS // 1000  # mu-law: one byte per sample
+MULAW_SILENCE_BYTE = b"\xff"
+SILENCE_FRAME = MULAW_SILENCE_BYTE * FRAME_BYTES
+
+
+def load_mulaw(path: str) -> bytes:
+    """
+    Read a recording as 8kHz mono mu-law.
+
+    Args:
+        path: .wav (any rate / width / channels) or raw 8kHz mu-law (.ulaw, .raw)
+
+    Returns:
+        mu-law bytes
+    """
+    if not path.lower().endswith(".wav"):
+        with open(path, "rb") as f:
+            return f.read()
+    with wave.open(path, "rb") as wav:
+        width = wav.getsampwidth()
+        rate = wav.getframerate()
+        pcm = wav.readframes(wav.getnframes())
+        if wav.getnchannels() == 2:
+            pcm = audioop.tomono(pcm, width, 0.5, 0.5)
+    if width != 2:
+        pcm = audioop.lin2lin(pcm, width, 2)
+    if rate != SAMPLE_RATE:
+        pcm, _ = audioop.ratecv(pcm, 2, 1, rate, SAMPLE_RATE, None)
+    return audioop.lin2ulaw(pcm, 2)
+
+
+def synthetic_utterance(seconds: float, pitch_hz: float = 180.0) -> bytes:
+    """
+    Voice-like test signal: a harmonic-rich tone with a syllable-rate envelope.
+
+    Returns:
+        mu-law bytes, `seconds` long
+    """
+    samples = bytearray()
+    for n in range(int(seconds * SAMPLE_RATE)):
+        t = n / SAMPLE_RATE
+        envelope = 0.55 + 0.45 * math.sin(2 * math.pi * 4 * t)  # ~4 syllables/s
+        value = sum(math.sin(2 * math.pi * pitch_hz * k * t) / k for k in (1, 2, 3))
+        sample = int(max(-1.0, min(1.0, 0.35 * envelope * value)) * 32767)
+        samples += sample.to_bytes(2, "little", signed=True)
+    return audioop.lin2ulaw(bytes(samples), 2)
+
+
+def split_utterances(audio: bytes, count: int) -> List[bytes]:
+    """Split one recording into `count` roughly equal caller turns."""
+    if count <= 1:
+        return [audio]
+    size = max(FRAME_BYTES, len(audio) // count)
+    return [audio[i * size:(i + 1) * size] for i in range(count)]
+
+
+def frames(audio: bytes) -> Iterator[bytes]:
+    """20 ms frames (last one padded with silence)."""
+    for i in range(0, len(audio), FRAME_BYTES):
+        frame = audio[i:i + FRAME_BYTES]
+        yield frame + MULAW_SILENCE_BYTE * (FRAME_BYTES - len(frame))
+
+
+def pcm16_tone(seconds: float, rate: int = 24000, pitch_hz: float = 220.0) -> bytes:
+    """PCM16 tone used as the fake assistant's scripted voice."""
+    samples = bytearray()
+    for n in range(int(seconds * rate)):
+        sample = int(0.25 * math.sin(2 * math.pi * pitch_hz * n / rate) * 32767)
+        samples += sample.to_bytes(2, "little", signed=True)
+    return bytes(samples)
@@ -0,0 +1,63 @@
+"""
+Chat session driver for POST /v1/chat: each session sends its turns one
+after another on its own thread_id and times every round trip.
+"""
+
+import time
+import logging
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+CHAT_PROMPTS = [
+    "Hi, I'd like to check on my auto policy.",
+    "Can you remind me what my deductible is?",
+    "My wife Sarah will also be driving the new car.",
+    "What discounts could I qualify for?",
+    "Thanks, please remember that I prefer email.",
+]
+
+
+@dataclass
+class ChatResult:
+    thread_id: str
+    turn_latencies_ms: List[float] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+async def run_chat_session(session: aiohttp.ClientSession, base_url: str, thread_id: str, user_id: str,
+                           turns: int, timeout_seconds: float = 60.0) -> ChatResult:
+    """
+    Drive one chat session.
+
+    Args:
+        base_url: Orchestrator base URL (http://host:port)
+        thread_id: Conversation thread (history accumulates server-side)
+        user_id: Memory owner for the session
+        turns: Number of user messages to send
+
+    Returns:
+        ChatResult with per-turn latency, or the first error
+    """
+    result = ChatResult(thread_id=thread_id)
+    for turn in range(turns):
+        started = time.perf_counter()
+        try:
+            async with session.post(
+                f"{base_url}/v1/chat",
+                params={"thread_id": thread_id, "user_id": user_id},
+                json={"messages": [{"role": "user", "content": CHAT_PROMPTS[turn % len(CHAT_PROMPTS)]}]},
+                timeout=aiohttp.ClientTimeout(total=timeout_seconds)
+            ) as response:
+                body = await response.text()
+                if response.status != 200:
+                    result.error = f"HTTP {response.status}: {body[:200]}"
+                    break
+        except Exception as e:
+            result.error = f"{type(e).__name__}: {e}"
+            break
+        result.turn_latencies_ms.append((time.perf_counter() - started) * 1000)
+    return result
@@ -0,0 +1,136 @@
+"""
+In-memory fake of the AI-Memory HTTP API - the endpoints HTTPMemoryStore
+and the call flow hit - so load tests exercise the orchestrator's memory
+path without PostgreSQL. JWTs are accepted unchecked. `latency_ms` adds a
+fixed per-request delay to model the real service's round trip.
+
+Also answers the post-call hand-offs (call summary, Notion health) so a
+finished call never reaches for a real host.
+"""
+
+import json
+import uuid
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+
+class FakeAIMemoryServer:
+    """
+    aiohttp app mimicking AI-Memory's v1/v2 endpoints.
+
+    Args:
+        latency_ms: Added to every request
+    """
+
+    def __init__(self, latency_ms: float = 0):
+        self.latency_ms = latency_ms
+        self.memories: List[Dict[str, Any]] = []
+        self.calls_processed = 0
+        self.requests = defaultdict(int)  # "METHOD route" -> count
+        self.app = web.Application(middlewares=[self._latency])
+        router = self.app.router
+        router.add_get("/health", self.health)
+        router.add_get("/v1/memories", self.list_memories)
+        router.add_post("/v1/memories", self.store_memory)
+        router.add_post("/v1/memories/user", self.store_memory)
+        router.add_put("/v1/memories/user", self.upsert_memory)
+        router.add_get("/v1/memories/user/{user_id}", self.user_memories)
+        router.add_get("/v1/memories/user/{user_id}/key", self.memory_by_key)
+        router.add_post("/v1/memories/shared", self.store_memory)
+        router.add_post("/memory/retrieve", self.retrieve)
+        router.add_post("/v2/context/enriched", self.enriched_context)
+        router.add_get("/v2/profile/{user_id}", self.not_found)
+        router.add_get("/v2/personality/{user_id}", self.not_found)
+        router.add_get("/v2/callers", self.callers)
+        router.add_get("/v2/callers/{user_id}", self.not_found)
+        router.add_post("/v2/callers", self.ok)
+        router.add_post("/v2/process-call", self.process_call)
+        router.add_post("/call-summary", self.ok)
+
+    @web.middleware
+    async def _latency(self, request: web.Request, handler):
+        route = request.match_info.route.resource.canonical if request.match_info.route.resource else "unmatched"
+        self.requests[f"{request.method} {route}"] += 1
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        return await handler(request)
+
+    async def health(self, request: web.Request) -> web.Response:
+        return web.json_response({"status": "healthy", "db": True, "memories": len(self.memories)})
+
+    def _matching(self, user_id: str, types: List[str]) -> List[Dict[str, Any]]:
+        return [m for m in reversed(self.memories)  # newest first, like the real service
+                if m.get("user_id") == user_id and (not types or m.get("type") in types)]
+
+    async def list_memories(self, request: web.Request) -> web.Response:
+        types = [t for t in request.query.get("memory_type", "").split(",") if t]
+        limit = int(request.query.get("limit", 50))
+        matches = self._matching(request.query.get("user_id", "unknown"), types)
+        return web.json_response({"memories": matches[:limit], "count": min(limit, len(matches))})
+
+    async def user_memories(self, request: web.Request) -> web.Response:
+        # Real service ranks by query (hybrid search); newest-first is enough for load
+        user_id = request.match_info["user_id"]
+        types = [t for t in request.query.get("memory_type", "").split(",") if t]
+        limit = int(request.query.get("limit", 10))
+        matches = self._matching(user_id, types)[:limit]
+        return web.json_response({"user_id": user_id, "memories": matches, "count": len(matches)})
+
+    async def memory_by_key(self, request: web.Request) -> web.Response:
+        user_id = request.match_info["user_id"]
+        key = request.query.get("key")
+        matches = [m for m in self._matching(user_id, [request.query.get("memory_type", "")]) if m.get("key") == key]
+        return web.json_response({"user_id": user_id, "memory": matches[0] if matches else None})
+
+    async def upsert_memory(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        user_id = request.query.get("user_id")
+        expected = request.query.get("expected_version")
+        if expected:
+            current = [m for m in self._matching(user_id, [payload.get("type")]) if m.get("key") == payload.get("key")]
+            if not current or current[0].get("created_at") != expected:
+                return web.json_response({"detail": "Memory changed since expected_version"}, status=409)
+        self.memories = [m for m in self.memories if not (
+            m.get("user_id") == user_id and m.get("type") == payload.get("type") and m.get("key") == payload.get("key"))]
+        return await self.store_memory(request)
+
+    async def store_memory(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        memory = dict(payload, id=str(uuid.uuid4()), created_at=datetime.utcnow().isoformat())
+        memory.setdefault("user_id", request.query.get("user_id") or payload.get("user_id") or "shared")
+        memory.setdefault("type", payload.get("memory_type", "fact"))
+        self.memories.append(memory)
+        return web.json_response({"success": True, "id": memory["id"]})
+
+    async def retrieve(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        matches = self._matching(payload.get("user_id", "unknown"), payload.get("types") or [])
+        lines = [json.dumps(m) for m in matches[:int(payload.get("limit", 50))]]
+        return web.json_response({"memory": "\n".join(lines)})
+
+    async def enriched_context(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        matches = self._matching(payload.get("user_id", "unknown"), [])
+        context = "\n".join(f"- {m.get('key', m.get('type'))}: {json.dumps(m.get('value'))[:200]}" for m in matches[:10])
+        return web.json_response({"success": True, "context": context or "New caller, no history yet.",
+                                  "summary_count": len(matches)})
+
+    async def callers(self, request: web.Request) -> web.Response:
+        return web.json_response({"callers": []})
+
+    async def process_call(self, request: web.Request) -> web.Response:
+        self.calls_processed += 1
+        return web.json_response({"success": True})
+
+    async def ok(self, request: web.Request) -> web.Response:
+        return web.json_response({"success": True})
+
+    async def not_found(self, request: web.Request) -> web.Response:
+        return web.json_response({"success": False, "error": "not found"}, status=404)
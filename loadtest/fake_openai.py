@@ -0,0 +1,182 @@
+"""
+Fake OpenAI for offline load tests: the Realtime WebSocket (/v1/realtime)
+and Chat Completions (/v1/chat/completions), both scripted.
+
+Realtime sessions behave like server VAD: input audio is classified by
+energy, speech_stopped fires after the session's silence_duration_ms of
+quiet (taken from session.update, as OpenAI does), and every
+response.create - explicit or VAD-triggered - streams a scripted reply as
+response.audio.delta events paced at real time. The first delta is held
+back by `response_delay_ms` to stand in for model time-to-first-audio.
+"""
+
+import json
+import time
+import uuid
+import base64
+import asyncio
+import audioop
+import logging
+from typing import Any, Dict, Optional
+
+from aiohttp import web, WSMsgType
+
+from loadtest.audio import pcm16_tone
+
+logger = logging.getLogger(__name__)
+
+REALTIME_RATE = 24000
+DELTA_MS = 100
+DELTA_BYTES = REALTIME_RATE * 2 * DELTA_MS // 1000  # PCM16 mono
+SPEECH_RMS_THRESHOLD = 500
+
+SCRIPTED_REPLY = "Thanks for calling, this is the load test assistant. How can I help?"
+
+
+class FakeRealtimeSession:
+    """One Realtime WebSocket connection."""
+
+    def __init__(self, ws: web.WebSocketResponse, server: "FakeOpenAIServer"):
+        self.ws = ws
+        self.server = server
+        self.session_id = f"sess_{uuid.uuid4().hex[:20]}"
+        self.silence_duration_ms = 500
+        self.vad_enabled = True
+        self.speaking = False
+        self.silence_ms = 0.0
+        self.response_task: Optional[asyncio.Task] = None
+
+    async def send(self, event: Dict[str, Any]):
+        event.setdefault("event_id", f"event_{uuid.uuid4().hex[:12]}")
+        await self.ws.send_str(json.dumps(event))
+
+    async def handle(self, event: Dict[str, Any]):
+        event_type = event.get("type")
+        if event_type == "session.update":
+            turn_detection = event.get("session", {}).get("turn_detection")
+            self.vad_enabled = bool(turn_detection)
+            if turn_detection:
+                self.silence_duration_ms = turn_detection.get("silence_duration_ms", self.silence_duration_ms)
+            await self.send({"type": "session.updated", "session": dict(event.get("session", {}), id=self.session_id)})
+        elif event_type == "input_audio_buffer.append":
+            await self._on_audio(base64.b64decode(event.get("audio", "")))
+        elif event_type == "input_audio_buffer.commit":
+            await self.send({"type": "input_audio_buffer.committed", "item_id": f"item_{uuid.uuid4().hex[:12]}"})
+        elif event_type == "conversation.item.create":
+            await self.send({"type": "conversation.item.created", "item": event.get("item", {})})
+        elif event_type == "response.create":
+            self._start_response()
+        elif event_type == "response.cancel":
+            self._cancel_response()
+
+    async def _on_audio(self, pcm: bytes):
+        if not self.vad_enabled or not pcm:
+            return
+        chunk_ms = len(pcm) / 2 / REALTIME_RATE * 1000
+        loud = audioop.rms(pcm, 2) >= SPEECH_RMS_THRESHOLD
+        if loud:
+            self.silence_ms = 0.0
+            if not self.speaking:
+                self.speaking = True
+                self._cancel_response()  # barge-in
+                await self.send({"type": "input_audio_buffer.speech_started"})
+            return
+        if not self.speaking:
+            return
+        self.silence_ms += chunk_ms
+        if self.silence_ms >= self.silence_duration_ms:
+            self.speaking = False
+            self.silence_ms = 0.0
+            await self.send({"type": "input_audio_buffer.speech_stopped"})
+            await self.send({"type": "conversation.item.created", "item": {
+                "id": f"item_{uuid.uuid4().hex[:12]}", "role": "user",
+                "content": [{"type": "input_audio", "transcript": "load test caller turn"}]
+            }})
+            self._start_response()
+
+    def _start_response(self):
+        self._cancel_response()
+        self.response_task = asyncio.create_task(self._stream_response())
+
+    def _cancel_response(self):
+        if self.response_task and not self.response_task.done():
+            self.response_task.cancel()
+
+    async def _stream_response(self):
+        response_id = f"resp_{uuid.uuid4().hex[:12]}"
+        await self.send({"type": "response.created", "response": {"id": response_id, "status": "in_progress"}})
+        await asyncio.sleep(self.server.response_delay_ms / 1000)
+        audio = self.server.reply_audio
+        started = time.perf_counter()
+        for n, i in enumerate(range(0, len(audio), DELTA_BYTES)):
+            # Pace on an absolute schedule so event-loop hiccups here don't read as orchestrator jitter
+            await asyncio.sleep(max(0.0, started + n * DELTA_MS / 1000 - time.perf_counter()))
+            await self.send({"type": "response.audio.delta", "response_id": response_id,
+                             "delta": base64.b64encode(audio[i:i + DELTA_BYTES]).decode("ascii")})
+        await self.send({"type": "response.audio_transcript.done", "response_id": response_id, "transcript": SCRIPTED_REPLY})
+        await self.send({"type": "response.done", "response": {"id": response_id, "status": "completed", "output": []}})
+
+
+class FakeOpenAIServer:
+    """
+    aiohttp app serving the Realtime WebSocket and Chat Completions.
+
+    Args:
+        reply_seconds: Length of each scripted spoken reply
+        response_delay_ms: Delay before the first audio delta / completion
+    """
+
+    def __init__(self, reply_seconds: float = 2.0, response_delay_ms: float = 300):
+        self.response_delay_ms = response_delay_ms
+        self.reply_audio = pcm16_tone(reply_seconds, REALTIME_RATE)
+        self.stats = {"realtime_sessions": 0, "active_sessions": 0, "chat_completions": 0}
+        self.app = web.Application()
+        self.app.router.add_get("/v1/realtime", self.realtime)
+        self.app.router.add_post("/v1/chat/completions", self.chat_completions)
+        self.app.router.add_get("/v1/models", self.models)
+
+    async def realtime(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse(max_msg_size=0)
+        await ws.prepare(request)
+        session = FakeRealtimeSession(ws, self)
+        self.stats["realtime_sessions"] += 1
+        self.stats["active_sessions"] += 1
+        try:
+            await session.send({"type": "session.created", "session": {"id": session.session_id,
+                                                                       "model": request.query.get("model")}})
+            async for msg in ws:
+                if msg.type == WSMsgType.TEXT:
+                    await session.handle(json.loads(msg.data))
+                elif msg.type == WSMsgType.ERROR:
+                    break
+        finally:
+            session._cancel_response()
+            self.stats["active_sessions"] -= 1
+        return ws
+
+    async def chat_completions(self, request: web.Request) -> web.StreamResponse:
+        payload = await request.json()
+        self.stats["chat_completions"] += 1
+        await asyncio.sleep(self.response_delay_ms / 1000)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        model = payload.get("model", "gpt-4o-mini")
+        if not payload.get("stream"):
+            return web.json_response({
+                "id": completion_id, "object": "chat.completion", "model": model,
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": SCRIPTED_REPLY}}],
+                "usage": {"prompt_tokens": 50, "completion_tokens": 15, "total_tokens": 65}
+            })
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        for word in SCRIPTED_REPLY.split(" "):
+            chunk = {"id": completion_id, "object": "chat.completion.chunk", "model": model,
+                     "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}]}
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            await asyncio.sleep(0.02)
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+    async def models(self, request: web.Request) -> web.Response:
+        return web.json_response({"data": [{"id": "gpt-4o-mini"}, {"id": "gpt-realtime"}]})
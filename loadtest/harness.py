@@ -0,0 +1,232 @@
+"""
+Runs a load test end to end: start the fakes, start (or attach to) an
+orchestrator pointed at them, drive concurrent calls and chat sessions,
+and summarize the timings.
+"""
+
+import os
+import sys
+import time
+import uuid
+import socket
+import asyncio
+import logging
+import subprocess
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+from aiohttp import web
+
+from loadtest.audio import load_mulaw, synthetic_utterance, split_utterances
+from loadtest.chat_client import run_chat_session
+from loadtest.fake_ai_memory import FakeAIMemoryServer
+from loadtest.fake_openai import FakeOpenAIServer
+from loadtest.report import MemorySampler, percentiles
+from loadtest.twilio_client import FakeTwilioCall
+
+logger = logging.getLogger(__name__)
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LOADTEST_SESSION_SECRET = "loadtest-session-secret"
+LOADTEST_JWT_SECRET = "loadtest-jwt-secret"
+
+
+@dataclass
+class LoadTestConfig:
+    calls: int = 10
+    chats: int = 10
+    turns: int = 3
+    ramp_seconds: float = 2.0
+    audio_path: Optional[str] = None
+    utterance_seconds: float = 1.5
+    target: Optional[str] = None  # running orchestrator; None = spawn one
+    tenants: int = 2
+    memory_latency_ms: float = 20
+    openai_delay_ms: float = 300
+    reply_seconds: float = 2.0
+    realtime_pool_size: int = 2
+    orchestrator_pid: Optional[int] = None
+    drain_seconds: float = 5.0  # let post-call processing finish before stopping the orchestrator
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def start_app(app: web.Application, port: int) -> web.AppRunner:
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return runner
+
+
+def orchestrator_env(openai_port: int, memory_port: int, realtime_pool_size: int) -> Dict[str, str]:
+    """Environment overrides (env beats config.json) that point the orchestrator at the fakes."""
+    openai_base = f"127.0.0.1:{openai_port}"
+    memory_base = f"http://127.0.0.1:{memory_port}"
+    return {
+        "OPENAI_API_KEY": "sk-loadtest",
+        "OPENAI_REALTIME_URL": f"ws://{openai_base}/v1/realtime",
+        "LLM_BASE_URL": f"http://{openai_base}/v1",
+        "LLM_MODEL": "gpt-4o-mini",
+        "AI_MEMORY_URL": memory_base,
+        "CALL_SUMMARY_URL": f"{memory_base}/call-summary",
+        "NOTION_SERVICE_URL": f"{memory_base}/notion",
+        "JWT_SECRET_KEY": LOADTEST_JWT_SECRET,
+        "SESSION_SECRET": LOADTEST_SESSION_SECRET,
+        "SPECULATIVE_GREETING_WAIT_MS": "0",
+        "REALTIME_POOL_SIZE": str(realtime_pool_size),
+        "TRACING_OTLP_ENDPOINT": "",
+    }
+
+
+async def wait_healthy(session: aiohttp.ClientSession, base_url: str, timeout: float = 60.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            async with session.get(f"{base_url}/health", timeout=aiohttp.ClientTimeout(total=2)) as response:
+                if response.status == 200:
+                    return
+        except aiohttp.ClientError:
+            pass
+        await asyncio.sleep(0.5)
+    raise RuntimeError(f"orchestrator at {base_url} did not become healthy within {timeout:.0f}s")
+
+
+def spawn_orchestrator(port: int, env: Dict[str, str]) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=REPO_ROOT,
+        env=dict(os.environ, **env),
+    )
+
+
+def call_parameters(index: int, tenants: int, signed: bool) -> Dict[str, str]:
+    """<Stream> parameters for call `index`; the tenant (customer_id) is signed when the secret is known."""
+    call_sid = f"CA{uuid.uuid4().hex}"
+    customer_id = index % tenants + 1
+    params = {"call_sid": call_sid, "user_id": f"+1555{index:07d}", "is_callback": "False"}
+    if signed:
+        from app.call_sessions import sign_call_context
+        token = sign_call_context(call_sid, customer_id)
+        if token:
+            params["ctx"] = token
+    return params
+
+
+def caller_utterances(config: LoadTestConfig) -> List[bytes]:
+    if config.audio_path:
+        return split_utterances(load_mulaw(config.audio_path), config.turns)
+    return [synthetic_utterance(config.utterance_seconds)] * config.turns
+
+
+async def run_load_test(config: LoadTestConfig) -> Dict[str, Any]:
+    """
+    Run one load test.
+
+    Returns:
+        Report dict: percentile summaries per metric, error counts and fake-side stats
+    """
+    openai = memory = None
+    runners: List[web.AppRunner] = []
+    process = None
+    base_url = config.target
+    if not base_url:
+        openai, memory, runners, env = await start_fakes(config)
+        port = free_port()
+        process = spawn_orchestrator(port, env)
+        base_url = f"http://127.0.0.1:{port}"
+        os.environ["SESSION_SECRET"] = LOADTEST_SESSION_SECRET  # sign tenant context like the web app
+    ws_url = base_url.replace("http", "ws", 1) + "/phone/media-stream"
+
+    connector = aiohttp.TCPConnector(limit=0)
+    session = aiohttp.ClientSession(connector=connector)
+    sampler = None
+    try:
+        await wait_healthy(session, base_url)
+        pid = process.pid if process else config.orchestrator_pid
+        if pid:
+            sampler = MemorySampler(pid)
+            sampler.start()
+
+        utterances = caller_utterances(config)
+        signed = bool(os.environ.get("SESSION_SECRET"))
+        stagger = config.ramp_seconds / max(1, config.calls + config.chats)
+
+        async def delayed(delay, coro):
+            await asyncio.sleep(delay)
+            return await coro
+
+        started = time.perf_counter()
+        call_tasks = [
+            delayed(i * stagger, FakeTwilioCall(ws_url, utterances, call_parameters(i, config.tenants, signed)).run(session))
+            for i in range(config.calls)
+        ]
+        chat_tasks = [
+            delayed(i * stagger, run_chat_session(session, base_url, f"loadtest-chat-{i}", f"+1666{i:07d}", config.turns))
+            for i in range(config.chats)
+        ]
+        results = await asyncio.gather(*call_tasks, *chat_tasks)
+        elapsed = time.perf_counter() - started
+        await asyncio.sleep(config.drain_seconds)
+    finally:
+        if sampler:
+            await sampler.stop()
+        await session.close()
+        if process:
+            process.terminate()
+            try:
+                # The fakes live on this loop - don't block it while the orchestrator shuts down
+                await asyncio.to_thread(process.wait, 10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        for runner in runners:
+            await runner.cleanup()
+
+    call_results, chat_results = results[:config.calls], results[config.calls:]
+    return {
+        "elapsed_seconds": round(elapsed, 1),
+        "calls": config.calls,
+        "chats": config.chats,
+        "metrics": {
+            "greeting_latency_ms": percentiles([r.greeting_latency_ms for r in call_results if r.greeting_latency_ms is not None]),
+            "call_turn_latency_ms": percentiles([v for r in call_results for v in r.turn_latencies_ms]),
+            "audio_jitter_ms": percentiles([v for r in call_results for v in r.jitter_ms]),
+            "chat_turn_latency_ms": percentiles([v for r in chat_results for v in r.turn_latencies_ms]),
+            "memory_growth_mb": sampler.summary() if sampler else {"count": 0},
+        },
+        "errors": [f"call {r.call_sid}: {r.error}" for r in call_results if r.error]
+                  + [f"chat {r.thread_id}: {r.error}" for r in chat_results if r.error],
+        "fakes": {
+            "openai": dict(openai.stats),
+            "ai_memory": {"memories": len(memory.memories), "calls_processed": memory.calls_processed,
+                          "requests": dict(memory.requests)},
+        } if openai else None,
+    }
+
+
+async def start_fakes(config: LoadTestConfig, openai_port: int = 0, memory_port: int = 0):
+    """
+    Start the fake OpenAI and AI-Memory servers.
+
+    Returns:
+        (openai, memory, runners, orchestrator env overrides)
+    """
+    openai = FakeOpenAIServer(reply_seconds=config.reply_seconds, response_delay_ms=config.openai_delay_ms)
+    memory = FakeAIMemoryServer(latency_ms=config.memory_latency_ms)
+    openai_port, memory_port = openai_port or free_port(), memory_port or free_port()
+    runners = [await start_app(openai.app, openai_port), await start_app(memory.app, memory_port)]
+    return openai, memory, runners, orchestrator_env(openai_port, memory_port, config.realtime_pool_size)
+
+
+async def serve_fakes(config: LoadTestConfig, openai_port: int, memory_port: int):
+    """Run only the fakes and print the env that points an orchestrator at them."""
+    _, _, _, env = await start_fakes(config, openai_port, memory_port)
+    for key, value in env.items():
+        print(f"export {key}={value!r}")
+    sys.stdout.flush()
+    await asyncio.Event().wait()
@@ -0,0 +1,84 @@
+"""
+Percentiles and process memory sampling for load-test reports.
+"""
+
+import math
+import asyncio
+from typing import Dict, List, Optional, Sequence
+
+
+def percentiles(values: Sequence[float]) -> Dict[str, Optional[float]]:
+    """
+    Nearest-rank p50 / p95 / p99 / max.
+
+    Returns:
+        Dict with count, p50, p95, p99, max (None when there are no values)
+    """
+    ordered = sorted(values)
+    summary: Dict[str, Optional[float]] = {"count": len(ordered)}
+    for name, q in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99)):
+        summary[name] = round(ordered[max(0, math.ceil(len(ordered) * q) - 1)], 1) if ordered else None
+    summary["max"] = round(ordered[-1], 1) if ordered else None
+    return summary
+
+
+def rss_mb(pid: int) -> Optional[float]:
+    """Resident set size of a process in MB (Linux /proc), None if unreadable."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+class MemorySampler:
+    """
+    Samples a process's RSS while the load runs; growth is measured from the
+    first sample, taken before any call starts.
+    """
+
+    def __init__(self, pid: int, interval: float = 0.5):
+        self.pid = pid
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._sample()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+        self._sample()
+
+    def _sample(self):
+        value = rss_mb(self.pid)
+        if value is not None:
+            self.samples.append(value)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            self._sample()
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        if not self.samples:
+            return {"count": 0}
+        baseline = self.samples[0]
+        summary = percentiles([s - baseline for s in self.samples])
+        summary.update(baseline_mb=round(baseline, 1), peak_mb=round(max(self.samples), 1),
+                       end_mb=round(self.samples[-1], 1))
+        return summary
+
+
+def format_table(results: Dict[str, Dict[str, Optional[float]]]) -> str:
+    """Fixed-width table of percentile summaries."""
+    lines = [f"{'metric':<26}{'count':>7}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}"]
+    for name, summary in results.items():
+        cells = [f"{summary.get(k):>10.1f}" if summary.get(k) is not None else f"{'-':>10}" for k in ("p50", "p95", "p99", "max")]
+        lines.append(f"{name:<26}{summary.get('count', 0):>7}" + "".join(cells))
+    return "\n".join(lines)
@@ -0,0 +1,161 @@
+"""
+Fake Twilio Media Streams client for /phone/media-stream.
+
+Streams caller audio as 20 ms mu-law media frames at real-time pace - and
+keeps streaming silence in between, as Twilio does for a live call - while
+timing what comes back:
+
+    greeting latency   "start" sent -> first media frame from the orchestrator
+    turn latency       last frame of a caller utterance -> first reply frame
+    audio jitter       |gap between reply frames - audio length of the previous frame|
+"""
+
+import json
+import time
+import uuid
+import base64
+import asyncio
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional
+
+import aiohttp
+
+from loadtest.audio import SAMPLE_RATE, FRAME_MS, SILENCE_FRAME, frames
+
+logger = logging.getLogger(__name__)
+
+BURST_GAP_SECONDS = 0.25  # a longer gap between reply frames starts a new burst
+
+
+@dataclass
+class CallResult:
+    call_sid: str
+    greeting_latency_ms: Optional[float] = None
+    turn_latencies_ms: List[float] = field(default_factory=list)
+    jitter_ms: List[float] = field(default_factory=list)
+    frames_sent: int = 0
+    frames_received: int = 0
+    error: Optional[str] = None
+
+
+class FakeTwilioCall:
+    """
+    One simulated phone call.
+
+    Args:
+        ws_url: ws://host:port/phone/media-stream
+        utterances: Caller turns (mu-law bytes), spoken in order
+        custom_parameters: <Stream> parameters (user_id, call_sid, is_callback, ctx)
+        reply_quiet_seconds: Reply counts as finished after this long without frames
+        turn_timeout_seconds: Give up waiting for a greeting / reply after this long
+    """
+
+    def __init__(self, ws_url: str, utterances: List[bytes], custom_parameters: Dict[str, str],
+                 reply_quiet_seconds: float = 0.6, turn_timeout_seconds: float = 15.0):
+        self.ws_url = ws_url
+        self.utterances = utterances
+        self.call_sid = custom_parameters.get("call_sid") or f"CA{uuid.uuid4().hex}"
+        self.custom_parameters = dict(custom_parameters, call_sid=self.call_sid)
+        self.stream_sid = f"MZ{uuid.uuid4().hex}"
+        self.reply_quiet_seconds = reply_quiet_seconds
+        self.turn_timeout_seconds = turn_timeout_seconds
+        self.result = CallResult(call_sid=self.call_sid)
+        self._speaking: Optional[bytes] = None
+        self._waiting_since: Optional[float] = None  # perf_counter of the last caller frame / start
+        self._first_reply_at: Optional[float] = None
+        self._last_frame_at: Optional[float] = None
+        self._last_frame_seconds = 0.0
+        self._reply_started = asyncio.Event()
+
+    async def run(self, session: aiohttp.ClientSession) -> CallResult:
+        try:
+            async with session.ws_connect(self.ws_url, max_msg_size=0) as ws:
+                receiver = asyncio.create_task(self._receive(ws))
+                sender = asyncio.create_task(self._send_audio(ws))
+                try:
+                    await self._converse(ws)
+                finally:
+                    sender.cancel()
+                    await ws.send_str(json.dumps({"event": "stop", "streamSid": self.stream_sid,
+                                                  "stop": {"callSid": self.call_sid}}))
+                    receiver.cancel()
+        except Exception as e:
+            self.result.error = f"{type(e).__name__}: {e}"
+        return self.result
+
+    async def _converse(self, ws):
+        await ws.send_str(json.dumps({"event": "connected", "protocol": "Call", "version": "1.0.0"}))
+        await ws.send_str(json.dumps({"event": "start", "streamSid": self.stream_sid, "start": {
+            "streamSid": self.stream_sid, "callSid": self.call_sid,
+            "tracks": ["inbound"], "mediaFormat": {"encoding": "audio/x-mulaw", "sampleRate": SAMPLE_RATE, "channels": 1},
+            "customParameters": self.custom_parameters
+        }}))
+        self._waiting_since = time.perf_counter()
+        latency = await self._await_reply()
+        if latency is None:
+            raise TimeoutError("no greeting audio")
+        self.result.greeting_latency_ms = latency
+
+        for utterance in self.utterances:
+            self._speaking = utterance
+            while self._speaking is not None:
+                await asyncio.sleep(FRAME_MS / 1000)
+            latency = await self._await_reply()
+            if latency is None:
+                raise TimeoutError(f"no reply to caller turn {len(self.result.turn_latencies_ms) + 1}")
+            self.result.turn_latencies_ms.append(latency)
+
+    async def _await_reply(self) -> Optional[float]:
+        """Wait for the next reply to start and finish; returns its latency in ms."""
+        waiting_since = self._waiting_since
+        self._reply_started.clear()
+        try:
+            await asyncio.wait_for(self._reply_started.wait(), self.turn_timeout_seconds)
+        except asyncio.TimeoutError:
+            return None
+        latency_ms = (self._first_reply_at - waiting_since) * 1000
+        while time.perf_counter() - self._last_frame_at < self.reply_quiet_seconds:
+            await asyncio.sleep(0.05)
+        return latency_ms
+
+    async def _send_audio(self, ws):
+        """20 ms frames on an absolute schedule: the utterance being spoken, else silence."""
+        started = time.perf_counter()
+        sequence = 0
+        pending: Deque[bytes] = deque()
+        while True:
+            if self._speaking is not None and not pending:
+                pending.extend(frames(self._speaking))
+            frame = pending.popleft() if pending else SILENCE_FRAME
+            await ws.send_str(json.dumps({
+                "event": "media", "streamSid": self.stream_sid, "sequenceNumber": str(sequence),
+                "media": {"track": "inbound", "chunk": str(sequence), "timestamp": str(sequence * FRAME_MS),
+                          "payload": base64.b64encode(frame).decode("ascii")}
+            }))
+            if self._speaking is not None and not pending:
+                self._waiting_since = time.perf_counter()  # caller just finished the utterance
+                self._speaking = None
+            self.result.frames_sent += 1
+            sequence += 1
+            await asyncio.sleep(max(0.0, started + sequence * FRAME_MS / 1000 - time.perf_counter()))
+
+    async def _receive(self, ws):
+        async for msg in ws:
+            if msg.type != aiohttp.WSMsgType.TEXT:
+                continue
+            event = json.loads(msg.data)
+            if event.get("event") != "media":
+                continue
+            now = time.perf_counter()
+            seconds = len(base64.b64decode(event["media"]["payload"])) / SAMPLE_RATE
+            self.result.frames_received += 1
+            if self._last_frame_at is not None and now - self._last_frame_at < BURST_GAP_SECONDS:
+                self.result.jitter_ms.append(abs((now - self._last_frame_at) - self._last_frame_seconds) * 1000)
+            if not self._reply_started.is_set() and self._speaking is None and (
+                    self._last_frame_at is None or now - self._last_frame_at >= self.reply_quiet_seconds):
+                self._first_reply_at = now
+                self._reply_started.set()
+            self._last_frame_at = now
+            self._last_frame_seconds = seconds
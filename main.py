@@ -6,7 +6,7 @@ import requests
 import json
 import io
 import base64
-from flask import Flask, render_template_string, request, jsonify, redirect, url_for, flash, Response, send_from_directory, session
+from flask import Flask, render_template_string, request, jsonify, redirect, url_for, flash, Response, send_file, send_from_directory, session, g
 from twilio.rest import Client
 from twilio.twiml import TwiML
 from twilio.twiml.voice_response import VoiceResponse, Gather, Start, Stream, Connect
@@ -14,6 +14,9 @@ from twilio.twiml.voice_response import VoiceResponse, Gather, Start, Stream, Co
 # from elevenlabs import ElevenLabs, VoiceSettings
 import tempfile
 import logging
+import threading
+import contextvars
+from functools import wraps
 from config_loader import get_secret, get_setting, get_twilio_config, get_elevenlabs_config, get_llm_config, get_all_config
 
 # Configure logging
@@ -84,12 +87,32 @@ app.register_blueprint(status_bp)
 # Create calls directory for storing transcripts and recordings
 CALLS_DIR = os.path.join(os.path.dirname(__file__), 'static', 'calls')
 os.makedirs(CALLS_DIR, exist_ok=True)
-CALLS_INDEX = os.path.join(CALLS_DIR, 'calls.json')
-if not os.path.exists(CALLS_INDEX):
-    with open(CALLS_INDEX, 'w') as f:
-        json.dump([], f)
 logging.info(f"📁 Calls directory ready: {CALLS_DIR}")
 
+# Build the inbound-number routing table in the background so the first call
+# doesn't pay for it (lookups rebuild lazily if this hasn't finished)
+def _warm_customer_routing():
+    try:
+        from customer_db import get_routing_table
+        get_routing_table().refresh()
+    except Exception as e:
+        logging.warning(f"⚠️ Customer routing table warm-up failed: {e}")
+
+threading.Thread(target=_warm_customer_routing, daemon=True).start()
+
+def _warm_known_callers():
+    """Load known callers at startup, then pick up new profiles incrementally"""
+    import time
+    from app.known_callers import get_known_callers
+    while True:
+        try:
+            get_known_callers().warm()
+        except Exception as e:
+            logging.warning(f"⚠️ Known-callers warm-up failed: {e}")
+        time.sleep(float(get_setting("known_callers_refresh_seconds", 600)))
+
+threading.Thread(target=_warm_known_callers, daemon=True).start()
+
 def _get_backend_url():
     """Get LLM backend URL dynamically"""
     config = _get_config()
@@ -126,28 +149,54 @@ def _get_elevenlabs_client():
 if not _initial_config["llm_base_url"]:
     print("⚠️ Warning: LLM_BASE_URL not set, using default")
 
-# Phone call session storage (in production, use Redis or database)
-call_sessions = {}
+# Per-call latency tracing: every Twilio webhook of a call joins the trace derived from its CallSid
+from app import tracing
+tracing.configure("chatstack-web")
+
+_TRACED_PATHS = ('/phone/', '/recording-complete', '/call-status')
+
+@app.before_request
+def _start_request_span():
+    if not request.path.startswith(_TRACED_PATHS):
+        return
+    call_sid = request.values.get('CallSid')
+    if not call_sid:
+        return
+    span = tracing.begin_span(
+        f"{request.method} {request.url_rule.rule if request.url_rule else request.path}",
+        trace_id=tracing.trace_id_for_call(call_sid),
+        kind="server",
+        attributes={"call_sid": call_sid}
+    )
+    g.trace_span = span
+    g.trace_token = tracing.activate(span)
+
+@app.after_request
+def _tag_request_span(response):
+    span = g.get('trace_span')
+    if span:
+        span.set_attribute("http.status_code", response.status_code)
+    return response
+
+@app.teardown_request
+def _end_request_span(exc):
+    span = g.pop('trace_span', None)
+    if span:
+        tracing.deactivate(g.pop('trace_token'))
+        if exc:
+            span.error = str(exc)
+        span.end()
+
+# Phone call session storage (in-process by default; sqlite/redis for multiple workers)
+from app.call_sessions import get_call_session_store, sign_call_context
+call_sessions = get_call_session_store()
 
 def cleanup_old_sessions():
-    """Remove sessions older than 1 hour to prevent memory leaks"""
-    import time
-    current_time = time.time()
-    expired_sessions = []
-    
-    for call_sid, session_data in call_sessions.items():
-        created_at = session_data.get('created_at', current_time)
-        age = current_time - created_at
-        
-        # Remove sessions older than 1 hour
-        if age > 3600:
-            expired_sessions.append(call_sid)
-    
-    for call_sid in expired_sessions:
-        del call_sessions[call_sid]
-        logging.info(f"🧹 Cleaned up expired session: {call_sid}")
-    
-    return len(expired_sessions)
+    """Remove sessions past their TTL (expiry-ordered, no full scan)"""
+    removed = call_sessions.cleanup()
+    if removed:
+        logging.info(f"🧹 Cleaned up {removed} expired call sessions")
+    return removed
 
 # Admin-configurable settings - initialize with fallback values first
 VOICE_ID = "FGY2WhTYpPnrIDTdsKH5"  # Default voice ID
@@ -431,29 +480,44 @@ def admin():
     return app.send_static_file('admin.html')
 @app.route('/add-knowledge', methods=['POST'])
 def add_knowledge():
-    """Add new knowledge to shared knowledge base"""
+    """Add new knowledge to the local knowledge index (and shared AI-Memory)"""
     try:
-        # Use new /v1/memories/shared POST endpoint
+        from app.knowledge import get_knowledge_index
+        
+        key = request.form.get('key')
+        content = request.form.get('value')
+        knowledge_type = request.form.get('type')
+        
+        # ✅ Local BM25 index - searchable by the agents immediately (hot reload)
+        added = get_knowledge_index().add_document(
+            title=key,
+            text=content,
+            doc_type=knowledge_type,
+            category=request.form.get('category', 'general'),
+            source="admin_web_interface"
+        )
+        
+        # Keep shared memories in AI-Memory for prompt retrieval
         data = {
-            "type": request.form.get('type'),
-            "key": request.form.get('key'),
+            "type": knowledge_type,
+            "key": key,
             "value": {
-                "summary": request.form.get('value'),
-                "key": request.form.get('key')
+                "summary": content,
+                "key": key
             },
             "ttl_days": 365,
             "source": "admin_web_interface"
         }
         
-        # Call AI-Memory service with new endpoint
-        ai_memory_url = get_setting("ai_memory_url", "http://host.docker.internal:8100")
-        resp = requests.post(f"{ai_memory_url}/v1/memories/shared", json=data, timeout=10)
+        try:
+            ai_memory_url = get_setting("ai_memory_url", "http://host.docker.internal:8100")
+            resp = requests.post(f"{ai_memory_url}/v1/memories/shared", json=data, timeout=10)
+            if resp.status_code != 200:
+                logging.warning(f"⚠️ AI-Memory shared knowledge write failed: {resp.status_code} {resp.text}")
+        except Exception as e:
+            logging.warning(f"⚠️ AI-Memory shared knowledge write failed: {e}")
         
-        if resp.status_code == 200:
-            result = resp.json()
-            flash(f"✅ Knowledge added: {data['key']} (ID: {result.get('id', 'unknown')})")
-        else:
-            flash(f"❌ Failed to add knowledge: {resp.text}")
+        flash(f"✅ Knowledge added: {key} ({added['chunks']} chunks indexed)")
             
     except Exception as e:
         flash(f"❌ Error: {str(e)}")
@@ -462,8 +526,52 @@ def add_knowledge():
 
 @app.route('/search-knowledge')
 def search_knowledge():
-    """Redirect search to admin with query"""
-    return redirect(url_for('admin', query=request.args.get('query', '')))
+    """Knowledge search form target - renders the results as HTML"""
+    query = request.args.get('query', '')
+    knowledge_results = []
+    if query:
+        try:
+            from app.knowledge import get_knowledge_index
+            
+            for chunk in get_knowledge_index().search(query, k=request.args.get('k', 10, type=int),
+                                                      category=request.args.get('category')):
+                knowledge_results.append({
+                    "type": chunk.get("type"),
+                    "key": chunk.get("title"),
+                    "value": chunk.get("text"),
+                    "score": chunk.get("score")
+                })
+            if not knowledge_results:
+                flash(f"No knowledge found for '{query}'")
+        except Exception as e:
+            logging.error(f"❌ Knowledge search failed: {e}")
+            flash(f"❌ Error: {str(e)}")
+    
+    return render_template_string(ADMIN_TEMPLATE, knowledge_results=knowledge_results)
+
+@app.route('/api/knowledge/search', methods=['GET'])
+def api_search_knowledge():
+    """Search the local knowledge index (JSON, with timings)"""
+    query = request.args.get('query', '')
+    if not query:
+        return jsonify({"success": False, "error": "Missing query"}), 400
+    
+    try:
+        import time
+        from app.knowledge import get_knowledge_index
+        
+        started = time.perf_counter()
+        results = get_knowledge_index().search(
+            query,
+            k=request.args.get('k', 5, type=int),
+            category=request.args.get('category')
+        )
+        took_ms = (time.perf_counter() - started) * 1000
+        
+        return jsonify({"success": True, "query": query, "results": results, "count": len(results), "took_ms": round(took_ms, 2)})
+    except Exception as e:
+        logging.error(f"❌ Knowledge search failed: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
 
 @app.route('/user-memories')
 def user_memories():
@@ -484,87 +592,157 @@ def twilio_websocket_info():
 
 # ============ PHONE AI ENDPOINTS ============
 
+TTS_MODEL_ID = "eleven_flash_v2_5"  # Faster model for streaming
+
+def _tts_voice_settings():
+    """Current ElevenLabs voice settings (part of the TTS cache key)."""
+    return {
+        "stability": VOICE_SETTINGS.get("stability", 0.71),
+        "similarity_boost": VOICE_SETTINGS.get("similarity_boost", 0.5),
+        "style": VOICE_SETTINGS.get("style", 0.0),
+        "use_speaker_boost": True
+    }
+
 def text_to_speech(text, voice_id=None):
-    """Convert text to speech using ElevenLabs"""
+    """Convert text to speech using ElevenLabs (served from the content-addressed TTS cache)"""
     try:
-        from elevenlabs import VoiceSettings
-        import os
-        import time
+        from app.tts_cache import get_tts_cache, tts_cache_key, iter_audio_bytes
         
-        client = _get_elevenlabs_client()
-        if not client:
-            logging.info("ElevenLabs client not available - using Twilio voice fallback")
-            return None
-            
         # Use provided voice_id or fall back to current_voice_id
         voice_to_use = voice_id or current_voice_id
+        settings = _tts_voice_settings()
         
-        # Generate audio with ElevenLabs streaming API for faster response
-        audio_stream = client.text_to_speech.stream(
-            voice_id=voice_to_use,
-            text=text,
-            model_id="eleven_flash_v2_5",  # Faster model for streaming
-            voice_settings=VoiceSettings(
-                stability=VOICE_SETTINGS.get("stability", 0.71),
-                similarity_boost=VOICE_SETTINGS.get("similarity_boost", 0.5),
-                style=VOICE_SETTINGS.get("style", 0.0),
-                use_speaker_boost=True
-            )
-        )
-        
-        # Create timestamp for unique filename
-        timestamp = str(int(time.time()))
-        filename = f"response_{timestamp}.mp3"
-        
-        # Ensure static/audio directory exists
-        static_folder = app.static_folder or 'static'
-        audio_dir = os.path.join(static_folder, 'audio')
-        os.makedirs(audio_dir, exist_ok=True)
+        cache = get_tts_cache()
+        key = tts_cache_key(text, voice_to_use, TTS_MODEL_ID, settings)
+        audio_path = cache.lookup(key)
         
-        # Save streaming audio file - process chunks as they arrive
-        audio_path = os.path.join(audio_dir, filename)
-        try:
-            with open(audio_path, 'wb') as f:
-                bytes_written = 0
-                for chunk in audio_stream:
-                    if isinstance(chunk, (bytes, bytearray, memoryview)):
-                        f.write(chunk)
-                        bytes_written += len(chunk)
-                    elif hasattr(chunk, 'encode'):
-                        encoded = chunk.encode()
-                        f.write(encoded)
-                        bytes_written += len(encoded)
-                    else:
-                        data = bytes(chunk)
-                        f.write(data)
-                        bytes_written += len(data)
-                
-                # Ensure all streaming data is written to disk
-                f.flush()
-                os.fsync(f.fileno())
-                logging.info(f"Streaming TTS: wrote {bytes_written} bytes to {filename}")
+        if audio_path:
+            logging.info(f"🔊 TTS cache hit: {key[:12]} ({len(text)} chars)")
+        else:
+            tts_span = tracing.begin_span("tts.synthesize", kind="client", attributes={"tts.chars": len(text)})
+            from elevenlabs import VoiceSettings
             
-            # Verify file exists and has content before returning URL
-            if os.path.exists(audio_path) and os.path.getsize(audio_path) > 0:
-                # ✅ Fix: Use configured server_url for public URLs instead of Flask auto-detection
-                config = _get_config()
-                server_url = config["server_url"]
-                audio_url = f"{server_url}/static/audio/{filename}"
-                logging.info(f"🔧 DEBUG: server_url from config: {server_url}")
-                logging.info(f"ElevenLabs TTS generated: {audio_url} ({os.path.getsize(audio_path)} bytes)")
-                return audio_url
-            else:
-                logging.error(f"Audio file not properly saved: {audio_path}")
+            client = _get_elevenlabs_client()
+            if not client:
+                logging.info("ElevenLabs client not available - using Twilio voice fallback")
                 return None
-                
-        except Exception as write_error:
-            logging.error(f"Failed to write audio file {audio_path}: {write_error}")
-            return None
+            
+            # Generate audio with ElevenLabs streaming API for faster response
+            audio_stream = client.text_to_speech.stream(
+                voice_id=voice_to_use,
+                text=text,
+                model_id=TTS_MODEL_ID,
+                voice_settings=VoiceSettings(**settings)
+            )
+            
+            # Chunks are written as they arrive, then atomically renamed into the cache
+            audio_path = cache.store(key, _trace_first_chunk(iter_audio_bytes(audio_stream), tts_span))
+            tts_span.end()
+            if not audio_path:
+                logging.error(f"ElevenLabs returned no audio for: {text[:50]}")
+                return None
+            logging.info(f"Streaming TTS: cached {os.path.getsize(audio_path)} bytes as {key[:12]}")
+        
+        # ✅ Fix: Use configured server_url for public URLs instead of Flask auto-detection
+        server_url = _get_config()["server_url"]
+        audio_url = f"{server_url}/static/audio/tts/{cache.filename_for(key)}"
+        logging.info(f"ElevenLabs TTS ready: {audio_url}")
+        return audio_url
         
     except Exception as e:
         logging.error(f"ElevenLabs TTS failed: {e}")
         return None
 
+def _trace_first_chunk(chunks, span):
+    """Pass audio chunks through, recording time-to-first-byte on the span"""
+    import time
+    for chunk in chunks:
+        if "tts.ttfb_ms" not in span.attributes:
+            span.set_attribute("tts.ttfb_ms", round((time.time_ns() - span.start_ns) / 1e6, 3))
+        yield chunk
+
+def _tts_stream_serializer():
+    """Signs /phone/tts/<token> payloads (text + voice) so the URL can't be used to synthesize arbitrary text."""
+    from itsdangerous import URLSafeTimedSerializer
+    return URLSafeTimedSerializer(app.secret_key, salt="tts-stream")
+
+def tts_play_url(text, voice_id=None):
+    """
+    URL for a TwiML <Play> of this text, without waiting for synthesis.
+    
+    Cached phrases get their static file URL (served by nginx). Otherwise a
+    signed, short-lived /phone/tts/<token>.mp3 URL is returned; fetching it
+    proxies ElevenLabs chunks to Twilio as they arrive and tees them into
+    the cache, so time-to-first-audio is the first chunk, not the full file.
+    
+    Returns:
+        Audio URL, or None if ElevenLabs isn't configured (caller falls back to <Say>)
+    """
+    from app.tts_cache import get_tts_cache, tts_cache_key
+    
+    voice_to_use = voice_id or current_voice_id
+    settings = _tts_voice_settings()
+    cache = get_tts_cache()
+    key = tts_cache_key(text, voice_to_use, TTS_MODEL_ID, settings)
+    server_url = _get_config()["server_url"]
+    
+    if cache.lookup(key):
+        logging.info(f"🔊 TTS cache hit: {key[:12]} ({len(text)} chars)")
+        return f"{server_url}/static/audio/tts/{cache.filename_for(key)}"
+    
+    if not _get_config()["elevenlabs_api_key"]:
+        logging.info("ElevenLabs not configured - using Twilio voice fallback")
+        return None
+    
+    payload = {"t": text, "v": voice_to_use, "s": settings}
+    span = tracing.current_span()
+    if span:
+        payload["p"] = span.traceparent()  # Twilio's audio fetch joins the call's trace
+    token = _tts_stream_serializer().dumps(payload)
+    return f"{server_url}/phone/tts/{token}.mp3"
+
+def prewarm_tts_cache(phrases=None, voice_id=None):
+    """
+    Synthesize static phrases into the TTS cache ahead of calls.
+    
+    Args:
+        phrases: Phrases to render (default: configured static phrases plus
+            each tenant's greeting template without placeholders)
+        voice_id: Voice to render with (default: the Gather flow voice)
+    
+    Returns:
+        Dict with counts of phrases already cached / newly synthesized / failed
+    """
+    from app.tts_cache import get_tts_cache, tts_cache_key, default_prewarm_phrases
+    
+    if phrases is None:
+        phrases = default_prewarm_phrases()
+        try:
+            from customer_db import get_routing_table
+            for route in get_routing_table().routes():
+                greeting = route.get("greeting_template")
+                if greeting and "{" not in greeting:
+                    phrases.append(greeting)
+        except Exception as e:
+            logging.warning(f"⚠️ Could not load tenant greetings for TTS pre-warm: {e}")
+    
+    cache = get_tts_cache()
+    voice_to_use = voice_id or VOICE_ID
+    result = {"cached": 0, "synthesized": 0, "failed": 0}
+    for phrase in dict.fromkeys(phrases):
+        key = tts_cache_key(phrase, voice_to_use, TTS_MODEL_ID, _tts_voice_settings())
+        if os.path.exists(cache.path_for(key)):
+            result["cached"] += 1
+        elif text_to_speech(phrase, voice_to_use):
+            result["synthesized"] += 1
+        else:
+            result["failed"] += 1
+    logging.info(f"🔥 TTS cache pre-warm: {result}")
+    return result
+
+if get_setting("tts_prewarm_on_startup", True):
+    threading.Thread(target=prewarm_tts_cache, daemon=True).start()
+
 def get_personalized_greeting(user_id):
     """Return personalized greeting from AI-Memory service with user registration"""
     from datetime import datetime
@@ -580,12 +758,14 @@ def get_personalized_greeting(user_id):
 
     try:
         from app.http_memory import HTTPMemoryStore
+        from app.known_callers import get_known_callers
         mem_store = HTTPMemoryStore()
+        known_callers = get_known_callers()
         
-        # ✅ Step 1: Check if user exists by searching for any memories
-        user_memories = mem_store.search("", user_id=normalized_user_id, k=5)
-        user_exists = len(user_memories) > 0
-        logging.info(f"👤 User exists check: {user_exists} ({len(user_memories)} memories found)")
+        # ✅ Step 1: Check if user exists (known-callers index, no memory search)
+        caller = known_callers.lookup(normalized_user_id, mem_store)
+        user_exists = caller["known"]
+        logging.info(f"👤 User exists check: {user_exists} (name: {caller['name']})")
         
         # ✅ Step 2: If user doesn't exist, register them
         if not user_exists:
@@ -602,24 +782,12 @@ def get_personalized_greeting(user_id):
                 scope="user",
                 source="auto_registration"
             )
+            known_callers.mark_known(normalized_user_id)
         
         # ✅ Step 3: Get appropriate greeting template from ai-memory
         if user_exists:
-            # ✅ Search for user's name in multiple memory formats
-            user_name = None
-            
-            # Strategy 1: Look for memories with "name" field (relationship != wife/husband/friend)
-            for memory in user_memories:
-                value = memory.get("value", {})
-                if isinstance(value, dict):
-                    # Check for direct name field (not a relationship)
-                    if "name" in value and value.get("relationship") not in ["friend", "wife", "husband", "son", "daughter"]:
-                        user_name = value["name"]
-                        break
-                    # Check for first_name field
-                    if "first_name" in value:
-                        user_name = value["first_name"]
-                        break
+            # ✅ Strategy 1: Name already known to the index (profile preferred_name / learned this process)
+            user_name = caller["name"]
             
             # Strategy 2: Search ai-memory specifically for user's own name
             if not user_name:
@@ -640,6 +808,8 @@ def get_personalized_greeting(user_id):
                             if "caller_name" in val:
                                 user_name = val["caller_name"]
                                 break
+                    if user_name:
+                        known_callers.mark_known(normalized_user_id, user_name)
                 except Exception as e:
                     logging.warning(f"Failed to search for user name: {e}")
             
@@ -695,7 +865,7 @@ def get_ai_response(user_id, message, call_sid=None):
     """Get AI response from NeuroSphere backend with conversation context"""
     try:
         # Get call session info
-        session = call_sessions.get(call_sid, {})
+        session = call_sessions.get(call_sid) or {}
         is_callback = session.get('is_callback', False)
         first_message_handled = session.get('first_message_handled', False)
         
@@ -735,6 +905,7 @@ def get_ai_response(user_id, message, call_sid=None):
                 f"{orchestrator_url}/v1/chat",
                 json=payload,
                 params={"user_id": user_id, "thread_id": persistent_thread_id},  # ✅ Stable thread_id for continuity
+                headers=tracing.inject(),
                 timeout=15
             )
             
@@ -757,6 +928,235 @@ def get_ai_response(user_id, message, call_sid=None):
         agent_name = get_admin_setting("agent_name", "Amanda")
         return f"Hello! I'm {agent_name}. How can I help?"
 
+def _extract_speech_memories(speech_result, user_id, call_sid):
+    """
+    Memory items worth keeping from one caller utterance (keyword heuristics).
+    
+    Returns:
+        List of dicts for the background memory writer (type, key, value, user_id, ttl_days)
+    """
+    import re
+    import time
+    from app.packer import should_remember, extract_carry_kit_items
+    
+    items = []
+    
+    def add(memory_type, key, value, ttl_days=365):
+        items.append({"type": memory_type, "key": key, "value": value, "user_id": user_id, "ttl_days": ttl_days})
+    
+    # ✅ ALWAYS store basic speech information - this ensures callers are remembered
+    # Store every utterance as a "moment"
+    add("moment", f"utterance_{call_sid}_{int(time.time())}", {
+        "summary": speech_result,
+        "timestamp": int(time.time()),
+        "call_sid": call_sid
+    })
+    
+    # Check if this message contains additional information worth extracting
+    if should_remember(speech_result):
+        for item in extract_carry_kit_items(speech_result):
+            add(item["type"], item["key"], item["value"], item.get("ttl_days", 365))
+    
+    # Also look for specific information that should be learned
+    message_lower = speech_result.lower()
+    
+    # Store shopping/task information
+    if any(phrase in message_lower for phrase in ["need to get", "going to", "have to get", "need from"]):
+        if any(place in message_lower for place in ["costco", "store", "shopping", "market"]):
+            add("task", f"shopping_task_{hash(speech_result) % 1000}", {
+                "summary": f"John needs to: {speech_result}",
+                "context": "shopping/errands",
+                "task_type": "shopping"
+            })
+    
+    # Food preferences (like pizza)
+    if any(phrase in message_lower for phrase in ["i like", "my favorite", "love", "prefer"]):
+        if any(food in message_lower for food in ["pizza", "mushroom", "pepperoni", "cheese", "sausage"]):
+            add("preference", f"food_preference_{hash(speech_result) % 1000}", {
+                "summary": f"John likes {speech_result.replace('I like', '').replace('my favorite', '').strip()}",
+                "category": "food",
+                "preference_type": "food_preference"
+            })
+    
+    # Store any mention of plans or activities
+    if any(phrase in message_lower for phrase in ["going to", "planning to", "need to", "have to"]):
+        add("task", f"activity_plan_{hash(speech_result) % 1000}", {
+            "summary": speech_result[:200],
+            "context": "plans and activities",
+            "task_type": "general"
+        })
+    
+    # Birthday information
+    if ("birthday" in message_lower or "born" in message_lower):
+        if "jack" in message_lower or "colin" in message_lower:
+            name = "Jack" if "jack" in message_lower else "Colin"
+            add("fact", f"{name.lower()}_birthday_inquiry", {
+                "summary": f"User asked about {name}'s birthday",
+                "context": speech_result,
+                "name": name,
+                "relationship": "son"
+            })
+    
+    # Look for new family information  
+    if any(phrase in message_lower for phrase in ["my son", "my daughter", "my child", "brother-in-law", "my brother"]):
+        add("person", f"family_info_{hash(speech_result) % 1000}", {
+            "summary": speech_result[:200],
+            "context": "family information shared during call",
+            "relationship": "family"
+        })
+    
+    # ✅ Extract and store caller's name when they introduce themselves
+    if any(phrase in message_lower for phrase in ["my name is", "i'm", "this is", "call me"]):
+        # Pattern: "my name is John" or "This is John"
+        extracted_name = None
+        match = re.search(r"(?:my name(?:'s| is)|i'm|this is|call me)\s+([A-Z][a-z]+)", speech_result, re.IGNORECASE)
+        if match:
+            extracted_name = match.group(1).capitalize()
+        add("person", f"caller_info_{user_id}", {
+            "caller_name": extracted_name if extracted_name else "unknown",
+            "name": extracted_name if extracted_name else "unknown",
+            "summary": speech_result[:200],
+            "context": "caller introduced themselves",
+            "info_type": "caller_identity"
+        })
+    
+    # Look for other names being shared (wife, kids, friends)
+    elif any(phrase in message_lower for phrase in ["name is", "called", "his name", "her name"]):
+        add("person", f"name_info_{hash(speech_result) % 1000}", {
+            "summary": speech_result[:200],
+            "context": "name shared during call",
+            "info_type": "name_reference"
+        })
+    
+    # Look for books/reading interests
+    if any(phrase in message_lower for phrase in ["book", "read", "reading", "novel", "author"]):
+        add("preference", f"reading_interest_{hash(speech_result) % 1000}", {
+            "summary": speech_result[:200],
+            "context": "books and reading interests",
+            "preference_type": "reading"
+        })
+    
+    return items
+
+_tts_presynth_executor = None
+
+def _presynthesize(text, voice_id):
+    """Render a later sentence of the reply into the TTS cache while earlier ones play."""
+    global _tts_presynth_executor
+    if not _get_config()["elevenlabs_api_key"]:
+        return
+    if _tts_presynth_executor is None:
+        from concurrent.futures import ThreadPoolExecutor
+        _tts_presynth_executor = ThreadPoolExecutor(max_workers=int(get_setting("tts_presynth_workers", 4)), thread_name_prefix="tts-presynth")
+    _tts_presynth_executor.submit(contextvars.copy_context().run, text_to_speech, text, voice_id)
+
+def stream_ai_response(turn, user_id, message, call_sid=None):
+    """
+    Stream the assistant reply from the orchestrator into a SpeechTurn.
+    
+    Runs in a background thread: sentences are published to the turn as soon
+    as they are complete, and every sentence after the first is synthesized
+    right away so it is cached by the time Twilio asks for it. Falls back to
+    the blocking /v1/chat call if streaming fails before any text arrived.
+    """
+    import time
+    produced = False
+    next_presynth = 1  # the first sentence is streamed straight to Twilio
+    try:
+        persistent_thread_id = f"user_{user_id}"
+        response = requests.post(
+            f"{_get_orchestrator_url()}/v1/chat/stream",
+            json={"messages": [{"role": "user", "content": message}], "temperature": 0.7, "max_tokens": 50},
+            params={"user_id": user_id, "thread_id": persistent_thread_id},
+            headers=tracing.inject(),
+            timeout=15,
+            stream=True
+        )
+        response.raise_for_status()
+        response.encoding = 'utf-8'
+        for delta in response.iter_content(chunk_size=None, decode_unicode=True):
+            if not delta:
+                continue
+            if not produced:
+                turn.mark("llm_first_token")
+                produced = True
+            turn.add_text(delta)
+            while next_presynth < len(turn.sentences):
+                _presynthesize(turn.sentences[next_presynth], VOICE_ID)
+                next_presynth += 1
+        turn.finish()
+    except Exception as e:
+        logging.error(f"Streaming AI response failed: {e}")
+        if not produced:
+            # Nothing said yet - the blocking call still gives the caller an answer
+            turn.finish(fallback_text=get_ai_response(user_id, message, call_sid))
+        else:
+            turn.finish()
+    for sentence in turn.sentences[next_presynth:]:
+        _presynthesize(sentence, VOICE_ID)
+    
+    ai_response = turn.text
+    logging.info(f"🤖 AI Response: {ai_response}")
+    
+    # Store conversation history
+    def append_turn(session_data):
+        conversation = session_data.setdefault('conversation', [])
+        conversation.extend([
+            {"role": "user", "content": message},
+            {"role": "assistant", "content": ai_response}
+        ])
+        # Keep only last 10 exchanges (20 messages)
+        del conversation[:-20]
+    if call_sid:
+        call_sessions.update(call_sid, append_turn)
+    
+    logging.info(f"⏱️ Speech turn breakdown ({len(turn.sentences)} sentences): {turn.breakdown()}")
+    for stage, at in turn.marks.items():
+        if stage != "start":
+            tracing.record_span(f"speech.{stage}", turn.marks["start"], at, attributes={"call_sid": call_sid})
+
+def _speech_gather():
+    """Gather for the caller's next utterance"""
+    # ✅ Fix: Use absolute HTTPS URL with configured server_url
+    server_url = _get_config()["server_url"].replace("/phone/incoming", "")
+    return Gather(
+        input='speech',
+        timeout=8,  # Reduced timeout  
+        speech_timeout=3,  # Reliable speech detection
+        action=f"{server_url}/phone/process-speech",  # Absolute HTTPS URL
+        actionOnEmptyResult=True,  # Call action even if no speech detected
+        method='POST'
+    )
+
+def _speech_turn_twiml(turn, from_index, timeout):
+    """
+    TwiML for the next part of a streamed reply.
+    
+    Plays every sentence ready past from_index. If the LLM is still writing,
+    ends with a <Redirect> to /phone/continue-turn so the rest is fetched
+    while this audio plays; otherwise ends with the Gather for the next
+    utterance.
+    """
+    from app.speech_pipeline import end_turn
+    
+    sentences, done = turn.wait_for_more(from_index, timeout)
+    response = VoiceResponse()
+    for sentence in sentences:
+        audio_url = tts_play_url(sentence, VOICE_ID)
+        if audio_url:
+            response.play(audio_url)
+        else:
+            # Fallback to Twilio voice if ElevenLabs isn't available
+            response.say(sentence, voice='alice')
+    
+    if done:
+        end_turn(turn.turn_id, call_sid=turn.call_sid, store=call_sessions)
+        response.append(_speech_gather())
+    else:
+        server_url = _get_config()["server_url"].replace("/phone/incoming", "")
+        response.redirect(f"{server_url}/phone/continue-turn/{turn.turn_id}?i={from_index + len(sentences)}", method='POST')
+    return str(response)
+
 @app.route('/phone/incoming', methods=['POST'])
 def handle_incoming_call():
     """Handle incoming phone calls from Twilio - Improved streaming version"""
@@ -779,15 +1179,11 @@ def handle_incoming_call():
     
     is_callback = False
     try:
-        from app.http_memory import HTTPMemoryStore
-        mem_store = HTTPMemoryStore()
-        # Search with both raw and normalized IDs to handle inconsistent storage
-        user_memories = mem_store.search("", user_id=normalized_user_id, k=3)
-        if not user_memories:
-            # Try with raw from_number in case memories stored with different format
-            user_memories = mem_store.search("", user_id=from_number, k=3)
-        is_callback = len(user_memories) > 0
-        logging.info(f"🔄 Callback detection: user {normalized_user_id} has {len(user_memories)} memories, is_callback={is_callback}")
+        from app.known_callers import get_known_callers
+        known_callers = get_known_callers()
+        # Check both normalized and raw IDs to handle inconsistent storage
+        is_callback = known_callers.lookup(normalized_user_id)["known"] or known_callers.lookup(from_number)["known"]
+        logging.info(f"🔄 Callback detection: user {normalized_user_id}, is_callback={is_callback}")
         logging.info(f"⏱️ Stage: Callback detection | Elapsed: {time.time() - t0:.3f}s")
     except Exception as e:
         logging.warning(f"Failed to check callback status: {e}")
@@ -797,19 +1193,20 @@ def handle_incoming_call():
     logging.info(f"⏱️ Stage: Greeting chosen | Elapsed: {time.time() - t0:.3f}s")
     
     # ✅ Store call session with greeting and callback flag
-    call_sessions[call_sid] = {
+    call_sessions.set(call_sid, {
         'user_id': from_number,
         'call_count': 1,
         'is_callback': is_callback,
         'first_message_handled': False,  # Track if we've injected fresh start prompt
         'conversation': [
             {"role": "assistant", "content": greeting}  # Include initial greeting!
-        ]
-    }
+        ],
+        'created_at': time.time()
+    })
     
     # Use improved ElevenLabs streaming for faster response
     tts_start = time.time()
-    audio_url = text_to_speech(greeting, VOICE_ID)
+    audio_url = tts_play_url(greeting, VOICE_ID)
     logging.info(f"⏱️ Stage: TTS generation | Elapsed: {time.time() - t0:.3f}s | TTS duration: {time.time() - tts_start:.3f}s")
     
     if audio_url:
@@ -884,22 +1281,42 @@ def get_customer_context(call_sid):
             logging.error(f"❌ SECURITY: Unauthorized access attempt to internal API - invalid secret")
             return jsonify({"error": "Forbidden"}), 403
         
-        session_data = call_sessions.get(call_sid)
+        import time
+        
+        # Mark session as retrieved (for one-time use tracking)
+        def mark_retrieved(session_data):
+            if 'retrieved' not in session_data:
+                session_data['retrieved'] = True
+                session_data['retrieved_at'] = time.time()
+        
+        session_data = call_sessions.update(call_sid, mark_retrieved)
         if not session_data:
             logging.warning(f"⚠️ No customer session found for call_sid={call_sid}")
             return jsonify({"error": "Session not found"}), 404
         
-        # Mark session as retrieved (for one-time use tracking)
-        if 'retrieved' not in session_data:
-            session_data['retrieved'] = True
-            session_data['retrieved_at'] = time.time()
-        
         logging.info(f"🔐 Retrieved customer session for call_sid={call_sid}, customer_id={session_data.get('customer_id')}")
         return jsonify(session_data)
     except Exception as e:
         logging.error(f"❌ Error retrieving customer context: {e}")
         return jsonify({"error": str(e)}), 500
 
+def _speculative_greeting(call_sid, is_callback, caller_name, customer):
+    """Compose and pre-synthesize the Realtime greeting for a call (background thread)."""
+    from app.speculative_greeting import compose_greeting, prepare_speculative_greeting
+    
+    customer = customer or {}
+    text = compose_greeting(
+        is_callback,
+        caller_name,
+        customer.get('agent_name') or get_admin_setting("agent_name", "AI Assistant"),
+        get_admin_setting("existing_user_greeting", "Hi, this is {agent_name}. Is this {user_name}?"),
+        get_admin_setting("new_caller_greeting", "{time_greeting}! This is {agent_name}. How can I help you?"),
+        template_override=customer.get('greeting_template')
+    )
+    voice = customer.get('openai_voice') or get_admin_setting("openai_voice", "alloy")
+    if prepare_speculative_greeting(call_sid, text, voice):
+        logging.info(f"⚡ Speculative greeting ready for {call_sid}: '{text}'")
+
 @app.route('/phone/incoming-realtime', methods=['POST'])
 def handle_incoming_call_realtime():
     """Handle incoming phone calls using OpenAI Realtime API with Twilio Media Streams - Multi-Tenant Version"""
@@ -936,39 +1353,17 @@ def handle_incoming_call_realtime():
     logging.info(f"📞 Incoming call from {from_number} to {to_number} - Using OpenAI Realtime API")
     logging.info(f"⏱️ Stage: Call received | Elapsed: {time.time() - t0:.3f}s")
     
-    # MULTI-TENANT: Look up customer by Twilio phone number
+    # MULTI-TENANT: Look up customer by Twilio phone number (in-memory routing table)
     customer = None
     customer_id = None
     try:
-        from sqlalchemy import create_engine
-        from sqlalchemy.orm import sessionmaker
-        from customer_models import Customer
-        
-        engine = create_engine(_get_config()["database_url"])
-        Session = sessionmaker(bind=engine)
-        db_session = Session()
+        from customer_db import get_routing_table
         
-        # Normalize to_number for matching (remove +1, spaces, etc)
-        normalized_to = ''.join(filter(str.isdigit, to_number)) if to_number else ''
-        
-        # Try exact match first
-        customer = db_session.query(Customer).filter_by(twilio_phone_number=to_number).first()
-        
-        # Try normalized match
-        if not customer and normalized_to:
-            customers = db_session.query(Customer).all()
-            for c in customers:
-                if c.twilio_phone_number:
-                    cust_normalized = ''.join(filter(str.isdigit, c.twilio_phone_number))
-                    if cust_normalized == normalized_to or cust_normalized.endswith(normalized_to[-10:]):
-                        customer = c
-                        break
-        
-        db_session.close()
+        customer = get_routing_table().lookup(to_number)
         
         if customer:
-            customer_id = customer.id
-            logging.info(f"✅ Found customer {customer_id}: {customer.business_name}")
+            customer_id = customer["customer_id"]
+            logging.info(f"✅ Found customer {customer_id}: {customer['business_name']}")
         else:
             logging.warning(f"⚠️ No customer found for phone number {to_number} - using default config")
     except Exception as e:
@@ -983,22 +1378,31 @@ def handle_incoming_call_realtime():
     
     # Check callback status with customer namespacing
     is_callback = False
+    caller_name = None
     try:
-        from app.http_memory import HTTPMemoryStore
-        mem_store = HTTPMemoryStore()
+        from app.known_callers import get_known_callers, caller_key
+        known_callers = get_known_callers()
         
-        # Use customer-namespaced user_id for memory lookup
-        namespaced_user_id = f"customer_{customer_id}_{normalized_user_id}" if customer_id else normalized_user_id
+        # Use customer-namespaced user_id for the lookup
+        namespaced_user_id = caller_key(from_number, customer_id)
         
-        user_memories = mem_store.search("", user_id=namespaced_user_id, k=3)
-        if not user_memories:
+        caller = known_callers.lookup(namespaced_user_id)
+        if not caller["known"] and customer_id:
             # Try without namespace for backwards compatibility
-            user_memories = mem_store.search("", user_id=normalized_user_id, k=3)
-        is_callback = len(user_memories) > 0
+            caller = known_callers.lookup(normalized_user_id)
+        is_callback, caller_name = caller["known"], caller["name"]
         logging.info(f"🔄 Callback detection: user {namespaced_user_id}, is_callback={is_callback}")
     except Exception as e:
         logging.warning(f"Failed to check callback status: {e}")
     
+    # Render the greeting while Twilio opens the media stream
+    if call_sid and get_setting("speculative_greeting_enabled", True):
+        threading.Thread(
+            target=_speculative_greeting,
+            args=(call_sid, is_callback, caller_name, customer),
+            daemon=True
+        ).start()
+    
     # Create TwiML response with Media Streams
     response = VoiceResponse()
     
@@ -1013,31 +1417,37 @@ def handle_incoming_call_realtime():
     ws_url = server_url.replace("https://", "wss://").replace("http://", "ws://")
     ws_url = f"{ws_url}/phone/media-stream"
     
-    # SECURITY: Store customer context in session for WebSocket to retrieve
-    # Do NOT pass customer_id directly (can be spoofed) - use call_sid as secure session key
+    # SECURITY: Do NOT pass customer_id directly (can be spoofed). The context is
+    # stored under call_sid; only call_sid + customer_id travel as a signed token
+    customer_context = None
     if customer_id:
-        call_sessions[call_sid] = {
+        customer_context = {
             'customer_id': customer_id,
-            'agent_name': customer.agent_name or 'AI Assistant',
-            'greeting_template': customer.greeting_template or 'Hello! How can I help you today?',
-            'openai_voice': customer.openai_voice or 'alloy',
-            'personality_sliders': customer.personality_sliders,
-            'business_name': customer.business_name,
+            'agent_name': customer['agent_name'],
+            'greeting_template': customer['greeting_template'],
+            'openai_voice': customer['openai_voice'],
+            'personality_sliders': customer['personality_sliders'],
+            'business_name': customer['business_name'],
             'to_number': to_number,
             'from_number': from_number,
+            'call_sid': call_sid,
             'created_at': time.time()
         }
+        call_sessions.set(call_sid, customer_context)
         logging.info(f"🔐 Stored customer session for call_sid={call_sid}, customer_id={customer_id}")
     
     # Cleanup old sessions periodically
-    if len(call_sessions) > 100:
-        cleanup_old_sessions()
+    cleanup_old_sessions()
     
-    # Pass minimal parameters - WebSocket will lookup customer server-side using call_sid
+    # WebSocket trusts the customer_id from the signed ctx parameter and loads the rest from call_sessions
     stream_elem = Stream(url=ws_url)
     stream_elem.parameter(name='user_id', value=normalized_user_id)
     stream_elem.parameter(name='call_sid', value=call_sid)  # Used for secure customer lookup
     stream_elem.parameter(name='is_callback', value=str(is_callback))
+    if customer_context:
+        context_token = sign_call_context(call_sid, customer_id)
+        if context_token:
+            stream_elem.parameter(name='ctx', value=context_token)
     
     connect.append(stream_elem)
     response.append(connect)
@@ -1053,10 +1463,33 @@ def handle_incoming_call_realtime():
     logging.info(f"🔗 WebSocket URL: {ws_url}")
     logging.info(f"🎙️ Call recording enabled - callback: {server_url}/recording-complete")
     if customer_id:
-        logging.info(f"👤 Customer Context: ID={customer_id}, Agent={customer.agent_name}, Voice={customer.openai_voice}")
+        logging.info(f"👤 Customer Context: ID={customer_id}, Agent={customer['agent_name']}, Voice={customer['openai_voice']}")
     
     return str(response), 200, {'Content-Type': 'text/xml'}
 
+def _get_recording_queue():
+    """Recording download queue, saving into CALLS_DIR with the Twilio credentials"""
+    from app.recording_queue import get_recording_queue
+    
+    config = _get_config()
+    queue = get_recording_queue(CALLS_DIR, (config["twilio_account_sid"], config["twilio_auth_token"]))
+    queue.start()
+    return queue
+
+def _start_recording_queue():
+    """Resume downloads left queued or half-finished by the previous process"""
+    try:
+        _get_recording_queue()
+    except Exception as e:
+        logging.warning(f"⚠️ Recording download queue failed to start: {e}")
+
+threading.Thread(target=_start_recording_queue, daemon=True).start()
+
+@app.route('/api/recordings/queue', methods=['GET'])
+def recording_queue_stats():
+    """Recording download queue depth and throughput"""
+    return jsonify(_get_recording_queue().stats())
+
 @app.route('/recording-complete', methods=['POST'])
 def recording_complete():
     """Handle recording completion callback from Twilio"""
@@ -1104,36 +1537,11 @@ def recording_complete():
         
         logging.info(f"🎙️ Recording completed for call {call_sid}: {recording_url}")
         
-        # Download recording from Twilio with size limit
-        auth = (config["twilio_account_sid"], config["twilio_auth_token"])
-        
-        # Get MP3 format recording
-        mp3_url = f"{recording_url}.mp3"
-        response = requests.get(mp3_url, auth=auth, stream=True, timeout=30)
-        
-        if response.status_code == 200:
-            # SECURITY: Limit file size to 100MB
-            max_size = 100 * 1024 * 1024  # 100MB
-            
-            # Save to static/calls directory with temp file and atomic rename
-            temp_path = os.path.join(CALLS_DIR, f"{call_sid}.mp3.tmp")
-            final_path = os.path.join(CALLS_DIR, f"{call_sid}.mp3")
-            
-            total_size = 0
-            with open(temp_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    total_size += len(chunk)
-                    if total_size > max_size:
-                        os.remove(temp_path)
-                        logging.error(f"❌ Recording too large (>{max_size} bytes)")
-                        return "Recording too large", 413
-                    f.write(chunk)
-            
-            # Atomic rename
-            os.rename(temp_path, final_path)
-            logging.info(f"✅ Recording saved: {final_path} ({total_size} bytes)")
+        # Download happens on the recording queue's workers - return to Twilio immediately
+        if _get_recording_queue().enqueue(call_sid, recording_sid, recording_url):
+            logging.info(f"📥 Recording {recording_sid} queued for download")
         else:
-            logging.error(f"❌ Failed to download recording: {response.status_code}")
+            logging.info(f"📥 Recording {recording_sid} already queued (Twilio retry)")
         
         return '', 200
     except Exception as e:
@@ -1160,13 +1568,8 @@ def process_speech():
         response = VoiceResponse()
         # Use ElevenLabs for error message too
         try:
-            error_audio = text_to_speech("Sorry, I didn't catch that. Could you repeat?")
-            if error_audio:
-                error_path = f"static/audio/error_{call_sid}.mp3"
-                with open(error_path, "wb") as f:
-                    for chunk in error_audio:
-                        f.write(chunk)
-                error_url = f"https://{request.host}/{error_path}"
+            error_url = tts_play_url("Sorry, I didn't catch that. Could you repeat?", VOICE_ID)
+            if error_url:
                 response.play(error_url)
             else:
                 response.say("I didn't catch that. Could you please repeat?")
@@ -1190,7 +1593,6 @@ def process_speech():
     
     logging.info(f"🎤 Speech from {from_number}: {speech_result}")
     
-    # Save new information to memory before generating response
     # ✅ Normalize user_id for consistent memory lookup
     user_id = from_number
     if user_id:
@@ -1200,246 +1602,60 @@ def process_speech():
             # Use last 10 digits (removes country code variations)  
             user_id = normalized_digits[-10:]
         logging.info(f"📞 Normalized user_id: {from_number} -> {user_id}")
+    
+    from app.speech_pipeline import start_turn
+    turn = start_turn(call_sid, store=call_sessions)
+    
+    # Memory extraction doesn't affect this reply - queue it and move on
     try:
-        from app.http_memory import HTTPMemoryStore
-        
-        # ✅ ALWAYS store basic speech information - this ensures callers are remembered
-        mem_store = HTTPMemoryStore()
-        
-        # Store every utterance as a "moment" - this is the key fix!
-        import time
-        memory_id = mem_store.write(
-            "moment",
-            f"utterance_{call_sid}_{int(time.time())}",
-            {
-                "summary": speech_result,
-                "timestamp": int(time.time()),
-                "call_sid": call_sid
-            },
-            user_id=user_id,
-            scope="user",
-            ttl_days=365
-        )
-        logging.info(f"🔍 ALWAYS storing speech for user_id={user_id}: {speech_result[:50]}...")
-        logging.info(f"💾 Stored utterance memory with ID: {memory_id}")
-        
-        # Check if this message contains additional information worth extracting
-        from app.packer import should_remember, extract_carry_kit_items
-        if should_remember(speech_result):
-            carry_kit_items = extract_carry_kit_items(speech_result)
-            
-            for item in carry_kit_items:
-                try:
-                    memory_id = mem_store.write(
-                        item["type"],
-                        item["key"], 
-                        item["value"],
-                        user_id=user_id,
-                        scope="user",
-                        ttl_days=item.get("ttl_days", 365)
-                    )
-                    logging.info(f"💾 Stored extracted memory: {item['type']}:{item['key']} -> {memory_id}")
-                except Exception as e:
-                    logging.error(f"Failed to store extracted memory item: {e}")
-        
-        # Also look for specific information that should be learned
-        message_lower = speech_result.lower()
-        mem_store = HTTPMemoryStore()
-        
-        # Store shopping/task information
-        if any(phrase in message_lower for phrase in ["need to get", "going to", "have to get", "need from"]):
-            if any(place in message_lower for place in ["costco", "store", "shopping", "market"]):
-                mem_store.write(
-                    "task",
-                    f"shopping_task_{hash(speech_result) % 1000}",
-                    {
-                        "summary": f"John needs to: {speech_result}",
-                        "context": "shopping/errands",
-                        "task_type": "shopping"
-                    },
-                    user_id=user_id,
-                    scope="user"
-                )
-                logging.info(f"💾 Stored shopping task: {speech_result}")
-        
-        # Food preferences (like pizza)
-        if any(phrase in message_lower for phrase in ["i like", "my favorite", "love", "prefer"]):
-            if any(food in message_lower for food in ["pizza", "mushroom", "pepperoni", "cheese", "sausage"]):
-                mem_store.write(
-                    "preference",
-                    f"food_preference_{hash(speech_result) % 1000}",
-                    {
-                        "summary": f"John likes {speech_result.replace('I like', '').replace('my favorite', '').strip()}",
-                        "category": "food",
-                        "preference_type": "food_preference"
-                    },
-                    user_id=user_id,
-                    scope="user"
-                )
-                logging.info(f"💾 Stored food preference: {speech_result}")
-        
-        # Store any mention of plans or activities
-        if any(phrase in message_lower for phrase in ["going to", "planning to", "need to", "have to"]):
-            mem_store.write(
-                "task",
-                f"activity_plan_{hash(speech_result) % 1000}",
-                {
-                    "summary": speech_result[:200],
-                    "context": "plans and activities",
-                    "task_type": "general"
-                },
-                user_id=user_id,
-                scope="user"
-            )
-            logging.info(f"💾 Stored activity plan: {speech_result}")
-        
-        # Birthday information
-        if ("birthday" in message_lower or "born" in message_lower):
-            if "jack" in message_lower or "colin" in message_lower:
-                name = "Jack" if "jack" in message_lower else "Colin"
-                mem_store.write(
-                    "fact",
-                    f"{name.lower()}_birthday_inquiry",
-                    {
-                        "summary": f"User asked about {name}'s birthday",
-                        "context": speech_result,
-                        "name": name,
-                        "relationship": "son"
-                    },
-                    user_id=user_id,
-                    scope="user"
-                )
-                logging.info(f"💾 Stored birthday inquiry for {name}")
-        
-        # Look for new family information  
-        if any(phrase in message_lower for phrase in ["my son", "my daughter", "my child", "brother-in-law", "my brother"]):
-            mem_store.write(
-                "person",
-                f"family_info_{hash(speech_result) % 1000}",
-                {
-                    "summary": speech_result[:200],
-                    "context": "family information shared during call",
-                    "relationship": "family"
-                },
-                user_id=user_id,
-                scope="user"
-            )
-            logging.info(f"💾 Stored family information: {speech_result}")
-            
-        # ✅ Extract and store caller's name when they introduce themselves
-        if any(phrase in message_lower for phrase in ["my name is", "i'm", "this is", "call me"]):
-            import re
-            # Try to extract the name from common patterns
-            extracted_name = None
-            
-            # Pattern: "my name is John" or "This is John"
-            match = re.search(r"(?:my name(?:'s| is)|i'm|this is|call me)\s+([A-Z][a-z]+)", speech_result, re.IGNORECASE)
-            if match:
-                extracted_name = match.group(1).capitalize()
-            
-            # Store with structured name field
-            mem_store.write(
-                "person",
-                f"caller_info_{user_id}",
-                {
-                    "caller_name": extracted_name if extracted_name else "unknown",
-                    "name": extracted_name if extracted_name else "unknown",
-                    "summary": speech_result[:200],
-                    "context": "caller introduced themselves",
-                    "info_type": "caller_identity"
-                },
-                user_id=user_id,
-                scope="user"
-            )
-            logging.info(f"💾 Stored caller name: {extracted_name} from '{speech_result}'")
-        
-        # Look for other names being shared (wife, kids, friends)
-        elif any(phrase in message_lower for phrase in ["name is", "called", "his name", "her name"]):
-            mem_store.write(
-                "person",
-                f"name_info_{hash(speech_result) % 1000}",
-                {
-                    "summary": speech_result[:200],
-                    "context": "name shared during call",
-                    "info_type": "name_reference"
-                },
-                user_id=user_id,
-                scope="user"
-            )
-            logging.info(f"💾 Stored name information: {speech_result}")
-            
-        # Look for books/reading interests
-        if any(phrase in message_lower for phrase in ["book", "read", "reading", "novel", "author"]):
-            mem_store.write(
-                "preference",
-                f"reading_interest_{hash(speech_result) % 1000}",
-                {
-                    "summary": speech_result[:200],
-                    "context": "books and reading interests",
-                    "preference_type": "reading"
-                },
-                user_id=user_id,
-                scope="user"
-            )
-            logging.info(f"💾 Stored reading interest: {speech_result}")
-                    
+        from app.memory_writer import get_memory_writer
+        items = _extract_speech_memories(speech_result, user_id, call_sid)
+        get_memory_writer().submit(items)
+        for item in items:
+            if item["key"] == f"caller_info_{user_id}" and item["value"]["caller_name"] != "unknown":
+                from app.known_callers import get_known_callers
+                get_known_callers().mark_known(user_id, item["value"]["caller_name"])
+        logging.info(f"💾 Queued {len(items)} memory writes for user_id={user_id}")
     except Exception as e:
         logging.error(f"Memory saving error: {e}")
+    turn.mark("memory_enqueued")
+    logging.info(f"⏱️ Stage: Memory writes queued | Elapsed: {time.time() - t0:.3f}s")
     
-    logging.info(f"⏱️ Stage: Memory storage complete | Elapsed: {time.time() - t0:.3f}s")
-    
-    # Get AI response from NeuroSphere with conversation context
+    # Stream the AI response; sentences are spoken as they complete
     llm_start = time.time()
     logging.info(f"⏱️ Stage: LLM request start | Elapsed: {time.time() - t0:.3f}s")
-    ai_response = get_ai_response(user_id, speech_result, call_sid)
-    logging.info(f"⏱️ Stage: LLM response complete | Elapsed: {time.time() - t0:.3f}s | LLM duration: {time.time() - llm_start:.3f}s")
+    threading.Thread(
+        target=contextvars.copy_context().run,  # keeps this webhook's trace span as the parent
+        args=(stream_ai_response, turn, user_id, speech_result, call_sid),
+        name=f"speech-turn-{turn.turn_id[:8]}",
+        daemon=True
+    ).start()
     
-    # Store conversation history
-    if call_sid in call_sessions:
-        call_sessions[call_sid]['conversation'].extend([
-            {"role": "user", "content": speech_result},
-            {"role": "assistant", "content": ai_response}
-        ])
-        # Keep only last 10 exchanges (20 messages)
-        if len(call_sessions[call_sid]['conversation']) > 20:
-            call_sessions[call_sid]['conversation'] = call_sessions[call_sid]['conversation'][-20:]
-    
-    logging.info(f"🤖 AI Response: {ai_response}")
-    
-    # Generate TwiML response with ElevenLabs TTS (same as greeting)
-    response = VoiceResponse()
-    
-    # Use ElevenLabs for AI response (consistent with greeting)
     tts_start = time.time()
-    logging.info(f"⏱️ Stage: TTS request start | Elapsed: {time.time() - t0:.3f}s")
-    audio_url = text_to_speech(ai_response, VOICE_ID)
-    logging.info(f"⏱️ Stage: TTS complete | Elapsed: {time.time() - t0:.3f}s | TTS duration: {time.time() - tts_start:.3f}s")
-    
-    if audio_url:
-        # Play the generated audio file
-        response.play(audio_url)
-        logging.info(f"⏱️ Stage: Response audio sent to Twilio | Elapsed: {time.time() - t0:.3f}s")
-    else:
-        # Fallback to Twilio voice if ElevenLabs fails
-        response.say(ai_response, voice='alice')
-        logging.info(f"⏱️ Stage: Fallback response sent | Elapsed: {time.time() - t0:.3f}s")
-    
-    # Skip the "anything else" question - just wait for user input
-    
-    # ✅ Fix: Use absolute HTTPS URL with configured server_url
-    config = _get_config()
-    server_url = config["server_url"].replace("/phone/incoming", "")
-    gather = Gather(
-        input='speech',
-        timeout=8,  # Reduced timeout  
-        speech_timeout=3,  # Reliable speech detection
-        action=f"{server_url}/phone/process-speech",  # Absolute HTTPS URL
-        actionOnEmptyResult=True,  # Call action even if no speech detected
-        method='POST'
-    )
-    response.append(gather)
+    twiml = _speech_turn_twiml(turn, 0, timeout=float(get_setting("speech_first_sentence_timeout", 8)))
+    turn.mark("twiml_sent")
+    logging.info(f"⏱️ Stage: First sentence TwiML sent | Elapsed: {time.time() - t0:.3f}s | "
+                 f"LLM wait: {tts_start - llm_start:.3f}s+{time.time() - tts_start:.3f}s | {turn.breakdown()}")
+    
+    return twiml, 200, {'Content-Type': 'text/xml'}
+
+@app.route('/phone/continue-turn/<turn_id>', methods=['POST', 'GET'])
+def continue_speech_turn(turn_id):
+    """Play the sentences of a streamed reply generated since the last TwiML"""
+    from app.speech_pipeline import get_turn
+    
+    # Any worker can continue the turn: it is read from the shared session store
+    # when another worker is producing it
+    turn = get_turn(turn_id, call_sid=request.values.get('CallSid'), store=call_sessions)
+    if not turn:
+        logging.warning(f"⚠️ Unknown or expired speech turn {turn_id}")
+        response = VoiceResponse()
+        response.append(_speech_gather())
+        return str(response), 200, {'Content-Type': 'text/xml'}
     
-    return str(response), 200, {'Content-Type': 'text/xml'}
+    from_index = request.args.get('i', default=0, type=int)
+    twiml = _speech_turn_twiml(turn, from_index, timeout=float(get_setting("speech_continue_timeout", 4)))
+    return twiml, 200, {'Content-Type': 'text/xml'}
 
 @app.route('/phone/status', methods=['POST'])
 def call_status():
@@ -1452,7 +1668,12 @@ def call_status():
     
     # Clean up session when call ends
     if call_status in ['completed', 'failed', 'busy', 'no-answer']:
-        call_sessions.pop(call_sid, None)
+        session_data = call_sessions.get(call_sid)
+        if call_status == 'completed' and from_number:
+            # The call left memories behind - recognize the caller next time without asking AI-Memory
+            from app.known_callers import get_known_callers, caller_key
+            get_known_callers().mark_known(caller_key(from_number, (session_data or {}).get('customer_id')))
+        call_sessions.delete(call_sid)
     
     return '', 200
 
@@ -1471,28 +1692,142 @@ def test_phone_system():
         "backend_url": _get_backend_url()
     })
 
+def _send_cached_audio(path):
+    """Cached audio: hand off to nginx (X-Accel-Redirect) or a zero-copy send_file."""
+    accel_prefix = get_setting("tts_accel_redirect_prefix", "")
+    if accel_prefix:
+        response = Response(mimetype='audio/mpeg')
+        response.headers['X-Accel-Redirect'] = f"{accel_prefix.rstrip('/')}/{os.path.basename(path)}"
+        return response
+    return send_file(os.path.abspath(path), mimetype='audio/mpeg', conditional=True, max_age=86400)
+
+@app.route('/phone/tts/<token>.mp3', methods=['GET'])
+def stream_tts(token):
+    """Stream ElevenLabs audio for a signed TTS token, teeing it into the TTS cache"""
+    import time
+    from itsdangerous import BadSignature
+    from app.tts_cache import get_tts_cache, tts_cache_key, iter_audio_bytes
+    
+    try:
+        payload = _tts_stream_serializer().loads(token, max_age=int(get_setting("tts_stream_token_ttl", 600)))
+    except BadSignature:
+        logging.warning("❌ Invalid or expired TTS stream token")
+        return "Invalid token", 403
+    
+    text, voice_id, settings = payload["t"], payload["v"], payload["s"]
+    cache = get_tts_cache()
+    key = tts_cache_key(text, voice_id, TTS_MODEL_ID, settings)
+    
+    # Already rendered (Twilio retry, or another call synthesized it meanwhile)
+    cached_path = cache.path_for(key)
+    if os.path.exists(cached_path):
+        return _send_cached_audio(cached_path)
+    
+    t0 = time.time()
+    tts_span = tracing.begin_span("tts.stream", parent=payload.get("p"), kind="client", attributes={"tts.chars": len(text)})
+    try:
+        from elevenlabs import VoiceSettings
+        
+        client = _get_elevenlabs_client()
+        if not client:
+            return "TTS unavailable", 503
+        audio_stream = client.text_to_speech.stream(
+            voice_id=voice_id,
+            text=text,
+            model_id=TTS_MODEL_ID,
+            voice_settings=VoiceSettings(**settings)
+        )
+        chunks = cache.tee(key, iter_audio_bytes(audio_stream))
+        # Pull the first chunk before committing to a 200 so upstream errors surface as 502
+        first_chunk = next(chunks)
+    except StopIteration:
+        logging.error(f"ElevenLabs returned no audio for: {text[:50]}")
+        tts_span.error = "no audio"
+        tts_span.end()
+        return "No audio", 502
+    except Exception as e:
+        logging.error(f"ElevenLabs streaming TTS failed: {e}")
+        tts_span.error = str(e)
+        tts_span.end()
+        return "TTS failed", 502
+    
+    logging.info(f"⏱️ TTS first chunk in {time.time() - t0:.3f}s ({key[:12]}, {len(text)} chars)")
+    tts_span.set_attribute("tts.ttfb_ms", round((time.time() - t0) * 1000, 3))
+    
+    def generate():
+        try:
+            yield first_chunk
+            yield from chunks
+        finally:
+            tts_span.end()
+    
+    return Response(generate(), mimetype='audio/mpeg', headers={'X-Accel-Buffering': 'no'})
+
+def require_admin_token(view):
+    """Admin-only Flask route: ADMIN_API_TOKEN as a bearer token or X-Admin-Token (like the orchestrator's debug routes)"""
+    from app.profiling import admin_token_error
+    
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        error = admin_token_error(request.headers.get('Authorization'), request.headers.get('X-Admin-Token'))
+        if error:
+            return jsonify({"error": error[1]}), error[0]
+        return view(*args, **kwargs)
+    return wrapper
+
+@app.route('/api/traces', methods=['GET'])
+@require_admin_token
+def list_traces():
+    """Most recent traces in this process's span buffer"""
+    return jsonify({
+        "traces": tracing.get_tracer().recent_traces(limit=request.args.get('limit', default=50, type=int)),
+        "stats": tracing.get_tracer().stats()
+    })
+
+@app.route('/api/traces/<trace_id>', methods=['GET'])
+@require_admin_token
+def get_trace(trace_id):
+    """All buffered spans of one trace (pass a CallSid to look up a call's trace)"""
+    if trace_id.startswith('CA'):
+        trace_id = tracing.trace_id_for_call(trace_id)
+    return jsonify({"trace_id": trace_id, "spans": tracing.get_tracer().get_trace(trace_id)})
+
+@app.route('/api/calls', methods=['GET'])
+def list_calls():
+    """Paginated call log (newest first) for the dashboard"""
+    try:
+        from app.call_log import get_call_log
+        
+        return jsonify(get_call_log().query(
+            page=request.args.get('page', default=1, type=int),
+            page_size=request.args.get('page_size', default=50, type=int),
+            caller=request.args.get('caller'),
+            customer_id=request.args.get('customer_id', type=int),
+            date_from=request.args.get('date_from'),
+            date_to=request.args.get('date_to'),
+        ))
+    except Exception as e:
+        logging.error(f"❌ Error querying call log: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/calls/<call_sid>', methods=['GET'])
+def get_call(call_sid):
+    """Single call log entry"""
+    from app.call_log import get_call_log
+    
+    call = get_call_log().get(call_sid)
+    if not call:
+        return jsonify({"error": "Call not found"}), 404
+    return jsonify(call)
+
 @app.route('/static/audio/<path:filename>')
 def serve_audio(filename):
     """Serve audio files with proper headers for external access"""
-    import os
     try:
-        audio_path = os.path.join('static/audio', filename)
-        if os.path.exists(audio_path):
-            def generate():
-                with open(audio_path, 'rb') as f:
-                    data = f.read(1024)
-                    while data:
-                        yield data
-                        data = f.read(1024)
-            
-            return Response(generate(), mimetype='audio/mpeg', 
-                          headers={'Content-Disposition': f'inline; filename={filename}'})
-        else:
-            logging.error(f"Audio file not found: {audio_path}")
-            return "Audio file not found", 404
+        return send_from_directory(os.path.abspath('static/audio'), filename, mimetype='audio/mpeg', conditional=True)
     except Exception as e:
-        logging.error(f"Error serving audio file {filename}: {e}")
-        return "Audio file error", 500
+        logging.error(f"Audio file not found or unreadable: {filename} ({e})")
+        return "Audio file not found", 404
 
 # ============ ADMIN API ENDPOINTS ============
 
@@ -1587,6 +1922,9 @@ def update_voice():
         VOICE_SETTINGS['similarity_boost'] = clarity
         
         logging.info(f"✅ Voice settings updated: ID={voice_id}, stability={stability}, clarity={clarity}")
+        
+        # New voice/settings = new cache keys; render the static phrases now, not mid-call
+        threading.Thread(target=prewarm_tts_cache, daemon=True).start()
         return jsonify({"success": True})
         
     except Exception as e:
@@ -1964,6 +2302,23 @@ def get_agent_name():
         logging.error(f"❌ Failed to get agent name: {e}")
         return jsonify({"agent_name": "AI Assistant"})  # Return generic default on error
 
+@app.route('/phone/admin/tts-cache', methods=['GET'])
+def tts_cache_stats():
+    """TTS audio cache hit rate, size and evictions"""
+    from app.tts_cache import get_tts_cache
+    return jsonify(get_tts_cache().stats())
+
+@app.route('/phone/admin/tts-cache/prewarm', methods=['POST'])
+def tts_cache_prewarm():
+    """Pre-render phrases into the TTS cache (body: {"phrases": [...]} or empty for defaults)"""
+    try:
+        data = request.get_json(silent=True) or {}
+        result = prewarm_tts_cache(data.get('phrases'), data.get('voice_id'))
+        return jsonify({"success": True, **result})
+    except Exception as e:
+        logging.error(f"❌ TTS cache pre-warm failed: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
 @app.route('/phone/admin/reset-greetings', methods=['POST'])
 def reset_greetings_to_placeholders():
     """Reset greetings to use proper {agent_name} placeholders - ADMIN ONLY"""
@@ -2509,7 +2864,7 @@ def get_user_schema(user_id):
 
 @app.route('/phone/process-all-memories/<user_id>', methods=['POST'])
 def process_all_memories(user_id):
-    """Process ALL memories for a user and extract into structured schema"""
+    """Rebuild a user's stored caller schema from ALL their memories (drift repair)"""
     try:
         from app.http_memory import HTTPMemoryStore
         mem_store = HTTPMemoryStore()
@@ -2521,37 +2876,12 @@ def process_all_memories(user_id):
             if len(normalized_digits) >= 10:
                 normalized_user_id = normalized_digits[-10:]
         
-        logging.info(f"🔄 Processing ALL memories for user: {normalized_user_id}")
+        logging.info(f"🔄 Rebuilding caller schema from ALL memories for user: {normalized_user_id}")
         
-        # Get ALL memories for this user (high limit)
+        # Full re-normalization; the stored schema is otherwise maintained incrementally on write
+        schema_doc = mem_store.rebuild_caller_schema(normalized_user_id)
+        normalized_schema = schema_doc["schema"]
         ai_memory_url = get_setting("ai_memory_url", "http://209.38.143.71:8100")
-        response = requests.post(
-            f"{ai_memory_url}/memory/retrieve",
-            json={"user_id": normalized_user_id, "message": "", "limit": 2000},
-            timeout=30
-        )
-        
-        if response.status_code != 200:
-            return jsonify({"success": False, "error": f"Failed to fetch memories: {response.status_code}"}), 500
-        
-        data = response.json()
-        all_memories = []
-        
-        # Parse all memories
-        if "memory" in data and data["memory"].strip():
-            for idx, line in enumerate(data["memory"].split('\n')):
-                line = line.strip()
-                if line:
-                    try:
-                        mem_obj = json.loads(line)
-                        all_memories.append(mem_obj)
-                    except:
-                        pass
-        
-        logging.info(f"📊 Found {len(all_memories)} total memories for user {normalized_user_id}")
-        
-        # Run normalization pipeline on ALL memories
-        normalized_schema = mem_store.normalize_memories(all_memories)
         
         # Count what was extracted
         contacts_count = sum(1 for rel in ["spouse", "father", "mother"] 
@@ -2559,7 +2889,7 @@ def process_all_memories(user_id):
         contacts_count += len(normalized_schema.get("contacts", {}).get("children", []))
         
         stats = {
-            "total_memories": len(all_memories),
+            "total_memories": schema_doc["memory_count"],
             "contacts": contacts_count,
             "vehicles": len(normalized_schema.get("vehicles", [])),
             "policies": len(normalized_schema.get("policies", [])),
@@ -2569,7 +2899,7 @@ def process_all_memories(user_id):
         
         logging.info(f"✅ Extracted: {stats['contacts']} contacts, {stats['vehicles']} vehicles, {stats['policies']} policies, {stats['facts']} facts")
         
-        # Save the normalized schema
+        # Save a copy of the normalized schema for the admin panel schema editor
         response = requests.post(
             f"{ai_memory_url}/memory/store",
             json={
@@ -2754,9 +3084,8 @@ def customer_onboard():
     """Handle new customer onboarding"""
     try:
         from werkzeug.security import generate_password_hash
-        from sqlalchemy import create_engine
-        from sqlalchemy.orm import sessionmaker
         from customer_models import Customer, CustomerConfiguration
+        from customer_db import get_db_session, get_routing_table
         import json
         
         data = request.get_json()
@@ -2765,10 +3094,7 @@ def customer_onboard():
         if not data.get('password'):
             return jsonify({"success": False, "error": "Password is required"}), 400
         
-        # Create database engine
-        engine = create_engine(_get_config()["database_url"])
-        Session = sessionmaker(bind=engine)
-        db_session = Session()
+        db_session = get_db_session()
         
         # Hash password
         password_hash = generate_password_hash(data.get('password'))
@@ -2804,6 +3130,7 @@ def customer_onboard():
         db_session.commit()
         
         logging.info(f"✅ New customer onboarded: {customer.email} (ID: {customer.id})")
+        get_routing_table().invalidate()
         
         # Also save to Notion for easy management
         try:
@@ -2848,9 +3175,8 @@ def login():
     """Customer login endpoint"""
     try:
         from werkzeug.security import check_password_hash
-        from sqlalchemy import create_engine
-        from sqlalchemy.orm import sessionmaker
         from customer_models import Customer
+        from customer_db import get_db_session
         
         data = request.get_json()
         email = data.get('email')
@@ -2859,9 +3185,7 @@ def login():
         if not email or not password:
             return jsonify({"error": "Email and password required"}), 400
         
-        engine = create_engine(_get_config()["database_url"])
-        Session = sessionmaker(bind=engine)
-        db_session = Session()
+        db_session = get_db_session()
         
         customer = db_session.query(Customer).filter_by(email=email).first()
         
@@ -2925,13 +3249,10 @@ def check_session():
 def get_customer(customer_id):
     """Get customer details"""
     try:
-        from sqlalchemy import create_engine
-        from sqlalchemy.orm import sessionmaker
         from customer_models import Customer
+        from customer_db import get_db_session
         
-        engine = create_engine(_get_config()["database_url"])
-        Session = sessionmaker(bind=engine)
-        db_session = Session()
+        db_session = get_db_session()
         
         customer = db_session.query(Customer).filter_by(id=customer_id).first()
         
@@ -2952,15 +3273,12 @@ def get_customer(customer_id):
 def update_customer_settings(customer_id):
     """Update customer AI settings"""
     try:
-        from sqlalchemy import create_engine
-        from sqlalchemy.orm import sessionmaker
         from customer_models import Customer, CustomerConfiguration
+        from customer_db import get_db_session, get_routing_table
         
         data = request.get_json()
         
-        engine = create_engine(_get_config()["database_url"])
-        Session = sessionmaker(bind=engine)
-        db_session = Session()
+        db_session = get_db_session()
         
         customer = db_session.query(Customer).filter_by(id=customer_id).first()
         
@@ -2991,6 +3309,7 @@ def update_customer_settings(customer_id):
         db_session.close()
         
         logging.info(f"✅ Updated settings for customer {customer_id}")
+        get_routing_table().invalidate()
         
         return jsonify({"success": True, "message": "Settings updated"})
         
@@ -3002,16 +3321,13 @@ def update_customer_settings(customer_id):
 def apply_customer_personality(customer_id):
     """Apply personality preset to customer"""
     try:
-        from sqlalchemy import create_engine
-        from sqlalchemy.orm import sessionmaker
         from customer_models import Customer, CustomerConfiguration
+        from customer_db import get_db_session, get_routing_table
         
         data = request.get_json()
         preset = data.get('preset', 'professional')
         
-        engine = create_engine(_get_config()["database_url"])
-        Session = sessionmaker(bind=engine)
-        db_session = Session()
+        db_session = get_db_session()
         
         customer = db_session.query(Customer).filter_by(id=customer_id).first()
         
@@ -3044,6 +3360,7 @@ def apply_customer_personality(customer_id):
         db_session.close()
         
         logging.info(f"✅ Applied {preset} personality for customer {customer_id}")
+        get_routing_table().invalidate()
         
         return jsonify({"success": True, "message": f"Applied {preset} personality"})
         
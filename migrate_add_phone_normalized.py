@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Database Migration: Add twilio_phone_normalized column to customers table
+Stores the E.164 form of twilio_phone_number (indexed) so inbound calls can
+be routed with an indexed lookup instead of scanning every customer.
+Run this inside the Docker container before deploying the routing table.
+"""
+import os
+from sqlalchemy import create_engine, text
+
+from customer_models import normalize_e164
+
+def migrate():
+    """Add, backfill and index twilio_phone_normalized on customers"""
+
+    database_url = os.environ.get("DATABASE_URL")
+
+    if not database_url:
+        # Try config_loader if available
+        try:
+            from config_loader import get_secret
+            database_url = get_secret("DATABASE_URL")
+        except ImportError:
+            pass
+
+    if not database_url:
+        print("❌ DATABASE_URL not found in environment")
+        print("\n💡 TIP: Run this script inside the Docker container:")
+        print("   docker exec -it chatstack-web-1 python3 migrate_add_phone_normalized.py")
+        return False
+
+    engine = create_engine(database_url)
+
+    try:
+        with engine.connect() as conn:
+            print("🔧 Adding twilio_phone_normalized column to customers table...")
+            conn.execute(text("""
+                ALTER TABLE customers
+                ADD COLUMN IF NOT EXISTS twilio_phone_normalized VARCHAR(20)
+            """))
+
+            # Backfill from twilio_phone_number
+            rows = conn.execute(text("""
+                SELECT id, twilio_phone_number
+                FROM customers
+                WHERE twilio_phone_number IS NOT NULL
+            """)).fetchall()
+
+            for customer_id, phone in rows:
+                conn.execute(
+                    text("UPDATE customers SET twilio_phone_normalized = :normalized WHERE id = :id"),
+                    {"normalized": normalize_e164(phone), "id": customer_id}
+                )
+            print(f"✅ Backfilled {len(rows)} customers")
+
+            conn.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_customers_twilio_phone_normalized
+                ON customers (twilio_phone_normalized)
+            """))
+            conn.commit()
+
+            print("✅ Migration complete! twilio_phone_normalized column added and indexed")
+            return True
+
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        return False
+    finally:
+        engine.dispose()
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Database Migration: Add twilio_phone_normalized to customers")
+    print("=" * 60)
+
+    success = migrate()
+
+    if success:
+        print("\n✅ Migration successful!")
+    else:
+        print("\n❌ Migration failed!")
+
+    print("=" * 60)
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Data Migration: Import static/calls/calls.json into the call log index
+Calls are now indexed in SQLite (app/call_log.py) instead of being appended
+to calls.json. Run once after deploying; re-running skips calls already
+imported. The old calls.json is left in place.
+"""
+import os
+import sys
+
+from app.call_log import get_call_log
+
+DEFAULT_CALLS_JSON = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'calls', 'calls.json')
+
+def migrate(path):
+    """Import every entry of calls.json into the call log"""
+
+    if not os.path.exists(path):
+        print(f"❌ {path} not found")
+        print("\n💡 TIP: Run this script inside the Docker container:")
+        print("   docker exec -it chatstack-orchestrator python3 migrate_calls_json.py")
+        return False
+
+    try:
+        call_log = get_call_log()
+        print(f"🔧 Importing {path} into {call_log.path}...")
+        result = call_log.import_calls_json(path)
+        print(f"✅ Imported {result['imported']} calls ({result['skipped']} already present or invalid)")
+        return True
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        return False
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Data Migration: calls.json -> call log index")
+    print("=" * 60)
+
+    success = migrate(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_CALLS_JSON)
+
+    if success:
+        print("\n✅ Migration successful!")
+    else:
+        print("\n❌ Migration failed!")
+
+    print("=" * 60)
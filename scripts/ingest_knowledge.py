@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Ingest documents into the local knowledge base (BM25 index).
+
+Each .txt/.md file becomes one document (title = file name) that is
+chunked and indexed. Running services pick up the new index version on
+their next search - no restart needed.
+
+Usage:
+    python3 scripts/ingest_knowledge.py docs/faq.md docs/policies/ --type rule --category business
+    python3 scripts/ingest_knowledge.py --rebuild
+
+Dependencies:
+- numpy, requests (via app.knowledge)
+"""
+
+import argparse
+import os
+import sys
+from typing import List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.knowledge import get_knowledge_index
+
+SUPPORTED_EXTENSIONS = (".txt", ".md")
+
+
+def collect_files(paths: List[str]) -> List[str]:
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(os.path.join(root, n) for n in sorted(names) if n.endswith(SUPPORTED_EXTENSIONS))
+        elif path.endswith(SUPPORTED_EXTENSIONS):
+            files.append(path)
+    return files
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Ingest documents into the local knowledge base")
+    parser.add_argument("paths", nargs="*", help="Files or directories (.txt, .md)")
+    parser.add_argument("--type", default="fact", help="Knowledge type (fact, rule, procedure, requirement)")
+    parser.add_argument("--category", default="general", help="Knowledge category (general, technical, business, personal)")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild the index from existing chunks")
+    args = parser.parse_args()
+
+    index = get_knowledge_index()
+
+    if args.rebuild:
+        version = index.rebuild()
+        print(f"✅ Rebuilt knowledge index {version}")
+        return 0
+
+    files = collect_files(args.paths)
+    if not files:
+        parser.error("no .txt/.md files found")
+
+    for path in files:
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+        title = os.path.splitext(os.path.basename(path))[0].replace("_", " ").replace("-", " ")
+        added = index.add_document(title, text, doc_type=args.type, category=args.category, source=path)
+        print(f"✅ {path}: {added['chunks']} chunks")
+
+    print(f"📚 Index stats: {index.stats()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
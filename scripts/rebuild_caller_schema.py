@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Rebuild stored caller schemas from raw memories (drift repair).
+
+The normalized caller schema is maintained incrementally on every memory
+write. This script re-normalizes ALL memories for the given callers and
+stores a fresh schema document, e.g. after classification rules change or
+if concurrent writers let a document drift.
+
+Usage:
+    python3 scripts/rebuild_caller_schema.py 9495551234 7145550000
+    python3 scripts/rebuild_caller_schema.py --file callers.txt
+
+Dependencies:
+- requests (via app.http_memory)
+"""
+
+import argparse
+import os
+import sys
+from typing import List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.http_memory import HTTPMemoryStore
+
+
+def normalize_user_id(user_id: str) -> str:
+    """Match the 10-digit user_id convention used by the phone routes."""
+    digits = ''.join(filter(str.isdigit, user_id))
+    return digits[-10:] if len(digits) >= 10 else user_id
+
+
+def load_user_ids(args: argparse.Namespace) -> List[str]:
+    user_ids = list(args.user_ids)
+    if args.file:
+        with open(args.file, "r") as f:
+            user_ids.extend(line.strip() for line in f if line.strip() and not line.startswith("#"))
+    return [normalize_user_id(u) for u in user_ids]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rebuild stored caller schemas from raw memories")
+    parser.add_argument("user_ids", nargs="*", help="Caller user IDs (phone numbers)")
+    parser.add_argument("--file", help="File with one user ID per line")
+    args = parser.parse_args()
+
+    user_ids = load_user_ids(args)
+    if not user_ids:
+        parser.error("no user IDs given")
+
+    mem_store = HTTPMemoryStore()
+    if not mem_store.available:
+        print("❌ AI-Memory service unavailable")
+        return 1
+
+    failures = 0
+    for user_id in user_ids:
+        try:
+            document = mem_store.rebuild_caller_schema(user_id)
+            schema = document["schema"]
+            print(
+                f"✅ {user_id}: {document['memory_count']} memories -> "
+                f"name={schema['identity'].get('caller_name')}, "
+                f"vehicles={len(schema['vehicles'])}, policies={len(schema['policies'])}, "
+                f"facts={len(schema['facts'])}"
+            )
+        except Exception as e:
+            failures += 1
+            print(f"❌ {user_id}: {e}")
+
+    mem_store.close()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
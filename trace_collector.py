@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Local OTLP/HTTP JSON collector stand-in for per-call latency traces
+Accepts the spans app/tracing.py exports (POST /v1/traces) and prints a
+waterfall for every trace once it has been quiet for a couple of seconds -
+where each 100 ms of a call went, without running a real collector.
+
+    python3 trace_collector.py [port]          # default 4318
+    # then set "tracing_otlp_endpoint": "http://localhost:4318/v1/traces"
+"""
+import sys
+import json
+import time
+import threading
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+QUIET_SECONDS = 2.0
+BAR_WIDTH = 50
+
+_traces = defaultdict(list)   # trace_id -> spans
+_last_seen = {}               # trace_id -> arrival time
+_lock = threading.Lock()
+
+def _attributes(raw):
+    values = {}
+    for attr in raw or []:
+        value = attr.get("value", {})
+        values[attr["key"]] = next(iter(value.values()), None) if value else None
+    return values
+
+class CollectorHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        if self.path != "/v1/traces":
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        with _lock:
+            for resource_spans in body.get("resourceSpans", []):
+                service = _attributes(resource_spans.get("resource", {}).get("attributes")).get("service.name", "?")
+                for scope_spans in resource_spans.get("scopeSpans", []):
+                    for span in scope_spans.get("spans", []):
+                        span["service"] = service
+                        _traces[span["traceId"]].append(span)
+                        _last_seen[span["traceId"]] = time.time()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, format, *args):
+        pass
+
+def print_waterfall(trace_id, spans):
+    """One line per span: offset, duration and a bar on the trace's timeline"""
+    start = min(int(s["startTimeUnixNano"]) for s in spans)
+    end = max(int(s["endTimeUnixNano"]) for s in spans)
+    total_ms = max((end - start) / 1e6, 0.001)
+    by_parent = defaultdict(list)
+    ids = {s["spanId"] for s in spans}
+    for span in spans:
+        parent = span.get("parentSpanId") if span.get("parentSpanId") in ids else None
+        by_parent[parent].append(span)
+
+    call_sid = next((_attributes(s.get("attributes")).get("call_sid") for s in spans
+                     if _attributes(s.get("attributes")).get("call_sid")), None)
+    print(f"\n📞 trace {trace_id} {f'(call {call_sid}) ' if call_sid else ''}- {len(spans)} spans, {total_ms:.0f}ms")
+
+    def walk(parent, depth):
+        for span in sorted(by_parent.get(parent, []), key=lambda s: int(s["startTimeUnixNano"])):
+            offset_ms = (int(span["startTimeUnixNano"]) - start) / 1e6
+            duration_ms = (int(span["endTimeUnixNano"]) - int(span["startTimeUnixNano"])) / 1e6
+            lead = int(offset_ms / total_ms * BAR_WIDTH)
+            bar = " " * lead + "█" * max(1, int(duration_ms / total_ms * BAR_WIDTH))
+            error = " ❌" if span.get("status", {}).get("code") == 2 else ""
+            name = f"{'  ' * depth}{span['name']} [{span['service']}]"
+            print(f"  {offset_ms:8.1f}ms {duration_ms:8.1f}ms |{bar:<{BAR_WIDTH}}| {name}{error}")
+            walk(span["spanId"], depth + 1)
+
+    walk(None, 0)
+
+def flush_quiet_traces():
+    while True:
+        time.sleep(0.5)
+        cutoff = time.time() - QUIET_SECONDS
+        with _lock:
+            ready = [trace_id for trace_id, seen in _last_seen.items() if seen < cutoff]
+            batches = [(trace_id, _traces.pop(trace_id)) for trace_id in ready]
+            for trace_id in ready:
+                _last_seen.pop(trace_id, None)
+        for trace_id, spans in batches:
+            print_waterfall(trace_id, spans)
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 4318
+    threading.Thread(target=flush_quiet_traces, daemon=True).start()
+    print(f"🔭 Trace collector listening on http://0.0.0.0:{port}/v1/traces")
+    ThreadingHTTPServer(("0.0.0.0", port), CollectorHandler).serve_forever()